@@ -6,13 +6,18 @@ import random
 
 from common.utils import env_utils
 
-from langchain import hub
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI, AzureChatOpenAI
 from langsmith.utils import LangSmithConnectionError
 from dotenv import load_dotenv
 from common.genie_logger import GenieLogger
+from ai.langsmith.llm_gateway import llm_gateway, retry_after
+from ai.langsmith.param_scoring import BATCH_SCORING_HUMAN, BATCH_SCORING_PROMPT_NAME, BATCH_SCORING_SYSTEM, parse_score, parse_scores
+from ai.langsmith.prompt_registry import LANGSMITH_PROMPT_WARM_UP, prompt_registry
+from ai.langsmith.response_cache import bypass_response_cache, response_cache
 # from data.api_services.embeddings import GenieEmbeddingsClient
 from data.data_common.events.genie_event import GenieEvent
+from data.data_common.events.retry import defer_inline_retry
 from data.data_common.events.topics import Topic
 
 load_dotenv()
@@ -21,6 +26,13 @@ logger = GenieLogger()
 
 OPENAI_API_VERSION = env_utils.get("OPENAI_API_VERSION", "2024-08-01-preview")
 
+
+def has_text_content(response) -> bool:
+    """A model answer with text, the only kind of summary worth caching."""
+    content = getattr(response, "content", None)
+    return isinstance(content, str) and bool(content.strip())
+
+
 class LoggerEventHandler(logging.Handler):
     def emit(self, record):
         try:
@@ -50,6 +62,17 @@ class Langsmith:
             openai_api_version=OPENAI_API_VERSION,
         )
         self.model = self.azure_model
+        # Prompts are pulled from the hub once and cached, see prompt_registry
+        self.prompts = prompt_registry()
+        if LANGSMITH_PROMPT_WARM_UP:
+            self.prompts.start_warm_up()
+        # Every LLM call of the process shares the concurrency and rate limits, see llm_gateway
+        self.llm = llm_gateway()
+        # Responses of the profile prompts are reused for the same inputs, see response_cache
+        self.responses = response_cache()
+        self.batch_scoring_prompt = ChatPromptTemplate.from_messages(
+            [("system", BATCH_SCORING_SYSTEM), ("human", BATCH_SCORING_HUMAN)]
+        )
         # self.embeddings_client = GenieEmbeddingsClient()
         self.setup_custom_logging()
         
@@ -79,11 +102,11 @@ class Langsmith:
         logger.info(f"Profile from Langsmith: {person_data}")
         return person_data
 
-    def run_prompt_profile_person(self, person_data):
-        prompt = hub.pull("profile_person")
+    async def run_prompt_profile_person(self, person_data):
+        prompt = await self.prompts.aget("profile_person")
         try:
             runnable = prompt | self.model
-            response = runnable.invoke(person_data)
+            response = await self.llm.invoke("profile_person", runnable, person_data)
         except Exception as e:
             response = f"Error: {e}"
         if response.get("news"):
@@ -92,12 +115,13 @@ class Langsmith:
 
     async def run_prompt_strength(self, person_data, news_data=None):
         logger.info("Running Langsmith prompt for strengths")
-        prompt = hub.pull("get_strengths_with_social_media") if news_data else hub.pull("get_strengths")
+        prompt_name = "get_strengths_with_social_media" if news_data else "get_strengths"
+        prompt = await self.prompts.aget(prompt_name)
         runnable = prompt | self.model
         arguments = {"personal_data": person_data, "social_media_posts": news_data if news_data else None}
 
         try:
-            response = await self._run_prompt_with_retry(runnable, arguments)
+            response = await self._run_prompt_with_retry(runnable, arguments, prompt_name=prompt_name)
             for i in range(5):
                 try:
                     if response and isinstance(response, dict):
@@ -105,7 +129,8 @@ class Langsmith:
                     if response and isinstance(response, list) and len(response) > 0:
                         if isinstance(response[0], str):
                             logger.error(f"Strengths from Langsmith got wrong: {response}")
-                            response = await self._run_prompt_with_retry(runnable, arguments)
+                            with bypass_response_cache():
+                                response = await self._run_prompt_with_retry(runnable, arguments, prompt_name=prompt_name)
                 except Exception as e:
                     logger.error(f"Error parsing strengths from Langsmith: {e}")
         except Exception as e:
@@ -113,7 +138,7 @@ class Langsmith:
         return response
 
     async def run_prompt_action_items(self, person_data, action_item, action_item_criteria, company_data=None, seller_context=None):
-        prompt = hub.pull("specific-action-item") 
+        prompt = await self.prompts.aget("specific-action-item") 
         runnable = prompt | self.model
         logger.info(f"Running Langsmith prompt for specific action item: {action_item}, criteria: {action_item_criteria}, seller_context: {seller_context}")
         arguments = {
@@ -125,7 +150,7 @@ class Langsmith:
         }
 
         try:
-            response = await self._run_prompt_with_retry(runnable, arguments)
+            response = await self._run_prompt_with_retry(runnable, arguments, prompt_name="specific-action-item")
         except Exception as e:
             response = f"Error: {e}"
         return response
@@ -138,7 +163,7 @@ class Langsmith:
             person_data, 
             prospect_company_data=None,
             chunk_text = None):
-        prompt = hub.pull("send-file-action-item") 
+        prompt = await self.prompts.aget("send-file-action-item") 
         runnable = prompt | self.azure_model
         logger.info(f"Running Langsmith prompt for specific send file action item: {action_item}, criteria: {action_item_criteria}, file: {file_name}")
         arguments = {
@@ -151,13 +176,14 @@ class Langsmith:
         }
 
         try:
-            response = await self._run_prompt_with_retry(runnable, arguments)
+            response = await self._run_prompt_with_retry(runnable, arguments, prompt_name="send-file-action-item")
         except Exception as e:
             response = f"Error: {e}"
         return response
 
     async def run_prompt_get_to_know(self, person_data, company_data=None, news_data=None, seller_context=None):
-        prompt = hub.pull("dos_and_donts_w_context_and_posts") if news_data else hub.pull("dos_and_donts_w_context")
+        prompt_name = "dos_and_donts_w_context_and_posts" if news_data else "dos_and_donts_w_context"
+        prompt = await self.prompts.aget(prompt_name)
         runnable = prompt | self.model
         arguments = {
             "personal_data": person_data.get("personal_data", "not found"),
@@ -171,7 +197,7 @@ class Langsmith:
             "seller_context": seller_context if seller_context else "not found",
         }
         try:
-            response = await self._run_prompt_with_retry(runnable, arguments)
+            response = await self._run_prompt_with_retry(runnable, arguments, prompt_name=prompt_name)
             for i in range(5):
                 if (
                     response
@@ -192,7 +218,9 @@ class Langsmith:
                     )
                 ):
                     logger.warning("Got wrong get-to-know from Langsmith - trying again")
-                    response = runnable.invoke(arguments)
+                    # Replaces the wrong response in the cache
+                    with bypass_response_cache():
+                        response = await self._run_prompt_with_retry(runnable, arguments, prompt_name=prompt_name)
                 else:
                     break
             logger.info("Got get-to-know from Langsmith: " + str(response))
@@ -202,21 +230,23 @@ class Langsmith:
         logger.info(f"Got get-to-know from Langsmith: {response}")
         return response
 
-    def run_prompt_linkedin_url(self, email_address, company_data=None):
-        prompt = hub.pull("linkedin_from_email_and_company")
+    async def run_prompt_linkedin_url(self, email_address, company_data=None):
+        prompt = await self.prompts.aget("linkedin_from_email_and_company")
         try:
             runnable = prompt | self.model
-            response = runnable.invoke({"email_address": email_address, "company_data": company_data})
+            response = await self.llm.invoke(
+                "linkedin_from_email_and_company", runnable, {"email_address": email_address, "company_data": company_data}
+            )
         except Exception as e:
             response = f"Error: {e}"
         return response
         return response
 
     async def run_prompt_doc_categories(self, doc_content):
-        prompt = hub.pull("classify-file-category")
+        prompt = await self.prompts.aget("classify-file-category")
         try:
             runnable = prompt | self.model
-            response = runnable.invoke({"file_content": doc_content})
+            response = await self.llm.invoke("classify-file-category", runnable, {"file_content": doc_content})
         except Exception as e:
             response = f"Error: {e}"
         if isinstance(response, dict) and response.get("doc_categories"):
@@ -224,13 +254,13 @@ class Langsmith:
         else:
             return []
 
-    def run_prompt_company_overview_challenges(self, company_data):
+    async def run_prompt_company_overview_challenges(self, company_data):
         logger.info("Running Langsmith prompt for company overview and challenges")
 
-        prompt = hub.pull("get_company_overview")
+        prompt = await self.prompts.aget("get_company_overview")
         try:
             runnable = prompt | self.model
-            response = runnable.invoke(company_data)
+            response = await self.llm.invoke("get_company_overview", runnable, company_data)
         except Exception as e:
             response = f"Error: {e}"
         return response
@@ -238,10 +268,8 @@ class Langsmith:
     async def run_prompt_get_meeting_goals(
         self, personal_data, my_company_data, seller_context, call_info={}
     ):
-        if seller_context:
-            prompt = hub.pull("get_meeting_goals_w_context")
-        else:
-            prompt = hub.pull("get_meeting_goals")
+        prompt_name = "get_meeting_goals_w_context" if seller_context else "get_meeting_goals"
+        prompt = await self.prompts.aget(prompt_name)
         arguments = {
             "personal_data": personal_data,
             "my_company_data": my_company_data,
@@ -251,7 +279,7 @@ class Langsmith:
         response = None
         try:
             runnable = prompt | self.model
-            response = await self._run_prompt_with_retry(runnable, arguments)
+            response = await self._run_prompt_with_retry(runnable, arguments, prompt_name=prompt_name)
         except Exception as e:
             response = f"Error: {e}"
         finally:
@@ -272,10 +300,8 @@ class Langsmith:
     async def run_prompt_get_meeting_guidelines(
         self, customer_strengths, meeting_details, meeting_goals, seller_context, case={}
     ):
-        if seller_context:
-            prompt = hub.pull("get_meeting_guidelines_w_context")
-        else:
-            prompt = hub.pull("get_meeting_guidelines")
+        prompt_name = "get_meeting_guidelines_w_context" if seller_context else "get_meeting_guidelines"
+        prompt = await self.prompts.aget(prompt_name)
         arguments = {
             "customer_strengths": customer_strengths,
             "meeting_details": meeting_details,
@@ -286,7 +312,7 @@ class Langsmith:
         response = None
         try:
             runnable = prompt | self.model
-            response = await self._run_prompt_with_retry(runnable, arguments)
+            response = await self._run_prompt_with_retry(runnable, arguments, prompt_name=prompt_name)
         except Exception as e:
             response = f"Error: {e}"
         finally:
@@ -306,9 +332,9 @@ class Langsmith:
 
     async def preprocess_uploaded_file_content(self, text):
         try:
-            prompt = hub.pull("file-upload-preprocessing")
+            prompt = await self.prompts.aget("file-upload-preprocessing")
             runnable = prompt | self.model
-            response = await self._run_prompt_with_retry(runnable, text)
+            response = await self._run_prompt_with_retry(runnable, text, prompt_name="file-upload-preprocessing")
         except Exception as e:
             logger.error(f"Error running file upload preprocessing: {e}")
             response = text
@@ -322,10 +348,23 @@ class Langsmith:
             response = f"Error: {e}"
         return response
 
-    async def _run_prompt_with_retry(self, runnable, arguments, max_retries=5, base_wait=2):
+    async def _run_prompt_with_retry(self, runnable, arguments, prompt_name=None, max_retries=5, base_wait=2,
+                                     valid=None):
+        """
+        Runs the prompt through the LLM gateway with ainvoke, so the event loop keeps serving other events during the
+        LLM call. Rate limits are retried by the gateway, so a rate limit it gives up on is not retried again here.
+        The response cache answers prompts it already ran on the same inputs, with responses passing `valid`.
+        """
+        return await self.responses.get_or_call(
+            prompt_name, runnable, arguments,
+            lambda: self._invoke_with_retry(runnable, arguments, prompt_name, max_retries, base_wait),
+            valid=valid,
+        )
+
+    async def _invoke_with_retry(self, runnable, arguments, prompt_name, max_retries, base_wait):
         for attempt in range(max_retries):
             try:
-                response = runnable.invoke(arguments)
+                response = await self.llm.invoke(prompt_name, runnable, arguments)
                 if response:  # If successful, return the response
                     return response
             except LangSmithConnectionError as e:  # Handling specific connection error from LangSmith
@@ -334,53 +373,30 @@ class Langsmith:
                     wait_time = base_wait * (2**attempt) + random.uniform(
                         0, 1
                     )  # Exponential backoff with jitter
+                    defer_inline_retry(wait_time, f"LangSmith prompt failed {attempt + 1} times: {e}")
                     logger.info(f"Retrying in {wait_time:.2f} seconds...")
                     await asyncio.sleep(wait_time)
                 else:
                     raise e  # Raise exception if retries are exhausted
             except Exception as e:
                 logger.error(f"General error encountered on attempt {attempt + 1}: {e}")
-                if attempt < max_retries - 1:
+                if attempt < max_retries - 1 and retry_after(e) is None:
                     wait_time = base_wait * (2**attempt) + random.uniform(0, 1)
+                    defer_inline_retry(wait_time, f"LangSmith prompt failed {attempt + 1} times: {e}")
                     logger.info(f"Retrying in {wait_time:.2f} seconds...")
                     await asyncio.sleep(wait_time)
                 else:
                     raise e  # Raise exception if retries are exhausted
         raise Exception("Max retries exceeded")
 
-    async def _run_prompt_with_retry_artifacts(self, runnable, arguments, max_retries=5, base_wait=2):
-        """Retries LangSmith prompt execution with async support."""
-        for attempt in range(max_retries):
-            try:
-                loop = asyncio.get_running_loop()
-                response = await loop.run_in_executor(None, runnable.invoke, arguments)
-                if response:  # ✅ If successful, return the response
-                    return response
-            except LangSmithConnectionError as e:
-                logger.error(f"LangSmithConnectionError encountered on attempt {attempt + 1}: {e}")
-                if attempt < max_retries - 1:
-                    wait_time = base_wait * (2**attempt) + random.uniform(0, 1)
-                    logger.info(f"Retrying in {wait_time:.2f} seconds...")
-                    await asyncio.sleep(wait_time)  # ✅ Keep it async
-                else:
-                    raise e
-            except Exception as e:
-                logger.error(f"General error encountered on attempt {attempt + 1}: {e}")
-                if attempt < max_retries - 1:
-                    wait_time = base_wait * (2**attempt) + random.uniform(0, 1)
-                    logger.info(f"Retrying in {wait_time:.2f} seconds...")
-                    await asyncio.sleep(wait_time)  # ✅ Keep it async
-                else:
-                    raise e
-        raise Exception("Max retries exceeded")
-
     async def get_news(self, news_data: dict):
-        prompt = hub.pull("post_summary")
+        prompt = await self.prompts.aget("post_summary")
         runnable = prompt | self.model
         arguments = [news_data]
 
         try:
-            response = await self._run_prompt_with_retry(runnable, arguments)
+            response = await self._run_prompt_with_retry(runnable, arguments, prompt_name="post_summary",
+                                                         valid=has_text_content)
         except Exception as e:
             response = f"Error: {e}"
 
@@ -388,11 +404,11 @@ class Langsmith:
         return response
 
     async def get_company_challenges_with_news(self, company_dto):
-        prompt = hub.pull("get_company_challenges_with_news")
+        prompt = await self.prompts.aget("get_company_challenges_with_news")
         arguments = {"company_data": company_dto.to_dict(), "company_news": company_dto.news}
         try:
             runnable = prompt | self.model
-            response = await self._run_prompt_with_retry(runnable, arguments)
+            response = await self._run_prompt_with_retry(runnable, arguments, prompt_name="get_company_challenges_with_news")
             if response and isinstance(response, dict):
                 response = response.get("challenges")
         except Exception as e:
@@ -401,7 +417,7 @@ class Langsmith:
 
     async def get_meeting_summary(self, meeting_data, seller_context, profiles, company_data):
         logger.info("Running Langsmith prompt for meeting summary")
-        prompt = hub.pull("get_meeting_summary_to_email")
+        prompt = await self.prompts.aget("get_meeting_summary_to_email")
         arguments = {
             "meeting_data": meeting_data,
             "profiles": profiles,
@@ -410,7 +426,7 @@ class Langsmith:
         }
         try:
             runnable = prompt | self.model
-            response = await self._run_prompt_with_retry(runnable, arguments)
+            response = await self._run_prompt_with_retry(runnable, arguments, prompt_name="get_meeting_summary_to_email")
         except Exception as e:
             response = f"Error: {e}"
         return response
@@ -418,14 +434,15 @@ class Langsmith:
 
     async def get_work_history_summary(self, person, work_history):
         logger.info("Running Langsmith prompt for work history summary")
-        prompt = hub.pull("work-history-summary")
+        prompt = await self.prompts.aget("work-history-summary")
         arguments = {
             "person_data": person,
             "work_history": work_history
         }
         try:
             runnable = prompt | self.model
-            response = await self._run_prompt_with_retry(runnable, arguments)            
+            response = await self._run_prompt_with_retry(runnable, arguments, prompt_name="work-history-summary",
+                                                         valid=has_text_content)
             if response and response.content and isinstance(response.content, str):
                 response = response.content
         except Exception as e:          
@@ -435,7 +452,7 @@ class Langsmith:
 
     async def get_profile_param_reasoning(self, person_name, text, param_name, reasoning, profile):
         logger.info("Running Langsmith prompt for profile-param-reasoning")
-        prompt = hub.pull("profile-param-reasoning")
+        prompt = await self.prompts.aget("profile-param-reasoning")
         arguments = {
             "name": person_name,
             "text": text,
@@ -445,7 +462,7 @@ class Langsmith:
         }
         try:
             runnable = prompt | self.model
-            response = await self._run_prompt_with_retry(runnable, arguments)            
+            response = await self._run_prompt_with_retry(runnable, arguments, prompt_name="profile-param-reasoning")            
             if response and response.content and isinstance(response.content, str):
                 response = response.content
         except Exception as e:          
@@ -454,13 +471,13 @@ class Langsmith:
 
     async def get_work_history_post(self, work_history_artifact: dict):
         logger.info("Running Langsmith prompt for work history post")
-        prompt = hub.pull("work_history_post_generator")
+        prompt = await self.prompts.aget("work_history_post_generator")
         arguments = {
             "work_history": work_history_artifact
         }
         try:
             runnable = prompt | self.model
-            response = await self._run_prompt_with_retry(runnable, arguments)
+            response = await self._run_prompt_with_retry(runnable, arguments, prompt_name="work_history_post_generator")
             if response and response.content and isinstance(response.content, str):
                 response = response.content
         except Exception as e:
@@ -469,7 +486,7 @@ class Langsmith:
 
     async def get_param_evaluation(self, person, param_data, person_artifact):
         logger.info("Running Langsmith prompt for evaluating param")
-        prompt = hub.pull("param-scoring-v2")
+        prompt = await self.prompts.aget("param-scoring-v2")
         arguments = {
             "personal_info": person,
             "param_data": param_data,
@@ -477,18 +494,15 @@ class Langsmith:
         }
         try:
             runnable = prompt | self.azure_model
-            response = await self._run_prompt_with_retry_artifacts(runnable, arguments)
-            if response and response.content and isinstance(response.content, str):
-                response = response.content
-                if response.startswith("```"):
-                    response = response.replace("```json", "").strip("`").strip()
-                    response = response.replace("\\n", "\n").replace("\n", " ").replace('\\"', '"')
-                    response = response.split("```")[0].strip() if "```" in response else response
-                    response = json.loads(response, strict=False)
-                else:
-                    response = self.extract_json(response)
-            else:
+            response = await self._run_prompt_with_retry(
+                runnable, arguments, prompt_name="param-scoring-v2",
+                valid=lambda answer: parse_score(getattr(answer, "content", None)) is not None,
+            )
+            score = parse_score(getattr(response, "content", None))
+            if score is None:
                 logger.error(f"Error parsing param evaluation from Langsmith: {response}")
+                return {}
+            response = score
         except Exception as e:
             logger.error(f"Error running param evaluation: {e}")
             try:
@@ -498,9 +512,36 @@ class Langsmith:
             return {}
         return response
 
+    async def get_params_evaluation(self, person, params_data: list[dict], person_artifact) -> dict[str, dict]:
+        """
+        Scores all of `params_data` (param_data dicts with a 'param_id') on the artifact in one call, see
+        param_scoring. Returns the scores by param_id; the parameters missing from it were not scored.
+        """
+        logger.info(f"Running batched prompt for evaluating {len(params_data)} params")
+        prompt = self.batch_scoring_prompt
+        param_ids = [param["param_id"] for param in params_data]
+        arguments = {
+            "personal_info": json.dumps(person, default=str),
+            "params_data": json.dumps(params_data, default=str),
+            "post": person_artifact if isinstance(person_artifact, str) else json.dumps(person_artifact, default=str),
+        }
+        try:
+            runnable = prompt | self.azure_model
+            response = await self._run_prompt_with_retry(
+                runnable, arguments, prompt_name=BATCH_SCORING_PROMPT_NAME,
+                valid=lambda answer: bool(parse_scores(getattr(answer, "content", None), param_ids)),
+            )
+        except Exception as e:
+            logger.error(f"Error running batched param evaluation: {e}")
+            return {}
+        scores = parse_scores(getattr(response, "content", None), param_ids)
+        if not scores:
+            logger.error(f"Error parsing batched param evaluation from Langsmith: {response}")
+        return scores
+
     async def get_summary(self, data, max_words=50):
         logger.info("Running Langsmith prompt for text summary")
-        prompt = hub.pull("whiteforest/chain-of-density-prompt")
+        prompt = await self.prompts.aget("whiteforest/chain-of-density-prompt")
         arguments = {
             "content": data,
             "max_words": max_words,
@@ -510,7 +551,7 @@ class Langsmith:
         }
         try:
             runnable = prompt | self.model
-            response = await self._run_prompt_with_retry(runnable, arguments)
+            response = await self._run_prompt_with_retry(runnable, arguments, prompt_name="whiteforest/chain-of-density-prompt")
             if response and response.content and isinstance(response.content, str):
                 summary_array = json.loads(response.content)
                 if summary_array and isinstance(summary_array, list) and len(summary_array) > 0:
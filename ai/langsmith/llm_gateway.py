@@ -0,0 +1,246 @@
+"""
+One gate for all LLM calls of a process. Profile params evaluation fans out a call per parameter (per post), and the
+Langsmith consumer and meeting manager call the same Azure OpenAI deployment at the same time, so bursts used to hit
+the deployment's rate limits and fail with 429s after the client's own retries.
+
+A call through LLMGateway.invoke waits, in order, for:
+- the end of a pause after a 429, whose Retry-After holds back every call of the process;
+- a slot of its prompt (LLM_MAX_CONCURRENT_CALLS_PER_PROMPT, or LLM_MAX_CONCURRENT_CALLS_<PROMPT>), so that one
+  fan-out cannot take every slot;
+- a slot of the process (LLM_MAX_CONCURRENT_CALLS);
+- a request from the requests-per-minute bucket and its estimated tokens from the tokens-per-minute bucket
+  (LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE; 0 disables a bucket). Estimates are corrected by the usage the
+  model reports.
+
+A call answered with a 429 is tried again after its Retry-After, up to LLM_RATE_LIMIT_RETRIES times; within a
+consumer, a pause longer than the consumer may hold its partition hands the event to the retry scheduler instead
+(see defer_inline_retry).
+
+`stats` and `prompt_stats` count calls, queue depth and time spent waiting.
+"""
+import asyncio
+import json
+import re
+import threading
+import time
+from typing import Optional
+
+from common.genie_logger import GenieLogger
+from common.utils import env_utils
+from data.data_common.events.retry import defer_inline_retry
+
+logger = GenieLogger()
+
+LLM_MAX_CONCURRENT_CALLS = int(env_utils.get("LLM_MAX_CONCURRENT_CALLS", "16"))
+LLM_MAX_CONCURRENT_CALLS_PER_PROMPT = int(env_utils.get("LLM_MAX_CONCURRENT_CALLS_PER_PROMPT", "8"))
+LLM_REQUESTS_PER_MINUTE = int(env_utils.get("LLM_REQUESTS_PER_MINUTE", "300"))
+LLM_TOKENS_PER_MINUTE = int(env_utils.get("LLM_TOKENS_PER_MINUTE", "150000"))
+# Tokens of a completion, added to the prompt's estimate until the model reports the usage
+LLM_COMPLETION_TOKENS_ESTIMATE = int(env_utils.get("LLM_COMPLETION_TOKENS_ESTIMATE", "600"))
+LLM_RATE_LIMIT_RETRIES = int(env_utils.get("LLM_RATE_LIMIT_RETRIES", "3"))
+LLM_DEFAULT_RETRY_AFTER_SECONDS = float(env_utils.get("LLM_DEFAULT_RETRY_AFTER_SECONDS", "10"))
+
+
+class TokenBucket:
+    """
+    `per_period` tokens per `period_seconds`, refilled continuously, holding at most a period's worth. Waiters are
+    served first come, first served; a request larger than the bucket waits for a full bucket.
+    """
+
+    def __init__(self, per_period: float, period_seconds: float = 60):
+        self.capacity = float(per_period)
+        self.rate = self.capacity / period_seconds
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1) -> float:
+        """Takes `amount` tokens, waiting for them; returns the seconds waited."""
+        amount = min(amount, self.capacity)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        started = time.monotonic()
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+        return time.monotonic() - started
+
+    def adjust(self, amount: float):
+        """Takes `amount` more tokens (or gives them back when negative), e.g. once the actual usage is known."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+def estimate_tokens(arguments) -> int:
+    """A rough count of the tokens a prompt's arguments add: a token per 4 characters of their JSON."""
+    try:
+        text = arguments if isinstance(arguments, str) else json.dumps(arguments, default=str)
+    except (TypeError, ValueError):
+        text = str(arguments)
+    return len(text) // 4 + 1
+
+
+def used_tokens(response) -> Optional[int]:
+    """The tokens a model response reports it used, if it does (AIMessage usage metadata)."""
+    usage = getattr(response, "usage_metadata", None)
+    if isinstance(usage, dict) and usage.get("total_tokens"):
+        return int(usage["total_tokens"])
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage")
+    if isinstance(token_usage, dict) and token_usage.get("total_tokens"):
+        return int(token_usage["total_tokens"])
+    return None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds to wait before calling again if `error` is a rate limit (HTTP 429) answer, None for other errors."""
+    if getattr(error, "status_code", None) != 429 and type(error).__name__ != "RateLimitError":
+        return None
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1)):
+        value = headers.get(header)
+        if value is not None:
+            try:
+                return max(0.0, float(value) * scale)
+            except ValueError:
+                pass
+    return LLM_DEFAULT_RETRY_AFTER_SECONDS
+
+
+class LLMGateway:
+    def __init__(
+        self,
+        max_concurrent: int = LLM_MAX_CONCURRENT_CALLS,
+        max_concurrent_per_prompt: int = LLM_MAX_CONCURRENT_CALLS_PER_PROMPT,
+        requests_per_minute: int = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = LLM_TOKENS_PER_MINUTE,
+        completion_tokens: int = LLM_COMPLETION_TOKENS_ESTIMATE,
+        rate_limit_retries: int = LLM_RATE_LIMIT_RETRIES,
+        minute_seconds: float = 60,
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_concurrent_per_prompt = max(1, max_concurrent_per_prompt)
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.completion_tokens = completion_tokens
+        self.rate_limit_retries = rate_limit_retries
+        # Length of a "minute" of the buckets, shorter in simulations
+        self.minute_seconds = minute_seconds
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._paused_until = 0.0
+        self.stats = {"calls": 0, "failures": 0, "in_flight": 0, "queued": 0, "max_queued": 0, "wait_seconds": 0.0,
+                      "rate_limited": 0, "estimated_tokens": 0, "used_tokens": 0}
+        self.prompt_stats: dict[str, dict] = {}
+
+    def _bind(self):
+        # Semaphores and locks belong to one event loop; a process running another loop (a test, a script) gets its own
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+            self._prompt_slots: dict[str, asyncio.Semaphore] = {}
+            self._requests = TokenBucket(self.requests_per_minute, self.minute_seconds) if self.requests_per_minute > 0 else None
+            self._tokens = TokenBucket(self.tokens_per_minute, self.minute_seconds) if self.tokens_per_minute > 0 else None
+
+    def prompt_limit(self, prompt_name: str) -> int:
+        suffix = re.sub(r"[^A-Z0-9]", "_", prompt_name.upper()).strip("_")
+        limit = env_utils.get(f"LLM_MAX_CONCURRENT_CALLS_{suffix}", "") if suffix else ""
+        return max(1, int(limit)) if limit else self.max_concurrent_per_prompt
+
+    def _prompt_slot(self, prompt_name: str) -> asyncio.Semaphore:
+        slot = self._prompt_slots.get(prompt_name)
+        if slot is None:
+            slot = self._prompt_slots[prompt_name] = asyncio.Semaphore(self.prompt_limit(prompt_name))
+        return slot
+
+    def _prompt_stats(self, prompt_name: str) -> dict:
+        stats = self.prompt_stats.get(prompt_name)
+        if stats is None:
+            stats = self.prompt_stats[prompt_name] = {"calls": 0, "queued": 0, "wait_seconds": 0.0, "rate_limited": 0}
+        return stats
+
+    async def _wait_for_pause(self):
+        while (pause := self._paused_until - time.monotonic()) > 0:
+            await asyncio.sleep(pause)
+
+    async def invoke(self, prompt_name: Optional[str], runnable, arguments):
+        """runnable.ainvoke(arguments) within the limits; raises what the call raises once the 429 retries are used up."""
+        self._bind()
+        prompt_name = prompt_name or "unnamed"
+        prompt_stats = self._prompt_stats(prompt_name)
+        estimate = estimate_tokens(arguments) + self.completion_tokens
+        for attempt in range(self.rate_limit_retries + 1):
+            queued_at = time.monotonic()
+            self.stats["queued"] += 1
+            self.stats["max_queued"] = max(self.stats["max_queued"], self.stats["queued"])
+            prompt_stats["queued"] += 1
+            started = False
+            try:
+                await self._wait_for_pause()
+                async with self._prompt_slot(prompt_name), self._slots:
+                    await self._wait_for_pause()
+                    if self._requests is not None:
+                        await self._requests.acquire(1)
+                    if self._tokens is not None:
+                        await self._tokens.acquire(estimate)
+                    waited = time.monotonic() - queued_at
+                    self.stats["wait_seconds"] += waited
+                    prompt_stats["wait_seconds"] += waited
+                    self.stats["queued"] -= 1
+                    prompt_stats["queued"] -= 1
+                    started = True
+                    self.stats["calls"] += 1
+                    prompt_stats["calls"] += 1
+                    self.stats["in_flight"] += 1
+                    self.stats["estimated_tokens"] += estimate
+                    try:
+                        response = await runnable.ainvoke(arguments)
+                    finally:
+                        self.stats["in_flight"] -= 1
+                used = used_tokens(response)
+                if used is not None:
+                    self.stats["used_tokens"] += used
+                    if self._tokens is not None:
+                        self._tokens.adjust(used - estimate)
+                return response
+            except Exception as e:
+                pause = retry_after(e)
+                if pause is None or attempt == self.rate_limit_retries:
+                    self.stats["failures"] += 1
+                    raise
+                self.stats["rate_limited"] += 1
+                prompt_stats["rate_limited"] += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+                logger.warning(f"LLM rate limited on {prompt_name}, pausing LLM calls for {pause:.1f}s")
+                defer_inline_retry(pause, f"LLM rate limited on {prompt_name}", delay_seconds=pause)
+            finally:
+                if not started:
+                    self.stats["queued"] -= 1
+                    prompt_stats["queued"] -= 1
+
+
+_llm_gateway: Optional[LLMGateway] = None
+_llm_gateway_lock = threading.Lock()
+
+
+def llm_gateway() -> LLMGateway:
+    """The gateway shared by the whole process."""
+    global _llm_gateway
+    if _llm_gateway is None:
+        with _llm_gateway_lock:
+            if _llm_gateway is None:
+                _llm_gateway = LLMGateway()
+    return _llm_gateway
+
+
+def set_llm_gateway(gateway: Optional[LLMGateway]):
+    """Replaces the shared gateway, e.g. with one of other limits in benchmarks and tests."""
+    global _llm_gateway
+    _llm_gateway = gateway
@@ -0,0 +1,155 @@
+"""
+Batched scoring of profile parameters. param-scoring-v2 scores one parameter per call, so scoring an artifact (a post
+or a work history element) sent the artifact's text once per parameter of the sheet. In batched mode a single call
+scores a group of up to PARAM_SCORING_BATCH_SIZE parameters and answers with a JSON array of
+{param_id, score, clues}. Groups are also cut so that the artifact and the definitions of the group's parameters stay
+under PARAM_SCORING_MAX_PROMPT_TOKENS.
+
+A parameter the batched answer does not score - the answer could not be parsed, or the parameter is missing or
+malformed in it - is scored again on its own with param-scoring-v2. PARAM_SCORING_BATCH_SIZE=1 turns batching off.
+
+Larger groups send fewer prompt tokens but answer slower, a call decoding the scores of its whole group one after the
+other; with 30 parameters, groups of 4 are both cheaper and faster than per-parameter calls
+(benchmarks/bench_param_scoring.py).
+"""
+import asyncio
+import json
+import re
+from typing import Awaitable, Callable, Optional
+
+from ai.langsmith.llm_gateway import estimate_tokens
+from common.genie_logger import GenieLogger
+from common.utils import env_utils
+
+logger = GenieLogger()
+
+PARAM_SCORING_BATCH_SIZE = int(env_utils.get("PARAM_SCORING_BATCH_SIZE", "4"))
+PARAM_SCORING_MAX_PROMPT_TOKENS = int(env_utils.get("PARAM_SCORING_MAX_PROMPT_TOKENS", "12000"))
+
+BATCH_SCORING_PROMPT_NAME = "param-scoring-batch"
+BATCH_SCORING_SYSTEM = """You are an expert in analyzing the personality of sales prospects from what they write.
+You get a text written by a person and a list of personality parameters. For each parameter you get its id, its name,
+its range (min_range to max_range), an explanation of the range, and a list of clues to look for in the text.
+
+Score every parameter of the list on its range, based on the text only, and score each of its clues from 0 to 100 by
+how strongly the text shows it. Answer with a JSON array and nothing else, one object per parameter, in the order of
+the list:
+[{{"param_id": "<id of the parameter>", "score": <score of the parameter>, "reasoning": "<one sentence>",
+"clues": [{{"clue": "<the clue>", "score": <score of the clue>}}]}}]"""
+BATCH_SCORING_HUMAN = """Person: {personal_info}
+
+Text: {post}
+
+Parameters: {params_data}"""
+
+
+def chunk_params(
+    params: list[dict],
+    artifact,
+    batch_size: int = PARAM_SCORING_BATCH_SIZE,
+    max_prompt_tokens: int = PARAM_SCORING_MAX_PROMPT_TOKENS,
+) -> list[list[dict]]:
+    """
+    `params` in groups of at most `batch_size`, each small enough that the artifact and the group's parameters fit in
+    `max_prompt_tokens`. A parameter too large to share a group gets one of its own.
+    """
+    budget = max_prompt_tokens - estimate_tokens(BATCH_SCORING_SYSTEM) - estimate_tokens(artifact)
+    groups, group, group_tokens = [], [], 0
+    for param in params:
+        tokens = estimate_tokens(param)
+        if group and (len(group) >= batch_size or group_tokens + tokens > budget):
+            groups.append(group)
+            group, group_tokens = [], 0
+        group.append(param)
+        group_tokens += tokens
+    if group:
+        groups.append(group)
+    return groups
+
+
+def parse_score(content: str) -> Optional[dict]:
+    """The JSON object of a param-scoring-v2 answer, fenced or not, or None when it has none."""
+    text = content.strip() if isinstance(content, str) else ""
+    match = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if match:
+        text = match.group(1).strip()
+    try:
+        answer = json.loads(text, strict=False)
+    except json.JSONDecodeError:
+        start, end = text.find("{"), text.rfind("}")
+        try:
+            answer = json.loads(text[start:end + 1], strict=False) if 0 <= start < end else None
+        except json.JSONDecodeError:
+            answer = None
+    return answer if isinstance(answer, dict) else None
+
+
+def parse_scores(content: str, param_ids: list[str]) -> dict[str, dict]:
+    """
+    The scores of a batched answer by param_id, for the requested `param_ids` only. Entries without a numeric score
+    are left out, so that their parameters are scored again; an answer that is not a JSON array gives no scores.
+    """
+    text = content.strip() if isinstance(content, str) else ""
+    match = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if match:
+        text = match.group(1).strip()
+    try:
+        answer = json.loads(text, strict=False)
+    except json.JSONDecodeError:
+        start, end = text.find("["), text.rfind("]")
+        try:
+            answer = json.loads(text[start:end + 1], strict=False) if 0 <= start < end else None
+        except json.JSONDecodeError:
+            answer = None
+    if isinstance(answer, dict):
+        answer = answer.get("scores") or answer.get("params")
+    if not isinstance(answer, list):
+        return {}
+    requested = {str(param_id) for param_id in param_ids}
+    scores = {}
+    for entry in answer:
+        if not isinstance(entry, dict) or str(entry.get("param_id")) not in requested:
+            continue
+        try:
+            entry["score"] = float(entry["score"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        clues = entry.get("clues")
+        entry["clues"] = [clue for clue in clues if isinstance(clue, dict)] if isinstance(clues, list) else []
+        scores[str(entry["param_id"])] = entry
+    return scores
+
+
+async def score_in_batches(
+    params: list[dict],
+    artifact,
+    score_batch: Callable[[list[dict]], Awaitable[dict[str, dict]]],
+    score_one: Callable[[dict], Awaitable[Optional[dict]]],
+    batch_size: int = PARAM_SCORING_BATCH_SIZE,
+    max_prompt_tokens: int = PARAM_SCORING_MAX_PROMPT_TOKENS,
+) -> list[dict]:
+    """
+    Scores `params` (dicts with a 'param_id') on `artifact`, a group per `score_batch` call, which returns the scores
+    it got by param_id. The parameters a group's answer did not score go to `score_one`. Returns the scores found,
+    in the order of `params`.
+    """
+    if batch_size <= 1:
+        results = await asyncio.gather(*(score_one(param) for param in params))
+        return [result for result in results if result]
+
+    async def score_group(group: list[dict]) -> list[Optional[dict]]:
+        try:
+            scores = await score_batch(group)
+        except Exception as e:
+            logger.error(f"Failed to score a batch of {len(group)} params, scoring them one by one: {e}")
+            scores = {}
+        missing = [param for param in group if str(param["param_id"]) not in scores]
+        if missing:
+            logger.warning(f"Batched scoring left {len(missing)} of {len(group)} params unscored, retrying them")
+        retried = dict(zip((str(param["param_id"]) for param in missing),
+                           await asyncio.gather(*(score_one(param) for param in missing))))
+        return [scores.get(str(param["param_id"])) or retried.get(str(param["param_id"])) for param in group]
+
+    groups = await asyncio.gather(*(score_group(group) for group in chunk_params(params, artifact, batch_size,
+                                                                                   max_prompt_tokens)))
+    return [result for group in groups for result in group if result]
@@ -0,0 +1,257 @@
+"""
+Cache of the LangChain hub prompts Langsmith runs. Langsmith used to hub.pull its prompt on every LLM call, a round-trip
+to the hub before each invocation. The registry keeps every prompt for LANGSMITH_PROMPT_TTL_SECONDS and then refreshes
+it in the background while the cached copy keeps serving, so only the first use of a prompt in a process waits for the
+hub, and Langsmith warms the registry up with KNOWN_PROMPTS when it is first created (LANGSMITH_PROMPT_WARM_UP).
+
+Every pulled prompt is also written to LANGSMITH_PROMPT_SNAPSHOT_DIR. When the hub cannot be reached the snapshot is
+served instead, so a process can start and run offline on the prompts of its last successful pulls, or on a snapshot
+directory shipped with the deployment; with LANGSMITH_PROMPT_OFFLINE=true the hub is not contacted at all.
+
+A prompt can be pinned to a hub commit with LANGSMITH_PROMPT_VERSION_<PROMPT>, e.g.
+LANGSMITH_PROMPT_VERSION_PARAM_SCORING_V2=1a2b3c4d. Pinned prompts do not change and are never refreshed.
+"""
+import asyncio
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+
+from common.genie_logger import GenieLogger
+from common.utils import env_utils
+
+logger = GenieLogger()
+
+LANGSMITH_PROMPT_TTL_SECONDS = float(env_utils.get("LANGSMITH_PROMPT_TTL_SECONDS", "600"))
+LANGSMITH_PROMPT_SNAPSHOT_DIR = env_utils.get(
+    "LANGSMITH_PROMPT_SNAPSHOT_DIR", os.path.join(tempfile.gettempdir(), "genie-prompt-snapshots")
+)
+LANGSMITH_PROMPT_OFFLINE = env_utils.get("LANGSMITH_PROMPT_OFFLINE", "false").lower() == "true"
+LANGSMITH_PROMPT_WARM_UP = env_utils.get("LANGSMITH_PROMPT_WARM_UP", "true").lower() == "true"
+
+# The prompts Langsmith runs, pulled by warm_up()
+KNOWN_PROMPTS = (
+    "classify-file-category",
+    "dos_and_donts_w_context",
+    "dos_and_donts_w_context_and_posts",
+    "file-upload-preprocessing",
+    "get_company_challenges_with_news",
+    "get_company_overview",
+    "get_meeting_goals",
+    "get_meeting_goals_w_context",
+    "get_meeting_guidelines",
+    "get_meeting_guidelines_w_context",
+    "get_meeting_summary_to_email",
+    "get_strengths",
+    "get_strengths_with_social_media",
+    "linkedin_from_email_and_company",
+    "param-scoring-v2",
+    "post_summary",
+    "profile-param-reasoning",
+    "profile_person",
+    "send-file-action-item",
+    "specific-action-item",
+    "whiteforest/chain-of-density-prompt",
+    "work-history-summary",
+    "work_history_post_generator",
+)
+
+
+class _CachedPrompt:
+    __slots__ = ("prompt", "fetched_at", "refreshing")
+
+    def __init__(self, prompt):
+        self.prompt = prompt
+        self.fetched_at = time.monotonic()
+        self.refreshing = False
+
+
+class PromptRegistry:
+    """
+    Prompts by name. `pull` fetches a prompt from the hub by reference ("name" or "name:commit", as hub.pull takes);
+    `dumps` / `loads` serialize prompts for the snapshots, which are disabled without them or without `snapshot_dir`.
+    `pins` maps prompt names to commits, on top of the LANGSMITH_PROMPT_VERSION_<PROMPT> variables.
+    """
+
+    def __init__(
+        self,
+        pull: Callable[[str], object],
+        dumps: Callable[[object], str] = None,
+        loads: Callable[[str], object] = None,
+        ttl_seconds: float = LANGSMITH_PROMPT_TTL_SECONDS,
+        snapshot_dir: Optional[str] = LANGSMITH_PROMPT_SNAPSHOT_DIR,
+        pins: dict[str, str] = None,
+        offline: bool = LANGSMITH_PROMPT_OFFLINE,
+    ):
+        self._pull = pull
+        self._dumps = dumps
+        self._loads = loads
+        self.ttl_seconds = max(0.0, ttl_seconds)
+        self.snapshot_dir = snapshot_dir if dumps and loads else None
+        self.pins = dict(pins or {})
+        self.offline = offline
+        self._cache: dict[str, _CachedPrompt] = {}
+        self._loading: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._warm_up: Optional[threading.Thread] = None
+        self.stats = {"hits": 0, "misses": 0, "pulls": 0, "refreshes": 0, "pull_failures": 0, "snapshot_loads": 0}
+
+    def version(self, name: str) -> Optional[str]:
+        """The hub commit `name` is pinned to, if any."""
+        if name in self.pins:
+            return self.pins[name]
+        suffix = re.sub(r"[^A-Z0-9]", "_", name.upper()).strip("_")
+        return env_utils.get(f"LANGSMITH_PROMPT_VERSION_{suffix}", "") or None
+
+    def reference(self, name: str) -> str:
+        version = self.version(name)
+        return f"{name}:{version}" if version else name
+
+    def get(self, name: str):
+        """
+        The prompt `name`, at its pinned version if it has one. Pulled from the hub on first use, or read from its
+        snapshot when the hub fails; raises when neither has it.
+        """
+        reference = self.reference(name)
+        entry = self._cache.get(reference)
+        if entry is None:
+            self.stats["misses"] += 1
+            with self._lock:
+                loading = self._loading.setdefault(reference, threading.Lock())
+            # One pull per prompt, however many callers miss it at once
+            with loading:
+                entry = self._cache.get(reference)
+                if entry is None:
+                    return self._load(reference)
+        self.stats["hits"] += 1
+        if (
+            not entry.refreshing
+            and reference == name
+            and time.monotonic() - entry.fetched_at >= self.ttl_seconds
+            and not self.offline
+        ):
+            entry.refreshing = True
+            threading.Thread(target=self._refresh, args=(reference, entry), daemon=True).start()
+        return entry.prompt
+
+    async def aget(self, name: str):
+        """get() for async code: a prompt that is not cached yet is loaded in a thread, not on the event loop."""
+        if self.reference(name) in self._cache:
+            return self.get(name)
+        return await asyncio.to_thread(self.get, name)
+
+    def _load(self, reference: str):
+        error = None
+        if not self.offline:
+            try:
+                return self._pull_and_store(reference)
+            except Exception as e:
+                self.stats["pull_failures"] += 1
+                logger.warning(f"Failed to pull prompt {reference}, trying its snapshot: {e}")
+                error = e
+        prompt = self._read_snapshot(reference)
+        if prompt is None:
+            raise error or LookupError(f"No snapshot of prompt {reference} in {self.snapshot_dir}")
+        self.stats["snapshot_loads"] += 1
+        # Kept for a TTL like a pulled prompt, then the hub is tried again in the background
+        self._cache[reference] = _CachedPrompt(prompt)
+        return prompt
+
+    def _pull_and_store(self, reference: str):
+        prompt = self._pull(reference)
+        self.stats["pulls"] += 1
+        self._cache[reference] = _CachedPrompt(prompt)
+        self._write_snapshot(reference, prompt)
+        return prompt
+
+    def _refresh(self, reference: str, entry: _CachedPrompt):
+        try:
+            self._pull_and_store(reference)
+            self.stats["refreshes"] += 1
+        except Exception as e:
+            self.stats["pull_failures"] += 1
+            # Keep serving the cached prompt and try again after another TTL
+            entry.fetched_at = time.monotonic()
+            logger.warning(f"Failed to refresh prompt {reference}, serving the cached one: {e}")
+        finally:
+            entry.refreshing = False
+
+    def snapshot_path(self, reference: str) -> Optional[str]:
+        if not self.snapshot_dir:
+            return None
+        return os.path.join(self.snapshot_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", reference) + ".json")
+
+    def _write_snapshot(self, reference: str, prompt):
+        path = self.snapshot_path(reference)
+        if path is None:
+            return
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary, "w", encoding="utf-8") as file:
+                file.write(self._dumps(prompt))
+            os.replace(temporary, path)
+        except Exception as e:
+            logger.warning(f"Failed to write snapshot of prompt {reference}: {e}")
+
+    def _read_snapshot(self, reference: str):
+        path = self.snapshot_path(reference)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as file:
+                return self._loads(file.read())
+        except Exception as e:
+            logger.warning(f"Failed to read snapshot of prompt {reference}: {e}")
+            return None
+
+    def warm_up(self, names: Iterable[str] = KNOWN_PROMPTS, max_workers: int = 8) -> int:
+        """Loads the prompts not cached yet, concurrently; returns how many of `names` are available."""
+        names = list(names)
+
+        def load(name: str) -> bool:
+            try:
+                self.get(name)
+                return True
+            except Exception as e:
+                logger.error(f"Failed to warm up prompt {name}: {e}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(names) or 1))) as executor:
+            available = sum(executor.map(load, names))
+        logger.info(f"Warmed up {available} of {len(names)} prompts")
+        return available
+
+    def start_warm_up(self, names: Iterable[str] = KNOWN_PROMPTS):
+        """warm_up() in a background thread, once per registry."""
+        with self._lock:
+            if self._warm_up is not None:
+                return
+            self._warm_up = threading.Thread(target=self.warm_up, args=(tuple(names),), daemon=True)
+        self._warm_up.start()
+
+
+_prompt_registry: Optional[PromptRegistry] = None
+_prompt_registry_lock = threading.Lock()
+
+
+def prompt_registry() -> PromptRegistry:
+    """The registry shared by the whole process, over the LangChain hub."""
+    global _prompt_registry
+    if _prompt_registry is None:
+        with _prompt_registry_lock:
+            if _prompt_registry is None:
+                from langchain import hub
+                from langchain_core.load import dumps, loads
+
+                _prompt_registry = PromptRegistry(hub.pull, dumps, loads)
+    return _prompt_registry
+
+
+def set_prompt_registry(registry: Optional[PromptRegistry]):
+    """Replaces the shared registry, e.g. with one over a stub hub in benchmarks and tests."""
+    global _prompt_registry
+    _prompt_registry = registry
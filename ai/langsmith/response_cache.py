@@ -0,0 +1,330 @@
+"""
+Cache of LLM responses by content. The same prospect is profiled again and again - NEW_PERSONAL_DATA events sent
+twice, admin re-syncs, a PDL refresh returning the same data - and every time get_strengths, work-history-summary,
+dos_and_donts and param-scoring ran again on the same inputs.
+
+A response is keyed by the prompt name, the prompt's version (its pinned hub commit, or a fingerprint of the prompt
+pulled), a hash of the canonical JSON of its inputs and the model, so a new prompt version, other inputs or another
+model miss the cache. Responses are kept in Postgres (llm_responses), shared by processes and replicas, behind an
+in-memory LRU of LLM_RESPONSE_CACHE_SIZE responses, each kept in memory for LLM_RESPONSE_CACHE_MEMORY_TTL_SECONDS at
+most so that responses deleted from the table (POST /admin/llm-cache/purge) stop being served by every process soon.
+
+Only prompts with a TTL are cached: those of DEFAULT_PROMPT_TTL_SECONDS, LLM_RESPONSE_CACHE_TTL_SECONDS for all the
+others (0, not cached, by default), or LLM_RESPONSE_CACHE_TTL_SECONDS_<PROMPT>, e.g.
+LLM_RESPONSE_CACHE_TTL_SECONDS_GET_STRENGTHS=0 to stop caching get_strengths. LLM_RESPONSE_CACHE=false turns the
+cache off.
+
+Only answers the caller can use are cached: get_or_call takes a `valid` check, e.g. that the answer parses, and a
+response failing it is neither stored nor served, so the next call asks the model again.
+
+Bypassing the cache calls the model and replaces the cached response: within `with bypass_response_cache():`, and
+for events whose payload has `bypass_llm_cache` (set by GenieConsumer).
+
+`stats` and `prompt_stats` count lookups and hits; the hit rate of every prompt is logged every
+LLM_RESPONSE_CACHE_REPORT_EVERY lookups and returned by hit_rates().
+"""
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from common.genie_logger import GenieLogger
+from common.utils import env_utils
+
+logger = GenieLogger()
+
+LLM_RESPONSE_CACHE = env_utils.get("LLM_RESPONSE_CACHE", "true").lower() == "true"
+LLM_RESPONSE_CACHE_SIZE = int(env_utils.get("LLM_RESPONSE_CACHE_SIZE", "2000"))
+LLM_RESPONSE_CACHE_TTL_SECONDS = float(env_utils.get("LLM_RESPONSE_CACHE_TTL_SECONDS", "0"))
+LLM_RESPONSE_CACHE_MEMORY_TTL_SECONDS = float(env_utils.get("LLM_RESPONSE_CACHE_MEMORY_TTL_SECONDS", "600"))
+LLM_RESPONSE_CACHE_PURGE_EVERY = int(env_utils.get("LLM_RESPONSE_CACHE_PURGE_EVERY", "500"))
+LLM_RESPONSE_CACHE_REPORT_EVERY = int(env_utils.get("LLM_RESPONSE_CACHE_REPORT_EVERY", "200"))
+
+WEEK_SECONDS = 7 * 24 * 3600
+# Prompts of the profile pipeline, which answer the same on the same inputs
+DEFAULT_PROMPT_TTL_SECONDS = {
+    "get_strengths": WEEK_SECONDS,
+    "get_strengths_with_social_media": WEEK_SECONDS,
+    "work-history-summary": WEEK_SECONDS,
+    "dos_and_donts_w_context": WEEK_SECONDS,
+    "dos_and_donts_w_context_and_posts": WEEK_SECONDS,
+    "param-scoring-v2": WEEK_SECONDS,
+    "param-scoring-batch": WEEK_SECONDS,
+    "post_summary": WEEK_SECONDS,
+}
+
+_bypassed: ContextVar[bool] = ContextVar("response_cache_bypassed", default=False)
+_MISSING = object()
+
+
+def response_cache_bypassed() -> bool:
+    return _bypassed.get()
+
+
+def set_response_cache_bypassed(bypassed: bool):
+    _bypassed.set(bypassed)
+
+
+@contextmanager
+def bypass_response_cache(bypassed: bool = True):
+    """LLM calls within the block call the model, and the responses they get replace the cached ones."""
+    token = _bypassed.set(bypassed)
+    try:
+        yield
+    finally:
+        _bypassed.reset(token)
+
+
+def canonical_inputs(arguments) -> str:
+    """The inputs of a prompt as JSON with sorted keys, so that equal inputs give the same text."""
+    return json.dumps(arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class ResponseCache:
+    """
+    Responses by content key, in `repository` (LlmResponsesRepository) behind an LRU of `cache_size` responses.
+    `dumps` / `loads` serialize responses for the repository, which is not used without them. The repository fails
+    open: when it is unavailable calls go to the model.
+    """
+
+    def __init__(
+        self,
+        repository=None,
+        dumps: Callable[[object], str] = None,
+        loads: Callable[[str], object] = None,
+        enabled: bool = LLM_RESPONSE_CACHE,
+        cache_size: int = LLM_RESPONSE_CACHE_SIZE,
+        memory_ttl_seconds: float = LLM_RESPONSE_CACHE_MEMORY_TTL_SECONDS,
+        default_ttl_seconds: float = LLM_RESPONSE_CACHE_TTL_SECONDS,
+        ttls: dict[str, float] = None,
+        version: Callable[[str], Optional[str]] = None,
+        purge_every: int = LLM_RESPONSE_CACHE_PURGE_EVERY,
+        report_every: int = LLM_RESPONSE_CACHE_REPORT_EVERY,
+    ):
+        self.repository = repository if dumps and loads else None
+        self._dumps = dumps
+        self._loads = loads
+        self.enabled = enabled
+        self.cache_size = max(1, cache_size)
+        # Without a repository memory is the only copy, kept for the prompt's TTL
+        self.memory_ttl_seconds = memory_ttl_seconds if self.repository is not None else float("inf")
+        self.default_ttl_seconds = default_ttl_seconds
+        self.ttls = dict(DEFAULT_PROMPT_TTL_SECONDS if ttls is None else ttls)
+        # The pinned version of a prompt (PromptRegistry.version); unpinned prompts are fingerprinted
+        self._version = version
+        self.purge_every = max(1, purge_every)
+        self.report_every = max(1, report_every)
+        self._cache: OrderedDict[str, tuple[object, float]] = OrderedDict()
+        self._fingerprints: dict[int, tuple[object, str]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"lookups": 0, "memory_hits": 0, "store_hits": 0, "misses": 0, "bypassed": 0, "writes": 0,
+                      "rejected": 0, "store_failures": 0, "purged": 0}
+        self.prompt_stats: dict[str, dict] = {}
+
+    def ttl(self, prompt_name: str) -> float:
+        suffix = re.sub(r"[^A-Z0-9]", "_", prompt_name.upper()).strip("_")
+        ttl = env_utils.get(f"LLM_RESPONSE_CACHE_TTL_SECONDS_{suffix}", "") if suffix else ""
+        if ttl:
+            return float(ttl)
+        return self.ttls.get(prompt_name, self.default_ttl_seconds)
+
+    def prompt_version(self, prompt_name: str, prompt) -> str:
+        pinned = self._version(prompt_name) if self._version else None
+        if pinned:
+            return pinned
+        # Prompts are the registry's cached objects, so each is fingerprinted once per pull
+        with self._lock:
+            known = self._fingerprints.get(id(prompt))
+            if known is not None and known[0] is prompt:
+                return known[1]
+        try:
+            text = self._dumps(prompt) if self._dumps else repr(prompt)
+        except Exception:
+            text = repr(prompt)
+        fingerprint = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        with self._lock:
+            if len(self._fingerprints) >= 256:
+                self._fingerprints.clear()
+            self._fingerprints[id(prompt)] = (prompt, fingerprint)
+        return fingerprint
+
+    @staticmethod
+    def model_name(model) -> str:
+        name = getattr(model, "deployment_name", None) or getattr(model, "model_name", None)
+        return f"{type(model).__name__}:{name}" if name else type(model).__name__
+
+    def key(self, prompt_name: str, runnable, arguments) -> str:
+        """The content key of running `runnable` (prompt | model) on `arguments`."""
+        prompt = getattr(runnable, "first", runnable)
+        model = getattr(runnable, "last", None)
+        content = "\n".join((
+            prompt_name,
+            self.prompt_version(prompt_name, prompt),
+            hashlib.sha256(canonical_inputs(arguments).encode("utf-8")).hexdigest(),
+            self.model_name(model),
+        ))
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def _prompt_stats(self, prompt_name: str) -> dict:
+        stats = self.prompt_stats.get(prompt_name)
+        if stats is None:
+            stats = self.prompt_stats[prompt_name] = {"lookups": 0, "hits": 0, "misses": 0, "bypassed": 0}
+        return stats
+
+    def hit_rates(self) -> dict[str, float]:
+        """Hits per lookup of every prompt, bypassed calls included in the lookups."""
+        return {
+            prompt_name: round(stats["hits"] / stats["lookups"], 3)
+            for prompt_name, stats in sorted(self.prompt_stats.items()) if stats["lookups"]
+        }
+
+    async def get_or_call(
+        self,
+        prompt_name: Optional[str],
+        runnable,
+        arguments,
+        call: Callable[[], Awaitable],
+        valid: Optional[Callable[[Any], bool]] = None,
+    ):
+        """
+        The cached response of running `runnable` on `arguments`, or `call()`'s, which is cached for the prompt's TTL
+        if `valid(response)`. A cached response failing `valid` is a miss.
+        """
+        ttl = self.ttl(prompt_name) if self.enabled and prompt_name else 0
+        if ttl <= 0:
+            return await call()
+        key = self.key(prompt_name, runnable, arguments)
+        prompt_stats = self._prompt_stats(prompt_name)
+        self.stats["lookups"] += 1
+        prompt_stats["lookups"] += 1
+        if response_cache_bypassed():
+            self.stats["bypassed"] += 1
+            prompt_stats["bypassed"] += 1
+        else:
+            response = await self._lookup(key)
+            if response is not _MISSING and not self._usable(response, valid):
+                self._drop(key)
+                response = _MISSING
+            if response is not _MISSING:
+                prompt_stats["hits"] += 1
+                self._report()
+                return response
+            self.stats["misses"] += 1
+            prompt_stats["misses"] += 1
+        self._report()
+        response = await call()
+        if self._usable(response, valid):
+            await self._store(key, prompt_name, response, ttl)
+        elif response:
+            self.stats["rejected"] += 1
+            logger.warning(f"Not caching the response of {prompt_name}, which the caller cannot use")
+        return response
+
+    @staticmethod
+    def _usable(response, valid: Optional[Callable[[Any], bool]]) -> bool:
+        if not response:
+            return False
+        try:
+            return valid is None or bool(valid(response))
+        except Exception:
+            return False
+
+    async def _lookup(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._cache.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return entry[0]
+                del self._cache[key]
+        if self.repository is None:
+            return _MISSING
+        try:
+            row = await asyncio.to_thread(self.repository.get, key)
+            if row is None:
+                return _MISSING
+            response = self._loads(row[0])
+        except Exception as e:
+            self.stats["store_failures"] += 1
+            logger.error(f"Failed to read cached LLM response {key}, calling the model: {e}")
+            return _MISSING
+        self.stats["store_hits"] += 1
+        self._remember(key, response, row[1].timestamp())
+        return response
+
+    def _remember(self, key: str, response, expires_at: float):
+        expires_at = min(expires_at, time.time() + self.memory_ttl_seconds)
+        with self._lock:
+            self._cache[key] = (response, expires_at)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _drop(self, key: str):
+        with self._lock:
+            self._cache.pop(key, None)
+
+    async def _store(self, key: str, prompt_name: str, response, ttl: float):
+        expires_at = time.time() + ttl
+        self._remember(key, response, expires_at)
+        if self.repository is None:
+            return
+        try:
+            await asyncio.to_thread(self.repository.put, key, prompt_name, self._dumps(response),
+                                    datetime.fromtimestamp(expires_at, timezone.utc))
+            self.stats["writes"] += 1
+        except Exception as e:
+            self.stats["store_failures"] += 1
+            logger.error(f"Failed to cache LLM response of {prompt_name}: {e}")
+            return
+        if self.stats["writes"] % self.purge_every == 0:
+            try:
+                self.stats["purged"] += await asyncio.to_thread(self.repository.delete_expired) or 0
+            except Exception as e:
+                self.stats["store_failures"] += 1
+                logger.error(f"Failed to delete expired LLM responses: {e}")
+
+    def _report(self):
+        if self.stats["lookups"] % self.report_every == 0:
+            logger.info(f"LLM response cache hit rates: {self.hit_rates()}. Stats: {self.stats}")
+
+    def forget(self):
+        """Drops the responses cached in memory, e.g. after those of the repository were deleted."""
+        with self._lock:
+            self._cache.clear()
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def response_cache() -> ResponseCache:
+    """The cache shared by the whole process, over the llm_responses table."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                # Imported here so that the module does not need the database settings or langchain, e.g. in tests
+                from langchain_core.load import dumps, loads
+
+                from ai.langsmith.prompt_registry import prompt_registry
+                from data.data_common.repositories.llm_responses_repository import LlmResponsesRepository
+
+                _response_cache = ResponseCache(LlmResponsesRepository(), dumps, loads,
+                                                version=prompt_registry().version)
+    return _response_cache
+
+
+def set_response_cache(cache: Optional[ResponseCache]):
+    """Replaces the shared cache, e.g. with one in memory in benchmarks and tests."""
+    global _response_cache
+    _response_cache = cache
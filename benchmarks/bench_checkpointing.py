@@ -0,0 +1,134 @@
+"""
+Checkpoint writes per 1k events under different CheckpointPolicy settings, against a filesystem checkpoint store
+standing in for BlobCheckpointStore (one JSON document per partition, overwritten atomically and fsynced like a
+blob upload). --write-latency-ms adds a round-trip per write on top of the disk write (a few ms for Azurite, more for
+a storage account).
+
+Events flow like in GenieConsumer: a stub receiver per partition dispatches --events events through
+PartitionDispatcher, whose checkpoints go through a Checkpointer. "every event" is the previous behaviour.
+
+Usage:
+    python -m benchmarks.bench_checkpointing [--events 5000] [--partitions 4] [--handler-ms 1] [--write-latency-ms 5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from data.data_common.events.checkpointing import CheckpointPolicy, Checkpointer
+from data.data_common.events.event_dispatcher import PartitionDispatcher
+
+
+class FileCheckpointStore:
+    """The checkpoint half of the azure CheckpointStore interface, kept in files."""
+
+    def __init__(self, directory: str, write_latency: float):
+        self.directory = directory
+        self.write_latency = write_latency
+        self.writes = 0
+
+    def _write(self, checkpoint: dict):
+        path = os.path.join(self.directory, checkpoint["consumer_group"], f"{checkpoint['partition_id']}.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(path), delete=False) as file:
+            json.dump(checkpoint, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(file.name, path)
+
+    async def update_checkpoint(self, checkpoint: dict):
+        await asyncio.sleep(self.write_latency)
+        await asyncio.to_thread(self._write, checkpoint)
+        self.writes += 1
+
+    def list_checkpoints(self, consumer_group: str) -> dict[str, dict]:
+        directory = os.path.join(self.directory, consumer_group)
+        checkpoints = {}
+        for name in os.listdir(directory):
+            with open(os.path.join(directory, name)) as file:
+                checkpoints[name.removesuffix(".json")] = json.load(file)
+        return checkpoints
+
+
+class StubEvent:
+    def __init__(self, sequence_number: int):
+        self.sequence_number = sequence_number
+        self.offset = str(sequence_number * 512)
+
+
+class StubPartitionContext:
+    def __init__(self, store: FileCheckpointStore, consumer_group: str, partition_id: str):
+        self.store = store
+        self.consumer_group = consumer_group
+        self.partition_id = partition_id
+
+    async def update_checkpoint(self, event: StubEvent):
+        await self.store.update_checkpoint({
+            "fully_qualified_namespace": "local", "eventhub_name": "genie", "consumer_group": self.consumer_group,
+            "partition_id": self.partition_id, "offset": event.offset, "sequence_number": event.sequence_number,
+        })
+
+
+async def run(args, policy: CheckpointPolicy, directory: str) -> dict:
+    store = FileCheckpointStore(directory, args.write_latency_ms / 1000)
+    checkpointer = Checkpointer(policy)
+    handler_latency = args.handler_ms / 1000
+    window = {"max": 0}
+
+    async def handler(event):
+        await asyncio.sleep(handler_latency)
+
+    async def checkpoint(partition_context, event):
+        await checkpointer.advance(partition_context, event)
+        state = checkpointer._partitions[partition_context.partition_id]
+        window["max"] = max(window["max"], state.pending_events)
+
+    dispatcher = PartitionDispatcher(handler, checkpoint, max_in_flight_per_partition=1, max_in_flight=args.partitions)
+
+    async def receive(partition_id: str):
+        context = StubPartitionContext(store, "bench", partition_id)
+        for sequence_number in range(args.events // args.partitions):
+            await dispatcher.dispatch(context, StubEvent(sequence_number))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(receive(str(partition)) for partition in range(args.partitions)))
+    await dispatcher.drain()
+    elapsed = time.perf_counter() - started
+    # Shutdown: everything processed is checkpointed
+    await checkpointer.flush()
+    last = args.events // args.partitions - 1
+    complete = all(c["sequence_number"] == last for c in store.list_checkpoints("bench").values())
+    return {"seconds": elapsed, "writes": store.writes, "window": window["max"], "complete": complete}
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--partitions", type=int, default=4)
+    parser.add_argument("--handler-ms", type=float, default=1)
+    parser.add_argument("--write-latency-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    policies = [
+        ("every event", CheckpointPolicy(every_events=1, every_seconds=0)),
+        ("every 10 events", CheckpointPolicy(every_events=10, every_seconds=60)),
+        ("every 50 events / 10s", CheckpointPolicy(every_events=50, every_seconds=10)),
+        ("every 200 events", CheckpointPolicy(every_events=200, every_seconds=60)),
+        ("every 1s", CheckpointPolicy(every_events=1_000_000, every_seconds=1)),
+    ]
+    print(f"{'policy':<24}{'events/s':>10}{'writes':>8}{'writes/1k':>11}{'max uncommitted':>17}{'flushed':>9}")
+    for name, policy in policies:
+        directory = tempfile.mkdtemp(prefix="genie-checkpoints-")
+        try:
+            result = await run(args, policy, directory)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        print(f"{name:<24}{args.events / result['seconds']:>10.0f}{result['writes']:>8}"
+              f"{result['writes'] * 1000 / args.events:>11.1f}{result['window']:>17}{str(result['complete']):>9}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
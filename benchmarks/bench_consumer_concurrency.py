@@ -0,0 +1,107 @@
+"""
+Consumer throughput with PartitionDispatcher against a stub receiver: --partitions partitions replay --events
+synthetic events between them, awaiting dispatch() for each event like the event hub receive loop does.
+Handling an event sleeps for its injected latency: --latency-ms on average (exponentially distributed), with
+--slow-percent of the events taking --slow-ms, like an LLM call that hangs.
+
+Each configuration reports events/s, checkpoints written, and the share of checkpoints that would have been
+unsafe (a checkpoint past an event that had not finished yet; must be 0).
+
+Usage:
+    python -m benchmarks.bench_consumer_concurrency [--events 2000] [--partitions 4] [--latency-ms 20]
+        [--slow-percent 1] [--slow-ms 2000] [--keys 200]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from data.data_common.events.event_dispatcher import PartitionDispatcher, object_id_key
+
+
+class StubEvent:
+    def __init__(self, partition_id: str, offset: int, object_id: str, latency: float):
+        self.partition_id = partition_id
+        self.offset = offset
+        self.latency = latency
+        self.body = json.dumps(json.dumps({"object_id": object_id}))
+
+    def body_as_str(self):
+        return self.body
+
+
+class StubPartitionContext:
+    def __init__(self, partition_id: str):
+        self.partition_id = partition_id
+
+
+def make_partitions(args) -> dict[str, list[StubEvent]]:
+    rng = random.Random(7)
+    partitions = {str(p): [] for p in range(args.partitions)}
+    for i in range(args.events):
+        partition_id = str(i % args.partitions)
+        slow = rng.random() * 100 < args.slow_percent
+        latency = args.slow_ms / 1000 if slow else rng.expovariate(1000 / args.latency_ms)
+        partitions[partition_id].append(
+            StubEvent(partition_id, len(partitions[partition_id]), f"object{rng.randrange(args.keys)}", latency)
+        )
+    return partitions
+
+
+async def run(partitions: dict[str, list[StubEvent]], per_partition: int, overall: int, ordered: bool) -> dict:
+    finished: dict[str, set[int]] = {partition_id: set() for partition_id in partitions}
+    result = {"checkpoints": 0, "unsafe": 0}
+
+    async def handler(event: StubEvent):
+        await asyncio.sleep(event.latency)
+        finished[event.partition_id].add(event.offset)
+
+    async def checkpoint(partition_context, event: StubEvent):
+        result["checkpoints"] += 1
+        done = finished[event.partition_id]
+        if any(offset not in done for offset in range(event.offset + 1)):
+            result["unsafe"] += 1
+
+    dispatcher = PartitionDispatcher(handler, checkpoint, max_in_flight_per_partition=per_partition,
+                                     max_in_flight=overall, ordering_key=object_id_key if ordered else None)
+
+    async def receive(partition_id: str):
+        context = StubPartitionContext(partition_id)
+        for event in partitions[partition_id]:
+            await dispatcher.dispatch(context, event)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(receive(partition_id) for partition_id in partitions))
+    await dispatcher.drain()
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--partitions", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--slow-percent", type=float, default=1)
+    parser.add_argument("--slow-ms", type=float, default=2000)
+    parser.add_argument("--keys", type=int, default=200)
+    args = parser.parse_args()
+
+    partitions = make_partitions(args)
+    configurations = [
+        ("sequential (prefetch=1)", 1, args.partitions, False),
+        ("4 per partition", 4, 32, False),
+        ("16 per partition", 16, 32, False),
+        ("16 per partition, keyed", 16, 32, True),
+        ("64 per partition", 64, 128, False),
+    ]
+    print(f"{'configuration':<26}{'events/s':>10}{'seconds':>9}{'checkpoints':>13}{'unsafe':>8}")
+    for name, per_partition, overall, ordered in configurations:
+        result = await run(partitions, per_partition, overall, ordered)
+        print(f"{name:<26}{args.events / result['seconds']:>10.0f}{result['seconds']:>9.2f}"
+              f"{result['checkpoints']:>13}{result['unsafe']:>8}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
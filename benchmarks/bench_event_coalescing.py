@@ -0,0 +1,147 @@
+"""
+Duplicate work from calendar imports, without and with event coalescing.
+
+Replays the events MeetingManager sends when importing calendars: for every user, NEW_EMAIL_TO_PROCESS_DOMAIN for
+the user's own email, then NEW_EMAIL_TO_PROCESS_DOMAIN and NEW_EMAIL_ADDRESS_TO_PROCESS for each external
+participant of each meeting, in one EventHubBatchManager batch per import. Participants are drawn from a pool of
+--contacts with a Zipf-like skew, as the same customers and partners attend many meetings. After the first import,
+--resyncs calendar syncs re-send the participants of the --changed fraction of meetings. The consumers then receive
+what was sent, and the last --redelivered events of every import a second time, as after a restart before the
+checkpoint was written.
+
+The idempotency store runs on an in-memory repository that sleeps --rtt-ms per round-trip, standing in for Postgres.
+"work" counts the events handlers processed: each NEW_EMAIL_ADDRESS_TO_PROCESS starts enrichment, profiling and
+scoring of the person.
+
+Usage:
+    python -m benchmarks.bench_event_coalescing [--users 5] [--meetings 80] [--contacts 150] [--resyncs 3]
+                                                [--changed 0.2] [--redelivered 50] [--rtt-ms 1]
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from data.data_common.events.coalescing import EventCoalescer, IdempotencyStore
+from data.data_common.events.genie_envelope import GenieEnvelope
+from data.data_common.events.local_event_bus import LocalEvent
+from data.data_common.events.topics import Topic
+from data.data_common.events.wire_format import encode_payload
+
+CONSUMER_GROUPS = {
+    Topic.NEW_EMAIL_ADDRESS_TO_PROCESS: "personmanagerconsumergroup",
+    Topic.NEW_EMAIL_TO_PROCESS_DOMAIN: "companyconsumergroup",
+}
+
+
+class StubEventKeysRepository:
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.keys = {}
+
+    def claim(self, keys):
+        time.sleep(self.rtt)
+        now = datetime.now(timezone.utc)
+        claimed = set()
+        for key, expires_at in keys:
+            if key not in self.keys or self.keys[key] <= now:
+                self.keys[key] = expires_at
+                claimed.add(key)
+        return claimed
+
+    def release(self, key):
+        time.sleep(self.rtt)
+        self.keys.pop(key, None)
+
+    def delete_expired(self):
+        time.sleep(self.rtt)
+        return 0
+
+
+class Event:
+    """The parts of a GenieEvent the coalescer reads."""
+
+    def __init__(self, topic, payload):
+        self.topic = topic
+        self.payload = payload
+        self.user_id = payload["user_id"]
+
+
+def calendar(rng: random.Random, user: int, meetings: int, contacts: int) -> list[list[str]]:
+    weights = [1 / (rank + 1) for rank in range(contacts)]
+    return [
+        [f"contact{number}@customer{number % 40}.com"
+         for number in rng.choices(range(contacts), weights, k=rng.randint(1, 6))]
+        for _ in range(meetings)
+    ]
+
+
+def import_events(user_id: str, meetings: list[list[str]]) -> list[Event]:
+    """The batch handle_new_meetings_to_process sends."""
+    events = [Event(Topic.NEW_EMAIL_TO_PROCESS_DOMAIN, {"user_id": user_id, "email": f"{user_id}@example.com"})]
+    for participants in meetings:
+        for email in participants:
+            events.append(Event(Topic.NEW_EMAIL_TO_PROCESS_DOMAIN, {"user_id": user_id, "email": email}))
+            events.append(Event(Topic.NEW_EMAIL_ADDRESS_TO_PROCESS, {"user_id": user_id, "email": email}))
+    return events
+
+
+def received(event: Event) -> GenieEnvelope:
+    body, properties = encode_payload(event.payload)
+    properties = {"topic": event.topic, "user_id": event.user_id, **properties}
+    return GenieEnvelope(LocalEvent(body, {key.encode(): value.encode() for key, value in properties.items()}, None, 0))
+
+
+def replay(coalescer: EventCoalescer, imports: list[list[Event]], redelivered: int) -> tuple[Counter, float]:
+    counts = Counter()
+    started = time.perf_counter()
+    for events in imports:
+        counts["queued"] += len(events)
+        sent = coalescer.filter_sends(events)
+        counts["sent"] += len(sent)
+        for envelope in [received(event) for event in sent + sent[-redelivered:]]:
+            counts["received"] += 1
+            key = coalescer.receipt_key(CONSUMER_GROUPS[envelope.topic], envelope) if coalescer.enabled else None
+            if key and not coalescer.claim_receipt(key, envelope.topic):
+                continue
+            counts["processed"] += 1
+            if envelope.topic == Topic.NEW_EMAIL_ADDRESS_TO_PROCESS:
+                counts["work"] += 1
+    return counts, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--meetings", type=int, default=80)
+    parser.add_argument("--contacts", type=int, default=150)
+    parser.add_argument("--resyncs", type=int, default=3)
+    parser.add_argument("--changed", type=float, default=0.2)
+    parser.add_argument("--redelivered", type=int, default=50)
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    imports = []
+    for user in range(args.users):
+        meetings = calendar(rng, user, args.meetings, args.contacts)
+        imports.append(import_events(f"user{user}", meetings))
+        for _ in range(args.resyncs):
+            imports.append(import_events(f"user{user}", rng.sample(meetings, int(len(meetings) * args.changed))))
+
+    print(f"{'mode':<12}{'queued':>8}{'sent':>8}{'received':>10}{'processed':>11}{'work':>7}"
+          f"{'round-trips':>13}{'cache hits':>12}{'ms':>9}")
+    for mode, enabled in (("before", False), ("coalesced", True)):
+        store = IdempotencyStore(StubEventKeysRepository(args.rtt_ms / 1000))
+        coalescer = EventCoalescer(store, enabled=enabled)
+        counts, elapsed = replay(coalescer, imports, args.redelivered)
+        print(f"{mode:<12}{counts['queued']:>8}{counts['sent']:>8}{counts['received']:>10}{counts['processed']:>11}"
+              f"{counts['work']:>7}{store.stats['round_trips']:>13}{store.stats['cache_hits']:>12}{elapsed * 1000:>9.1f}")
+        if enabled:
+            print(f"suppressed: sends {coalescer.stats['suppressed_sends']}, "
+                  f"receipts {coalescer.stats['skipped_receipts']}, by topic {dict(coalescer.suppressed_by_topic)}")
+
+
+if __name__ == "__main__":
+    main()
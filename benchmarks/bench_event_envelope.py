@@ -0,0 +1,145 @@
+"""
+CPU per consumed event for decoding large event bodies, before and after GenieEnvelope.
+
+Before: every reader of a body decodes it again with the json module, twice since bodies are double encoded.
+GenieConsumer.handle_event ran extract_object_id for the status row, and the handler ran its own
+json.loads / isinstance / json.loads. Consumers with object_id_key ordering, like LangsmithConsumer, did it a third time.
+After: GenieEnvelope decodes the body once with orjson, and the status row, ordering key and handler all read
+envelope.payload / envelope.object_id.
+
+Payloads are shaped like the largest events: NEW_PERSONAL_DATA carries the person and the full enrichment record
+(--jobs experience entries), NEW_PROCESSED_PROFILE the person and the cooked profile (--strengths entries).
+
+Usage:
+    python -m benchmarks.bench_event_envelope [--events 2000] [--jobs 15] [--strengths 12]
+"""
+import argparse
+import json
+import random
+import time
+
+from common.utils.event_utils import extract_object_id
+from data.data_common.events.event_dispatcher import object_id_key
+from data.data_common.events.genie_envelope import GenieEnvelope
+from data.data_common.events.local_event_bus import LocalEvent
+from data.data_common.events.topics import Topic
+
+WORDS = (
+    "led cross-functional teams shipping data products to enterprise customers across emea and north america built "
+    "the sales organization from scratch grew annual recurring revenue closed strategic partnerships with global "
+    "banks insurers retailers managed quota carrying account executives solution engineers customer success hired "
+    "coached promoted launched new markets in germany france spain nordics negotiated multi year contracts reduced "
+    "churn improved forecasting accuracy introduced meddic salesforce gong outreach playbooks speaker at saas "
+    "conferences mentor for early stage founders passionate about pricing strategy product led growth analytics "
+    "machine learning cloud security infrastructure developer tools fintech healthcare logistics marketplaces"
+).split()
+_rng = random.Random(3)
+
+
+def text(words: int) -> str:
+    """Prose from a fixed vocabulary, compressing about as well as real profile text."""
+    return " ".join(_rng.choice(WORDS) for _ in range(words)) + ". "
+
+
+def person(number: int) -> dict:
+    return {
+        "uuid": f"person-{number}",
+        "name": "Jane Doe",
+        "company": "Example",
+        "email": f"jane{number}@example.com",
+        "linkedin": f"linkedin.com/in/jane-{number}",
+        "position": "VP Sales",
+        "timezone": "Europe/London",
+    }
+
+
+def personal_data_payload(number: int, jobs: int) -> dict:
+    experience = [
+        {
+            "company": {"name": f"Company {job}", "size": "1001-5000", "industry": "computer software", "website": f"company{job}.com",
+                        "linkedin_url": f"linkedin.com/company/company-{job}", "location": {"name": "london, england", "country": "united kingdom"}},
+            "title": {"name": "vice president of sales", "role": "sales", "sub_role": None, "levels": ["vp"]},
+            "start_date": f"{2000 + job}-01", "end_date": f"{2001 + job}-06", "is_primary": job == 0,
+            "summary": text(60),
+        }
+        for job in range(jobs)
+    ]
+    return {
+        "person": person(number),
+        "user_id": "user",
+        "personal_data": {
+            "full_name": "jane doe", "first_name": "jane", "last_name": "doe", "sex": "female",
+            "linkedin_url": f"linkedin.com/in/jane-{number}", "job_title": "vp sales", "summary": text(100),
+            "skills": [f"skill {skill}" for skill in range(40)],
+            "interests": [f"interest {interest}" for interest in range(10)],
+            "experience": experience,
+            "education": [{"school": {"name": f"University {school}"}, "degrees": ["master"], "majors": ["business"]}
+                          for school in range(3)],
+            "profiles": [{"network": network, "url": f"{network}.com/jane-{number}"} for network in ("linkedin", "twitter", "github")],
+        },
+    }
+
+
+def processed_profile_payload(number: int, strengths: int) -> dict:
+    return {
+        "person": person(number),
+        "profile": {
+            "strengths": [{"strength_name": f"Strength {strength}", "reasoning": text(40), "score": 80 + strength % 20}
+                          for strength in range(strengths)],
+            "work_history_summary": text(160),
+        },
+        "force_refresh": False,
+    }
+
+
+def events_for(topic: str, payloads: list[dict]) -> list[LocalEvent]:
+    properties = {b"topic": topic.encode(), b"ctx_id": b"ctx", b"user_id": b"user", b"tenant_id": b"tenant"}
+    return [LocalEvent(json.dumps(json.dumps(payload)), properties, None, number) for number, payload in enumerate(payloads)]
+
+
+def before(event, ordering_key: bool):
+    if ordering_key:
+        extract_object_id(event.body_as_str())
+    extract_object_id(event.body_as_str())
+    event_body = json.loads(event.body_as_str())
+    if isinstance(event_body, str):
+        event_body = json.loads(event_body)
+    return event_body.get("person")
+
+
+def after(event, ordering_key: bool):
+    envelope = GenieEnvelope(event)
+    if ordering_key:
+        object_id_key(envelope)
+    envelope.object_id
+    return envelope.payload.get("person")
+
+
+def measure(function, events: list, ordering_key: bool) -> float:
+    started = time.process_time()
+    for event in events:
+        function(event, ordering_key)
+    return (time.process_time() - started) / len(events) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, default=15)
+    parser.add_argument("--strengths", type=int, default=12)
+    args = parser.parse_args()
+
+    workloads = {
+        Topic.NEW_PERSONAL_DATA: events_for(Topic.NEW_PERSONAL_DATA, [personal_data_payload(n, args.jobs) for n in range(args.events)]),
+        Topic.NEW_PROCESSED_PROFILE: events_for(Topic.NEW_PROCESSED_PROFILE, [processed_profile_payload(n, args.strengths) for n in range(args.events)]),
+    }
+    print(f"{'topic':<32}{'KB':>6}{'ordering key':>14}{'before us':>11}{'after us':>10}{'speedup':>9}")
+    for topic, events in workloads.items():
+        size = sum(len(event.body) for event in events) / len(events) / 1024
+        for ordering_key in (False, True):
+            old, new = measure(before, events, ordering_key), measure(after, events, ordering_key)
+            print(f"{topic:<32}{size:>6.1f}{'yes' if ordering_key else 'no':>14}{old:>11.1f}{new:>10.1f}{old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Send throughput of the event producer against a local stub transport that charges a connection handshake on
+first use and a round-trip per batch, and caps batches by size like EventDataBatch.
+
+"client per send" reproduces the previous GenieEvent.send(): a batch of one event and a closed connection after
+every send, so every event pays the handshake. "shared" is EventProducerService with one connection and the given
+linger window; linger 0 only coalesces sends queued in the same loop iteration, larger windows wait for more
+concurrent sends per partition key (trading latency of a lone send for fewer round-trips).
+--producers tasks each send their share of --events, awaiting every send, spread over --keys partition keys.
+
+Usage:
+    python -m benchmarks.bench_event_producer [--events 5000] [--producers 50] [--keys 8]
+        [--handshake-ms 40] [--rtt-ms 4] [--linger-ms 0 5 20]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from azure.eventhub import EventData
+
+from data.data_common.events.genie_event_producer import EventProducerService
+
+MAX_BATCH_BYTES = 1024 * 1024
+
+
+class StubBatch:
+    def __init__(self):
+        self.events = []
+        self.size = 0
+
+    def add(self, event: EventData):
+        size = len(event.body_as_str())
+        if self.events and self.size + size > MAX_BATCH_BYTES:
+            raise ValueError("EventDataBatch has reached its size limit")
+        self.events.append(event)
+        self.size += size
+
+
+class StubTransport:
+    def __init__(self, handshake_ms: float, rtt_ms: float):
+        self.handshake = handshake_ms / 1000
+        self.rtt = rtt_ms / 1000
+        self.connected = False
+        self.connecting = None
+        self.handshakes = 0
+        self.batches = 0
+        self.events = 0
+
+    async def create_batch(self, partition_key=None):
+        if not self.connected:
+            self.connecting = self.connecting or asyncio.Lock()
+            async with self.connecting:
+                if not self.connected:
+                    await asyncio.sleep(self.handshake)
+                    self.connected = True
+                    self.handshakes += 1
+        return StubBatch()
+
+    async def send_batch(self, batch: StubBatch, timeout=None):
+        await asyncio.sleep(self.rtt)
+        self.batches += 1
+        self.events += len(batch.events)
+
+    async def close(self):
+        self.connected = False
+
+
+def make_event(i: int) -> EventData:
+    body = {"tenant_id": f"tenant{i % 20}", "user_id": f"user{i % 200}", "meeting_uuid": f"meeting{i}", "agenda": "x" * 500}
+    event = EventData(body=json.dumps(json.dumps(body)))
+    event.properties = {"topic": "new-meeting", "scope": "public", "ctx_id": f"ctx{i}"}
+    return event
+
+
+async def produce(send, events: int, producers: int, keys: int) -> list[float]:
+    latencies = []
+
+    async def producer(index: int):
+        for i in range(index, events, producers):
+            started = time.perf_counter()
+            await send(make_event(i), f"key{i % keys}")
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(producer(index) for index in range(producers)))
+    return latencies
+
+
+async def client_per_send(args) -> tuple[float, list[float], StubTransport]:
+    totals = StubTransport(args.handshake_ms, args.rtt_ms)
+
+    async def send(event, partition_key):
+        transport = StubTransport(args.handshake_ms, args.rtt_ms)
+        batch = await transport.create_batch(partition_key=partition_key)
+        batch.add(event)
+        await transport.send_batch(batch)
+        await transport.close()
+        totals.handshakes += transport.handshakes
+        totals.batches += transport.batches
+        totals.events += transport.events
+
+    started = time.perf_counter()
+    latencies = await produce(send, args.events, args.producers, args.keys)
+    return time.perf_counter() - started, latencies, totals
+
+
+async def shared(args, linger_ms: float) -> tuple[float, list[float], StubTransport]:
+    transport = StubTransport(args.handshake_ms, args.rtt_ms)
+    service = EventProducerService(transport=transport, linger_ms=linger_ms, max_batch_size=args.max_batch_size)
+    started = time.perf_counter()
+    latencies = await produce(service.send, args.events, args.producers, args.keys)
+    elapsed = time.perf_counter() - started
+    await asyncio.to_thread(service.close)
+    return elapsed, latencies, transport
+
+
+def report(mode: str, elapsed: float, latencies: list[float], transport: StubTransport):
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{mode:<22}{len(latencies) / elapsed:>10.0f}{transport.handshakes:>12}{transport.batches:>9}"
+          f"{transport.events / max(transport.batches, 1):>14.1f}{p50:>9.1f}{p99:>9.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--producers", type=int, default=50)
+    parser.add_argument("--keys", type=int, default=8)
+    parser.add_argument("--handshake-ms", type=float, default=40)
+    parser.add_argument("--rtt-ms", type=float, default=4)
+    parser.add_argument("--max-batch-size", type=int, default=100)
+    parser.add_argument("--linger-ms", type=float, nargs="+", default=[0, 5, 20])
+    args = parser.parse_args()
+
+    print(f"{'mode':<22}{'events/s':>10}{'handshakes':>12}{'batches':>9}{'events/batch':>14}{'p50 ms':>9}{'p99 ms':>9}")
+    report("client per send", *await client_per_send(args))
+    for linger_ms in args.linger_ms:
+        report(f"shared, linger {linger_ms:g}ms", *await shared(args, linger_ms))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
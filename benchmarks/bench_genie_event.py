@@ -0,0 +1,152 @@
+"""
+Micro-benchmark for constructing and sending GenieEvents, with the event hub transport and the status sink
+replaced by in-memory recorders so only the Python side is measured.
+
+"before" reproduces the previous GenieEvent: a StatusesRepository per event, the payload validated and encoded
+in the constructor, parsed again for tenant_id / user_id / previous_topic and twice more for the object id.
+"after" is the current GenieEvent. Both are run for dict and JSON string payloads; construct-only is reported
+separately since many events are built in loops before being sent.
+
+Usage:
+    python -m benchmarks.bench_genie_event [--events 10000]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from common.utils.event_utils import extract_object_id
+from data.data_common.events import genie_event
+from data.data_common.events.genie_event import GenieEvent, set_status_sink
+from data.data_common.events.genie_event_producer import EventProducerService, set_producer_service
+from data.data_common.events.topics import Topic
+from data.data_common.repositories.statuses_repository import StatusesRepository
+
+
+class InMemoryBatch(list):
+    def add(self, event):
+        self.append(event)
+
+
+class InMemoryProducer:
+    def __init__(self):
+        self.sent = 0
+
+    def create_batch(self):
+        return InMemoryBatch()
+
+    def send_batch(self, batch, timeout=None):
+        self.sent += len(batch)
+
+    def close(self):
+        pass
+
+
+class InMemoryTransport:
+    def __init__(self):
+        self.sent = 0
+
+    async def create_batch(self, partition_key=None):
+        return InMemoryBatch()
+
+    async def send_batch(self, batch, timeout=None):
+        self.sent += len(batch)
+
+    async def close(self):
+        pass
+
+
+legacy_producer = InMemoryProducer()
+
+
+class InMemoryStatusSink:
+    def __init__(self):
+        self.started = 0
+
+    def start_status(self, **kwargs):
+        self.started += 1
+
+
+class LegacyGenieEvent:
+    def __init__(self, topic, data, sink):
+        self.topic = topic
+        self.data = json.dumps(self.convert_to_json(data))
+        self.scope = "public"
+        self.ctx_id = genie_event.logger.get_ctx_id()
+        self.cty_id = genie_event.logger.get_cty_id()
+        self.tenant_id = genie_event.logger.get_tenant_id() or (json.loads(data).get("tenant_id") if isinstance(data, str) else data.get("tenant_id"))
+        self.user_id = genie_event.logger.get_user_id() or (json.loads(data).get("user_id") if isinstance(data, str) else data.get("user_id"))
+        self.previous_topic = genie_event.logger.get_topic() or (json.loads(data).get("previous_topic") if isinstance(data, str) else data.get("previous_topic"))
+        self.statuses_repository = StatusesRepository()
+        self.sink = sink
+
+    def convert_to_json(self, data):
+        if isinstance(data, dict):
+            return json.dumps(data)
+        json.loads(data)
+        return data
+
+    def send(self):
+        batch = legacy_producer.create_batch()
+        event = genie_event.EventData(body=self.data)
+        event.properties = {"topic": self.topic, "scope": self.scope, "ctx_id": self.ctx_id,
+                            "tenant_id": self.tenant_id, "user_id": self.user_id}
+        batch.add(event)
+        legacy_producer.send_batch(batch, timeout=60)
+        legacy_producer.close()
+        object_id, object_type = extract_object_id(self.data)
+        if object_id:
+            self.sink.start_status(ctx_id=self.ctx_id, object_id=object_id, object_type=object_type)
+
+
+def payload(i: int) -> dict:
+    return {
+        "tenant_id": f"tenant{i % 50}",
+        "user_id": f"user{i % 500}",
+        "meeting_uuid": f"meeting{i}",
+        "meeting": {"uuid": f"meeting{i}", "subject": "Weekly sync", "participants_emails": [{"email": f"guest{i}@example.com"}] * 5},
+    }
+
+
+def measure(make_event, payloads: list, send: bool) -> tuple[float, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    for data in payloads:
+        event = make_event(data)
+        if send:
+            event.send()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / len(payloads) * 1_000_000, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=10_000)
+    args = parser.parse_args()
+
+    transport = InMemoryTransport()
+    # No linger: each send() waits for its own delivery, so a linger window would only measure the timer
+    service = EventProducerService(transport=transport, linger_ms=0)
+    set_producer_service(service)
+    sink = InMemoryStatusSink()
+    set_status_sink(sink)
+
+    variants = {
+        "before": lambda data: LegacyGenieEvent(Topic.NEW_MEETING, data, sink),
+        "after": lambda data: GenieEvent(Topic.NEW_MEETING, data),
+    }
+    print(f"{'variant':<8}{'payload':<9}{'phase':<16}{'us/event':>10}{'peak KiB':>10}")
+    for name, factory in variants.items():
+        for payload_type, convert in (("dict", lambda data: data), ("str", json.dumps)):
+            payloads = [convert(payload(i)) for i in range(args.events)]
+            for phase, send in (("construct", False), ("construct+send", True)):
+                us, peak = measure(factory, payloads, send)
+                print(f"{name:<8}{payload_type:<9}{phase:<16}{us:>10.2f}{peak:>10.0f}")
+    service.close()
+    print(f"sent {legacy_producer.sent + transport.sent} events, recorded {sink.started} statuses")
+
+
+if __name__ == "__main__":
+    main()
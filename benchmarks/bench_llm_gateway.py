@@ -0,0 +1,138 @@
+"""
+LLM calls of a burst against a rate limited deployment, sent all at once (before) and through the LLMGateway.
+
+The stub deployment enforces --rpm requests and --tpm tokens per "minute" of --minute-seconds, like Azure OpenAI:
+a call over either limit is answered with a 429 and a Retry-After of the time until the limit frees up. Calls take
+--latency-ms. Without the gateway a 429 is retried twice with backoff, as the OpenAI client does, then fails.
+
+The workload is the fan-out of profile params evaluation, --posts posts times --params param-scoring-v2 calls,
+while --meetings get_meeting_goals calls arrive spread over the first seconds; those are the interactive calls whose
+latency is reported.
+
+Usage:
+    python -m benchmarks.bench_llm_gateway [--posts 20] [--params 6] [--meetings 10] [--rpm 60] [--tpm 60000]
+        [--minute-seconds 3] [--latency-ms 200]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from ai.langsmith.llm_gateway import LLMGateway, estimate_tokens
+from data.data_common.events.retry import set_retries_deferred
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__("Too Many Requests")
+        self.response = type("Response", (), {"headers": {"retry-after-ms": str(int(retry_after * 1000))}})()
+
+
+class StubDeployment:
+    """Sliding window limits of requests and tokens per `minute` seconds."""
+
+    def __init__(self, rpm: int, tpm: int, minute: float, latency: float, completion_tokens: int = 300):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.minute = minute
+        self.latency = latency
+        self.completion_tokens = completion_tokens
+        self.window: list[tuple[float, int]] = []
+        self.requests = 0
+        self.rate_limited = 0
+
+    def _retry_after(self, tokens: int) -> float:
+        now = time.monotonic()
+        self.window = [(at, used) for at, used in self.window if now - at < self.minute]
+        if len(self.window) >= self.rpm:
+            return self.window[len(self.window) - self.rpm][0] + self.minute - now
+        over = sum(used for _, used in self.window) + tokens - self.tpm
+        if over <= 0:
+            return 0
+        for at, used in self.window:
+            over -= used
+            if over <= 0:
+                return at + self.minute - now
+        return 0
+
+    async def ainvoke(self, arguments):
+        self.requests += 1
+        tokens = estimate_tokens(arguments) + self.completion_tokens
+        wait = self._retry_after(tokens)
+        if wait > 0:
+            self.rate_limited += 1
+            raise RateLimitError(wait)
+        self.window.append((time.monotonic(), tokens))
+        await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+        return {"score": 50}
+
+
+async def direct(deployment: StubDeployment, prompt_name: str, arguments, retries: int = 2):
+    for attempt in range(retries + 1):
+        try:
+            return await deployment.ainvoke(arguments)
+        except RateLimitError:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(0.5 * 2 ** attempt + random.uniform(0, 0.25))
+
+
+async def workload(call, args) -> tuple[float, int, list[float]]:
+    post = {"post": "We are hiring SDRs in Berlin " * 40}
+    meeting_latencies = []
+
+    async def meeting(index: int):
+        await asyncio.sleep(index * 0.3)
+        started = time.perf_counter()
+        try:
+            await call("get_meeting_goals", {"meeting": index, "agenda": "Intro call " * 50})
+            meeting_latencies.append(time.perf_counter() - started)
+        except RateLimitError:
+            meeting_latencies.append(float("inf"))
+
+    started = time.perf_counter()
+    scoring = [call("param-scoring-v2", {**post, "param": param, "index": index})
+               for index in range(args.posts) for param in range(args.params)]
+    results = await asyncio.gather(*scoring, *(meeting(i) for i in range(args.meetings)), return_exceptions=True)
+    failures = sum(isinstance(result, Exception) for result in results)
+    return time.perf_counter() - started, failures, sorted(meeting_latencies)
+
+
+def report(mode: str, deployment: StubDeployment, elapsed: float, failures: int, meetings: list[float], extra=""):
+    p50 = meetings[len(meetings) // 2]
+    p99 = meetings[min(len(meetings) - 1, int(len(meetings) * 0.99))]
+    print(f"{mode:<10}{deployment.requests:>10}{deployment.rate_limited:>7}{failures:>10}{elapsed:>9.2f}"
+          f"{p50:>13.2f}{p99:>13.2f}  {extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=20)
+    parser.add_argument("--params", type=int, default=6)
+    parser.add_argument("--meetings", type=int, default=10)
+    parser.add_argument("--rpm", type=int, default=60)
+    parser.add_argument("--tpm", type=int, default=60000)
+    parser.add_argument("--minute-seconds", type=float, default=3)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    args = parser.parse_args()
+    set_retries_deferred(False)
+    random.seed(7)
+    latency = args.latency_ms / 1000
+
+    print(f"{'mode':<10}{'requests':>10}{'429s':>7}{'failures':>10}{'total s':>9}"
+          f"{'meeting p50':>13}{'meeting p99':>13}")
+    deployment = StubDeployment(args.rpm, args.tpm, args.minute_seconds, latency)
+    report("direct", deployment, *asyncio.run(workload(lambda name, arguments: direct(deployment, name, arguments), args)))
+
+    deployment = StubDeployment(args.rpm, args.tpm, args.minute_seconds, latency)
+    gateway = LLMGateway(requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+                         completion_tokens=deployment.completion_tokens, minute_seconds=args.minute_seconds)
+    report("gateway", deployment,
+           *asyncio.run(workload(lambda name, arguments: gateway.invoke(name, deployment, arguments), args)),
+           f"max queued {gateway.stats['max_queued']}, waited {gateway.stats['wait_seconds']:.1f}s in total")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+End-to-end pipeline over the in-process LocalEventBus, no event hub or Azure storage involved.
+
+Three consumer groups are chained like persons_manager -> person_langsmith -> the profile finisher:
+NEW_CONTACT -> NEW_PERSON -> NEW_PROCESSED_PROFILE. Every hop receives through a LocalReceiver, runs through
+PartitionDispatcher and Checkpointer as GenieConsumer does, sleeps --hop-ms (exponentially distributed) and publishes
+the next topic with the person as partition key. Reports throughput and end-to-end latency from publishing the
+NEW_CONTACT event to handling NEW_PROCESSED_PROFILE.
+
+Usage:
+    python -m benchmarks.bench_local_pipeline [--events 2000] [--hop-ms 5] [--per-partition 1 8] [--partitions 4]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from data.data_common.events.checkpointing import CheckpointPolicy, Checkpointer
+from data.data_common.events.event_dispatcher import PartitionDispatcher
+from data.data_common.events.local_event_bus import LocalEventBus
+from data.data_common.events.topics import Topic
+
+HOPS = [
+    ("persons_group", Topic.NEW_CONTACT, Topic.NEW_PERSON),
+    ("langsmith_group", Topic.NEW_PERSON, Topic.NEW_PROCESSED_PROFILE),
+    ("finisher_group", Topic.NEW_PROCESSED_PROFILE, None),
+]
+
+
+async def run(args, per_partition: int) -> dict:
+    bus = LocalEventBus(partitions=args.partitions)
+    rng = random.Random(11)
+    latencies = []
+    finished = asyncio.Event()
+    receivers, tasks, dispatchers = [], [], []
+
+    for consumer_group, topic, next_topic in HOPS:
+        receiver = bus.receiver(consumer_group, [topic])
+        checkpointer = Checkpointer(CheckpointPolicy(every_events=50, every_seconds=1))
+
+        async def handler(event, next_topic=next_topic):
+            await asyncio.sleep(rng.expovariate(1000 / args.hop_ms))
+            body = json.loads(json.loads(event.body_as_str()))
+            if next_topic:
+                bus.publish(json.dumps(json.dumps(body)), {"topic": next_topic}, partition_key=body["email"])
+                return
+            latencies.append(time.perf_counter() - body["published"])
+            if len(latencies) == args.events:
+                finished.set()
+
+        dispatcher = PartitionDispatcher(handler, checkpointer.advance, max_in_flight_per_partition=per_partition,
+                                         max_in_flight=per_partition * args.partitions)
+        receivers.append(receiver)
+        dispatchers.append((dispatcher, checkpointer))
+        on_partition_close = lambda context, reason, checkpointer=checkpointer: checkpointer.flush_partition(context)
+        tasks.append(asyncio.create_task(receiver.receive(on_event=dispatcher.dispatch, on_partition_close=on_partition_close)))
+
+    started = time.perf_counter()
+    for number in range(args.events):
+        body = {"email": f"person{number}@example.com", "published": time.perf_counter()}
+        bus.publish(json.dumps(json.dumps(body)), {"topic": Topic.NEW_CONTACT}, partition_key=body["email"])
+    await finished.wait()
+    elapsed = time.perf_counter() - started
+
+    for receiver in receivers:
+        await receiver.close()
+    await asyncio.gather(*tasks)
+    for dispatcher, checkpointer in dispatchers:
+        await dispatcher.drain()
+        await checkpointer.flush()
+    latencies.sort()
+    return {
+        "seconds": elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99)] * 1000,
+        "backlog": sum(bus.backlog(group) for group, _, _ in HOPS),
+        "published": bus.stats["published"],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--hop-ms", type=float, default=5)
+    parser.add_argument("--partitions", type=int, default=4)
+    parser.add_argument("--per-partition", type=int, nargs="+", default=[1, 8])
+    args = parser.parse_args()
+
+    print(f"{'per partition':<15}{'events/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'published':>11}{'unacked':>9}")
+    for per_partition in args.per_partition:
+        result = await run(args, per_partition)
+        print(f"{per_partition:<15}{args.events / result['seconds']:>10.0f}{result['p50']:>9.1f}{result['p99']:>9.1f}"
+              f"{result['published']:>11}{result['backlog']:>9}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,167 @@
+"""
+Compares the meeting time queries on the VARCHAR start_time (string casts on every row) with the indexed range
+predicates on start_time_tz / reminder_schedule, over a generated meetings table (1M rows by default).
+
+Tables are created in a scratch schema with LIKE public.<table> INCLUDING ALL, so run the migrations first to
+get the start_time_tz columns and indexes. Each query is run --repeat times under EXPLAIN (ANALYZE, BUFFERS);
+the median execution time and whether the plan used a sequential scan are reported.
+
+Requires the regular DB_* environment. Usage:
+    python -m benchmarks.bench_meeting_time_queries [--rows 1000000] [--repeat 5] [--keep]
+"""
+import argparse
+import statistics
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+
+from benchmarks.explain_hot_queries import find_seq_scans
+from data.data_common.utils import postgres_connector
+
+SCHEMA = "genie_meeting_times"
+
+# Meetings spread over +-1000 hours around now for 500 users, stored the way Google Calendar sends them
+# (offset date-times, a few all-day dates), with the typed columns and reminder schedule filled in like the repository does.
+GENERATE_MEETINGS = """
+    INSERT INTO meetings (uuid, google_calendar_id, user_id, tenant_id, participants_emails, participants_hash, link, subject, location,
+                          start_time, end_time, start_time_tz, end_time_tz, classification, reminder_schedule, reminder_sent)
+    SELECT 'meeting' || g, 'gcal' || g, 'user' || (g %% 500), 'tenant' || (g %% 500),
+           jsonb_build_array(jsonb_build_object('email', 'host' || (g %% 500) || '@genie.ai', 'self', true),
+                             jsonb_build_object('email', 'guest' || (g %% 20000) || '@example.com')),
+           md5(g::text), 'https://meet/' || g, 'Meeting ' || g, '',
+           CASE WHEN g %% 50 = 0 THEN to_char(t.starts AT TIME ZONE 'UTC', 'YYYY-MM-DD')
+                ELSE to_char(t.starts AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS') || '+00:00' END,
+           to_char((t.starts + interval '1 hour') AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS') || '+00:00',
+           t.starts, t.starts + interval '1 hour',
+           CASE WHEN g %% 3 = 0 THEN 'internal' ELSE 'external' END,
+           CASE WHEN g %% 3 = 0 THEN NULL ELSE t.starts - interval '30 minutes' END,
+           CASE WHEN t.starts < now() THEN t.starts - interval '30 minutes' END
+    FROM generate_series(1, %(rows)s) g
+    CROSS JOIN LATERAL (SELECT date_trunc('minute', now()) + (((g * 7919) %% 120000) - 60000 || ' minutes')::interval AS starts) t;
+"""
+
+GENERATE_TENANTS = """
+    INSERT INTO tenants (uuid, tenant_id, user_name, email, user_id, reminder_subscription)
+    SELECT 'tenant-row' || g, 'tenant' || g, 'User ' || g, 'host' || g || '@genie.ai', 'user' || g, g %% 10 != 0
+    FROM generate_series(0, 499) g;
+"""
+
+LEGACY_FUTURE_PREDICATE = """(
+    CASE
+        WHEN start_time ~ 'T' THEN TO_TIMESTAMP(SPLIT_PART(start_time, '+', 1), 'YYYY-MM-DD"T"HH24:MI:SS')
+        ELSE TO_TIMESTAMP(start_time, 'YYYY-MM-DD')
+    END > %s)"""
+
+
+def build_queries(now: datetime) -> list[tuple[str, str, tuple, str, tuple]]:
+    """(name, legacy query, legacy params, typed query, typed params)"""
+    return [
+        (
+            "get_all_meetings_by_user_id_in_datetime",
+            """SELECT uuid FROM meetings WHERE user_id = %s AND classification != %s
+               AND to_timestamp(start_time, 'YYYY-MM-DD"T"HH24:MI:SS') AT TIME ZONE 'UTC' BETWEEN %s AND %s;""",
+            ("user42", "deleted", (now - timedelta(weeks=2)).isoformat(), (now + timedelta(weeks=2)).isoformat()),
+            "SELECT uuid FROM meetings WHERE user_id = %s AND classification != %s AND start_time_tz BETWEEN %s AND %s;",
+            ("user42", "deleted", now - timedelta(weeks=2), now + timedelta(weeks=2)),
+        ),
+        (
+            "get_all_future_meetings_for_user",
+            f"SELECT uuid FROM meetings WHERE user_id = %s AND {LEGACY_FUTURE_PREDICATE} AND classification != %s;",
+            ("user42", now, "deleted"),
+            "SELECT uuid FROM meetings WHERE user_id = %s AND start_time_tz > %s AND classification != %s;",
+            ("user42", now, "deleted"),
+        ),
+        (
+            "get_all_future_external_meetings_for_tenant",
+            f"SELECT uuid FROM meetings WHERE tenant_id = %s AND {LEGACY_FUTURE_PREDICATE} AND classification = %s;",
+            ("tenant42", now.isoformat(), "external"),
+            "SELECT uuid FROM meetings WHERE tenant_id = %s AND start_time_tz > %s AND classification = %s;",
+            ("tenant42", now, "external"),
+        ),
+        (
+            "get_all_meetings_by_user_id_that_should_be_imported",
+            """SELECT uuid FROM meetings WHERE classification NOT IN (%s) AND fake = FALSE AND start_time > %s AND user_id = %s
+               ORDER BY start_time ASC LIMIT 50;""",
+            ("deleted", (now - timedelta(hours=10)).isoformat(), "user42"),
+            """SELECT uuid FROM meetings WHERE classification NOT IN (%s) AND fake = FALSE AND start_time_tz > %s AND user_id = %s
+               ORDER BY start_time_tz ASC LIMIT 50;""",
+            ("deleted", now - timedelta(hours=10), "user42"),
+        ),
+        (
+            "get_meetings_to_send_reminders",
+            """SELECT m.uuid FROM meetings m INNER JOIN tenants t ON m.user_id = t.user_id
+               WHERE (m.reminder_schedule AT TIME ZONE 'UTC') BETWEEN (CURRENT_TIMESTAMP AT TIME ZONE 'UTC' - INTERVAL '25 minutes')
+                     AND (CURRENT_TIMESTAMP AT TIME ZONE 'UTC' + INTERVAL '5 minutes')
+                 AND m.classification = %s AND m.reminder_sent IS NULL AND t.reminder_subscription = TRUE;""",
+            ("external",),
+            """SELECT m.uuid FROM meetings m INNER JOIN tenants t ON m.user_id = t.user_id
+               WHERE m.reminder_schedule BETWEEN CURRENT_TIMESTAMP - INTERVAL '25 minutes' AND CURRENT_TIMESTAMP + INTERVAL '5 minutes'
+                 AND m.classification = %s AND m.reminder_sent IS NULL AND t.reminder_subscription = TRUE;""",
+            ("external",),
+        ),
+    ]
+
+
+def build_dataset(cursor, rows: int):
+    cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA};")
+    for table in ("meetings", "tenants"):
+        # Defaults are excluded so the SERIAL ids don't advance the production sequences
+        cursor.execute(f"CREATE TABLE {SCHEMA}.{table} (LIKE public.{table} INCLUDING ALL EXCLUDING DEFAULTS);")
+        cursor.execute(f"ALTER TABLE {SCHEMA}.{table} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;")
+    cursor.execute(f"SET search_path TO {SCHEMA};")
+    cursor.execute("ALTER TABLE meetings ALTER COLUMN fake SET DEFAULT FALSE;")
+    cursor.execute(GENERATE_MEETINGS, {"rows": rows})
+    cursor.execute(GENERATE_TENANTS)
+    cursor.execute("ANALYZE meetings; ANALYZE tenants;")
+
+
+def measure(cursor, query: str, params: tuple, repeat: int) -> tuple[float, int, bool]:
+    timings = []
+    rows = 0
+    seq_scans = []
+    for _ in range(repeat):
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, params)
+        explain = cursor.fetchone()[0][0]
+        timings.append(explain["Execution Time"])
+        rows = explain["Plan"].get("Actual Rows", 0)
+        seq_scans = []
+        find_seq_scans(explain["Plan"], seq_scans)
+    return statistics.median(timings), rows, any(scan["relation"] == "meetings" for scan in seq_scans)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="Keep the generated schema")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(
+        user=postgres_connector.db_user,
+        password=postgres_connector.password,
+        host=postgres_connector.host,
+        port=postgres_connector.port,
+        database=postgres_connector.database,
+    )
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            print(f"Generating {args.rows} meetings in schema {SCHEMA}...")
+            build_dataset(cursor, args.rows)
+            print(f"{'query':<54}{'varchar ms':>12}{'typed ms':>10}{'speedup':>9}{'rows':>7}  seq scan (varchar/typed)")
+            for name, legacy_query, legacy_params, typed_query, typed_params in build_queries(datetime.now(timezone.utc)):
+                legacy_ms, _, legacy_seq = measure(cursor, legacy_query, legacy_params, args.repeat)
+                typed_ms, rows, typed_seq = measure(cursor, typed_query, typed_params, args.repeat)
+                print(
+                    f"{name:<54}{legacy_ms:>12.2f}{typed_ms:>10.2f}{legacy_ms / max(typed_ms, 0.001):>8.1f}x{rows:>7}"
+                    f"  {'yes' if legacy_seq else 'no'}/{'yes' if typed_seq else 'no'}"
+                )
+    finally:
+        if not args.keep:
+            with conn.cursor() as cursor:
+                cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Tokens and wall time of scoring an artifact on the profile parameters, one param-scoring-v2 call per parameter
+(before) and in batches of --batch-size parameters per call (param_scoring).
+
+The stub model counts prompt tokens as the gateway estimates them (a token per 4 characters), answers
+--answer-tokens tokens per scored parameter and takes --ttft-ms plus --ms-per-token for each answered token. In
+batched mode it leaves out each parameter with probability --malformed, so that the per-parameter fallback is
+exercised. Calls go through an LLMGateway of --concurrency calls per prompt, without rate limits.
+
+Usage:
+    python -m benchmarks.bench_param_scoring [--artifacts 3] [--params 30] [--batch-size 4] [--post-chars 1500]
+        [--ttft-ms 400] [--ms-per-token 10] [--answer-tokens 120] [--malformed 0.05] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from ai.langsmith.llm_gateway import LLMGateway, estimate_tokens
+from ai.langsmith.param_scoring import BATCH_SCORING_SYSTEM, parse_scores, score_in_batches
+
+
+class StubModel:
+    def __init__(self, args, rng: random.Random):
+        self.args = args
+        self.rng = rng
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    async def ainvoke(self, arguments):
+        self.calls += 1
+        self.prompt_tokens += estimate_tokens(BATCH_SCORING_SYSTEM) + estimate_tokens(arguments)
+        if "params_data" in arguments:
+            params = [param for param in arguments["params_data"] if self.rng.random() >= self.args.malformed]
+            answer = json.dumps([{"param_id": param["param_id"], "score": 50, "clues": []} for param in params])
+        else:
+            params = [arguments["param_data"]]
+            answer = json.dumps({"score": 50, "clues": []})
+        tokens = self.args.answer_tokens * max(1, len(params))
+        self.completion_tokens += tokens
+        await asyncio.sleep((self.args.ttft_ms + tokens * self.args.ms_per_token) / 1000)
+        return answer
+
+
+def workload(args, rng: random.Random) -> tuple[list[str], list[dict]]:
+    posts = [" ".join(rng.choice(["We", "are", "hiring", "SDRs", "growth", "pipeline", "Berlin", "AI"])
+                      for _ in range(args.post_chars // 6)) for _ in range(args.artifacts)]
+    params = [{"param_id": str(i), "param_name": f"Param {i}", "min_range": 0, "max_range": 100,
+               "explanation": "Low means the person decides by feeling, high by analysis. " * 4,
+               "clues": [f"Mentions numbers or metrics, example {j}" for j in range(6)]}
+              for i in range(1, args.params + 1)]
+    return posts, params
+
+
+async def run(args, batch_size: int) -> tuple[StubModel, float, int]:
+    rng = random.Random(3)
+    model = StubModel(args, rng)
+    gateway = LLMGateway(max_concurrent=args.concurrency * 2, max_concurrent_per_prompt=args.concurrency,
+                         requests_per_minute=0, tokens_per_minute=0)
+    person = {"name": "Jane Doe", "position": "VP Sales", "company": "Acme"}
+    posts, params = workload(args, rng)
+    scored = 0
+    started = time.perf_counter()
+    for post in posts:
+        async def score_batch(group):
+            answer = await gateway.invoke("param-scoring-batch", model,
+                                          {"personal_info": person, "params_data": group, "post": post})
+            return parse_scores(answer, [param["param_id"] for param in group])
+
+        async def score_one(param):
+            answer = await gateway.invoke("param-scoring-v2", model,
+                                          {"personal_info": person, "param_data": param, "post": post})
+            return json.loads(answer)
+
+        scored += len(await score_in_batches(params, post, score_batch, score_one, batch_size=batch_size))
+    return model, time.perf_counter() - started, scored
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--artifacts", type=int, default=3)
+    parser.add_argument("--params", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--post-chars", type=int, default=1500)
+    parser.add_argument("--ttft-ms", type=float, default=400)
+    parser.add_argument("--ms-per-token", type=float, default=10)
+    parser.add_argument("--answer-tokens", type=int, default=120)
+    parser.add_argument("--malformed", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'mode':<14}{'calls':>8}{'prompt tok':>12}{'answer tok':>12}{'wall s':>9}{'scored':>8}   (per artifact)")
+    for mode, batch_size in (("per-param", 1), (f"batch of {args.batch_size}", args.batch_size)):
+        model, elapsed, scored = asyncio.run(run(args, batch_size))
+        n = args.artifacts
+        print(f"{mode:<14}{model.calls / n:>8.1f}{model.prompt_tokens / n:>12.0f}{model.completion_tokens / n:>12.0f}"
+              f"{elapsed / n:>9.2f}{scored / n:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
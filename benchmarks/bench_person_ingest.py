@@ -0,0 +1,144 @@
+"""
+Write throughput of ingesting persons: the previous save_person (SELECT by email, then INSERT or UPDATE) against
+the single INSERT ... ON CONFLICT statement of PersonsRepository.person_upsert.
+
+Each mode ingests --persons persons into an empty scratch table (all inserts), then ingests them again (all
+updates), from --workers threads with one connection each. Worker batches overlap like consumers seeing the same
+attendees; the scratch table has the unique email index, so a lost check-then-write race shows up as a failed
+INSERT instead of a duplicate person. Round-trips count statements plus COMMIT / ROLLBACK.
+
+Requires the regular DB_* environment. Usage:
+    python -m benchmarks.bench_person_ingest [--persons 10000] [--workers 8]
+"""
+import argparse
+import threading
+import time
+
+import psycopg2
+
+from data.data_common.data_transfer_objects.person_dto import PersonStatus
+from data.data_common.repositories.persons_repository import PersonsRepository
+from data.data_common.utils import postgres_connector
+
+SCHEMA = "genie_person_ingest"
+
+
+def connect():
+    return psycopg2.connect(
+        user=postgres_connector.db_user,
+        password=postgres_connector.password,
+        host=postgres_connector.host,
+        port=postgres_connector.port,
+        database=postgres_connector.database,
+        options=f"-c search_path={SCHEMA}",
+    )
+
+
+def reset_table(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}; DROP TABLE IF EXISTS {SCHEMA}.persons;")
+        # Same columns as public.persons, with its own id sequence and the uuid / email unique indexes
+        cursor.execute(f"CREATE TABLE {SCHEMA}.persons (LIKE public.persons);")
+        cursor.execute(f"ALTER TABLE {SCHEMA}.persons ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;")
+        cursor.execute(f"CREATE UNIQUE INDEX ON {SCHEMA}.persons (uuid);")
+        cursor.execute(f"CREATE UNIQUE INDEX ON {SCHEMA}.persons (email);")
+    conn.commit()
+
+
+def legacy_save(conn, values: dict) -> int:
+    """The previous save_person; returns the number of round-trips."""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT uuid FROM persons WHERE email = %s;", (values["email"],))
+        existing = cursor.fetchone()
+        if existing:
+            cursor.execute(
+                "UPDATE persons SET name = %s, company = %s, email = %s, position = %s, timezone = %s, linkedin = %s WHERE uuid = %s",
+                (values["name"], values["company"], values["email"], values["position"], values["timezone"], values["linkedin"], existing[0]),
+            )
+        else:
+            try:
+                cursor.execute(
+                    "INSERT INTO persons (uuid, name, company, email, linkedin, position, timezone, status) "
+                    "VALUES (%(uuid)s, %(name)s, %(company)s, %(email)s, %(linkedin)s, %(position)s, %(timezone)s, %(status)s) RETURNING id;",
+                    values,
+                )
+            except psycopg2.IntegrityError:
+                # Lost the race against another worker; the unique email index turns it into an error here
+                conn.rollback()
+                return 2
+    conn.commit()
+    return 3
+
+
+def upsert_save(upsert, conn, values: dict) -> int:
+    upsert.execute(conn, values)
+    return 2
+
+
+def make_persons(count: int, round_number: int) -> list[dict]:
+    return [
+        {
+            "uuid": f"bench-{i}" if round_number == 0 else f"bench-{i}-again",
+            "name": f"Person {i}",
+            "company": f"Company {i % 500}",
+            "email": f"person{i}@example.com",
+            "linkedin": f"https://linkedin.com/in/person{i}" if i % 2 else None,
+            "position": "Engineer" if round_number == 0 else "Senior Engineer",
+            "timezone": "UTC",
+            "status": PersonStatus.IN_PROGRESS.value,
+        }
+        for i in range(count)
+    ]
+
+
+def run(save, persons: list[dict], workers: int) -> tuple[float, int]:
+    round_trips = [0] * workers
+    slices = [persons[i::workers] + persons[(i + 1) % workers::workers][:10] for i in range(workers)]
+
+    def worker(index: int):
+        conn = connect()
+        try:
+            for values in slices[index]:
+                round_trips[index] += save(conn, values)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, sum(round_trips)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--persons", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    upsert = PersonsRepository().person_upsert
+    modes = {"check-then-write": legacy_save, "upsert": lambda conn, values: upsert_save(upsert, conn, values)}
+    admin = connect()
+    try:
+        print(f"{'mode':<18}{'pass':<8}{'seconds':>9}{'persons/s':>11}{'round-trips':>13}{'rows':>8}")
+        for mode, save in modes.items():
+            reset_table(admin)
+            for round_number, label in enumerate(("insert", "update")):
+                persons = make_persons(args.persons, round_number)
+                elapsed, round_trips = run(save, persons, args.workers)
+                with admin.cursor() as cursor:
+                    cursor.execute("SELECT COUNT(*) FROM persons;")
+                    rows = cursor.fetchone()[0]
+                admin.commit()
+                print(f"{mode:<18}{label:<8}{elapsed:>9.2f}{len(persons) / elapsed:>11.0f}{round_trips:>13}{rows:>8}")
+    finally:
+        with admin.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+        admin.commit()
+        admin.close()
+
+
+if __name__ == "__main__":
+    main()
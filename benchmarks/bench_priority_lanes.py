@@ -0,0 +1,120 @@
+"""
+Time-to-profile of prospects in imminent meetings while a bulk backfill is queued, with FIFO dispatch and with
+priority lanes, over the in-process LocalEventBus.
+
+The pipeline is the one of bench_local_pipeline: NEW_CONTACT -> NEW_PERSON -> NEW_PROCESSED_PROFILE, three consumer
+groups each running PartitionDispatcher with one event per partition at a time. Every hop sleeps --hop-ms
+(exponentially distributed) and publishes the next topic with the priority of the event it handled, as GenieEvent
+inherits it. First --backlog BULK events are published (an admin re-sync or sync_personal_news); --urgent-after-ms
+later, --urgent contacts of a meeting starting in 20 minutes are published one every --urgent-every-ms.
+
+Priority lanes can only reorder events a consumer already received: each partition runs with up to --buffer events
+received ahead (CONSUMER_PRIORITY_BUFFER_PER_PARTITION). Reported: time from publishing an urgent contact to
+handling its NEW_PROCESSED_PROFILE, and the time until the whole backlog was profiled.
+
+Usage:
+    python -m benchmarks.bench_priority_lanes [--backlog 2000] [--urgent 20] [--hop-ms 5] [--partitions 4]
+                                             [--buffer 64 256 1024]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from data.data_common.events.checkpointing import CheckpointPolicy, Checkpointer
+from data.data_common.events.event_dispatcher import PartitionDispatcher
+from data.data_common.events.local_event_bus import LocalEventBus
+from data.data_common.events.priority import PRIORITY_PROPERTY, Priority, event_priority, priority_for_meeting
+from data.data_common.events.topics import Topic
+
+HOPS = [
+    ("persons_group", Topic.NEW_CONTACT, Topic.NEW_PERSON),
+    ("langsmith_group", Topic.NEW_PERSON, Topic.NEW_PROCESSED_PROFILE),
+    ("finisher_group", Topic.NEW_PROCESSED_PROFILE, None),
+]
+
+
+def publish(bus: LocalEventBus, topic: str, body: dict, priority: Priority):
+    properties = {"topic": topic, PRIORITY_PROPERTY: str(int(priority))}
+    bus.publish(json.dumps(json.dumps(body)), properties, partition_key=body["email"])
+
+
+async def run(args, buffer: int) -> dict:
+    bus = LocalEventBus(partitions=args.partitions)
+    rng = random.Random(11)
+    urgent, backlog = [], []
+    finished = asyncio.Event()
+    receivers, tasks, dispatchers = [], [], []
+
+    for consumer_group, topic, next_topic in HOPS:
+        receiver = bus.receiver(consumer_group, [topic])
+        checkpointer = Checkpointer(CheckpointPolicy(every_events=50, every_seconds=1))
+
+        async def handler(event, next_topic=next_topic):
+            await asyncio.sleep(rng.expovariate(1000 / args.hop_ms))
+            body = json.loads(json.loads(event.body_as_str()))
+            priority = event_priority(event)
+            if next_topic:
+                publish(bus, next_topic, body, priority)
+                return
+            (urgent if priority == Priority.URGENT else backlog).append(time.perf_counter() - body["published"])
+            if len(urgent) == args.urgent and len(backlog) == args.backlog:
+                finished.set()
+
+        dispatcher = PartitionDispatcher(handler, checkpointer.advance, max_in_flight_per_partition=1,
+                                         max_in_flight=args.partitions, priority=event_priority if buffer else None,
+                                         buffer_per_partition=buffer)
+        receivers.append(receiver)
+        dispatchers.append((dispatcher, checkpointer))
+        tasks.append(asyncio.create_task(receiver.receive(on_event=dispatcher.dispatch)))
+
+    started = time.perf_counter()
+    for number in range(args.backlog):
+        body = {"email": f"backfill{number}@example.com", "published": time.perf_counter()}
+        publish(bus, Topic.NEW_CONTACT, body, Priority.BULK)
+    await asyncio.sleep(args.urgent_after_ms / 1000)
+    meeting_priority = priority_for_meeting(datetime.now(timezone.utc) + timedelta(minutes=20))
+    for number in range(args.urgent):
+        body = {"email": f"prospect{number}@customer.com", "published": time.perf_counter()}
+        publish(bus, Topic.NEW_CONTACT, body, meeting_priority)
+        await asyncio.sleep(args.urgent_every_ms / 1000)
+    await finished.wait()
+    elapsed = time.perf_counter() - started
+
+    for receiver in receivers:
+        await receiver.close()
+    await asyncio.gather(*tasks)
+    for dispatcher, checkpointer in dispatchers:
+        await dispatcher.drain()
+        await checkpointer.flush()
+    urgent.sort()
+    return {
+        "p50": urgent[len(urgent) // 2] * 1000,
+        "p99": urgent[int(len(urgent) * 0.99)] * 1000,
+        "max": urgent[-1] * 1000,
+        "backlog seconds": elapsed,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backlog", type=int, default=2000)
+    parser.add_argument("--urgent", type=int, default=20)
+    parser.add_argument("--hop-ms", type=float, default=5)
+    parser.add_argument("--partitions", type=int, default=4)
+    parser.add_argument("--urgent-after-ms", type=float, default=200)
+    parser.add_argument("--urgent-every-ms", type=float, default=50)
+    parser.add_argument("--buffer", type=int, nargs="+", default=[64, 256, 1024])
+    args = parser.parse_args()
+
+    print(f"{'dispatch':<16}{'urgent p50 ms':>14}{'p99 ms':>9}{'max ms':>9}{'backlog done s':>16}")
+    for buffer in [0, *args.buffer]:
+        result = await run(args, buffer)
+        name = f"lanes, {buffer}" if buffer else "fifo"
+        print(f"{name:<16}{result['p50']:>14.1f}{result['p99']:>9.1f}{result['max']:>9.1f}{result['backlog seconds']:>16.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
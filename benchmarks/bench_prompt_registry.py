@@ -0,0 +1,97 @@
+"""
+Prompt fetch latency of Langsmith calls, pulling from the hub on every call and through the PromptRegistry.
+
+Replays the prompts Langsmith runs for --profiles persons: get_strengths, work-history-summary,
+dos_and_donts_w_context, --params param-scoring-v2 calls and --action-items specific-action-item calls each. The hub
+is a stub that sleeps --rtt-ms (exponentially distributed) per pull. "per call" is the time spent getting the prompt
+before each LLM invocation; the LLM call itself is not simulated.
+
+Modes: every call pulls (before), the registry without warm-up, the registry warmed up at startup (warm-up time
+reported separately, it runs in the background), and a restart with the hub down, served from the snapshots the
+previous runs wrote.
+
+Usage:
+    python -m benchmarks.bench_prompt_registry [--profiles 50] [--params 6] [--action-items 3] [--rtt-ms 120]
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+
+from ai.langsmith.prompt_registry import KNOWN_PROMPTS, PromptRegistry
+
+
+class StubHub:
+    def __init__(self, rtt: float, seed: int = 5):
+        self.rtt = rtt
+        self.rng = random.Random(seed)
+        self.pulls = 0
+        self.down = False
+
+    def pull(self, reference: str):
+        self.pulls += 1
+        if self.down:
+            raise ConnectionError("hub unreachable")
+        time.sleep(self.rng.expovariate(1 / self.rtt) if self.rtt else 0)
+        return {"name": reference, "template": f"You are a sales assistant. {reference}: {{personal_data}}"}
+
+
+def calls(args) -> list[str]:
+    profile = ["get_strengths", "work-history-summary", "dos_and_donts_w_context"]
+    profile += ["param-scoring-v2"] * args.params + ["specific-action-item"] * args.action_items
+    return profile * args.profiles
+
+
+def replay(get, names: list[str]) -> list[float]:
+    latencies = []
+    for name in names:
+        started = time.perf_counter()
+        get(name)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def report(mode: str, latencies: list[float], pulls: int, extra: str = ""):
+    latencies = sorted(latencies)
+    mean = sum(latencies) / len(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{mode:<18}{len(latencies):>7}{mean:>12.3f}{p99:>10.3f}{sum(latencies):>10.2f}{pulls:>7}  {extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=50)
+    parser.add_argument("--params", type=int, default=6)
+    parser.add_argument("--action-items", type=int, default=3)
+    parser.add_argument("--rtt-ms", type=float, default=120)
+    args = parser.parse_args()
+    names = calls(args)
+    rtt = args.rtt_ms / 1000
+    snapshot_dir = tempfile.mkdtemp(prefix="bench-prompts-")
+
+    print(f"{'mode':<18}{'calls':>7}{'per call ms':>12}{'p99 ms':>10}{'total s':>10}{'pulls':>7}")
+    hub = StubHub(rtt)
+    report("hub.pull", replay(hub.pull, names), hub.pulls)
+
+    hub = StubHub(rtt)
+    registry = PromptRegistry(hub.pull, json.dumps, json.loads, snapshot_dir=snapshot_dir)
+    report("registry", replay(registry.get, names), hub.pulls)
+
+    hub = StubHub(rtt)
+    registry = PromptRegistry(hub.pull, json.dumps, json.loads, snapshot_dir=snapshot_dir)
+    started = time.perf_counter()
+    registry.warm_up(KNOWN_PROMPTS)
+    warm_up = time.perf_counter() - started
+    report("registry, warm", replay(registry.get, names), hub.pulls,
+           f"warm-up of {len(KNOWN_PROMPTS)} prompts: {warm_up:.2f}s")
+
+    hub = StubHub(rtt)
+    hub.down = True
+    registry = PromptRegistry(hub.pull, json.dumps, json.loads, snapshot_dir=snapshot_dir)
+    report("hub down, snapshot", replay(registry.get, names), hub.pulls,
+           f"served from snapshots: {registry.stats['snapshot_loads']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Counts database connections opened and SQL statements executed per GenieEvent hop and per API request,
+with the legacy per-call DDL behaviour ("before") and with the one-time schema registry ("after").
+
+The legacy mode reproduces what the repositories did before the registry existed: every pool checkout opened
+a side connection to the "postgres" database, and every repository construction re-ran its CREATE TABLE.
+(Hot-path methods that used to call create_table_if_not_exists() are no longer emulated, so "before" is a lower bound.)
+
+Requires the regular DB_* environment. Usage:
+    python -m benchmarks.bench_schema_bootstrap [--iterations 50]
+"""
+import argparse
+from contextlib import contextmanager
+from unittest.mock import patch
+from uuid import uuid4
+
+import psycopg2
+
+from data.data_common.utils import postgres_connector, schema_registry
+from data.data_common.data_transfer_objects.status_dto import StatusEnum
+from data.data_common.repositories.statuses_repository import StatusesRepository
+from data.data_common.repositories.ownerships_repository import OwnershipsRepository
+from data.data_common.repositories.profiles_repository import ProfilesRepository
+from data.data_common.repositories.personal_data_repository import PersonalDataRepository
+
+
+class Counters:
+    def __init__(self):
+        self.connections = 0
+        self.statements = 0
+
+    def reset(self):
+        self.connections = 0
+        self.statements = 0
+
+
+counters = Counters()
+
+
+class _CountingCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, *args, **kwargs):
+        counters.statements += 1
+        return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        counters.statements += 1
+        return self._cursor.executemany(*args, **kwargs)
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._cursor.__exit__(*exc)
+
+    def __getattr__(self, item):
+        return getattr(self._cursor, item)
+
+
+class _CountingConnection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return _CountingCursor(self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, item):
+        return getattr(self._conn, item)
+
+    def __setattr__(self, key, value):
+        if key == "_conn":
+            object.__setattr__(self, key, value)
+        else:
+            setattr(self._conn, key, value)
+
+
+_real_connect = psycopg2.connect
+_real_get = postgres_connector.get_db_connection
+_real_release = postgres_connector.release_db_connection
+
+
+def _counting_connect(*args, **kwargs):
+    counters.connections += 1
+    return _CountingConnection(_real_connect(*args, **kwargs))
+
+
+def _counting_get():
+    conn = _real_get()
+    return _CountingConnection(conn) if conn else conn
+
+
+def _counting_release(conn):
+    _real_release(conn._conn if isinstance(conn, _CountingConnection) else conn)
+
+
+class _AlwaysNew(dict):
+    """Makes register_schema() treat every registration as new, like the old per-__init__ DDL."""
+
+    def __contains__(self, item):
+        return False
+
+
+@contextmanager
+def instrumented(legacy: bool):
+    patches = [
+        patch.object(psycopg2, "connect", _counting_connect),
+        patch.object(postgres_connector, "release_db_connection", _counting_release),
+    ]
+    if legacy:
+
+        def legacy_get():
+            postgres_connector.create_database_if_not_exists()
+            return _counting_get()
+
+        patches.append(patch.object(postgres_connector, "get_db_connection", legacy_get))
+        patches.append(patch.object(schema_registry, "_registered_ddl", _AlwaysNew()))
+        patches.append(patch.object(schema_registry, "_schema_ready", True))
+    else:
+        patches.append(patch.object(postgres_connector, "get_db_connection", _counting_get))
+    for p in patches:
+        p.start()
+    try:
+        yield
+    finally:
+        for p in reversed(patches):
+            p.stop()
+
+
+def genie_event_hop():
+    """Repository work of one pipeline hop: GenieEvent construction + send status, consumer PROCESSING/COMPLETED."""
+    ctx_id, object_id, user_id, topic = "bench", str(uuid4()), "bench-user", "bench-topic"
+    statuses = StatusesRepository()
+    statuses.start_status(ctx_id, object_id, "PERSON", user_id, "bench-tenant", None, topic)
+    statuses.update_status(ctx_id, object_id, user_id, topic, StatusEnum.PROCESSING)
+    statuses.update_status(ctx_id, object_id, user_id, topic, StatusEnum.COMPLETED)
+    statuses.delete_status(ctx_id, object_id, user_id, topic)
+
+
+ownerships = OwnershipsRepository()
+profiles = ProfilesRepository()
+personal_data = PersonalDataRepository()
+
+
+def attendee_info_request():
+    """Repository work of GET /{user_id}/profiles/{uuid}/attendee-info."""
+    uuid = str(uuid4())
+    ownerships.check_ownership("bench-user", uuid)
+    profiles.get_profile_data(uuid)
+    personal_data.get_social_media_links(uuid)
+
+
+def measure(scenario, iterations: int, legacy: bool) -> tuple[float, float]:
+    with instrumented(legacy):
+        counters.reset()
+        for _ in range(iterations):
+            scenario()
+        return counters.connections / iterations, counters.statements / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    schema_registry.bootstrap_schema()
+    print(f"{'scenario':<28}{'mode':<8}{'connections':>14}{'statements':>14}")
+    for name, scenario in (("per GenieEvent hop", genie_event_hop), ("per attendee-info request", attendee_info_request)):
+        for mode, legacy in (("before", True), ("after", False)):
+            connections, statements = measure(scenario, args.iterations, legacy)
+            print(f"{name:<28}{mode:<8}{connections:>14.2f}{statements:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Network bytes and CPU per published event: a receiver per consumer group (every group downloads and decodes every
+event, then skips the topics it does not handle) against one SharedReceiver fanning events out by topic.
+
+The consumer groups and their topics are those started by start_consumers. A stub hub stands in for the event hub:
+each event is stored as a wire frame (properties header + body) and every receiver downloads and decodes the frames
+itself, as EventHubConsumerClient decodes each AMQP message; bodies stay undecoded until a handler reads them.
+Handlers run through PartitionDispatcher and Checkpointer as in GenieConsumer and only read the body of events of
+their topics. CPU is process time of the whole run divided by published events.
+
+Usage:
+    python -m benchmarks.bench_shared_receiver [--events 20000] [--body-bytes 2000] [--partitions 4]
+"""
+import argparse
+import asyncio
+import json
+import random
+import struct
+import time
+
+from data.data_common.events.checkpointing import CheckpointPolicy, Checkpointer
+from data.data_common.events.event_dispatcher import PartitionDispatcher
+from data.data_common.events.genie_envelope import GenieEnvelope
+from data.data_common.events.shared_receiver import SharedReceiver
+from data.data_common.events.topics import Topic
+
+CONSUMERS = {
+    "personmanagerconsumergroup": [
+        Topic.NEW_PERSON, Topic.PDL_UPDATED_ENRICHED_DATA, Topic.APOLLO_UPDATED_ENRICHED_DATA,
+        Topic.PDL_FAILED_TO_ENRICH_PERSON, Topic.PDL_FAILED_TO_ENRICH_EMAIL, Topic.APOLLO_FAILED_TO_ENRICH_PERSON,
+        Topic.APOLLO_FAILED_TO_ENRICH_EMAIL, Topic.NEW_PROCESSED_PROFILE, Topic.NEW_EMAIL_ADDRESS_TO_PROCESS,
+        Topic.PDL_UP_TO_DATE_ENRICHED_DATA, Topic.APOLLO_UP_TO_DATE_ENRICHED_DATA,
+        Topic.ALREADY_PDL_FAILED_TO_ENRICH_PERSON, Topic.NEW_PERSONAL_DATA, Topic.FINISHED_NEW_PROFILE,
+        Topic.PROFILE_ERROR,
+    ],
+    "langsmithconsumergroup": [
+        Topic.NEW_PERSONAL_NEWS, Topic.FAILED_TO_GET_PERSONAL_NEWS, Topic.NEW_BASE_PROFILE, Topic.NEW_PERSON_CONTEXT,
+        Topic.PERSONAL_NEWS_ARE_UP_TO_DATE,
+    ],
+    "pdlconsumergroup": [Topic.PDL_NEW_PERSON_TO_ENRICH, Topic.PDL_NEW_EMAIL_ADDRESS_TO_ENRICH],
+    "meeting_manager_consumer_group": [
+        Topic.NEW_MEETING, Topic.NEW_MEETINGS_TO_PROCESS, Topic.PDL_UP_TO_DATE_ENRICHED_DATA,
+        Topic.PDL_UPDATED_ENRICHED_DATA, Topic.APOLLO_UPDATED_ENRICHED_DATA, Topic.APOLLO_UP_TO_DATE_ENRICHED_DATA,
+        Topic.COMPANY_NEWS_UPDATED, Topic.COMPANY_NEWS_UP_TO_DATE, Topic.NEW_PROCESSED_PROFILE,
+        Topic.NEW_MEETING_GOALS, Topic.NEW_EMBEDDED_DOCUMENT,
+    ],
+    "slack_consumer_group": [
+        Topic.FAILED_TO_ENRICH_PERSON, Topic.FAILED_TO_ENRICH_EMAIL, Topic.FAILED_TO_GET_PROFILE_PICTURE,
+        Topic.EMAIL_SENDING_FAILED, Topic.BUG_IN_TENANT_ID, Topic.PROFILE_ERROR, Topic.AI_TOKEN_ERROR,
+        Topic.MEETING_ERROR, Topic.FAILED_TO_GET_COMPANY_DATA,
+    ],
+    "apollo_consumer_group": [Topic.APOLLO_NEW_EMAIL_ADDRESS_TO_ENRICH, Topic.APOLLO_NEW_PERSON_TO_ENRICH],
+    "company_consumer_group": [Topic.NEW_COMPANY_DATA, Topic.NEW_EMAIL_TO_PROCESS_DOMAIN],
+    "sales_material_consumer_group": [Topic.FILE_UPLOADED],
+}
+
+
+class StubEvent:
+    __slots__ = ("properties", "body", "sequence_number", "offset")
+
+    def __init__(self, properties: dict, body: bytes, sequence_number: int):
+        self.properties = properties
+        self.body = body
+        self.sequence_number = sequence_number
+        self.offset = str(sequence_number)
+
+    def body_as_str(self, encoding: str = "UTF-8") -> str:
+        return self.body.decode(encoding)
+
+
+class StubPartitionContext:
+    fully_qualified_namespace = "stub"
+    eventhub_name = "stub"
+
+    def __init__(self, consumer_group: str, partition_id: str):
+        self.consumer_group = consumer_group
+        self.partition_id = partition_id
+
+    async def update_checkpoint(self, event=None, **kwargs):
+        pass
+
+
+class StubHub:
+    """Wire frames per partition: 4-byte header length, JSON properties header, body."""
+
+    def __init__(self, partitions: int):
+        self.partitions = [[] for _ in range(partitions)]
+
+    def publish(self, partition: int, properties: dict, body: str):
+        header = json.dumps(properties).encode("utf-8")
+        self.partitions[partition].append(struct.pack(">I", len(header)) + header + body.encode("utf-8"))
+
+    @staticmethod
+    def decode(frame: bytes, sequence_number: int) -> StubEvent:
+        length = struct.unpack_from(">I", frame)[0]
+        header = json.loads(frame[4:4 + length])
+        properties = {key.encode("utf-8"): value.encode("utf-8") for key, value in header.items()}
+        return StubEvent(properties, frame[4 + length:], sequence_number)
+
+    async def receive(self, consumer_group: str, on_event, stats: dict):
+        async def partition(partition_id: int, frames: list[bytes]):
+            context = StubPartitionContext(consumer_group, str(partition_id))
+            for sequence_number, frame in enumerate(frames):
+                stats["bytes"] += len(frame)
+                await on_event(context, self.decode(frame, sequence_number))
+
+        await asyncio.gather(*(partition(number, frames) for number, frames in enumerate(self.partitions)))
+
+
+class StubConsumer:
+    """GenieConsumer's event path: envelope, dispatcher, checkpointer, topic check, and decoding handled events."""
+
+    def __init__(self, consumer_group: str, topics: list[str]):
+        self.consumer_group = consumer_group
+        self.topics = topics
+        self.handled = 0
+        self.checkpointer = Checkpointer(CheckpointPolicy(every_events=50, every_seconds=10))
+        self.dispatcher = PartitionDispatcher(self.handle_event, self.checkpoint)
+        self.prefetch = self.dispatcher.max_in_flight_per_partition
+
+    async def on_event(self, partition_context, event):
+        await self.dispatcher.dispatch(partition_context, GenieEnvelope(event))
+
+    async def checkpoint(self, partition_context, envelope: GenieEnvelope):
+        await self.checkpointer.advance(partition_context, envelope.event)
+
+    async def handle_event(self, envelope: GenieEnvelope):
+        if envelope.topic in self.topics:
+            envelope.payload
+            self.handled += 1
+
+
+def publish_events(hub: StubHub, events: int, body_bytes: int):
+    rng = random.Random(5)
+    topics = sorted({topic for topics in CONSUMERS.values() for topic in topics})
+    filler = "x" * body_bytes
+    for number in range(events):
+        body = json.dumps(json.dumps({"email": f"person{number}@example.com", "data": filler}))
+        properties = {"topic": rng.choice(topics), "ctx_id": f"ctx{number}", "tenant_id": "tenant", "user_id": "user"}
+        hub.publish(number % len(hub.partitions), properties, body)
+
+
+async def per_consumer(hub: StubHub) -> tuple[dict, list[StubConsumer]]:
+    stats = {"bytes": 0}
+    consumers = [StubConsumer(group, topics) for group, topics in CONSUMERS.items()]
+
+    async def run(consumer: StubConsumer):
+        await hub.receive(consumer.consumer_group, consumer.on_event, stats)
+        await consumer.dispatcher.drain()
+        await consumer.checkpointer.flush()
+
+    await asyncio.gather(*(run(consumer) for consumer in consumers))
+    return stats, consumers
+
+
+async def shared(hub: StubHub) -> tuple[dict, list[StubConsumer]]:
+    stats = {"bytes": 0}
+    consumers = [StubConsumer(group, topics) for group, topics in CONSUMERS.items()]
+    receiver = SharedReceiver(consumers, receiver=None)
+    await hub.receive(receiver.consumer_group, receiver.on_event, stats)
+    for consumer in consumers:
+        await consumer.dispatcher.drain()
+        await consumer.checkpointer.flush()
+    await receiver.checkpointer.flush()
+    return stats, consumers
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--body-bytes", type=int, default=2000)
+    parser.add_argument("--partitions", type=int, default=4)
+    args = parser.parse_args()
+
+    hub = StubHub(args.partitions)
+    publish_events(hub, args.events, args.body_bytes)
+
+    print(f"{len(CONSUMERS)} consumer groups, {args.events} events of ~{args.body_bytes} bytes")
+    print(f"{'receiver':<14}{'bytes/event':>13}{'cpu us/event':>14}{'handled':>9}")
+    for name, run in (("per consumer", per_consumer), ("shared", shared)):
+        started = time.process_time()
+        stats, consumers = await run(hub)
+        cpu = time.process_time() - started
+        handled = sum(consumer.handled for consumer in consumers)
+        print(f"{name:<14}{stats['bytes'] / args.events:>13.0f}{cpu / args.events * 1e6:>14.1f}{handled:>9}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
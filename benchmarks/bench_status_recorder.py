@@ -0,0 +1,99 @@
+"""
+Status tracking overhead of an event handler, writing statuses directly with StatusesRepository against buffering
+them in StatusRecorder.
+
+Each simulated handler does what GenieConsumer and GenieEvent do for one hop: update_status PROCESSING, the handler's
+own work (--work-ms of sleep), update_status COMPLETED, and start_status for the event it sends on. The started rows
+the updates apply to are created up front, as the producer of the consumed event would have. Reported per event:
+time the handler spent in status calls, and for the recorder the time of the final flush on close(). "writes" are
+statements for direct writes and write_statuses transactions for the recorder.
+
+Runs against a scratch copy of the statuses table: PGOPTIONS puts the genie_status_bench schema first on the
+search path of every pooled connection. Requires the regular DB_* environment. Usage:
+    python -m benchmarks.bench_status_recorder [--events 5000] [--work-ms 0]
+"""
+import os
+
+SCHEMA = "genie_status_bench"
+os.environ["PGOPTIONS"] = f"-c search_path={SCHEMA},public"
+
+import argparse
+import time
+
+from data.data_common.data_transfer_objects.status_dto import StatusEnum
+from data.data_common.repositories.status_recorder import StatusRecorder
+from data.data_common.repositories.statuses_repository import StatusesRepository
+from data.data_common.utils.postgres_connector import db_connection
+
+
+def reset_table():
+    with db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}; DROP TABLE IF EXISTS {SCHEMA}.statuses;")
+            cursor.execute(f"CREATE TABLE {SCHEMA}.statuses (LIKE public.statuses);")
+            cursor.execute(f"ALTER TABLE {SCHEMA}.statuses ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;")
+            cursor.execute(f"CREATE INDEX ON {SCHEMA}.statuses (ctx_id, object_id);")
+        conn.commit()
+
+
+def seed(repository: StatusesRepository, events: int):
+    rows = [(f"ctx{i}", f"object{i}", "PERSON", "user", "tenant", "consumed-topic", "previous-topic", None, "STARTED", None)
+            for i in range(events)]
+    for start in range(0, events, 1000):
+        repository.write_statuses([], rows[start:start + 1000])
+
+
+def run(sink, events: int, work: float) -> float:
+    in_status_calls = 0.0
+    for i in range(events):
+        ctx_id, object_id = f"ctx{i}", f"object{i}"
+        started = time.perf_counter()
+        sink.update_status(ctx_id, object_id, "user", "consumed-topic", StatusEnum.PROCESSING)
+        in_status_calls += time.perf_counter() - started
+        if work:
+            time.sleep(work)
+        started = time.perf_counter()
+        sink.update_status(ctx_id, object_id, "user", "consumed-topic", StatusEnum.COMPLETED)
+        sink.start_status(ctx_id, object_id, "PERSON", "user", "tenant", "consumed-topic", "next-topic")
+        in_status_calls += time.perf_counter() - started
+    return in_status_calls
+
+
+def count_rows() -> dict:
+    with db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"SELECT status, COUNT(*) FROM {SCHEMA}.statuses GROUP BY status ORDER BY status;")
+            return dict(cursor.fetchall())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--work-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    repository = StatusesRepository()
+    try:
+        print(f"{'mode':<12}{'status us/event':>17}{'close us/event':>16}{'writes':>9}  rows")
+        for mode in ("direct", "recorder"):
+            reset_table()
+            seed(repository, args.events)
+            sink = repository if mode == "direct" else StatusRecorder(repository)
+            in_status_calls = run(sink, args.events, args.work_ms / 1000)
+            flush_seconds, writes = 0.0, args.events * 3
+            if mode == "recorder":
+                started = time.perf_counter()
+                sink.close()
+                flush_seconds = time.perf_counter() - started
+                writes = sink.stats["flushes"]
+            print(f"{mode:<12}{in_status_calls / args.events * 1e6:>17.1f}{flush_seconds / args.events * 1e6:>16.1f}"
+                  f"{writes:>9}  {count_rows()}")
+    finally:
+        with db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+            conn.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Bytes per event and encode / decode CPU per event for the event wire formats, on payloads shaped like the real ones.
+
+- legacy: the payload JSON encoded twice with the json module, which is the version 1 body.
+- v2: encoded once with orjson.
+- v2+gzip: v2, gzip compressed at --level above --threshold bytes, as GenieEvent sends by default.
+
+Encoding goes through wire_format.encode_payload. Decoding goes through wire_format.decode_event on events as a
+consumer receives them, with bytes property keys and values.
+
+Fixtures:
+- NEW_PERSONAL_DATA carries the person and the enrichment record.
+- NEW_PROCESSED_PROFILE carries the person and the cooked profile.
+- NEW_PERSONAL_NEWS carries the person and --news LinkedIn posts.
+- NEW_CONTACT is a small event that stays under the threshold.
+
+Usage:
+    python -m benchmarks.bench_wire_format [--events 1000] [--threshold 4096] [--level 1] [--news 30]
+"""
+import argparse
+import time
+
+from benchmarks.bench_event_envelope import person, personal_data_payload, processed_profile_payload, text
+from data.data_common.events import wire_format
+from data.data_common.events.local_event_bus import LocalEvent
+from data.data_common.events.topics import Topic
+from data.data_common.events.wire_format import decode_event, encode_payload
+
+
+def news_payload(number: int, posts: int) -> dict:
+    return {
+        "person": person(number),
+        "news": [
+            {"date": f"2024-0{post % 9 + 1}-1{post % 9}", "link": f"https://www.linkedin.com/posts/jane-{number}-{post}",
+             "media": "LinkedIn", "title": f"Post {post}", "summary": text(40), "reshared": None, "likes": post * 7,
+             "images": [f"https://media.licdn.com/image-{number}-{post}.jpg"]}
+            for post in range(posts)
+        ],
+    }
+
+
+def contact_payload(number: int) -> dict:
+    return {"email": f"jane{number}@example.com", "tenant_id": "tenant", "user_id": "user"}
+
+
+FORMATS = {
+    "legacy": {"version": 1},
+    "v2": {"version": 2, "compression": "none"},
+    "v2+gzip": {"version": 2, "compression": "gzip"},
+}
+
+
+def received(body, properties: dict) -> LocalEvent:
+    properties = {key.encode("utf-8"): value.encode("utf-8") for key, value in properties.items()}
+    return LocalEvent(body, properties, None, 0)
+
+
+def run(payloads: list[dict], options: dict, threshold: int) -> tuple[float, float, float]:
+    started = time.process_time()
+    encoded = [encode_payload(payload, threshold=threshold, **options) for payload in payloads]
+    encode = time.process_time() - started
+    events = [received(body, properties) for body, properties in encoded]
+    started = time.process_time()
+    for event in events:
+        decode_event(event)
+    decode = time.process_time() - started
+    size = sum(len(body.encode("utf-8") if isinstance(body, str) else body) for body, _ in encoded)
+    return size / len(payloads), encode / len(payloads) * 1e6, decode / len(payloads) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--threshold", type=int, default=wire_format.EVENT_COMPRESSION_THRESHOLD_BYTES)
+    parser.add_argument("--level", type=int, default=wire_format.EVENT_COMPRESSION_LEVEL)
+    parser.add_argument("--news", type=int, default=30)
+    args = parser.parse_args()
+    wire_format.EVENT_COMPRESSION_LEVEL = args.level
+
+    fixtures = {
+        Topic.NEW_PERSONAL_DATA: [personal_data_payload(n, 15) for n in range(args.events)],
+        Topic.NEW_PROCESSED_PROFILE: [processed_profile_payload(n, 12) for n in range(args.events)],
+        Topic.NEW_PERSONAL_NEWS: [news_payload(n, args.news) for n in range(args.events)],
+        Topic.NEW_CONTACT: [contact_payload(n) for n in range(args.events)],
+    }
+    print(f"{'topic':<32}{'format':<10}{'bytes':>9}{'encode us':>11}{'decode us':>11}")
+    for topic, payloads in fixtures.items():
+        for name, options in FORMATS.items():
+            size, encode, decode = run(payloads, options, args.threshold)
+            print(f"{topic:<32}{name:<10}{size:>9.0f}{encode:>11.1f}{decode:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Runs EXPLAIN (ANALYZE, BUFFERS) on each repository's hot queries against a generated dataset and reports
+every sequential scan.
+
+The dataset lives in a scratch schema whose tables are created with LIKE public.<table> INCLUDING ALL, so they
+carry the same columns, constraints and indexes as the real tables (run the migrations first to compare). The schema is dropped at the end.
+
+Requires the regular DB_* environment. Usage:
+    python -m benchmarks.explain_hot_queries [--rows 100000] [--keep]
+"""
+import argparse
+import json
+
+import psycopg2
+
+from data.data_common.utils import postgres_connector
+from data.data_common.repositories.meetings_repository import SELECT_MEETING_DATA_QUERY
+from data.data_common.repositories.ownerships_repository import CHECK_OWNERSHIP_QUERY
+from data.data_common.repositories.profiles_repository import SELECT_PROFILE_DATA_QUERY
+
+SCHEMA = "genie_explain"
+TABLES = ["statuses", "meetings", "personaldata", "stats", "ownerships", "profiles", "persons"]
+
+# Row generators; %(rows)s is the target row count. Value distributions mimic production (many users, few topics).
+GENERATORS = {
+    "statuses": """
+        INSERT INTO statuses (ctx_id, object_id, object_type, user_id, tenant_id, event_topic, previous_event_topic, current_event_start_time, status)
+        SELECT 'ctx' || (g %% 50000), 'obj' || g, 'PERSON', 'user' || (g %% 500), 'tenant' || (g %% 500),
+               'topic' || (g %% 40), 'topic' || ((g + 1) %% 40), now() - (g || ' seconds')::interval, 'COMPLETED'
+        FROM generate_series(1, %(rows)s) g;
+    """,
+    "meetings": """
+        INSERT INTO meetings (uuid, google_calendar_id, user_id, tenant_id, participants_emails, participants_hash, link, subject, location,
+                              start_time, end_time, start_time_tz, end_time_tz, classification)
+        SELECT 'meeting' || g, 'gcal' || g, 'user' || (g %% 500), 'tenant' || (g %% 500),
+               jsonb_build_array(jsonb_build_object('email', 'host' || (g %% 500) || '@genie.ai', 'self', true),
+                                 jsonb_build_object('email', 'guest' || (g %% 20000) || '@example.com')),
+               md5(g::text), 'https://meet/' || g, 'Meeting ' || g, '',
+               to_char(now() + ((g %% 2000) - 1000 || ' hours')::interval, 'YYYY-MM-DD"T"HH24:MI:SS'),
+               to_char(now() + ((g %% 2000) - 999 || ' hours')::interval, 'YYYY-MM-DD"T"HH24:MI:SS'),
+               now() + ((g %% 2000) - 1000 || ' hours')::interval, now() + ((g %% 2000) - 999 || ' hours')::interval,
+               CASE WHEN g %% 3 = 0 THEN 'internal' ELSE 'external' END
+        FROM generate_series(1, %(rows)s) g;
+    """,
+    "personaldata": """
+        INSERT INTO personaldata (uuid, name, email, pdl_personal_data, apollo_personal_data)
+        SELECT 'person' || g, 'Person ' || g, 'guest' || g || '@example.com', '{"profiles": []}'::jsonb, '{}'::jsonb
+        FROM generate_series(1, %(rows)s) g;
+    """,
+    "stats": """
+        INSERT INTO stats (uuid, action, entity, entity_id, timestamp, email, tenant_id, user_id)
+        SELECT 'stat' || g, CASE WHEN g %% 2 = 0 THEN 'VIEW' ELSE 'DOWNLOAD' END, 'PROFILE', 'person' || (g %% 20000),
+               now() - (g || ' minutes')::interval, 'host' || (g %% 500) || '@genie.ai', 'tenant' || (g %% 500), 'user' || (g %% 500)
+        FROM generate_series(1, %(rows)s) g;
+    """,
+    "ownerships": """
+        INSERT INTO ownerships (person_uuid, user_id, tenant_id)
+        SELECT 'person' || (g %% 20000), 'user' || (g %% 500), 'tenant' || (g %% 500)
+        FROM generate_series(1, %(rows)s) g;
+    """,
+    "profiles": """
+        INSERT INTO profiles (uuid, name, company, position, strengths, hobbies, connections, get_to_know, picture_url)
+        SELECT 'person' || g, 'Person ' || g, 'Company', 'Position', '[]'::jsonb, '[]'::jsonb, '[]'::jsonb, '{}'::jsonb, 'https://picture/' || g
+        FROM generate_series(1, %(rows)s) g;
+    """,
+    "persons": """
+        INSERT INTO persons (uuid, name, email)
+        SELECT 'person' || g, 'Person ' || g, 'guest' || g || '@example.com'
+        FROM generate_series(1, %(rows)s) g;
+    """,
+}
+
+HOT_QUERIES = [
+    ("StatusesRepository.update_status",
+     "UPDATE statuses SET status = 'COMPLETED' WHERE ctx_id = %s AND object_id = %s AND user_id = %s AND event_topic = %s;",
+     ("ctx7", "obj7", "user7", "topic7")),
+    ("MeetingsRepository.get_meeting_data", SELECT_MEETING_DATA_QUERY, ("meeting42", "deleted")),
+    ("MeetingsRepository.get_all_meetings_by_user_id",
+     "SELECT uuid FROM meetings WHERE user_id = %s AND classification != %s;", ("user42", "deleted")),
+    ("MeetingsRepository.get_all_future_meetings_for_user",
+     "SELECT uuid FROM meetings WHERE user_id = %s AND start_time_tz > now() AND classification != %s;", ("user42", "deleted")),
+    ("MeetingsRepository.get_meetings_without_goals_by_email",
+     "SELECT uuid FROM meetings WHERE participants_emails @> %s::jsonb AND classification = %s;",
+     (json.dumps([{"email": "guest42@example.com"}]), "external")),
+    ("MeetingsRepository.get_meetings_by_participants_emails",
+     "SELECT uuid FROM meetings WHERE participants_emails ?| array[%s] AND classification != 'deleted';", ("guest42@example.com",)),
+    ("PersonalDataRepository.get_pdl_personal_data_by_email",
+     "SELECT pdl_personal_data FROM personalData WHERE email = %s;", ("guest42@example.com",)),
+    ("PersonalDataRepository.get_social_media_links",
+     "SELECT pdl_personal_data -> 'profiles', apollo_personal_data FROM personalData WHERE uuid = %s;", ("person42",)),
+    ("StatsRepository.should_log_stats",
+     "SELECT 1 FROM stats WHERE email = %s AND action = %s AND entity = %s AND entity_id = %s AND timestamp >= now() - interval '1 hour';",
+     ("host42@genie.ai", "VIEW", "PROFILE", "person42")),
+    ("OwnershipsRepository.check_ownership", CHECK_OWNERSHIP_QUERY, ("person42", "user42")),
+    ("OwnershipsRepository.get_users_for_person",
+     "SELECT user_id, tenant_id FROM ownerships WHERE person_uuid = %s;", ("person42",)),
+    ("ProfilesRepository.get_profile_data", SELECT_PROFILE_DATA_QUERY, ("person42",)),
+]
+
+
+def find_seq_scans(plan: dict, found: list):
+    if plan.get("Node Type") == "Seq Scan":
+        found.append({"relation": plan.get("Relation Name"), "rows": plan.get("Actual Rows"), "filter": plan.get("Filter")})
+    for child in plan.get("Plans", []):
+        find_seq_scans(child, found)
+
+
+def build_dataset(cursor, rows: int):
+    cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA};")
+    for table in TABLES:
+        # Defaults are excluded so the SERIAL ids don't advance the production sequences
+        cursor.execute(f"CREATE TABLE {SCHEMA}.{table} (LIKE public.{table} INCLUDING ALL EXCLUDING DEFAULTS);")
+        cursor.execute(f"ALTER TABLE {SCHEMA}.{table} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;")
+    cursor.execute(f"SET search_path TO {SCHEMA};")
+    for table in TABLES:
+        cursor.execute(GENERATORS[table], {"rows": rows})
+        cursor.execute(f"ANALYZE {table};")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--keep", action="store_true", help="Keep the generated schema")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(
+        user=postgres_connector.db_user,
+        password=postgres_connector.password,
+        host=postgres_connector.host,
+        port=postgres_connector.port,
+        database=postgres_connector.database,
+    )
+    conn.autocommit = True
+    seq_scan_count = 0
+    try:
+        with conn.cursor() as cursor:
+            print(f"Generating {args.rows} rows per table in schema {SCHEMA}...")
+            build_dataset(cursor, args.rows)
+            for name, query, params in HOT_QUERIES:
+                # Run UPDATEs inside a rolled back transaction so the dataset stays stable between queries
+                cursor.execute("BEGIN;")
+                cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, params)
+                explain = cursor.fetchone()[0][0]
+                cursor.execute("ROLLBACK;")
+                seq_scans = []
+                find_seq_scans(explain["Plan"], seq_scans)
+                seq_scan_count += len(seq_scans)
+                status = "SEQ SCAN" if seq_scans else "ok"
+                print(f"{status:<9}{name:<58}{explain['Execution Time']:>10.2f} ms  shared hit/read "
+                      f"{explain['Plan'].get('Shared Hit Blocks', 0)}/{explain['Plan'].get('Shared Read Blocks', 0)}")
+                for scan in seq_scans:
+                    print(f"         -> Seq Scan on {scan['relation']} (rows={scan['rows']}, filter={scan['filter']})")
+    finally:
+        if not args.keep:
+            with conn.cursor() as cursor:
+                cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+        conn.close()
+    print(f"{seq_scan_count} sequential scan(s) found")
+    raise SystemExit(1 if seq_scan_count else 0)
+
+
+if __name__ == "__main__":
+    main()
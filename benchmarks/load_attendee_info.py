@@ -0,0 +1,110 @@
+"""
+Load test for GET /v1/{user_id}/profiles/{uuid}/attendee-info: p50/p95/p99 latency under concurrent requests.
+
+"before" mounts the previous implementation (a sync endpoint running the psycopg2 repositories in
+FastAPI's threadpool); "after" is the real endpoint backed by the async repositories. While the load runs,
+a heartbeat coroutine measures event loop lag, which is what blocking DB calls inflate.
+
+Requires the regular DB_* environment and a profile owned by the given user. Usage:
+    python -m benchmarks.load_attendee_info --user-id <user_id> --uuid <profile_uuid> [--concurrency 50] [--requests 2000]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from data.api.api_services_classes.profiles_api_services import ProfilesApiService
+from data.api.base_models import AttendeeInfo
+from data.data_common.dependencies.dependencies import ownerships_repository, profiles_repository, personal_data_repository
+from data.data_common.utils.async_postgres_connector import close_async_pool
+from start_api import app as after_app
+
+before_app = FastAPI()
+
+
+@before_app.get("/v1/{user_id}/profiles/{uuid}/attendee-info", response_model=AttendeeInfo)
+def legacy_attendee_info(user_id: str, uuid: str) -> AttendeeInfo:
+    if not ownerships_repository().check_ownership(user_id, uuid):
+        raise ValueError("Profile not found under this user")
+    profile = profiles_repository().get_profile_data(uuid)
+    links = personal_data_repository().get_social_media_links(uuid)
+    return ProfilesApiService.build_attendee_info(profile, links)
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def heartbeat(stop: asyncio.Event, lags: list[float], interval: float = 0.01):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def run_load(app: FastAPI, url: str, concurrency: int, total: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(url)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+
+        lags: list[float] = []
+        stop = asyncio.Event()
+        beat = asyncio.create_task(heartbeat(stop, lags))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await beat
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": statistics.fmean(latencies),
+        "max_loop_lag_ms": max(lags) if lags else 0.0,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--uuid", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    url = f"/v1/{args.user_id}/profiles/{args.uuid}/attendee-info"
+    print(f"{'mode':<8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'loop lag ms':>14}{'errors':>8}")
+    for mode, app in (("before", before_app), ("after", after_app)):
+        result = await run_load(app, url, args.concurrency, args.requests)
+        print(
+            f"{mode:<8}{result['rps']:>10.1f}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+            f"{result['p99_ms']:>10.1f}{result['max_loop_lag_ms']:>14.1f}{result['errors']:>8}"
+        )
+    await close_async_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,10 +1,29 @@
 import json
 
+import orjson
 
-def extract_object_id(data) -> (str, str):
-    data = json.loads(data)
+
+def _loads(data):
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # NaN / Infinity, which json.dumps writes and orjson rejects
+        return json.loads(data)
+
+
+def decode_event_body(data):
+    """Event bodies are JSON encoded twice (a JSON string holding the JSON payload); plain JSON is accepted too."""
+    data = _loads(data)
     if isinstance(data, str):
-        data = json.loads(data)
+        data = _loads(data)
+    return data
+
+
+def extract_object_id(data) -> (str, str):
+    return object_id_from_payload(decode_event_body(data))
+
+
+def object_id_from_payload(data: dict) -> (str, str):
     if data.get("object_id"):
         return data.get("object_id"), "UNKNOWN"
     if data.get("person_uuid"):
@@ -407,7 +407,7 @@ def get_all_profiles_and_persons_for_meeting(
 
 
 @v1_router.get("/{user_id}/profiles/{uuid}/attendee-info", response_model=AttendeeInfo)
-def get_profile_attendee_info(
+async def get_profile_attendee_info(
     request: Request,
     uuid: str,
     user_id: str,
@@ -432,7 +432,7 @@ def get_profile_attendee_info(
     logger.info(f"Received attendee-info request for profile: {uuid}")
     allowed_impersonate_user_id = get_user_id_to_impersonate(impersonate_user_id, request)
     user_id = allowed_impersonate_user_id if allowed_impersonate_user_id else user_id
-    response = profiles_api_service.get_profile_attendee_info(user_id, uuid)
+    response = await profiles_api_service.get_profile_attendee_info(user_id, uuid)
     logger.info(f"About to send response: {response}")
     return response
 
@@ -1059,6 +1059,108 @@ def fetch_all_users(
         raise HTTPException(status_code=403, detail="Forbidden endpoint")
 
 
+@v1_router.get("/admin/failed-events", response_class=JSONResponse, include_in_schema=False)
+def get_failed_events(
+    request: Request, consumer_group: Optional[str] = None, topic: Optional[str] = None, limit: int = 100
+) -> JSONResponse:
+    """
+    Counts of retrying and dead-lettered events per consumer group, and the latest dead letters.
+    """
+    if (
+        request.state
+        and hasattr(request.state, "user_email")
+        and email_utils.is_genie_admin(request.state.user_email)
+    ):
+        response = admin_api_service.get_failed_events(consumer_group, topic, limit)
+        return JSONResponse(content=response)
+    else:
+        raise HTTPException(status_code=403, detail="Forbidden endpoint")
+
+
+@v1_router.get("/admin/dead-letters/{dead_letter_id}", response_class=JSONResponse, include_in_schema=False)
+def get_dead_letter(request: Request, dead_letter_id: int) -> JSONResponse:
+    """
+    A dead-lettered event with its payload, properties and last error.
+    """
+    if (
+        request.state
+        and hasattr(request.state, "user_email")
+        and email_utils.is_genie_admin(request.state.user_email)
+    ):
+        response = admin_api_service.get_dead_letter(dead_letter_id)
+        return JSONResponse(content=response)
+    else:
+        raise HTTPException(status_code=403, detail="Forbidden endpoint")
+
+
+@v1_router.post("/admin/dead-letters/replay", response_class=JSONResponse, include_in_schema=False)
+async def replay_dead_letters(request: Request) -> JSONResponse:
+    """
+    Retries dead letters now, with their attempts reset. The body selects them: {"ids": [...]}, "consumer_group"
+    and/or "topic".
+    """
+    if (
+        request.state
+        and hasattr(request.state, "user_email")
+        and email_utils.is_genie_admin(request.state.user_email)
+    ):
+        body = await request.json()
+        response = admin_api_service.replay_dead_letters(body.get("ids"), body.get("consumer_group"), body.get("topic"))
+        return JSONResponse(content=response)
+    else:
+        raise HTTPException(status_code=403, detail="Forbidden endpoint")
+
+
+@v1_router.post("/admin/dead-letters/purge", response_class=JSONResponse, include_in_schema=False)
+async def purge_dead_letters(request: Request) -> JSONResponse:
+    """
+    Deletes dead letters. The body selects them: {"ids": [...]}, "consumer_group" and/or "topic".
+    """
+    if (
+        request.state
+        and hasattr(request.state, "user_email")
+        and email_utils.is_genie_admin(request.state.user_email)
+    ):
+        body = await request.json()
+        response = admin_api_service.purge_dead_letters(body.get("ids"), body.get("consumer_group"), body.get("topic"))
+        return JSONResponse(content=response)
+    else:
+        raise HTTPException(status_code=403, detail="Forbidden endpoint")
+
+
+@v1_router.get("/admin/llm-cache", response_class=JSONResponse, include_in_schema=False)
+def get_llm_cache(request: Request) -> JSONResponse:
+    """
+    Cached LLM responses per prompt, and the hit rates of the response cache of this process.
+    """
+    if (
+        request.state
+        and hasattr(request.state, "user_email")
+        and email_utils.is_genie_admin(request.state.user_email)
+    ):
+        response = admin_api_service.get_llm_cache()
+        return JSONResponse(content=response)
+    else:
+        raise HTTPException(status_code=403, detail="Forbidden endpoint")
+
+
+@v1_router.post("/admin/llm-cache/purge", response_class=JSONResponse, include_in_schema=False)
+async def purge_llm_cache(request: Request) -> JSONResponse:
+    """
+    Deletes cached LLM responses, those of {"prompt_name": ...} or all of them.
+    """
+    if (
+        request.state
+        and hasattr(request.state, "user_email")
+        and email_utils.is_genie_admin(request.state.user_email)
+    ):
+        body = await request.json()
+        response = admin_api_service.purge_llm_cache(body.get("prompt_name"))
+        return JSONResponse(content=response)
+    else:
+        raise HTTPException(status_code=403, detail="Forbidden endpoint")
+
+
 def get_tenant_id_to_impersonate(
     impersonate_tenant_id: str,
     request: Request,
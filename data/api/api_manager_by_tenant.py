@@ -402,7 +402,7 @@ def get_all_profiles_and_persons_for_meeting(
 
 
 @v1_router.get("/{tenant_id}/profiles/{uuid}/attendee-info", response_model=AttendeeInfo)
-def get_profile_attendee_info(
+async def get_profile_attendee_info(
     request: Request,
     uuid: str,
     tenant_id: str,
@@ -427,7 +427,7 @@ def get_profile_attendee_info(
     logger.info(f"Received attendee-info request for profile: {uuid}")
     allowed_impersonate_tenant_id = get_tenant_id_to_impersonate(impersonate_tenant_id, request)
     tenant_id = allowed_impersonate_tenant_id if allowed_impersonate_tenant_id else tenant_id
-    response = profiles_api_service.get_profile_attendee_info(tenant_id, uuid)
+    response = await profiles_api_service.get_profile_attendee_info(tenant_id, uuid)
     logger.info(f"About to send response: {response}")
     return response
 
@@ -15,6 +15,9 @@ from data.data_common.data_transfer_objects.company_dto import CompanyDTO
 from data.data_common.data_transfer_objects.user_dto import UserDTO
 from data.data_common.repositories.user_profiles_repository import UserProfilesRepository
 from data.data_common.repositories.users_repository import UsersRepository
+from data.data_common.repositories.failed_events_repository import FailedEventsRepository
+from data.data_common.repositories.llm_responses_repository import LlmResponsesRepository
+from data.data_common.events.retry import failed_event_envelope
 from data.internal_scripts.fetch_social_media_news import (
     fetch_linkedin_posts,
     get_all_uuids_that_should_try_posts,
@@ -56,6 +59,8 @@ class AdminApiService:
         self.user_profiles_repository = UserProfilesRepository()
         self.user_profiles_repository = UserProfilesRepository()
         self.personal_data_repository = personal_data_repository()
+        self.failed_events_repository = FailedEventsRepository()
+        self.llm_responses_repository = LlmResponsesRepository()
         # self.embeddings_client = GenieEmbeddingsClient()
         self.langsmith = Langsmith()
 
@@ -461,4 +466,60 @@ class AdminApiService:
         result = self.user_profiles_repository.update_sales_action_item_description(user_id, uuid, criteria, description)
         return {"status": "success"} if result else {"error": str(result)}
 
-
+    def get_failed_events(self, consumer_group=None, topic=None, limit=100):
+        counts = self.failed_events_repository.count_by_consumer_group()
+        dead_letters = self.failed_events_repository.get_dead_letters(consumer_group, topic, limit=limit)
+        return {"consumer_groups": counts, "dead_letters": [self._dead_letter_to_dict(row) for row in dead_letters]}
+
+    def get_dead_letter(self, dead_letter_id: int):
+        dead_letters = self.failed_events_repository.get_dead_letters(ids=[dead_letter_id], limit=1)
+        if not dead_letters:
+            raise HTTPException(status_code=404, detail="Dead letter not found")
+        return self._dead_letter_to_dict(dead_letters[0], with_event=True)
+
+    def replay_dead_letters(self, ids=None, consumer_group=None, topic=None):
+        if not ids and not consumer_group and not topic:
+            raise HTTPException(status_code=400, detail="Dead letter ids, consumer_group or topic required")
+        replayed = self.failed_events_repository.replay_dead_letters(ids, consumer_group, topic)
+        logger.info(f"Replaying {replayed} dead letters [ids={ids}, consumer_group={consumer_group}, topic={topic}]")
+        return {"status": "success", "replayed": replayed}
+
+    def purge_dead_letters(self, ids=None, consumer_group=None, topic=None):
+        if not ids and not consumer_group and not topic:
+            raise HTTPException(status_code=400, detail="Dead letter ids, consumer_group or topic required")
+        purged = self.failed_events_repository.purge_dead_letters(ids, consumer_group, topic)
+        logger.info(f"Purged {purged} dead letters [ids={ids}, consumer_group={consumer_group}, topic={topic}]")
+        return {"status": "success", "purged": purged}
+
+    def get_llm_cache(self):
+        # Hit rates are those of this process; each consumer logs its own (see response_cache)
+        cache = self.langsmith.responses
+        return {
+            "cached_responses": self.llm_responses_repository.count_by_prompt(),
+            "hit_rates": cache.hit_rates(),
+            "prompts": cache.prompt_stats,
+            "stats": cache.stats,
+        }
+
+    def purge_llm_cache(self, prompt_name=None):
+        purged = self.llm_responses_repository.delete_by_prompt(prompt_name)
+        self.langsmith.responses.forget()
+        logger.info(f"Purged {purged} cached LLM responses of {prompt_name or 'all prompts'}")
+        return {"status": "success", "purged": purged}
+
+    def _dead_letter_to_dict(self, row: dict, with_event: bool = False):
+        dead_letter = {
+            key: value.isoformat() if hasattr(value, "isoformat") else value
+            for key, value in row.items()
+            if key not in ("body", "properties")
+        }
+        envelope = failed_event_envelope(row)
+        dead_letter["object_id"] = None
+        try:
+            dead_letter["object_id"] = envelope.object_id
+            if with_event:
+                dead_letter["properties"] = row.get("properties")
+                dead_letter["event"] = envelope.payload
+        except ValueError as e:
+            dead_letter["event"] = f"Undecodable event: {e}"
+        return dead_letter
@@ -113,16 +113,21 @@ class MeetingsApiService:
         mini_meeting = MiniMeeting.from_meeting_dto(meeting)
         logger.info(f"Mini meeting: {mini_meeting}")
         participants_emails = meeting.participants_emails
-        participants = []
+        emails = []
         for email_object in participants_emails:
             email = email_object.get("email")
             if not email:
                 logger.warning(f"Email not found in: {email_object}")
                 continue
-            person = self.persons_repository.find_person_by_email(email)
+            emails.append(email)
+        persons = self.persons_repository.find_persons_by_emails(emails)
+        pictures = self.profiles_repository.get_pictures_by_uuids([person.uuid for person in persons.values()])
+        participants = []
+        for email in emails:
+            person = persons.get(email)
             logger.info(f"Person: {person}")
             if person:
-                profile_picture = self.profiles_repository.get_profile_picture(person.uuid)
+                profile_picture = pictures.get(person.uuid)
                 mini_person = InternalMiniPersonResponse.from_person_dto(person, profile_picture)
                 participants.append(mini_person)
             else:
@@ -167,8 +172,9 @@ class MeetingsApiService:
     def handle_company_overview(self, domain_emails):
         companies = []
 
+        companies_by_domain = self.companies_repository.get_companies_by_domains(domain_emails)
         for domain in domain_emails:
-            company = self.companies_repository.get_company_from_domain(domain)
+            company = companies_by_domain.get(domain)
             logger.info(f"Company: {str(company)[:300]}")
             if company:
                 if not company.name or company.name == "None":
@@ -231,8 +237,12 @@ class MeetingsApiService:
         mini_profiles = []
         mini_persons = []
 
+        profiles = self.profiles_repository.get_profiles_by_emails(filtered_participants_emails)
+        persons = self.persons_repository.find_persons_by_emails(
+            [participant for participant in filtered_participants_emails if participant not in profiles]
+        )
         for participant in filtered_participants_emails:
-            profile = self.profiles_repository.get_profile_data_by_email(participant)
+            profile = profiles.get(participant)
             if profile:
                 person = PersonDTO.from_dict({"email": participant})
                 person.uuid = profile.uuid
@@ -242,7 +252,7 @@ class MeetingsApiService:
                 if profile_response:
                     mini_profiles.append(profile_response)
             else:
-                person = self.persons_repository.find_person_by_email(participant)
+                person = persons.get(participant)
                 logger.info(f"Person: {person}")
                 if person:
                     person_response = MiniPersonResponse.from_person_dto(person)
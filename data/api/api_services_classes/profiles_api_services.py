@@ -12,7 +12,10 @@ from data.data_common.dependencies.dependencies import (
     companies_repository,
     hobbies_repository,
     artifacts_repository,
-    artifact_scores_repository
+    artifact_scores_repository,
+    async_profiles_repository,
+    async_ownerships_repository,
+    async_personal_data_repository,
 )
 from data.data_common.repositories.users_repository import UsersRepository
 from data.data_common.repositories.user_profiles_repository import UserProfilesRepository
@@ -38,6 +41,9 @@ class ProfilesApiService:
         self.artifacts_repository = artifacts_repository()
         self.artifact_scores_repository = artifact_scores_repository()
         self.artifacts_service = ArtifactsService()
+        self.async_profiles_repository = async_profiles_repository()
+        self.async_ownerships_repository = async_ownerships_repository()
+        self.async_personal_data_repository = async_personal_data_repository()
 
     def get_profiles_and_persons_for_meeting(self, user_id, meeting_id):
         meeting = self.meetings_repository.get_meeting_data(meeting_id)
@@ -66,8 +72,12 @@ class ProfilesApiService:
         mini_profiles = []
         mini_persons = []
 
+        profiles = self.profiles_repository.get_profiles_by_emails(filtered_participants_emails)
+        persons = self.persons_repository.find_persons_by_emails(
+            [participant for participant in filtered_participants_emails if participant not in profiles]
+        )
         for participant in filtered_participants_emails:
-            profile = self.profiles_repository.get_profile_data_by_email(participant)
+            profile = profiles.get(participant)
             if profile:
                 person = PersonDTO.from_dict({"email": participant})
                 person.uuid = profile.uuid
@@ -77,7 +87,7 @@ class ProfilesApiService:
                 if profile_response:
                     mini_profiles.append(profile_response)
             else:
-                person = self.persons_repository.find_person_by_email(participant)
+                person = persons.get(participant)
                 logger.info(f"Person: {person}")
                 if person:
                     person_response = MiniPersonResponse.from_person_dto(person)
@@ -112,16 +122,21 @@ class ProfilesApiService:
 
         return profile
 
-    def get_profile_attendee_info(self, user_id, uuid):
-        if not self.ownerships_repository.check_ownership(user_id, uuid):
+    async def get_profile_attendee_info(self, user_id, uuid):
+        if not await self.async_ownerships_repository.check_ownership(user_id, uuid):
             logger.error(f"Profile not found under user_id: {user_id} for uuid: {uuid}")
             raise HTTPException(status_code=404, detail="Profile not found under this tenant")
 
-        profile = self.profiles_repository.get_profile_data(uuid)
+        profile = await self.async_profiles_repository.get_profile_data(uuid)
         if not profile:
             logger.error(f"Profile not found with uuid: {uuid}")
             raise HTTPException(status_code=404, detail="Could not find profile")
 
+        links = await self.async_personal_data_repository.get_social_media_links(uuid)
+        return self.build_attendee_info(profile, links)
+
+    @staticmethod
+    def build_attendee_info(profile, links) -> AttendeeInfo:
         # This will Upper Camel Case and Titleize the values in the profile
         profile = ProfileDTO.from_dict(profile.to_dict())
 
@@ -129,7 +144,6 @@ class ProfilesApiService:
         name = titleize_name(profile.name)
         company = profile.company
         position = profile.position
-        links = self.personal_data_repository.get_social_media_links(uuid)
         logger.info(f"Got links: {links}, type: {type(links)}")
         profile = {
             "picture": picture,
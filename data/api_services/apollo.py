@@ -2,6 +2,7 @@ import requests
 from dotenv import load_dotenv
 from common.genie_logger import GenieLogger
 from data.data_common.data_transfer_objects.person_dto import PersonDTO
+from data.data_common.events.retry import defer_inline_retry
 import os
 import time
 
@@ -36,6 +37,7 @@ class ApolloClient:
         """
         if response.status_code == 429:
             retry_after = int(response.headers.get("Retry-After", 1))  # Fallback to 1 second if not present
+            defer_inline_retry(retry_after, "Apollo rate limit", delay_seconds=retry_after, blocking=True)
             logger.warning(f"Rate limited. Retrying after {retry_after} seconds...")
             time.sleep(retry_after)
             return True
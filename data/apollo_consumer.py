@@ -45,7 +45,7 @@ class ApolloConsumer(GenieConsumer):
 
     async def process_event(self, event):
         logger.info(f"Person processing event: {str(event)[:300]}")
-        topic = event.properties.get(b"topic").decode("utf-8")
+        topic = event.topic
         logger.info(f"Processing event on topic {topic}")
         match topic:
             case Topic.APOLLO_NEW_EMAIL_ADDRESS_TO_ENRICH:
@@ -58,10 +58,7 @@ class ApolloConsumer(GenieConsumer):
                 logger.error(f"Should not have reached here: {topic}, consumer_group: {CONSUMER_GROUP}")
 
     async def handle_new_person_to_enrich(self, event):
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         person = event_body.get("person")
         logger.info(f"Person: {person}")
         if not person:
@@ -104,10 +101,7 @@ class ApolloConsumer(GenieConsumer):
         # The method return success status
 
     async def handle_new_email_address_to_enrich(self, event):
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         email = event_body.get("email")
         person = self.persons_repository.get_person_by_email(email)
         if not person:
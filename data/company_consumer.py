@@ -1,6 +1,5 @@
 import asyncio
 
-import json
 import os
 import sys
 import traceback
@@ -49,7 +48,7 @@ class CompanyConsumer(GenieConsumer):
 
     async def process_event(self, event):
         logger.info(f"Company consumer processing event: {str(event)[:300]}")
-        topic = event.properties.get(b"topic").decode("utf-8")
+        topic = event.topic
         logger.info(f"Company consumer - Processing event on topic {topic}")
         match topic:
             case Topic.NEW_COMPANY_DATA:
@@ -62,10 +61,7 @@ class CompanyConsumer(GenieConsumer):
                 logger.info(f"Unknown topic: {topic}")
 
     async def handle_fetch_company_news(self, event):
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         company_uuid = event_body.get("company_uuid")
         if not company_uuid:
             logger.error(f"Company uuid not found in event: {event_body}")
@@ -96,10 +92,7 @@ class CompanyConsumer(GenieConsumer):
         return {"status": "success"}
 
     async def handle_company_from_domain(self, event):
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         email_address = event_body.get("email")
         # tenant_id = event_body.get("tenant_id")
         if not email_address:
@@ -121,7 +114,7 @@ class CompanyConsumer(GenieConsumer):
         #     self.deals_repository.insert_deal(tenant_id, company.uuid)
 
         if not company.overview or not company.challenges:
-            response = self.langsmith.run_prompt_company_overview_challenges(
+            response = await self.langsmith.run_prompt_company_overview_challenges(
                 {"company_data": company.to_dict()}
             )
             logger.info(f"Response: {response}")
@@ -278,6 +278,24 @@ class MeetingDTO:
             logger.error(f"Invalid start_time format: {start_time_str} - {e}")
             return None
 
+    @staticmethod
+    def parse_time(time_str: Optional[str]) -> Optional[datetime]:
+        """
+        Parse a meeting start/end time string into an aware UTC datetime for the start_time_tz / end_time_tz columns.
+        Accepts ISO date-times with an offset ("2024-08-21T15:00:00+03:00") and all-day dates ("2024-08-21"),
+        which are taken as midnight UTC.
+        """
+        if not time_str:
+            return None
+        try:
+            parsed = datetime.fromisoformat(time_str)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Invalid meeting time format: {time_str} - {e}")
+            return None
+        if parsed.tzinfo is None:
+            return parsed.replace(tzinfo=timezone.utc)
+        return parsed.astimezone(timezone.utc)
+
 
 def evaluate_meeting_classification(participants_emails: List[dict]) -> MeetingClassification:
     if len(participants_emails) > 14:
@@ -1,12 +1,12 @@
 from ..utils.postgres_connector import get_db_connection, connection_pool
-from ..repositories.personal_data_repository import PersonalDataRepository
+from ..repositories.personal_data_repository import PersonalDataRepository, AsyncPersonalDataRepository
 from ..repositories.persons_repository import PersonsRepository
-from ..repositories.profiles_repository import ProfilesRepository
+from ..repositories.profiles_repository import ProfilesRepository, AsyncProfilesRepository
 from ..repositories.tenant_profiles_repository import TenantProfilesRepository
 from ..repositories.tenants_repository import TenantsRepository
-from ..repositories.meetings_repository import MeetingsRepository
+from ..repositories.meetings_repository import MeetingsRepository, AsyncMeetingsRepository
 from ..repositories.google_creds_repository import GoogleCredsRepository
-from ..repositories.ownerships_repository import OwnershipsRepository
+from ..repositories.ownerships_repository import OwnershipsRepository, AsyncOwnershipsRepository
 from ..repositories.hobbies_repository import HobbiesRepository
 from ..repositories.companies_repository import CompaniesRepository
 from ..repositories.stats_repository import StatsRepository
@@ -38,6 +38,11 @@ st_repository = StatusesRepository()
 a_repository = ArtifactsRepository()
 as_repository = ArtifactScoresRepository()
 
+async_pd_repository = AsyncPersonalDataRepository()
+async_pr_repository = AsyncProfilesRepository()
+async_m_repository = AsyncMeetingsRepository()
+async_o_repository = AsyncOwnershipsRepository()
+
 
 def artifacts_repository() -> ArtifactsRepository:
     return a_repository
@@ -102,3 +107,18 @@ def file_upload_repository() -> FileUploadRepository:
 def statuses_repository() -> StatusesRepository:
     return st_repository
 
+
+def async_personal_data_repository() -> AsyncPersonalDataRepository:
+    return async_pd_repository
+
+
+def async_profiles_repository() -> AsyncProfilesRepository:
+    return async_pr_repository
+
+
+def async_meetings_repository() -> AsyncMeetingsRepository:
+    return async_m_repository
+
+
+def async_ownerships_repository() -> AsyncOwnershipsRepository:
+    return async_o_repository
@@ -0,0 +1,135 @@
+import asyncio
+import re
+import time
+from typing import Awaitable, Callable, Optional
+
+from common.genie_logger import GenieLogger
+from common.utils import env_utils
+
+logger = GenieLogger()
+
+CHECKPOINT_EVERY_EVENTS = int(env_utils.get("CHECKPOINT_EVERY_EVENTS", "50"))
+CHECKPOINT_EVERY_SECONDS = float(env_utils.get("CHECKPOINT_EVERY_SECONDS", "10"))
+
+
+class CheckpointPolicy:
+    """
+    When a partition's checkpoint is written: once `every_events` events were processed since the last write or
+    `every_seconds` passed with processed events pending, whichever comes first. After a crash, up to that many
+    events are delivered again.
+    """
+
+    def __init__(self, every_events: int = CHECKPOINT_EVERY_EVENTS, every_seconds: float = CHECKPOINT_EVERY_SECONDS):
+        self.every_events = max(1, every_events)
+        self.every_seconds = max(0.0, every_seconds)
+
+    @classmethod
+    def for_consumer_group(cls, consumer_group: str) -> "CheckpointPolicy":
+        """
+        CHECKPOINT_EVERY_EVENTS / CHECKPOINT_EVERY_SECONDS, overridden per consumer group by the same variables
+        suffixed with the group name, e.g. CHECKPOINT_EVERY_EVENTS_LANGSMITHCONSUMERGROUP.
+        """
+        suffix = re.sub(r"[^A-Z0-9]", "_", consumer_group.upper()).strip("_")
+        every_events = env_utils.get(f"CHECKPOINT_EVERY_EVENTS_{suffix}", "") if suffix else ""
+        every_seconds = env_utils.get(f"CHECKPOINT_EVERY_SECONDS_{suffix}", "") if suffix else ""
+        return cls(
+            every_events=int(every_events) if every_events else CHECKPOINT_EVERY_EVENTS,
+            every_seconds=float(every_seconds) if every_seconds else CHECKPOINT_EVERY_SECONDS,
+        )
+
+    def due(self, events: int, seconds: float) -> bool:
+        return events >= self.every_events or seconds >= self.every_seconds
+
+    def __repr__(self):
+        return f"CheckpointPolicy(every_events={self.every_events}, every_seconds={self.every_seconds})"
+
+
+class _PartitionState:
+    def __init__(self):
+        self.context = None
+        self.pending = None
+        self.pending_events = 0
+        self.last_sequence_number: Optional[int] = None
+        self.last_write = time.monotonic()
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.lock = asyncio.Lock()
+
+
+class Checkpointer:
+    """
+    Applies a CheckpointPolicy on top of `write(partition_context, event)` (normally
+    partition_context.update_checkpoint). advance() is called with each event that may be checkpointed; the write
+    happens when the policy says so, from a timer when a partition goes quiet, and always on flush().
+    """
+
+    def __init__(self, policy: CheckpointPolicy, write: Optional[Callable[[object, object], Awaitable]] = None):
+        self.policy = policy
+        self.write = write or (lambda partition_context, event: partition_context.update_checkpoint(event))
+        self._partitions: dict[str, _PartitionState] = {}
+        self._timer_tasks: set[asyncio.Task] = set()
+        self.stats = {"events": 0, "writes": 0, "write_failures": 0}
+
+    async def advance(self, partition_context, event):
+        state = self._partitions.setdefault(partition_context.partition_id, _PartitionState())
+        async with state.lock:
+            events = self._events_since(state, event)
+            state.context = partition_context
+            state.pending = event
+            state.pending_events += events
+            self.stats["events"] += events
+            if self.policy.due(state.pending_events, time.monotonic() - state.last_write):
+                await self._write(state)
+            elif state.timer is None:
+                delay = max(0.0, self.policy.every_seconds - (time.monotonic() - state.last_write))
+                state.timer = asyncio.get_running_loop().call_later(delay, self._on_timer, state)
+
+    @staticmethod
+    def _events_since(state: _PartitionState, event) -> int:
+        # Event hub sequence numbers count the events covered by one checkpoint, even when several finished at once
+        sequence_number = getattr(event, "sequence_number", None)
+        if sequence_number is None or state.last_sequence_number is None:
+            events = 1
+        else:
+            events = max(1, sequence_number - state.last_sequence_number)
+        if sequence_number is not None:
+            state.last_sequence_number = sequence_number
+        return events
+
+    def _on_timer(self, state: _PartitionState):
+        state.timer = None
+        task = asyncio.get_running_loop().create_task(self._write_pending(state))
+        self._timer_tasks.add(task)
+        task.add_done_callback(self._timer_tasks.discard)
+
+    async def _write_pending(self, state: _PartitionState):
+        async with state.lock:
+            await self._write(state)
+
+    async def _write(self, state: _PartitionState):
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+        if state.pending is None:
+            return
+        event, state.pending = state.pending, None
+        state.pending_events = 0
+        state.last_write = time.monotonic()
+        try:
+            await self.write(state.context, event)
+            self.stats["writes"] += 1
+        except Exception as e:
+            self.stats["write_failures"] += 1
+            logger.error(f"Failed to checkpoint [PARTITION={state.context.partition_id}]: {e}")
+
+    async def flush_partition(self, partition_context):
+        """Writes the partition's pending checkpoint, e.g. when the partition is closed or handed to another consumer."""
+        state = self._partitions.get(partition_context.partition_id)
+        if state:
+            await self._write_pending(state)
+
+    async def flush(self):
+        """Writes every pending checkpoint, on shutdown."""
+        for state in list(self._partitions.values()):
+            await self._write_pending(state)
+        if self._timer_tasks:
+            await asyncio.gather(*self._timer_tasks, return_exceptions=True)
@@ -0,0 +1,310 @@
+"""
+Coalescing of duplicate events. A calendar import emits NEW_EMAIL_ADDRESS_TO_PROCESS for every participant of every
+meeting, so one email used to be enriched, profiled and scored many times within seconds.
+
+Events of a coalesced topic are identified by payload fields (the event's user_id / tenant_id when the payload lacks
+them). Within the topic's window:
+- GenieEvent.send / send_async and EventHubBatchManager.send_batch drop an event whose key was already sent;
+- GenieConsumer skips an event whose key its consumer group already processed, e.g. when events are delivered
+  again after a restart.
+
+A consumer group processing an event holds its key as a lease of EVENT_COALESCING_LEASE_SECONDS, renewed while the
+event runs, and marks it done for the window once the event succeeded. An event that did not succeed (failed,
+cancelled, or its process died) gives its key up, released or expired with its lease, so that it is processed when
+delivered or retried again. A duplicate received while another worker holds the lease is retried after the lease.
+
+Keys are claimed in Postgres (event_keys), so processes and replicas share them, behind an in-memory front cache
+that answers repeated keys without a round-trip. Payloads with `force_refresh` are never coalesced.
+
+Settings: EVENT_COALESCING (true / false), EVENT_COALESCING_WINDOW_SECONDS, EVENT_COALESCING_LEASE_SECONDS, and
+per topic EVENT_COALESCING_KEY_<TOPIC> (comma separated payload fields, or "none") and
+EVENT_COALESCING_WINDOW_SECONDS_<TOPIC>, e.g. EVENT_COALESCING_KEY_NEW_PERSON=uuid.
+"""
+import asyncio
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+
+from common.genie_logger import GenieLogger
+from common.utils import env_utils
+from data.data_common.events.topics import Topic
+
+logger = GenieLogger()
+
+EVENT_COALESCING = env_utils.get("EVENT_COALESCING", "true").lower() == "true"
+EVENT_COALESCING_WINDOW_SECONDS = float(env_utils.get("EVENT_COALESCING_WINDOW_SECONDS", "600"))
+EVENT_COALESCING_LEASE_SECONDS = float(env_utils.get("EVENT_COALESCING_LEASE_SECONDS", "60"))
+EVENT_COALESCING_CACHE_SIZE = int(env_utils.get("EVENT_COALESCING_CACHE_SIZE", "10000"))
+EVENT_COALESCING_PURGE_EVERY = int(env_utils.get("EVENT_COALESCING_PURGE_EVERY", "500"))
+
+# Topics coalesced without configuration and the payload fields identifying the work they trigger
+COALESCED_TOPICS = {
+    Topic.NEW_EMAIL_ADDRESS_TO_PROCESS: ("user_id", "email"),
+    Topic.NEW_EMAIL_TO_PROCESS_DOMAIN: ("user_id", "email"),
+}
+
+SEND_SCOPE = "send"
+
+# What claim_receipt found for an event's key
+RECEIPT_CLAIMED = "claimed"
+RECEIPT_DONE = "done"
+RECEIPT_PROCESSING = "processing"
+
+
+class CoalescingPolicy:
+    def __init__(self, key_fields: tuple[str, ...], window_seconds: float = EVENT_COALESCING_WINDOW_SECONDS):
+        self.key_fields = tuple(key_fields)
+        self.window_seconds = max(0.0, window_seconds)
+
+    @classmethod
+    def for_topic(cls, topic: str) -> Optional["CoalescingPolicy"]:
+        """COALESCED_TOPICS and EVENT_COALESCING_WINDOW_SECONDS, overridden by the variables suffixed with the topic."""
+        suffix = re.sub(r"[^A-Z0-9]", "_", str(topic).upper()).strip("_")
+        key = env_utils.get(f"EVENT_COALESCING_KEY_{suffix}", "") if suffix else ""
+        window = env_utils.get(f"EVENT_COALESCING_WINDOW_SECONDS_{suffix}", "") if suffix else ""
+        if key:
+            fields = () if key.lower() == "none" else tuple(field.strip() for field in key.split(",") if field.strip())
+        else:
+            fields = COALESCED_TOPICS.get(topic, ())
+        if not fields:
+            return None
+        return cls(fields, float(window) if window else EVENT_COALESCING_WINDOW_SECONDS)
+
+    def key(self, scope: str, topic: str, payload, source=None) -> Optional[str]:
+        """The event's key, or None when a field is missing and the event cannot be told apart from others."""
+        if not isinstance(payload, dict) or payload.get("force_refresh"):
+            return None
+        values = []
+        for field in self.key_fields:
+            value = payload.get(field) or getattr(source, field, None)
+            if value in (None, ""):
+                return None
+            values.append(str(value).strip().lower())
+        return "|".join([scope, str(topic), *values])
+
+    def __repr__(self):
+        return f"CoalescingPolicy(key_fields={self.key_fields}, window_seconds={self.window_seconds})"
+
+
+class IdempotencyStore:
+    """
+    Claims keys in the event_keys table (EventKeysRepository) for a window, behind an LRU cache of the keys this
+    process saw, so repeated keys are answered without a round-trip. Claiming fails open: when the database is
+    unavailable every key is considered free.
+    """
+
+    def __init__(self, repository, cache_size: int = EVENT_COALESCING_CACHE_SIZE,
+                 purge_every: int = EVENT_COALESCING_PURGE_EVERY):
+        self.repository = repository
+        self.cache_size = max(1, cache_size)
+        self.purge_every = max(1, purge_every)
+        self._cache: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"claims": 0, "cache_hits": 0, "round_trips": 0, "store_failures": 0, "purged": 0}
+
+    def claim(self, keys: list[tuple[str, float]]) -> list[bool]:
+        """
+        Claims (key, window_seconds) pairs; True for those that were free. A key repeated in `keys` is claimed by
+        its first occurrence only.
+        """
+        now = time.time()
+        claimed = [False] * len(keys)
+        pending: dict[str, tuple[int, float]] = {}
+        with self._lock:
+            self.stats["claims"] += len(keys)
+            for index, (key, window) in enumerate(keys):
+                expires_at = self._cache.get(key)
+                if (expires_at is not None and expires_at > now) or key in pending:
+                    self.stats["cache_hits"] += 1
+                    continue
+                pending[key] = (index, now + window)
+        if not pending:
+            return claimed
+
+        try:
+            rows = [(key, datetime.fromtimestamp(expires_at, timezone.utc)) for key, (_, expires_at) in pending.items()]
+            free = self.repository.claim(rows)
+        except Exception as e:
+            self.stats["store_failures"] += 1
+            logger.error(f"Failed to claim {len(pending)} event keys, processing them: {e}")
+            free = set(pending)
+        self.stats["round_trips"] += 1
+
+        with self._lock:
+            for key, (index, expires_at) in pending.items():
+                claimed[index] = key in free
+                # Keys held elsewhere are cached for our window, which their claim roughly matches
+                self._cache[key] = expires_at
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        if self.stats["round_trips"] % self.purge_every == 0:
+            self._purge()
+        return claimed
+
+    def lease(self, key: str, lease_seconds: float) -> str:
+        """
+        Claims a key for an event about to be processed: RECEIPT_CLAIMED, or RECEIPT_DONE / RECEIPT_PROCESSING when
+        an earlier claim holds it. Only keys marked done are cached, so a lease is never taken for done by the cache.
+        """
+        now = time.time()
+        with self._lock:
+            self.stats["claims"] += 1
+            expires_at = self._cache.get(key)
+            if expires_at is not None and expires_at > now:
+                self.stats["cache_hits"] += 1
+                return RECEIPT_DONE
+        try:
+            state = self.repository.lease(key, datetime.fromtimestamp(now + lease_seconds, timezone.utc))
+        except Exception as e:
+            self.stats["store_failures"] += 1
+            logger.error(f"Failed to lease event key {key}, processing it: {e}")
+            state = RECEIPT_CLAIMED
+        self.stats["round_trips"] += 1
+        if self.stats["round_trips"] % self.purge_every == 0:
+            self._purge()
+        return state
+
+    def renew(self, key: str, lease_seconds: float):
+        try:
+            self.repository.renew(key, datetime.fromtimestamp(time.time() + lease_seconds, timezone.utc))
+        except Exception as e:
+            self.stats["store_failures"] += 1
+            logger.error(f"Failed to renew the lease of event key {key}: {e}")
+
+    def complete(self, key: str, window_seconds: float):
+        expires_at = time.time() + window_seconds
+        try:
+            self.repository.complete(key, datetime.fromtimestamp(expires_at, timezone.utc))
+        except Exception as e:
+            self.stats["store_failures"] += 1
+            logger.error(f"Failed to mark event key {key} done: {e}")
+            return
+        with self._lock:
+            self._cache[key] = expires_at
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def release(self, key: str):
+        with self._lock:
+            self._cache.pop(key, None)
+        try:
+            self.repository.release(key)
+        except Exception as e:
+            self.stats["store_failures"] += 1
+            logger.error(f"Failed to release event key {key}: {e}")
+
+    def _purge(self):
+        try:
+            self.stats["purged"] += self.repository.delete_expired() or 0
+        except Exception as e:
+            self.stats["store_failures"] += 1
+            logger.error(f"Failed to delete expired event keys: {e}")
+
+
+class EventCoalescer:
+    """Applies the topics' CoalescingPolicy to sent events and to events received by a consumer group."""
+
+    def __init__(self, store: IdempotencyStore, enabled: bool = EVENT_COALESCING,
+                 lease_seconds: float = EVENT_COALESCING_LEASE_SECONDS):
+        self.store = store
+        self.enabled = enabled
+        self.lease_seconds = max(1.0, lease_seconds)
+        self._policies: dict[str, Optional[CoalescingPolicy]] = {}
+        self.stats = {"sends": 0, "suppressed_sends": 0, "receipts": 0, "skipped_receipts": 0,
+                      "held_receipts": 0, "completed": 0, "released": 0}
+        self.suppressed_by_topic: Counter[str] = Counter()
+
+    def policy(self, topic: str) -> Optional[CoalescingPolicy]:
+        if not self.enabled or not topic:
+            return None
+        if topic not in self._policies:
+            self._policies[topic] = CoalescingPolicy.for_topic(topic)
+        return self._policies[topic]
+
+    def filter_sends(self, events: list) -> list:
+        """The GenieEvents to send: those of coalesced topics whose key was sent within the window are dropped."""
+        self.stats["sends"] += len(events)
+        keyed = []
+        for index, event in enumerate(events):
+            policy = self.policy(event.topic)
+            key = policy.key(SEND_SCOPE, event.topic, event.payload, event) if policy else None
+            if key:
+                keyed.append((index, key, policy.window_seconds))
+        if not keyed:
+            return events
+
+        claimed = self.store.claim([(key, window) for _, key, window in keyed])
+        suppressed = {index for (index, key, _), free in zip(keyed, claimed) if not free}
+        for index in suppressed:
+            self.suppressed_by_topic[events[index].topic] += 1
+        self.stats["suppressed_sends"] += len(suppressed)
+        if suppressed:
+            logger.info(f"Suppressed {len(suppressed)} duplicate events of {len(events)}")
+        return [event for index, event in enumerate(events) if index not in suppressed]
+
+    def receipt_key(self, consumer_group: str, envelope) -> Optional[str]:
+        """The key a consumer group claims before processing `envelope` (a GenieEnvelope), None if not coalesced."""
+        policy = self.policy(envelope.topic)
+        return policy.key(consumer_group, envelope.topic, envelope.payload, envelope) if policy else None
+
+    def claim_receipt(self, key: str, topic: str) -> str:
+        """
+        Leases the key of an event about to be processed: RECEIPT_CLAIMED, RECEIPT_DONE when it was processed
+        within the topic's window, or RECEIPT_PROCESSING while another worker holds its lease.
+        """
+        self.stats["receipts"] += 1
+        state = self.store.lease(key, self.lease_seconds)
+        if state == RECEIPT_DONE:
+            self.stats["skipped_receipts"] += 1
+            self.suppressed_by_topic[topic] += 1
+        elif state == RECEIPT_PROCESSING:
+            self.stats["held_receipts"] += 1
+        return state
+
+    def keep_leased(self, key: str) -> asyncio.Task:
+        """Renews the lease of `key` until the returned task is cancelled, once the event is done."""
+        async def renew():
+            while True:
+                await asyncio.sleep(self.lease_seconds / 3)
+                await asyncio.to_thread(self.store.renew, key, self.lease_seconds)
+
+        return asyncio.create_task(renew())
+
+    def complete(self, key: str, topic: str):
+        """Holds the key of a processed event for the topic's window."""
+        self.stats["completed"] += 1
+        self.store.complete(key, self.policy(topic).window_seconds)
+
+    def release(self, key: Optional[str]):
+        """Frees the key of an event that did not succeed, so that it is processed when delivered or retried again."""
+        if key:
+            self.stats["released"] += 1
+            self.store.release(key)
+
+
+_event_coalescer: Optional[EventCoalescer] = None
+_event_coalescer_lock = threading.Lock()
+
+
+def event_coalescer() -> EventCoalescer:
+    """The coalescer shared by the whole process, created on first use."""
+    global _event_coalescer
+    if _event_coalescer is None:
+        with _event_coalescer_lock:
+            if _event_coalescer is None:
+                # Imported here so that the module does not need the database settings, e.g. in tests
+                from data.data_common.repositories.event_keys_repository import EventKeysRepository
+
+                _event_coalescer = EventCoalescer(IdempotencyStore(EventKeysRepository()))
+    return _event_coalescer
+
+
+def set_event_coalescer(coalescer: Optional[EventCoalescer]):
+    """Replaces the shared coalescer, e.g. with one over an in-memory store in benchmarks and tests."""
+    global _event_coalescer
+    _event_coalescer = coalescer
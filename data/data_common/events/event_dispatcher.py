@@ -0,0 +1,248 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from common.genie_logger import GenieLogger
+from common.utils import env_utils
+from common.utils.event_utils import object_id_from_payload
+from data.data_common.events.genie_envelope import GenieEnvelope
+from data.data_common.events.priority import PriorityLanes
+from data.data_common.events.wire_format import decode_event
+
+logger = GenieLogger()
+
+CONSUMER_MAX_IN_FLIGHT_PER_PARTITION = int(env_utils.get("CONSUMER_MAX_IN_FLIGHT_PER_PARTITION", "1"))
+CONSUMER_MAX_IN_FLIGHT = int(env_utils.get("CONSUMER_MAX_IN_FLIGHT", "32"))
+# Off by default: buffering ahead of the running events delays checkpoints and redelivers more events on a rebalance
+CONSUMER_PRIORITY_LANES = env_utils.get("CONSUMER_PRIORITY_LANES", "false").lower() == "true"
+# Events of a partition received ahead of those running, so that urgent ones can overtake (priority lanes only)
+CONSUMER_PRIORITY_BUFFER_PER_PARTITION = int(env_utils.get("CONSUMER_PRIORITY_BUFFER_PER_PARTITION", "256"))
+
+
+def object_id_key(event) -> Optional[str]:
+    """Orders events of the same person / profile / meeting / company, see extract_object_id."""
+    try:
+        if isinstance(event, GenieEnvelope):
+            object_id = event.object_id
+        else:
+            object_id, _ = object_id_from_payload(decode_event(event))
+    except (ValueError, AttributeError):
+        return None
+    return object_id or None
+
+
+def email_key(event) -> Optional[str]:
+    try:
+        body = event.payload if isinstance(event, GenieEnvelope) else decode_event(event)
+    except ValueError:
+        return None
+    if not isinstance(body, dict):
+        return None
+    email = body.get("email")
+    for nested in ("person", "profile"):
+        if not email and isinstance(body.get(nested), dict):
+            email = body[nested].get("email")
+    return email.lower() if isinstance(email, str) and email else None
+
+
+class CompletionTracker:
+    """
+    Order-preserving completion tracking for one partition. Events finish in any order, but the checkpoint may only
+    move past an event once it and every event received before it have finished.
+    """
+
+    def __init__(self):
+        self._pending: deque[list] = deque()
+        self._next_sequence = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def start(self, event) -> list:
+        entry = [self._next_sequence, event, False]
+        self._next_sequence += 1
+        self._pending.append(entry)
+        return entry
+
+    def finish(self, entry: list) -> Optional[tuple[int, object]]:
+        """Marks the entry finished; returns (sequence, event) of the newest checkpointable event, if it advanced."""
+        entry[2] = True
+        advanced = None
+        while self._pending and self._pending[0][2]:
+            sequence, event, _ = self._pending.popleft()
+            advanced = (sequence, event)
+        return advanced
+
+
+class _Dispatched:
+    """An event from receive until it finished: its completion entry, ordering key and the key's previous event."""
+
+    __slots__ = ("partition_context", "event", "entry", "key", "previous", "task")
+
+    def __init__(self, partition_context, event, entry: list, key: Optional[str], previous: Optional["_Dispatched"]):
+        self.partition_context = partition_context
+        self.event = event
+        self.entry = entry
+        self.key = key
+        self.previous = previous
+        self.task: Optional[asyncio.Task] = None
+
+
+class PartitionDispatcher:
+    """
+    Runs events concurrently while keeping checkpoints safe.
+
+    dispatch() is awaited from the receive callback of each partition and returns as soon as the event has a slot:
+    at most `max_in_flight_per_partition` events of a partition and `max_in_flight` events overall run at once, so a
+    slow event only holds back its own partition once that partition's slots are used up. With an `ordering_key`,
+    events sharing a key run one after the other in receive order. `checkpoint(partition_context, event)` is called
+    with the newest event whose predecessors in the partition all finished.
+
+    With a `priority` (e.g. priority.event_priority), dispatch() instead returns once the event is queued, with up
+    to `buffer_per_partition` events of a partition queued or running, and queued events start in PriorityLanes
+    order within the same limits, so urgent events overtake a backlog received before them. Events sharing an
+    ordering key still start in receive order.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[object], Awaitable],
+        checkpoint: Callable[[object, object], Awaitable],
+        max_in_flight_per_partition: int = CONSUMER_MAX_IN_FLIGHT_PER_PARTITION,
+        max_in_flight: int = CONSUMER_MAX_IN_FLIGHT,
+        ordering_key: Optional[Callable[[object], Optional[str]]] = None,
+        priority: Optional[Callable[[object], int]] = None,
+        buffer_per_partition: int = CONSUMER_PRIORITY_BUFFER_PER_PARTITION,
+        lanes: Optional[PriorityLanes] = None,
+    ):
+        self.handler = handler
+        self.checkpoint = checkpoint
+        self.max_in_flight_per_partition = max(1, max_in_flight_per_partition)
+        self.max_in_flight = max(1, max_in_flight)
+        self.ordering_key = ordering_key
+        self.priority = priority
+        self.buffer_per_partition = max(self.max_in_flight_per_partition, buffer_per_partition)
+        self.lanes = (lanes or PriorityLanes()) if priority else None
+        self._global_slots: Optional[asyncio.Semaphore] = None
+        self._partition_slots: dict[str, asyncio.Semaphore] = {}
+        self._running = 0
+        self._running_per_partition: dict[str, int] = {}
+        self._trackers: dict[str, CompletionTracker] = {}
+        self._checkpoint_locks: dict[str, asyncio.Lock] = {}
+        self._checkpointed: dict[str, int] = {}
+        self._key_tails: dict[str, _Dispatched] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._draining = False
+        self.stats = {"dispatched": 0, "finished": 0, "checkpoints": 0, "checkpoint_failures": 0, "slot_wait_seconds": 0.0}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    @property
+    def queued(self) -> int:
+        return len(self.lanes) if self.lanes is not None else 0
+
+    async def dispatch(self, partition_context, event):
+        partition_id = partition_context.partition_id
+        if self._global_slots is None:
+            self._global_slots = asyncio.Semaphore(self.max_in_flight)
+        # With priority lanes the partition's slots bound the events queued or running, otherwise those running
+        limit = self.buffer_per_partition if self.lanes is not None else self.max_in_flight_per_partition
+        partition_slots = self._partition_slots.setdefault(partition_id, asyncio.Semaphore(limit))
+        started = time.perf_counter()
+        await partition_slots.acquire()
+        if self.lanes is None:
+            await self._global_slots.acquire()
+        self.stats["slot_wait_seconds"] += time.perf_counter() - started
+
+        entry = self._trackers.setdefault(partition_id, CompletionTracker()).start(event)
+        key = self.ordering_key(event) if self.ordering_key else None
+        dispatched = _Dispatched(partition_context, event, entry, key, self._key_tails.get(key) if key else None)
+        if key:
+            self._key_tails[key] = dispatched
+        if self.lanes is None:
+            self._start(dispatched)
+            return
+        self.lanes.push(self.priority(event), dispatched, group=partition_id)
+        self._start_queued()
+
+    def _partition_startable(self, partition_id: str) -> bool:
+        return self._running_per_partition.get(partition_id, 0) < self.max_in_flight_per_partition
+
+    @staticmethod
+    def _startable(dispatched: _Dispatched) -> bool:
+        # An event waits in its lane until the previous event with its key started
+        return dispatched.previous is None or dispatched.previous.task is not None
+
+    def _start_queued(self):
+        while self._running < self.max_in_flight and not self._draining:
+            dispatched = self.lanes.pop(self._startable, self._partition_startable)
+            if dispatched is None:
+                return
+            partition_id = dispatched.partition_context.partition_id
+            self._running += 1
+            self._running_per_partition[partition_id] = self._running_per_partition.get(partition_id, 0) + 1
+            self._start(dispatched)
+
+    def _start(self, dispatched: _Dispatched):
+        task = asyncio.create_task(self._run(dispatched))
+        dispatched.task = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.stats["dispatched"] += 1
+
+    async def _run(self, dispatched: _Dispatched):
+        partition_context = dispatched.partition_context
+        partition_id = partition_context.partition_id
+        previous = dispatched.previous.task if dispatched.previous else None
+        dispatched.previous = None
+        try:
+            if previous is not None and not previous.done():
+                await asyncio.wait([previous])
+            await self.handler(dispatched.event)
+        except Exception as e:
+            # Handlers report their own failures; this only keeps the partition from stalling on an unexpected one
+            logger.error(f"Unhandled exception processing event [PARTITION={partition_id}]: {e}")
+        finally:
+            if dispatched.key and self._key_tails.get(dispatched.key) is dispatched:
+                del self._key_tails[dispatched.key]
+            self._partition_slots[partition_id].release()
+            if self.lanes is None:
+                self._global_slots.release()
+            else:
+                self._running -= 1
+                self._running_per_partition[partition_id] -= 1
+                self._start_queued()
+            self.stats["finished"] += 1
+            advanced = self._trackers[partition_id].finish(dispatched.entry)
+        if advanced:
+            await self._checkpoint(partition_context, *advanced)
+
+    async def _checkpoint(self, partition_context, sequence: int, event):
+        partition_id = partition_context.partition_id
+        async with self._checkpoint_locks.setdefault(partition_id, asyncio.Lock()):
+            # A later event may have been checkpointed while this one waited for the lock
+            if sequence <= self._checkpointed.get(partition_id, -1):
+                return
+            try:
+                await self.checkpoint(partition_context, event)
+                self._checkpointed[partition_id] = sequence
+                self.stats["checkpoints"] += 1
+            except Exception as e:
+                self.stats["checkpoint_failures"] += 1
+                logger.error(f"Failed to checkpoint [PARTITION={partition_id}]: {e}")
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits for the events in flight (and their checkpoints); returns False if some were still running. Events
+        still queued in priority lanes are not started: they were not checkpointed and are received again.
+        """
+        self._draining = True
+        if not self._tasks:
+            return True
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        if pending:
+            logger.warning(f"{len(pending)} events still in flight after {timeout} seconds")
+        return not pending
@@ -0,0 +1,77 @@
+from typing import Iterable, Optional
+
+from azure.eventhub import TransportType
+from azure.eventhub.aio import EventHubConsumerClient, EventHubProducerClient
+from azure.eventhub.extensions.checkpointstoreblobaio import BlobCheckpointStore
+
+from common.genie_logger import GenieLogger
+from common.utils import env_utils
+from data.data_common.events.local_event_bus import local_event_bus
+
+logger = GenieLogger()
+
+# "eventhub" (default) or "local": every producer and consumer of the process shares one in-process LocalEventBus
+EVENT_TRANSPORT = env_utils.get("EVENT_TRANSPORT", "eventhub").lower()
+
+
+class EventHubTransport:
+    """Sends batches with one long-lived async EventHubProducerClient, connected on first use."""
+
+    def __init__(self, connection_str: Optional[str] = None, eventhub_name: Optional[str] = None):
+        self.connection_str = connection_str or env_utils.get("EVENTHUB_CONNECTION_STRING", "")
+        self.eventhub_name = eventhub_name or env_utils.get("EVENTHUB_NAME", "")
+        self.client: Optional[EventHubProducerClient] = None
+
+    def _client(self) -> EventHubProducerClient:
+        if self.client is None:
+            self.client = EventHubProducerClient.from_connection_string(
+                conn_str=self.connection_str, eventhub_name=self.eventhub_name
+            )
+        return self.client
+
+    async def create_batch(self, partition_key: Optional[str] = None):
+        return await self._client().create_batch(partition_key=partition_key)
+
+    async def send_batch(self, batch, timeout: float):
+        await self._client().send_batch(batch, timeout=timeout)
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+
+
+def create_sender(transport: str = None):
+    """
+    The sending side used by EventProducerService: create_batch(partition_key), send_batch(batch, timeout), close().
+    """
+    if (transport or EVENT_TRANSPORT) == "local":
+        return local_event_bus()
+    return EventHubTransport()
+
+
+def create_checkpoint_store(transport: str = None):
+    """The event hub checkpoint (and partition ownership) store; the local event bus has none."""
+    if (transport or EVENT_TRANSPORT) == "local":
+        return None
+    return BlobCheckpointStore.from_connection_string(
+        env_utils.get("AZURE_STORAGE_CONNECTION_STRING", ""), env_utils.get("BLOB_CONTAINER_NAME", "")
+    )
+
+
+def create_receiver(consumer_group: str, topics: Iterable[str], transport: str = None, checkpoint_store=None):
+    """
+    The receiving side of a consumer group, used as `async with receiver:` / receive(on_event=..., ...) / close().
+    The local transport only delivers the group's `topics`; the event hub delivers everything.
+    """
+    if (transport or EVENT_TRANSPORT) == "local":
+        logger.info(f"Using the local event bus for consumer group {consumer_group}")
+        return local_event_bus().receiver(consumer_group, topics)
+    checkpoint_store = checkpoint_store or create_checkpoint_store(transport)
+    return EventHubConsumerClient.from_connection_string(
+        conn_str=env_utils.get("EVENTHUB_CONNECTION_STRING", ""),
+        consumer_group=consumer_group,
+        eventhub_name=env_utils.get("EVENTHUB_NAME", ""),
+        checkpoint_store=checkpoint_store,
+        transport_type=TransportType.AmqpOverWebsocket,
+    )
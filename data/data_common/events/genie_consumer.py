@@ -1,4 +1,3 @@
-import json
 import os
 import asyncio
 import sys
@@ -6,14 +5,23 @@ import traceback
 
 import aiohttp
 import httpx
-from azure.eventhub.aio import EventHubConsumerClient
-from azure.eventhub import TransportType
-from azure.eventhub.extensions.checkpointstoreblobaio import BlobCheckpointStore
 
-from common.utils.event_utils import extract_object_id
+from ai.langsmith.response_cache import set_response_cache_bypassed
 from data.data_common.data_transfer_objects.status_dto import StatusEnum
-from data.data_common.repositories.statuses_repository import StatusesRepository
-from data.data_common.events.genie_event import GenieEvent
+from data.data_common.utils.schema_registry import bootstrap_schema
+from data.data_common.events.coalescing import RECEIPT_DONE, RECEIPT_PROCESSING, event_coalescer
+from data.data_common.events.genie_event import GenieEvent, status_sink
+from data.data_common.events.genie_envelope import GenieEnvelope
+from data.data_common.events.checkpointing import CheckpointPolicy, Checkpointer
+from data.data_common.events.event_transport import create_receiver
+from data.data_common.events.event_dispatcher import (
+    CONSUMER_MAX_IN_FLIGHT,
+    CONSUMER_MAX_IN_FLIGHT_PER_PARTITION,
+    CONSUMER_PRIORITY_LANES,
+    PartitionDispatcher,
+)
+from data.data_common.events.priority import event_priority, set_current_priority
+from data.data_common.events.retry import RetryLater, retry_scheduler, set_retries_deferred
 from data.data_common.events.topics import Topic
 from common.genie_logger import GenieLogger
 from azure.monitor.opentelemetry import configure_azure_monitor
@@ -28,31 +36,50 @@ logger = GenieLogger()
 
 from common.utils import env_utils
 
+CONSUMER_DRAIN_TIMEOUT_SECONDS = float(env_utils.get("CONSUMER_DRAIN_TIMEOUT_SECONDS", "30"))
+
 
 class GenieConsumer:
     active_clients = set()
 
-    def __init__(self, topics, consumer_group="$Default"):
+    def __init__(
+        self,
+        topics,
+        consumer_group="$Default",
+        max_in_flight_per_partition: int = CONSUMER_MAX_IN_FLIGHT_PER_PARTITION,
+        max_in_flight: int = CONSUMER_MAX_IN_FLIGHT,
+        ordering_key=None,
+        checkpoint_policy: CheckpointPolicy = None,
+        priority_lanes: bool = CONSUMER_PRIORITY_LANES,
+    ):
+        """
+        Events of a partition are processed up to `max_in_flight_per_partition` at a time (and `max_in_flight` across
+        partitions); the default of 1 processes each partition sequentially. `ordering_key` (e.g. object_id_key or
+        email_key from event_dispatcher) keeps events sharing a key in order when running concurrently.
+        Checkpoints are written as `checkpoint_policy` says, by default the consumer group's configured policy.
+        With `priority_lanes`, received events are queued per priority and urgent ones start first (see priority).
+        Failed events are retried later by the consumer group's RetryScheduler (see retry).
+        """
         self.consumer_group = consumer_group
-        connection_str = env_utils.get("EVENTHUB_CONNECTION_STRING", "")
-        eventhub_name = env_utils.get("EVENTHUB_NAME", "")
-        storage_connection_str = env_utils.get("AZURE_STORAGE_CONNECTION_STRING", "")
-        blob_container_name = env_utils.get("BLOB_CONTAINER_NAME", "")
-        checkpoint_store = BlobCheckpointStore.from_connection_string(
-            storage_connection_str, blob_container_name
-        )
-        self.consumer = EventHubConsumerClient.from_connection_string(
-            conn_str=connection_str,
-            consumer_group=consumer_group,
-            eventhub_name=eventhub_name,
-            checkpoint_store=checkpoint_store,
-            transport_type=TransportType.AmqpOverWebsocket,
-        )
+        # Event hub client, or a receiver on the local event bus with EVENT_TRANSPORT=local
+        self.consumer = create_receiver(consumer_group, topics)
         self.topics = topics
-        self.current_event = None
+        self.checkpointer = Checkpointer(checkpoint_policy or CheckpointPolicy.for_consumer_group(consumer_group))
+        self.dispatcher = PartitionDispatcher(
+            handler=self.handle_event,
+            checkpoint=self.checkpoint,
+            max_in_flight_per_partition=max_in_flight_per_partition,
+            max_in_flight=max_in_flight,
+            ordering_key=ordering_key,
+            priority=event_priority if priority_lanes else None,
+        )
+        # Buffer as many events per partition as can run or wait in the priority lanes at once
+        self.prefetch = self.dispatcher.buffer_per_partition if priority_lanes else self.dispatcher.max_in_flight_per_partition
         self._shutdown_event = asyncio.Event()
         self.is_healthy = True
-        self.statuses_repository = StatusesRepository()
+        self.status_recorder = status_sink()
+        self.coalescer = event_coalescer()
+        self.retries = retry_scheduler(consumer_group, self.handle_event)
 
         health_check_port = env_utils.get("HEALTH_CHECK_PORT")
         if health_check_port:
@@ -83,73 +110,99 @@ class GenieConsumer:
 
 
     async def on_event(self, partition_context, event):
-        topic = event.properties.get(b"topic")
+        await self.dispatcher.dispatch(partition_context, GenieEnvelope(event))
+
+    async def checkpoint(self, partition_context, envelope: GenieEnvelope):
+        await self.checkpointer.advance(partition_context, envelope.event)
+
+    async def on_partition_close(self, partition_context, reason):
+        logger.info(f"Partition {partition_context.partition_id} closed ({reason}). Consumer group: {self.consumer_group}")
+        await self.checkpointer.flush_partition(partition_context)
+
+    async def handle_event(self, envelope: GenieEnvelope):
+        topic = envelope.topic
+        # The coalescing key this consumer leased for the event, released unless the event succeeds
+        receipt = None
         try:
-            if topic and (topic.decode("utf-8") in self.topics):
-                self.current_event = event
-                decoded_topic = topic.decode("utf-8")
-                decoded_ctx_id = None
-                decoded_user_id = None
-                if b"ctx_id" in event.properties:
-                    ctx_id = event.properties.get(b"ctx_id")
-                    if ctx_id:
-                        decoded_ctx_id = ctx_id.decode("utf-8")
-                        logger.bind_context(decoded_ctx_id)
-                if b"cty_id" in event.properties:
-                    cty_id = event.properties.get(b"cty_id")
-                    if cty_id:
-                        decoded_cty_id = cty_id.decode("utf-8")
-                        logger.bind_y_context(decoded_cty_id)
-                if b"tenant_id" in event.properties:
-                    tenant_id = event.properties.get(b"tenant_id")
-                    if tenant_id:
-                        decoded_tenant_id = tenant_id.decode("utf-8")
-                        logger.set_tenant_id(decoded_tenant_id)
-                if b"user_id" in event.properties:
-                    user_id = event.properties.get(b"user_id")
-                    if user_id:
-                        decoded_user_id = user_id.decode("utf-8")
-                        logger.set_user_id(decoded_user_id)
-                logger.set_topic(decoded_topic)
-                logger.info(f"TOPIC={decoded_topic} | About to process event: {str(event)[:300]}")
-                object_id, object_type = extract_object_id(event.body_as_str())
-                self.statuses_repository.update_status(ctx_id=decoded_ctx_id, object_id=object_id, event_topic=decoded_topic,
-                                                       user_id=decoded_user_id, status=StatusEnum.PROCESSING)
-                event_result = await self.process_event(event)
+            if topic and topic in self.topics:
+                if envelope.ctx_id:
+                    logger.bind_context(envelope.ctx_id)
+                if envelope.cty_id:
+                    logger.bind_y_context(envelope.cty_id)
+                if envelope.tenant_id:
+                    logger.set_tenant_id(envelope.tenant_id)
+                if envelope.user_id:
+                    logger.set_user_id(envelope.user_id)
+                logger.set_topic(topic)
+                # Events sent while handling this one inherit its priority
+                set_current_priority(event_priority(envelope))
+                # Clients give up long inline waits and let the retry scheduler try the event again
+                set_retries_deferred(self.retries.enabled)
+                # LLM calls of events sent with bypass_llm_cache ignore cached responses and replace them
+                payload = envelope.payload
+                set_response_cache_bypassed(isinstance(payload, dict) and bool(payload.get("bypass_llm_cache")))
+                logger.info(f"TOPIC={topic} | About to process event: {str(envelope)[:300]}")
+                key = self.coalescer.receipt_key(self.consumer_group, envelope)
+                state = self.coalescer.claim_receipt(key, topic) if key else None
+                if state == RECEIPT_DONE:
+                    logger.info(f"Skipping duplicate event [KEY={key}]. Consumer group: {self.consumer_group}")
+                    self.status_recorder.update_status(ctx_id=envelope.ctx_id, object_id=envelope.object_id, event_topic=topic,
+                                                       user_id=envelope.user_id, status=StatusEnum.COMPLETED)
+                    return
+                if state == RECEIPT_PROCESSING:
+                    # Its status is the other worker's; if that worker dies, the retry finds the lease expired
+                    held = RetryLater(f"Event [KEY={key}] is being processed", delay_seconds=self.coalescer.lease_seconds)
+                    if not self.retries.schedule(envelope, held):
+                        logger.warning(f"Skipping event being processed [KEY={key}]. Consumer group: {self.consumer_group}")
+                    return
+                receipt = key
+                self.status_recorder.update_status(ctx_id=envelope.ctx_id, object_id=envelope.object_id, event_topic=topic,
+                                                       user_id=envelope.user_id, status=StatusEnum.PROCESSING)
+                lease = self.coalescer.keep_leased(receipt) if receipt else None
+                try:
+                    event_result = await self.process_event(envelope)
+                finally:
+                    if lease:
+                        lease.cancel()
+                if receipt:
+                    self.coalescer.complete(receipt, topic)
+                    receipt = None
                 logger.info(f"Event processed. Result: {event_result}")
-                self.statuses_repository.update_status(ctx_id=decoded_ctx_id, object_id=object_id, event_topic=decoded_topic,
-                                                       user_id=decoded_user_id, status=StatusEnum.COMPLETED)
+                self.status_recorder.update_status(ctx_id=envelope.ctx_id, object_id=envelope.object_id, event_topic=topic,
+                                                       user_id=envelope.user_id, status=StatusEnum.COMPLETED)
             else:
-                topic = topic.decode("utf-8") if topic else None
                 logger.info(f"Skipping topic [{topic}]. Consumer group: {self.consumer_group}")
-        except Exception as e:
+        except (Exception, RetryLater) as e:
             logger.error(f"Exception occurred: {e}")
-            topic = topic.decode("utf-8") if topic else None
-            object_id, object_type = extract_object_id(event.body_as_str())
-            self.statuses_repository.update_status(ctx_id=decoded_ctx_id, object_id=object_id, event_topic=topic,
-                                                   user_id=decoded_user_id, status=StatusEnum.FAILED, error_message=str(e))
-            if topic in Topic.PROFILE_CRITICAL:
-                traceback_str = traceback.format_exc()
-                await self.handle_failed_processing_profile_event(event=event, error_message=e, topic=topic, traceback_logs=traceback_str)
-            if topic == Topic.NEW_MEETING_GOALS:
-                traceback_str = traceback.format_exc()
-                await self.handle_failed_processing_meeting_event(event=event, error_message=e, topic=topic, traceback_logs=traceback_str)
+            if self.retries.schedule(envelope, e):
+                self.status_recorder.update_status(ctx_id=envelope.ctx_id, object_id=envelope.object_id, event_topic=topic,
+                                                   user_id=envelope.user_id, status=StatusEnum.FAILED,
+                                                   error_message=f"{e} (retry scheduled)")
+            else:
+                self.status_recorder.update_status(ctx_id=envelope.ctx_id, object_id=envelope.object_id, event_topic=topic,
+                                                   user_id=envelope.user_id, status=StatusEnum.FAILED, error_message=str(e))
+                if topic in Topic.PROFILE_CRITICAL:
+                    traceback_str = traceback.format_exc()
+                    await self.handle_failed_processing_profile_event(event=envelope, error_message=e, topic=topic, traceback_logs=traceback_str)
+                if topic == Topic.NEW_MEETING_GOALS:
+                    traceback_str = traceback.format_exc()
+                    await self.handle_failed_processing_meeting_event(event=envelope, error_message=e, topic=topic, traceback_logs=traceback_str)
             logger.error("Detailed traceback information:")
             traceback.print_exc()
         finally:
-            self.current_event = None
+            # Failed, cancelled or interrupted by shutdown: the event is processed when delivered or retried again
+            self.coalescer.release(receipt)
             logger.clean_cty_id()
-        await partition_context.update_checkpoint(event)
 
-    async def process_event(self, event):
-        """Override this method in subclasses to define event processing logic."""
+    async def process_event(self, event: GenieEnvelope):
+        """
+        Override this method in subclasses to define event processing logic. `event` carries the decoded payload and
+        the event's topic, ctx_id, object_id and user_id; event.payload is decoded once for all of its readers.
+        """
         raise NotImplementedError("Must be implemented in subclass")
 
-    async def handle_failed_processing_profile_event(self, event, error_message, topic, traceback_logs):
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+    async def handle_failed_processing_profile_event(self, event: GenieEnvelope, error_message, topic, traceback_logs):
+        event_body = event.payload
         email = event_body.get("email")
         uuid = event_body.get("uuid") or event_body.get("person_uuid") or event_body.get("profile_uuid") or event_body.get("person_id")
         if not email and not uuid:
@@ -170,14 +223,10 @@ class GenieConsumer:
             "uuid": uuid,
         }
         event = GenieEvent(topic=Topic.PROFILE_ERROR, data=data_to_send)
-        event.send()
-
-    async def handle_failed_processing_meeting_event(self, event, error_message, topic, traceback_logs):
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
-        meeting_uuid = event_body.get("meeting_uuid")
+        await event.send_async()
+
+    async def handle_failed_processing_meeting_event(self, event: GenieEnvelope, error_message, topic, traceback_logs):
+        meeting_uuid = event.payload.get("meeting_uuid")
         data_to_send = {
             "error": str(error_message),
             "traceback": str(traceback_logs),
@@ -187,16 +236,23 @@ class GenieConsumer:
             "meeting_uuid": meeting_uuid,
         }
         event = GenieEvent(topic=Topic.MEETING_ERROR, data=data_to_send)
-        event.send()
+        await event.send_async()
 
     async def start(self):
         logger.info(f"Starting consumer for topics: {self.topics} on group: {self.consumer_group}")
+        bootstrap_schema()
         async with httpx.AsyncClient() as client:
             self.client = client
             GenieConsumer.active_clients.add(client)
+            self.retries.start()
             try:
                 async with self.consumer:
-                    await self.consumer.receive(on_event=self.on_event, starting_position="-1", prefetch=1)
+                    await self.consumer.receive(
+                        on_event=self.on_event,
+                        on_partition_close=self.on_partition_close,
+                        starting_position="-1",
+                        prefetch=self.prefetch,
+                    )
                     await self._shutdown_event.wait()
             except asyncio.CancelledError:
                 logger.warning("Consumer cancelled, closing consumer.")
@@ -222,6 +278,13 @@ class GenieConsumer:
 
     async def stop(self):
         self._shutdown_event.set()
+        if hasattr(self, "retries"):
+            await self.retries.stop(timeout=CONSUMER_DRAIN_TIMEOUT_SECONDS)
+        if hasattr(self, "dispatcher"):
+            # Let events in flight finish so their checkpoints are written before the consumer closes
+            await self.dispatcher.drain(timeout=CONSUMER_DRAIN_TIMEOUT_SECONDS)
+        if hasattr(self, "checkpointer"):
+            await self.checkpointer.flush()
         if hasattr(self, "consumer"):
             await self.consumer.close()
         if hasattr(self, "client"):
@@ -0,0 +1,61 @@
+from common.utils.event_utils import object_id_from_payload
+from data.data_common.events.wire_format import decode_event, event_text, property_str
+
+_UNDECODED = object()
+
+
+class GenieEnvelope:
+    """
+    A received event as consumers see it. The GenieEvent properties (topic, ctx_id, cty_id, tenant_id, user_id) are
+    plain strings, `payload` is the body decoded once on first use whatever its wire format (see wire_format), and
+    object_id / object_type are taken from the payload as extract_object_id does. body_as_str() is the body as JSON
+    text, decompressed. Everything else (properties, sequence_number, ...) is the received event's own.
+    """
+
+    __slots__ = ("event", "topic", "ctx_id", "cty_id", "tenant_id", "user_id", "_payload", "_object_id", "_text")
+
+    def __init__(self, event):
+        self.event = event
+        properties = event.properties
+        self.topic = property_str(properties, "topic")
+        self.ctx_id = property_str(properties, "ctx_id")
+        self.cty_id = property_str(properties, "cty_id")
+        self.tenant_id = property_str(properties, "tenant_id")
+        self.user_id = property_str(properties, "user_id")
+        self._payload = _UNDECODED
+        self._object_id = None
+        self._text = None
+
+    @property
+    def payload(self):
+        """The decoded body; raises ValueError (a JSONDecodeError for a body that is not JSON)."""
+        if self._payload is _UNDECODED:
+            self._payload = decode_event(self.event)
+        return self._payload
+
+    def body_as_str(self, encoding: str = "UTF-8") -> str:
+        if self._text is None:
+            self._text = event_text(self.event)
+        return self._text
+
+    def _object(self) -> tuple[str, str]:
+        if self._object_id is None:
+            payload = self.payload
+            self._object_id = object_id_from_payload(payload) if isinstance(payload, dict) else ("", "UNKNOWN")
+        return self._object_id
+
+    @property
+    def object_id(self) -> str:
+        return self._object()[0]
+
+    @property
+    def object_type(self) -> str:
+        return self._object()[1]
+
+    def __getattr__(self, name):
+        if name == "event":
+            raise AttributeError(name)
+        return getattr(self.event, name)
+
+    def __str__(self):
+        return str(self.event)
@@ -1,92 +1,151 @@
 import json
-import os
+import threading
+from functools import cached_property
+from typing import Optional
 
-from azure.eventhub import EventHubProducerClient, EventData
+from azure.eventhub import EventData
 from common.genie_logger import GenieLogger
+from data.data_common.events.coalescing import event_coalescer
+from data.data_common.events.genie_event_producer import producer_service
+from data.data_common.events.priority import PRIORITY_PROPERTY, Priority, as_priority, current_priority
+from data.data_common.repositories.status_recorder import StatusRecorder
 from data.data_common.repositories.statuses_repository import StatusesRepository
-from common.utils.event_utils import extract_object_id
-from common.utils import env_utils
+from common.utils.event_utils import object_id_from_payload
+from data.data_common.events.wire_format import encode_payload
 
 logger = GenieLogger()
 
+_status_sink: Optional[StatusRecorder] = None
+_status_sink_lock = threading.Lock()
 
 
-connection_str = env_utils.get("EVENTHUB_CONNECTION_STRING", "")
-eventhub_name = env_utils.get("EVENTHUB_NAME", "")
-producer = EventHubProducerClient.from_connection_string(conn_str=connection_str, eventhub_name=eventhub_name)
+def status_sink() -> StatusRecorder:
+    """
+    The write-behind status recorder sent and consumed events record their statuses with, created on first use
+    and shared by the whole process.
+    """
+    global _status_sink
+    if _status_sink is None:
+        with _status_sink_lock:
+            if _status_sink is None:
+                _status_sink = StatusRecorder(StatusesRepository())
+    return _status_sink
+
+
+def set_status_sink(sink):
+    """Replaces the shared status sink, e.g. with an in-memory recorder in benchmarks and tests."""
+    global _status_sink
+    _status_sink = sink
+
+
+def close_status_sink():
+    """Writes the statuses still buffered, on shutdown."""
+    if _status_sink is not None and hasattr(_status_sink, "close"):
+        _status_sink.close()
 
 
 class GenieEvent:
-    def __init__(self, topic, data: str | dict, scope="public", ctx_id=None, cty_id=None):
+    """
+    An event to publish on the event hub.
+
+    Constructing an event only captures the payload and the logging context; the payload is parsed and encoded
+    at most once, when the event is sent (or `body` is first read).
+
+    `priority` (a Priority, see priority.priority_for_meeting) defaults to the priority of the event being handled.
+    """
+
+    def __init__(self, topic, data: str | dict, scope="public", ctx_id=None, cty_id=None, partition_key=None,
+                 priority: Priority = None):
+        if not isinstance(data, (dict, str)):
+            logger.error("Data must be a dictionary or a JSON string")
+            raise TypeError("Data must be a dictionary or a JSON string")
         self.topic = topic
-        self.data: str = self.ensure_json_format(data)
+        self.raw_data = data
         self.scope = scope
-        ctx_id = ctx_id if ctx_id else logger.get_ctx_id()
-        self.ctx_id = ctx_id
+        self.partition_key = partition_key
+        self.ctx_id = ctx_id if ctx_id else logger.get_ctx_id()
         cty_id = cty_id if cty_id else logger.get_cty_id()
         self.cty_id = cty_id if cty_id else None
-        self.tenant_id = logger.get_tenant_id() or (json.loads(data).get("tenant_id") if isinstance(data, str) else data.get("tenant_id"))
-        self.user_id = logger.get_user_id() or (json.loads(data).get("user_id") if isinstance(data, str) else data.get("user_id"))
-        self.previous_topic = logger.get_topic() or (json.loads(data).get("previous_topic") if isinstance(data, str) else data.get("previous_topic"))
-        self.statuses_repository = StatusesRepository()
+        self._tenant_id = logger.get_tenant_id()
+        self._user_id = logger.get_user_id()
+        self._previous_topic = logger.get_topic()
+        self.priority = as_priority(priority) if priority is not None else current_priority()
+
+    @cached_property
+    def payload(self) -> dict:
+        if isinstance(self.raw_data, dict):
+            return self.raw_data
+        try:
+            return json.loads(self.raw_data)
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON string: {e}")
+            raise
+
+    @cached_property
+    def body(self) -> tuple[bytes | str, dict]:
+        """
+        The event body in the configured wire format (see wire_format) and the application properties describing it.
+        """
+        if isinstance(self.raw_data, str):
+            self.payload  # validates the string
+        try:
+            return encode_payload(self.raw_data)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Failed to convert data to JSON: {e}")
+            raise
+
+    @property
+    def tenant_id(self):
+        return self._tenant_id or self.payload.get("tenant_id")
+
+    @property
+    def user_id(self):
+        return self._user_id or self.payload.get("user_id")
+
+    @property
+    def previous_topic(self):
+        return self._previous_topic or self.payload.get("previous_topic")
 
     def prepare_event(self):
-        event = EventData(body=self.data)
+        body, wire_properties = self.body
+        event = EventData(body=body)
         event.properties = {"topic": self.topic, "scope": self.scope, "ctx_id": self.ctx_id,
-                            "tenant_id": self.tenant_id, "user_id": self.user_id}
+                            "tenant_id": self.tenant_id, "user_id": self.user_id, **wire_properties}
         if self.previous_topic:
             event.properties["previous_topic"] = self.previous_topic
         if self.cty_id:
             event.properties["cty_id"] = self.cty_id
+        if self.priority is not None:
+            event.properties[PRIORITY_PROPERTY] = str(int(self.priority))
         return event
 
     def send(self):
-        event_data_batch = producer.create_batch()
-        event = EventData(body=self.data)
-        event.properties = {"topic": self.topic, "scope": self.scope, "ctx_id": self.ctx_id,
-                            "tenant_id" : self.tenant_id, "user_id": self.user_id}
-        if self.previous_topic:
-            event.properties["previous_topic"] = self.previous_topic
-        if self.cty_id:
-            event.properties["cty_id"] = self.cty_id
-        logger.info(f"Events sent successfully [TOPIC={self.topic};SCOPE={self.scope};USER_ID={self.user_id}]")
-        event_data_batch.add(event)
-
-        # Send the batch
-        send_timeout = 60  # Set timeout to 60 seconds
-        producer.send_batch(event_data_batch, timeout=send_timeout)
-        logger.info(f"Batch sent successfully [TOPIC={self.topic}]")
-        producer.close()
-
-        object_id, object_type = extract_object_id(self.data)
-        if not object_id:
+        """Sends the event through the process-wide producer and waits until its batch was delivered."""
+        if self.suppressed():
             return
-        self.statuses_repository.start_status(ctx_id=self.ctx_id, object_id=object_id, object_type=object_type,
-                                              user_id=self.user_id, tenant_id=self.tenant_id, previous_event_topic=self.previous_topic,
-                                              next_event_topic=self.topic)
+        producer_service().send_sync(self.prepare_event(), partition_key=self.partition_key)
+        logger.info(f"Event sent successfully [TOPIC={self.topic};SCOPE={self.scope};USER_ID={self.user_id}]")
+        self.record_status()
 
-    def ensure_json_format(self, data):
-        """
-        Ensure that data is a valid JSON string. If it's a dictionary, convert it to a JSON string.
-        """
-        return json.dumps(self.convert_to_json(data))
-
-    def convert_to_json(self, data):
-        if isinstance(data, dict):
-            try:
-                return json.dumps(data)
-            except (TypeError, ValueError) as e:
-                logger.error(f"Failed to convert data to JSON: {e}")
-                raise
-        elif isinstance(data, str):
-            try:
-                json.loads(data)
-                return data
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON string: {e}")
-                raise
-        else:
-            logger.error("Data must be a dictionary or a JSON string")
-            raise TypeError("Data must be a dictionary or a JSON string")
+    async def send_async(self):
+        """Like send(), without blocking the calling event loop while the batch lingers and is delivered."""
+        if self.suppressed():
+            return
+        await producer_service().send(self.prepare_event(), partition_key=self.partition_key)
+        logger.info(f"Event sent successfully [TOPIC={self.topic};SCOPE={self.scope};USER_ID={self.user_id}]")
+        self.record_status()
 
+    def suppressed(self) -> bool:
+        """True for a duplicate of an event sent within its topic's coalescing window, which is not sent (see coalescing)."""
+        if event_coalescer().filter_sends([self]):
+            return False
+        logger.info(f"Duplicate event not sent [TOPIC={self.topic};USER_ID={self.user_id}]")
+        return True
 
+    def record_status(self):
+        object_id, object_type = object_id_from_payload(self.payload)
+        if not object_id:
+            return
+        status_sink().start_status(ctx_id=self.ctx_id, object_id=object_id, object_type=object_type,
+                                   user_id=self.user_id, tenant_id=self.tenant_id, previous_event_topic=self.previous_topic,
+                                   next_event_topic=self.topic)
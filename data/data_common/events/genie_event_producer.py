@@ -0,0 +1,173 @@
+import asyncio
+import atexit
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+from azure.eventhub import EventData
+
+from common.genie_logger import GenieLogger
+from common.utils import env_utils
+from data.data_common.events.event_transport import create_sender
+
+logger = GenieLogger()
+
+EVENTS_PRODUCER_LINGER_MS = float(env_utils.get("EVENTS_PRODUCER_LINGER_MS", "10"))
+EVENTS_PRODUCER_MAX_BATCH_SIZE = int(env_utils.get("EVENTS_PRODUCER_MAX_BATCH_SIZE", "100"))
+EVENTS_PRODUCER_SEND_TIMEOUT_SECONDS = float(env_utils.get("EVENTS_PRODUCER_SEND_TIMEOUT_SECONDS", "60"))
+
+
+class EventProducerService:
+    """
+    Process-wide event producer. Events submitted from any thread or event loop are handed to a dedicated
+    loop thread, coalesced per partition key for up to `linger_ms` (or until `max_batch_size` events are waiting)
+    and sent as EventDataBatches over one transport connection that stays open between sends.
+    close() flushes whatever is still waiting.
+    """
+
+    def __init__(
+        self,
+        transport=None,
+        linger_ms: float = EVENTS_PRODUCER_LINGER_MS,
+        max_batch_size: int = EVENTS_PRODUCER_MAX_BATCH_SIZE,
+        send_timeout: float = EVENTS_PRODUCER_SEND_TIMEOUT_SECONDS,
+    ):
+        self.transport = transport or create_sender()
+        self.linger = linger_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.send_timeout = send_timeout
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pending: dict[Optional[str], list[tuple[EventData, Future]]] = {}
+        self._timers: dict[Optional[str], asyncio.TimerHandle] = {}
+        self._in_flight: set[asyncio.Task] = set()
+        self._closed = False
+        self.stats = {"events_sent": 0, "batches_sent": 0, "send_failures": 0, "send_seconds": 0.0}
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Event producer is closed")
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="genie-event-producer", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def submit(self, event: EventData, partition_key: Optional[str] = None) -> Future:
+        """Queues the event and returns a future resolved once the batch holding it was sent."""
+        future = Future()
+        self._ensure_started().call_soon_threadsafe(self._enqueue, event, partition_key, future)
+        return future
+
+    async def send(self, event: EventData, partition_key: Optional[str] = None):
+        await asyncio.wrap_future(self.submit(event, partition_key))
+
+    def send_sync(self, event: EventData, partition_key: Optional[str] = None):
+        self.submit(event, partition_key).result(timeout=self.send_timeout + self.linger + 5)
+
+    def _enqueue(self, event: EventData, partition_key: Optional[str], future: Future):
+        pending = self._pending.setdefault(partition_key, [])
+        pending.append((event, future))
+        if len(pending) >= self.max_batch_size:
+            self._flush_key(partition_key)
+        elif partition_key not in self._timers:
+            self._timers[partition_key] = self._loop.call_later(self.linger, self._flush_key, partition_key)
+
+    def _flush_key(self, partition_key: Optional[str]):
+        timer = self._timers.pop(partition_key, None)
+        if timer:
+            timer.cancel()
+        pending = self._pending.pop(partition_key, None)
+        if pending:
+            task = self._loop.create_task(self._send(partition_key, pending))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, partition_key: Optional[str], pending: list[tuple[EventData, Future]]):
+        waiting: list[Future] = []
+        try:
+            batch = await self.transport.create_batch(partition_key=partition_key)
+            for event, future in pending:
+                try:
+                    batch.add(event)
+                except ValueError:
+                    # Batch is full; send it and start the next one with this event
+                    await self._send_batch(batch, waiting)
+                    waiting = []
+                    batch = await self.transport.create_batch(partition_key=partition_key)
+                    batch.add(event)
+                waiting.append(future)
+            await self._send_batch(batch, waiting)
+        except Exception as e:
+            self.stats["send_failures"] += 1
+            logger.error(f"Failed to send events [PARTITION_KEY={partition_key}]: {e}")
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _send_batch(self, batch, futures: list[Future]):
+        started = time.perf_counter()
+        await self.transport.send_batch(batch, timeout=self.send_timeout)
+        self.stats["send_seconds"] += time.perf_counter() - started
+        self.stats["batches_sent"] += 1
+        self.stats["events_sent"] += len(futures)
+        for future in futures:
+            future.set_result(None)
+
+    async def _flush_all(self):
+        for partition_key in list(self._pending):
+            self._flush_key(partition_key)
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    def flush(self, timeout: Optional[float] = None):
+        """Sends everything waiting for its linger window and waits for all in-flight batches."""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._flush_all(), self._loop).result(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        with self._lock:
+            if self._closed or self._loop is None:
+                self._closed = True
+                return
+            self._closed = True
+        try:
+            asyncio.run_coroutine_threadsafe(self._flush_all(), self._loop).result(timeout)
+            asyncio.run_coroutine_threadsafe(self.transport.close(), self._loop).result(timeout)
+        except Exception as e:
+            logger.error(f"Error flushing event producer on close: {e}")
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+            logger.info(f"Event producer closed. Stats: {self.stats}")
+
+
+_producer_service: Optional[EventProducerService] = None
+_producer_service_lock = threading.Lock()
+
+
+def producer_service() -> EventProducerService:
+    global _producer_service
+    if _producer_service is None:
+        with _producer_service_lock:
+            if _producer_service is None:
+                _producer_service = EventProducerService()
+    return _producer_service
+
+
+def set_producer_service(service: Optional[EventProducerService]):
+    """Replaces the process-wide producer, e.g. with one over a stub transport in benchmarks and tests."""
+    global _producer_service
+    _producer_service = service
+
+
+def close_producer_service(timeout: Optional[float] = None):
+    if _producer_service is not None:
+        _producer_service.close(timeout)
+
+
+atexit.register(close_producer_service, 30)
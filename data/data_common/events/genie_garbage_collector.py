@@ -2,6 +2,7 @@ import asyncio
 import traceback
 import httpx
 from data.data_common.events.genie_consumer import GenieConsumer
+from data.data_common.events.genie_envelope import GenieEnvelope
 from common.genie_logger import GenieLogger
 
 
@@ -9,19 +10,18 @@ logger = GenieLogger()
 
 
 class GenieGarbageCollector(GenieConsumer):
-    def __init__(self, consumer_group="$Default"):
+    def __init__(self, consumer_group="$Default", checkpoint_policy=None):
         """
         Initialize the GenieGarbageCollector.
         """
         # Pass wildcard `*` for topics to process all events in the consumer group
-        super().__init__(topics=["*"], consumer_group=consumer_group)
+        super().__init__(topics=["*"], consumer_group=consumer_group, checkpoint_policy=checkpoint_policy)
 
     async def process_event(self, event):
         """
         Log the event as garbage collected and mark it as processed.
         """
-        topic = event.properties.get(b"topic")
-        topic = topic.decode("utf-8") if topic else "unknown"
+        topic = event.topic or "unknown"
         logger.info(f"Garbage collected event from topic: {topic}")
         return f"Event from topic {topic} garbage collected"
 
@@ -37,6 +37,7 @@ class GenieGarbageCollector(GenieConsumer):
                 async with self.consumer:
                     await self.consumer.receive(
                         on_event=self.on_event,
+                        on_partition_close=self.on_partition_close,
                         starting_position="@latest",  # Start from the latest events
                         prefetch=5  # Adjust prefetch for performance if needed
                     )
@@ -52,19 +53,20 @@ class GenieGarbageCollector(GenieConsumer):
 
     async def on_event(self, partition_context, event):
         """
-        Process each event and update checkpoint to confirm handling.
+        Process each event and advance the checkpoint per the consumer group's checkpoint policy.
         """
-        topic = event.properties.get(b"topic", b"unknown").decode("utf-8")
+        envelope = GenieEnvelope(event)
+        topic = envelope.topic or "unknown"
         try:
             logger.info(f"Processing event from topic: {topic}")
-            await self.process_event(event)
+            await self.process_event(envelope)
         except Exception as e:
             logger.error(f"Exception occurred while processing event from topic {topic}: {e}")
             logger.error("Detailed traceback information:")
             traceback.print_exc()
         finally:
-            # Confirm the event is handled
-            await partition_context.update_checkpoint(event)
+            # Confirm the event is handled; written in batches, and on partition close and stop()
+            await self.checkpointer.advance(partition_context, event)
             logger.info(f"Event {topic} marked as handled, in consumer group: {self.consumer_group}")
 
 # Example usage
@@ -0,0 +1,289 @@
+import asyncio
+import itertools
+import threading
+import zlib
+from collections import deque
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from common.genie_logger import GenieLogger
+from common.utils import env_utils
+from data.data_common.events.wire_format import event_body_bytes
+
+logger = GenieLogger()
+
+LOCAL_EVENT_BUS_PARTITIONS = int(env_utils.get("LOCAL_EVENT_BUS_PARTITIONS", "4"))
+ALL_TOPICS = "*"
+
+
+class LocalEvent:
+    """A published event as a receiver sees it, shaped like a received azure EventData (bytes property keys)."""
+
+    __slots__ = ("body", "properties", "partition_key", "sequence_number", "offset", "enqueued_time")
+
+    def __init__(self, body: str | bytes, properties: dict, partition_key: Optional[str], sequence_number: int):
+        self.body = body
+        self.properties = properties
+        self.partition_key = partition_key
+        self.sequence_number = sequence_number
+        self.offset = str(sequence_number)
+        self.enqueued_time = datetime.now(timezone.utc)
+
+    def body_as_str(self, encoding: str = "UTF-8") -> str:
+        return self.body.decode(encoding) if isinstance(self.body, bytes) else self.body
+
+    def __str__(self):
+        return f"{{ body: '{self.body}', properties: {self.properties}, offset: {self.offset}, sequence_number: {self.sequence_number} }}"
+
+
+def _wire_properties(properties: dict) -> dict:
+    # What properties look like after an AMQP round-trip: keys and string values as bytes
+    return {
+        (key.encode("utf-8") if isinstance(key, str) else key): (value.encode("utf-8") if isinstance(value, str) else value)
+        for key, value in (properties or {}).items()
+    }
+
+
+class LocalBatch:
+    """Duck-typed EventDataBatch: add() takes anything with a body and properties, like a prepared EventData."""
+
+    def __init__(self, partition_key: Optional[str] = None, max_events: int = 1000):
+        self.partition_key = partition_key
+        self.max_events = max_events
+        self.events = []
+
+    def add(self, event):
+        if len(self.events) >= self.max_events:
+            raise ValueError("Batch is full")
+        self.events.append(event)
+
+    def __len__(self):
+        return len(self.events)
+
+
+class _PartitionLog:
+    """
+    Events of one partition for one consumer group. Delivered events stay unacknowledged until a checkpoint at or
+    past them; a receiver attaching later gets them again before newer events (at-least-once).
+    """
+
+    def __init__(self, partition_id: str):
+        self.partition_id = partition_id
+        self.pending: deque[LocalEvent] = deque()
+        self.unacked: dict[int, LocalEvent] = {}
+        self.lock = threading.Lock()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.ready: Optional[asyncio.Event] = None
+
+    def append(self, event: LocalEvent):
+        with self.lock:
+            self.pending.append(event)
+            loop, ready = self.loop, self.ready
+        if ready is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            ready.set()
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(ready.set)
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        with self.lock:
+            redeliver = sorted(self.unacked.values(), key=lambda event: event.sequence_number)
+            self.unacked.clear()
+            self.pending.extendleft(reversed(redeliver))
+            self.loop = loop
+            self.ready = asyncio.Event()
+            if self.pending:
+                self.ready.set()
+
+    def detach(self):
+        with self.lock:
+            self.loop = None
+            self.ready = None
+
+    async def next(self) -> LocalEvent:
+        while True:
+            with self.lock:
+                if self.pending:
+                    event = self.pending.popleft()
+                    self.unacked[event.sequence_number] = event
+                    return event
+                ready = self.ready
+                ready.clear()
+            await ready.wait()
+
+    def ack(self, sequence_number: int) -> int:
+        with self.lock:
+            acked = [number for number in self.unacked if number <= sequence_number]
+            for number in acked:
+                del self.unacked[number]
+        return len(acked)
+
+    @property
+    def backlog(self) -> int:
+        return len(self.pending) + len(self.unacked)
+
+
+class _Subscription:
+    def __init__(self, consumer_group: str, topics: Iterable[str], partitions: int):
+        self.consumer_group = consumer_group
+        self.topics = set(topics)
+        self.logs = [_PartitionLog(str(partition)) for partition in range(partitions)]
+
+    def wants(self, topic: Optional[str]) -> bool:
+        return ALL_TOPICS in self.topics or topic in self.topics
+
+
+class LocalPartitionContext:
+    """The parts of azure's PartitionContext consumers use; update_checkpoint acknowledges."""
+
+    def __init__(self, subscription: _Subscription, log: _PartitionLog):
+        self.consumer_group = subscription.consumer_group
+        self.eventhub_name = "local"
+        self.fully_qualified_namespace = "local"
+        self.partition_id = log.partition_id
+        self._log = log
+
+    async def update_checkpoint(self, event: Optional[LocalEvent] = None, **kwargs):
+        if event is not None:
+            self._log.ack(event.sequence_number)
+
+
+class LocalReceiver:
+    """
+    Receives a consumer group's events from a LocalEventBus with the EventHubConsumerClient calls GenieConsumer makes:
+    `async with`, receive(on_event=..., on_partition_close=...) running until close(), and close().
+    """
+
+    def __init__(self, bus: "LocalEventBus", subscription: _Subscription):
+        self.bus = bus
+        self.subscription = subscription
+        self._tasks: list[asyncio.Task] = []
+        self._closed: Optional[asyncio.Event] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def receive(self, on_event, on_partition_close=None, starting_position=None, prefetch=None, **kwargs):
+        loop = asyncio.get_running_loop()
+        self._closed = asyncio.Event()
+        for log in self.subscription.logs:
+            log.attach(loop)
+            self._tasks.append(asyncio.create_task(self._receive_partition(log, on_event)))
+        try:
+            await self._closed.wait()
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+            for log in self.subscription.logs:
+                if on_partition_close:
+                    try:
+                        await on_partition_close(LocalPartitionContext(self.subscription, log), "SHUTDOWN")
+                    except Exception as e:
+                        logger.error(f"Error closing local partition {log.partition_id}: {e}")
+                log.detach()
+
+    async def _receive_partition(self, log: _PartitionLog, on_event):
+        context = LocalPartitionContext(self.subscription, log)
+        while True:
+            event = await log.next()
+            try:
+                await on_event(context, event)
+            except Exception as e:
+                logger.error(f"Error in on_event [GROUP={self.subscription.consumer_group};PARTITION={log.partition_id}]: {e}")
+
+    async def close(self):
+        if self._closed is not None:
+            self._closed.set()
+
+
+class LocalEventBus:
+    """
+    In-process event transport. Consumers co-located in one process exchange events without network hops.
+
+    Publishing routes an event by its `topic` property to the consumer groups subscribed to that Topic (or to "*"),
+    into the partition picked by its partition key (round robin without one), so events sharing a key keep their
+    order. Sequence numbers are per partition as on the event hub. Events nobody subscribes to are dropped and
+    counted. The sending side has the transport interface of EventProducerService, so GenieEvent works unchanged.
+    """
+
+    def __init__(self, partitions: int = LOCAL_EVENT_BUS_PARTITIONS):
+        self.partitions = max(1, partitions)
+        self._subscriptions: dict[str, _Subscription] = {}
+        self._sequence_numbers = [itertools.count() for _ in range(self.partitions)]
+        self._round_robin = itertools.count()
+        self._lock = threading.Lock()
+        self.stats = {"published": 0, "delivered": 0, "unrouted": 0, "bytes": 0}
+
+    def subscribe(self, consumer_group: str, topics: Iterable[str]) -> _Subscription:
+        """Starts retaining the group's events; a group's later subscriptions add topics to the first one."""
+        with self._lock:
+            subscription = self._subscriptions.get(consumer_group)
+            if subscription is None:
+                subscription = self._subscriptions[consumer_group] = _Subscription(consumer_group, topics, self.partitions)
+            else:
+                subscription.topics.update(topics)
+            return subscription
+
+    def receiver(self, consumer_group: str, topics: Iterable[str]) -> LocalReceiver:
+        return LocalReceiver(self, self.subscribe(consumer_group, topics))
+
+    def partition_for(self, partition_key: Optional[str]) -> int:
+        if partition_key is None:
+            return next(self._round_robin) % self.partitions
+        return zlib.crc32(partition_key.encode("utf-8")) % self.partitions
+
+    def publish(self, body: str | bytes, properties: dict, partition_key: Optional[str] = None) -> int:
+        """Routes one event; returns the number of consumer groups it was delivered to."""
+        properties = _wire_properties(properties)
+        topic = properties.get(b"topic")
+        topic = topic.decode("utf-8") if isinstance(topic, bytes) else topic
+        partition = self.partition_for(partition_key)
+        event = LocalEvent(body, properties, partition_key, next(self._sequence_numbers[partition]))
+        self.stats["published"] += 1
+        self.stats["bytes"] += len(body)
+        subscriptions = [subscription for subscription in self._subscriptions.values() if subscription.wants(topic)]
+        for subscription in subscriptions:
+            subscription.logs[partition].append(event)
+        self.stats["delivered"] += len(subscriptions)
+        if not subscriptions:
+            self.stats["unrouted"] += 1
+        return len(subscriptions)
+
+    def backlog(self, consumer_group: str) -> int:
+        """Events of the group not acknowledged yet (pending or delivered without checkpoint)."""
+        subscription = self._subscriptions.get(consumer_group)
+        return sum(log.backlog for log in subscription.logs) if subscription else 0
+
+    async def create_batch(self, partition_key: Optional[str] = None) -> LocalBatch:
+        return LocalBatch(partition_key)
+
+    async def send_batch(self, batch: LocalBatch, timeout: Optional[float] = None):
+        for event in batch.events:
+            self.publish(event_body_bytes(event), event.properties, batch.partition_key)
+
+    async def close(self):
+        pass
+
+
+_local_event_bus: Optional[LocalEventBus] = None
+_local_event_bus_lock = threading.Lock()
+
+
+def local_event_bus() -> LocalEventBus:
+    """The process-wide bus shared by the producer and every consumer when EVENT_TRANSPORT=local."""
+    global _local_event_bus
+    if _local_event_bus is None:
+        with _local_event_bus_lock:
+            if _local_event_bus is None:
+                _local_event_bus = LocalEventBus()
+    return _local_event_bus
@@ -0,0 +1,170 @@
+"""
+Event priorities, so that the profile of a prospect meeting in 20 minutes is not generated behind bulk backfills.
+
+Producers set a priority on GenieEvent: from the nearest meeting start time (priority_for_meeting) or explicitly,
+e.g. Priority.BULK for admin syncs and scheduled backfills. It travels as the `priority` application property, and
+events sent while a consumer handles an event inherit that event's priority, so a whole profile pipeline runs at the
+priority of the meeting that triggered it. Events without the property are NORMAL.
+
+Consumers queue received events in one lane per priority (PriorityLanes) and start them by weighted fair dequeue,
+see PartitionDispatcher.
+"""
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from enum import IntEnum
+from typing import Callable, Optional
+
+from common.utils import env_utils
+from data.data_common.events.wire_format import property_str
+
+
+class Priority(IntEnum):
+    URGENT = 0
+    HIGH = 1
+    NORMAL = 2
+    BULK = 3
+
+
+PRIORITY_PROPERTY = "priority"
+
+# Meetings starting within this many minutes make their events URGENT, within PRIORITY_HIGH_MEETING_HOURS HIGH
+PRIORITY_URGENT_MEETING_MINUTES = float(env_utils.get("PRIORITY_URGENT_MEETING_MINUTES", "120"))
+PRIORITY_HIGH_MEETING_HOURS = float(env_utils.get("PRIORITY_HIGH_MEETING_HOURS", "24"))
+# Dequeue weights of the URGENT, HIGH, NORMAL and BULK lanes
+CONSUMER_PRIORITY_WEIGHTS = tuple(
+    max(1, int(weight)) for weight in env_utils.get("CONSUMER_PRIORITY_WEIGHTS", "8,4,2,1").split(",")
+)
+
+_current_priority: ContextVar[Optional[Priority]] = ContextVar("event_priority", default=None)
+
+
+def as_priority(value) -> Optional[Priority]:
+    """A Priority from an int, a numeric string or a name such as "urgent"; None for anything else."""
+    if isinstance(value, Priority):
+        return value
+    if isinstance(value, str):
+        value = value.strip()
+        if not value.lstrip("-").isdigit():
+            return Priority.__members__.get(value.upper())
+    try:
+        return Priority(min(max(int(value), Priority.URGENT), Priority.BULK))
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_datetime(start_time) -> Optional[datetime]:
+    if isinstance(start_time, str):
+        try:
+            start_time = datetime.fromisoformat(start_time.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(start_time, datetime):
+        return None
+    return start_time if start_time.tzinfo else start_time.replace(tzinfo=timezone.utc)
+
+
+def priority_for_meeting(start_time, now: datetime = None) -> Priority:
+    """
+    The priority of work for a meeting starting at `start_time` (a datetime or an ISO string): URGENT when it starts
+    within PRIORITY_URGENT_MEETING_MINUTES (or is running), HIGH within PRIORITY_HIGH_MEETING_HOURS, NORMAL otherwise
+    or when the start time is unknown or already long past.
+    """
+    start_time = _as_datetime(start_time)
+    if start_time is None:
+        return Priority.NORMAL
+    minutes = (start_time - (now or datetime.now(timezone.utc))).total_seconds() / 60
+    if -PRIORITY_URGENT_MEETING_MINUTES < minutes <= PRIORITY_URGENT_MEETING_MINUTES:
+        return Priority.URGENT
+    if 0 < minutes <= PRIORITY_HIGH_MEETING_HOURS * 60:
+        return Priority.HIGH
+    return Priority.NORMAL
+
+
+def current_priority() -> Optional[Priority]:
+    """The priority of the event being handled, inherited by the events it sends."""
+    return _current_priority.get()
+
+
+def set_current_priority(priority: Optional[Priority]):
+    _current_priority.set(priority)
+
+
+def event_priority(event) -> Priority:
+    """The priority of a received event (or GenieEnvelope), NORMAL when the producer did not set one."""
+    priority = as_priority(property_str(getattr(event, "properties", None), PRIORITY_PROPERTY))
+    return Priority.NORMAL if priority is None else priority
+
+
+class PriorityLanes:
+    """
+    One FIFO queue per priority, dequeued by smooth weighted round-robin: while lanes hold work, lane i is picked
+    weights[i] times out of sum(weights), interleaved, so URGENT work overtakes a backlog without starving BULK.
+
+    Items are pushed with a group (the partition) and pop() takes filters: `group_eligible` skips whole groups, e.g.
+    partitions already running their share, and `eligible` skips single items. Within a lane the oldest eligible
+    item goes first; a lane without one is skipped and earns no credit.
+    """
+
+    def __init__(self, weights: tuple[int, ...] = CONSUMER_PRIORITY_WEIGHTS):
+        self.weights = tuple(weights[priority] if priority < len(weights) else 1 for priority in Priority)
+        self._lanes: dict[Priority, dict[object, deque]] = {priority: {} for priority in Priority}
+        self._credit = {priority: 0 for priority in Priority}
+        self._sequence = 0
+        self._size = 0
+        self.stats = {priority.name.lower(): {"queued": 0, "dequeued": 0, "wait_seconds": 0.0} for priority in Priority}
+
+    def __len__(self):
+        return self._size
+
+    def push(self, priority: Priority, item, group=None):
+        priority = as_priority(priority)
+        priority = Priority.NORMAL if priority is None else priority
+        self._lanes[priority].setdefault(group, deque()).append((self._sequence, time.monotonic(), item))
+        self._sequence += 1
+        self._size += 1
+        self.stats[priority.name.lower()]["queued"] += 1
+
+    def _oldest(self, lane: dict[object, deque], group_eligible, eligible) -> Optional[tuple[object, int]]:
+        """(group, index) of the lane's oldest eligible item."""
+        oldest, oldest_sequence = None, None
+        for group, queue in lane.items():
+            if group_eligible is not None and not group_eligible(group):
+                continue
+            for index, (sequence, _, item) in enumerate(queue):
+                if oldest_sequence is not None and sequence > oldest_sequence:
+                    break
+                if eligible is None or eligible(item):
+                    oldest, oldest_sequence = (group, index), sequence
+                    break
+        return oldest
+
+    def pop(self, eligible: Callable[[object], bool] = None, group_eligible: Callable[[object], bool] = None):
+        """The next item to run, or None when no lane has an eligible one."""
+        candidates = {}
+        for priority, lane in self._lanes.items():
+            if lane:
+                oldest = self._oldest(lane, group_eligible, eligible)
+                if oldest is not None:
+                    candidates[priority] = oldest
+        if not candidates:
+            return None
+        total = 0
+        for priority in candidates:
+            self._credit[priority] += self.weights[priority]
+            total += self.weights[priority]
+        chosen = min(candidates, key=lambda priority: (-self._credit[priority], priority))
+        self._credit[chosen] -= total
+
+        group, index = candidates[chosen]
+        queue = self._lanes[chosen][group]
+        _, queued_at, item = queue[index]
+        del queue[index]
+        if not queue:
+            del self._lanes[chosen][group]
+        self._size -= 1
+        stats = self.stats[chosen.name.lower()]
+        stats["dequeued"] += 1
+        stats["wait_seconds"] += time.monotonic() - queued_at
+        return item
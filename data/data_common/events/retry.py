@@ -0,0 +1,301 @@
+"""
+Retries of failed events that do not hold their partition.
+
+When GenieConsumer.process_event raises, the event is stored in event_retries, due after an exponential backoff, and
+the consumer moves on to the partition's next event; the checkpoint may pass the failed event since the row holds it.
+The consumer group's RetryScheduler polls the due rows and runs them through the consumer's handle_event again,
+beside the live traffic. Retried events may therefore be handled after newer events of the same object.
+
+An event that failed RETRY_MAX_ATTEMPTS times, first attempt included, is a poison event: it moves to
+dead_letter_events and the consumer's failure handling (status FAILED, PROFILE_ERROR / MEETING_ERROR) runs as it did
+for every failure before. Dead letters are inspected, replayed or purged from the admin API.
+
+Clients that wait out transient errors inline (LangSmith prompt retries, Apollo rate limits) call
+defer_inline_retry() before a wait: within a consumer handling an event, waits longer than
+RETRY_INLINE_MAX_WAIT_SECONDS, and blocking waits of any length, raise RetryLater and the event is retried later
+instead.
+
+Settings: EVENT_RETRIES (true / false), RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY_SECONDS, RETRY_MAX_DELAY_SECONDS,
+RETRY_INLINE_MAX_WAIT_SECONDS, RETRY_POLL_SECONDS, RETRY_BATCH_SIZE, RETRY_LEASE_SECONDS; the first three can be
+overridden per consumer group, e.g. RETRY_MAX_ATTEMPTS_LANGSMITHCONSUMERGROUP.
+"""
+import asyncio
+import random
+import re
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from common.genie_logger import GenieLogger
+from common.utils import env_utils
+from data.data_common.events.genie_envelope import GenieEnvelope
+from data.data_common.events.local_event_bus import LocalEvent
+from data.data_common.events.wire_format import event_body_bytes, property_str
+
+logger = GenieLogger()
+
+EVENT_RETRIES = env_utils.get("EVENT_RETRIES", "true").lower() == "true"
+RETRY_MAX_ATTEMPTS = int(env_utils.get("RETRY_MAX_ATTEMPTS", "5"))
+RETRY_BASE_DELAY_SECONDS = float(env_utils.get("RETRY_BASE_DELAY_SECONDS", "30"))
+RETRY_MAX_DELAY_SECONDS = float(env_utils.get("RETRY_MAX_DELAY_SECONDS", "3600"))
+RETRY_INLINE_MAX_WAIT_SECONDS = float(env_utils.get("RETRY_INLINE_MAX_WAIT_SECONDS", "5"))
+RETRY_POLL_SECONDS = float(env_utils.get("RETRY_POLL_SECONDS", "5"))
+RETRY_BATCH_SIZE = int(env_utils.get("RETRY_BATCH_SIZE", "20"))
+# A claimed retry that did not finish within the lease (e.g. its replica crashed) is due again
+RETRY_LEASE_SECONDS = float(env_utils.get("RETRY_LEASE_SECONDS", "900"))
+
+# Properties of a retried event: the id of its event_retries row and how many attempts failed before this one
+RETRY_ID_PROPERTY = "retry_id"
+RETRY_ATTEMPT_PROPERTY = "retry_attempt"
+
+_retries_deferred: ContextVar[bool] = ContextVar("retries_deferred", default=False)
+
+
+class RetryLater(BaseException):
+    """
+    Gives up handling the event for now; it is retried after `delay_seconds`, or the policy's backoff when None.
+    A BaseException, like asyncio.CancelledError, so that it is not swallowed by the `except Exception` of handlers
+    and clients between the raise and GenieConsumer.
+    """
+
+    def __init__(self, message: str = "", delay_seconds: Optional[float] = None):
+        super().__init__(message)
+        self.delay_seconds = delay_seconds
+
+
+def retries_deferred() -> bool:
+    """Whether the event being handled is retried by a RetryScheduler when it fails."""
+    return _retries_deferred.get()
+
+
+def set_retries_deferred(deferred: bool):
+    _retries_deferred.set(deferred)
+
+
+def defer_inline_retry(wait_seconds: float, reason: str, delay_seconds: Optional[float] = None, blocking: bool = False):
+    """
+    Called by clients before waiting `wait_seconds` to retry inline. Raises RetryLater when the wait would hold a
+    consumer's partition longer than RETRY_INLINE_MAX_WAIT_SECONDS, or at all when `blocking` (a time.sleep holds
+    every partition of the process); returns otherwise, e.g. in the API.
+    """
+    if retries_deferred() and (blocking or wait_seconds > RETRY_INLINE_MAX_WAIT_SECONDS):
+        raise RetryLater(reason, delay_seconds)
+
+
+class RetryPolicy:
+    """
+    How often and when a failed event is tried again: up to `max_attempts` attempts in total, the n-th retry
+    `base_delay_seconds` * 2^(n-1) after the failure, capped at `max_delay_seconds`, with jitter.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        base_delay_seconds: float = RETRY_BASE_DELAY_SECONDS,
+        max_delay_seconds: float = RETRY_MAX_DELAY_SECONDS,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay_seconds = max(0.0, base_delay_seconds)
+        self.max_delay_seconds = max(self.base_delay_seconds, max_delay_seconds)
+
+    @classmethod
+    def for_consumer_group(cls, consumer_group: str) -> "RetryPolicy":
+        """RETRY_MAX_ATTEMPTS / RETRY_*_DELAY_SECONDS, overridden by the variables suffixed with the group name."""
+        suffix = re.sub(r"[^A-Z0-9]", "_", consumer_group.upper()).strip("_")
+        max_attempts = env_utils.get(f"RETRY_MAX_ATTEMPTS_{suffix}", "") if suffix else ""
+        base_delay = env_utils.get(f"RETRY_BASE_DELAY_SECONDS_{suffix}", "") if suffix else ""
+        max_delay = env_utils.get(f"RETRY_MAX_DELAY_SECONDS_{suffix}", "") if suffix else ""
+        return cls(
+            max_attempts=int(max_attempts) if max_attempts else RETRY_MAX_ATTEMPTS,
+            base_delay_seconds=float(base_delay) if base_delay else RETRY_BASE_DELAY_SECONDS,
+            max_delay_seconds=float(max_delay) if max_delay else RETRY_MAX_DELAY_SECONDS,
+        )
+
+    def exhausted(self, attempts: int) -> bool:
+        return attempts >= self.max_attempts
+
+    def delay(self, attempts: int) -> float:
+        """Seconds until the next attempt after `attempts` failed ones; between half and all of the capped backoff."""
+        backoff = min(self.max_delay_seconds, self.base_delay_seconds * 2 ** max(0, attempts - 1))
+        return random.uniform(backoff / 2, backoff)
+
+    def __repr__(self):
+        return (f"RetryPolicy(max_attempts={self.max_attempts}, base_delay_seconds={self.base_delay_seconds}, "
+                f"max_delay_seconds={self.max_delay_seconds})")
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _stored_properties(properties: Optional[dict]) -> dict:
+    stored = {}
+    for key, value in (properties or {}).items():
+        key = key.decode("utf-8") if isinstance(key, bytes) else str(key)
+        if key in (RETRY_ID_PROPERTY, RETRY_ATTEMPT_PROPERTY):
+            continue
+        stored[key] = value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+    return stored
+
+
+def failed_event_envelope(row: dict) -> GenieEnvelope:
+    """A stored failed event (a row of event_retries or dead_letter_events) as a received event."""
+    properties = {key.encode("utf-8"): str(value).encode("utf-8") for key, value in (row.get("properties") or {}).items()}
+    properties[RETRY_ID_PROPERTY.encode()] = str(row["id"]).encode()
+    properties[RETRY_ATTEMPT_PROPERTY.encode()] = str(row.get("attempts") or 0).encode()
+    return GenieEnvelope(LocalEvent(row["body"], properties, None, row["id"]))
+
+
+class RetryScheduler:
+    """
+    The failed events of one consumer group. `handler` is the consumer's handle_event: it calls schedule() when an
+    event fails, whether received or retried, and run() feeds it the events whose retry is due.
+
+    `repository` is a FailedEventsRepository or anything with its insert_retry, claim_due, reschedule, delete_retry
+    and dead_letter methods.
+    """
+
+    def __init__(
+        self,
+        consumer_group: str,
+        handler: Callable[[GenieEnvelope], Awaitable[None]],
+        repository,
+        policy: RetryPolicy = None,
+        enabled: bool = EVENT_RETRIES,
+        poll_seconds: float = RETRY_POLL_SECONDS,
+        batch_size: int = RETRY_BATCH_SIZE,
+        lease_seconds: float = RETRY_LEASE_SECONDS,
+    ):
+        self.consumer_group = consumer_group
+        self.handler = handler
+        self.repository = repository
+        self.policy = policy or RetryPolicy.for_consumer_group(consumer_group)
+        self.enabled = enabled and repository is not None
+        self.poll_seconds = poll_seconds
+        self.batch_size = max(1, batch_size)
+        self.lease_seconds = lease_seconds
+        # Claimed rows being retried, by id; schedule() takes out the ones that failed again
+        self._running: dict[int, dict] = {}
+        self._stopping: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"scheduled": 0, "retried": 0, "succeeded": 0, "dead_lettered": 0, "store_failures": 0}
+
+    def schedule(self, envelope: GenieEnvelope, error: BaseException) -> bool:
+        """
+        Records a failed attempt of the event. True when it will be retried; False when it was dead-lettered or could
+        not be stored, and the caller reports the failure as final.
+        """
+        if not self.enabled:
+            return False
+        retry_id = _int(property_str(envelope.properties, RETRY_ID_PROPERTY))
+        row = self._running.pop(retry_id, None) if retry_id is not None else None
+        attempts = (_int(property_str(envelope.properties, RETRY_ATTEMPT_PROPERTY)) or 0) + 1
+        last_error = f"{type(error).__name__}: {error}"[:4000]
+        body = event_body_bytes(envelope.event)
+        body = body.encode("utf-8") if isinstance(body, str) else body
+        properties = _stored_properties(envelope.properties)
+        try:
+            if self.policy.exhausted(attempts):
+                dead_letter_id = self.repository.dead_letter(
+                    retry_id if row else None, self.consumer_group, envelope.topic, body, properties, attempts,
+                    last_error, row.get("first_failed_at") if row else None,
+                )
+                self.stats["dead_lettered"] += 1
+                logger.error(f"Event of {envelope.topic} failed {attempts} times, moved to dead letters "
+                             f"[ID={dead_letter_id}]. Consumer group: {self.consumer_group}")
+                return False
+            delay = getattr(error, "delay_seconds", None)
+            delay = self.policy.delay(attempts) if delay is None else max(0.0, delay)
+            next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            if row:
+                self.repository.reschedule(retry_id, attempts, last_error, next_attempt_at)
+            else:
+                retry_id = self.repository.insert_retry(self.consumer_group, envelope.topic, body, properties,
+                                                        attempts, last_error, next_attempt_at)
+            self.stats["scheduled"] += 1
+            logger.warning(f"Retrying event of {envelope.topic} in {delay:.1f}s after {attempts} failed attempts "
+                           f"[RETRY_ID={retry_id}]. Consumer group: {self.consumer_group}")
+            return True
+        except Exception as e:
+            self.stats["store_failures"] += 1
+            logger.error(f"Failed to store failed event of {envelope.topic}: {e}")
+            return False
+
+    async def poll(self) -> int:
+        """Runs the retries that are due, concurrently; returns how many were due."""
+        rows = self.repository.claim_due(self.consumer_group, self.batch_size, self.lease_seconds)
+        if rows:
+            await asyncio.gather(*(self._retry(row) for row in rows))
+        return len(rows)
+
+    async def _retry(self, row: dict):
+        self._running[row["id"]] = row
+        self.stats["retried"] += 1
+        envelope = failed_event_envelope(row)
+        try:
+            await self.handler(envelope)
+        except (Exception, RetryLater) as e:
+            # Handlers report their own failures; this covers one that raised past its handling
+            if row["id"] in self._running:
+                self.schedule(envelope, e)
+        # Still running unless the handler scheduled it again: it succeeded
+        if self._running.pop(row["id"], None) is None:
+            return
+        try:
+            self.repository.delete_retry(row["id"])
+            self.stats["succeeded"] += 1
+        except Exception as e:
+            # The retry runs again when its lease expires
+            self.stats["store_failures"] += 1
+            logger.error(f"Failed to delete retry {row['id']}: {e}")
+
+    async def run(self):
+        """Polls for due retries until stop()."""
+        if not self.enabled:
+            return
+        self._stopping = asyncio.Event()
+        logger.info(f"Retrying failed events of consumer group {self.consumer_group} with {self.policy}")
+        while not self._stopping.is_set():
+            try:
+                due = await self.poll()
+            except Exception as e:
+                logger.error(f"Failed to poll retries of consumer group {self.consumer_group}: {e}")
+                due = 0
+            if due < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self) -> Optional[asyncio.Task]:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self, timeout: Optional[float] = None):
+        """Stops polling and waits for the retries running; ones still running then are cancelled and run again later."""
+        if self._stopping is not None:
+            self._stopping.set()
+        task, self._task = self._task, None
+        if task is None:
+            return
+        try:
+            await asyncio.wait_for(task, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Retries of consumer group {self.consumer_group} still running, cancelled")
+        except Exception as e:
+            logger.error(f"Retry scheduler of consumer group {self.consumer_group} failed: {e}")
+
+
+def retry_scheduler(consumer_group: str, handler: Callable[[GenieEnvelope], Awaitable[None]]) -> RetryScheduler:
+    """The RetryScheduler of a consumer group over the event_retries and dead_letter_events tables."""
+    repository = None
+    if EVENT_RETRIES:
+        # Imported here so that the module does not need the database settings, e.g. in tests
+        from data.data_common.repositories.failed_events_repository import FailedEventsRepository
+
+        repository = FailedEventsRepository()
+    return RetryScheduler(consumer_group, handler, repository)
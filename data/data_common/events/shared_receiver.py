@@ -0,0 +1,212 @@
+import asyncio
+from collections import deque
+from typing import Iterable, Optional
+
+from common.genie_logger import GenieLogger
+from common.utils import env_utils
+from data.data_common.events.checkpointing import CheckpointPolicy, Checkpointer
+from data.data_common.events.local_event_bus import ALL_TOPICS
+
+logger = GenieLogger()
+
+# With SHARED_RECEIVER=true, start_consumers reads the event hub once for all consumers of the process
+SHARED_RECEIVER = env_utils.get("SHARED_RECEIVER", "false").lower() == "true"
+SHARED_RECEIVER_CONSUMER_GROUP = env_utils.get("SHARED_RECEIVER_CONSUMER_GROUP", "shared_receiver_consumer_group")
+
+
+class _Handler:
+    """A consumer behind the shared receiver: its own dispatcher (concurrency limits) and checkpointer."""
+
+    def __init__(self, consumer):
+        self.consumer = consumer
+        self.consumer_group = consumer.consumer_group
+        self.contexts: dict[str, "HandlerPartitionContext"] = {}
+        # Sequence number of the consumer group's own checkpoint per partition; events up to it were processed
+        self.processed_through: dict[str, int] = {}
+
+
+class HandlerPartitionContext:
+    """
+    The partition context a consumer sees behind a SharedReceiver. update_checkpoint records the consumer's own
+    progress: in its consumer group's checkpoint (when there is a checkpoint store) and towards the shared one.
+    """
+
+    def __init__(self, receiver: "SharedReceiver", handler: _Handler, partition_context):
+        self.consumer_group = handler.consumer_group
+        self.partition_id = partition_context.partition_id
+        self.fully_qualified_namespace = partition_context.fully_qualified_namespace
+        self.eventhub_name = partition_context.eventhub_name
+        self.shared_context = partition_context
+        self._receiver = receiver
+        self._handler = handler
+
+    async def update_checkpoint(self, event=None, **kwargs):
+        if event is not None:
+            await self._receiver.commit(self._handler, self, event)
+
+
+class _PartitionProgress:
+    """Received events of one partition, each with the consumers that have not checkpointed past it yet."""
+
+    def __init__(self):
+        self.events: deque[tuple[object, set]] = deque()
+
+    def __len__(self):
+        return len(self.events)
+
+    def receive(self, event, handlers: list[_Handler]) -> Optional[object]:
+        self.events.append((event, set(handlers)))
+        return None if handlers else self._release()
+
+    def commit(self, handler: _Handler, sequence_number: int) -> Optional[object]:
+        for event, waiting in self.events:
+            if event.sequence_number > sequence_number:
+                break
+            waiting.discard(handler)
+        return self._release()
+
+    def _release(self) -> Optional[object]:
+        """Drops the leading events every consumer is done with; returns the newest of them."""
+        released = None
+        while self.events and not self.events[0][1]:
+            released, _ = self.events.popleft()
+        return released
+
+
+class SharedReceiver:
+    """
+    One receiver for all consumers of a process, instead of a receiver (and a full copy of the event stream) per
+    consumer group.
+
+    Events are routed by their `topic` application property alone, without decoding the body, to the consumers whose
+    `topics` contain it (or "*"); events no consumer wants are only counted. Each consumer keeps its own
+    PartitionDispatcher, so its concurrency limits apply as before, and its own Checkpointer, whose writes go to the
+    consumer's own consumer group in the checkpoint store. Switching SHARED_RECEIVER on or off therefore continues
+    every consumer where it stopped. The shared group is checkpointed at the newest event all consumers are past,
+    which is where the shared receiver resumes; events a consumer already checkpointed are not dispatched to it again.
+
+    A consumer out of slots holds back the partition for every consumer, as its own receiver would have for itself.
+    The consumers' RetrySchedulers run beside the receiver, as they do beside each consumer's own receiver.
+    """
+
+    def __init__(
+        self,
+        consumers: Iterable,
+        receiver,
+        checkpoint_store=None,
+        consumer_group: str = SHARED_RECEIVER_CONSUMER_GROUP,
+        checkpoint_policy: CheckpointPolicy = None,
+    ):
+        self.consumer_group = consumer_group
+        self.receiver = receiver
+        self.checkpoint_store = checkpoint_store
+        self.handlers = [_Handler(consumer) for consumer in consumers]
+        self.checkpointer = Checkpointer(checkpoint_policy or CheckpointPolicy.for_consumer_group(consumer_group))
+        self._everything = [handler for handler in self.handlers if ALL_TOPICS in handler.consumer.topics]
+        self._routes: dict[bytes, list[_Handler]] = {}
+        for handler in self.handlers:
+            for topic in handler.consumer.topics:
+                if topic != ALL_TOPICS:
+                    self._routes.setdefault(topic.encode("utf-8"), list(self._everything)).append(handler)
+        self._progress: dict[str, _PartitionProgress] = {}
+        self.prefetch = max((handler.consumer.prefetch for handler in self.handlers), default=1)
+        self.stats = {"received": 0, "dispatched": 0, "unrouted": 0, "skipped": 0}
+
+    @property
+    def topics(self) -> list[str]:
+        return sorted(topic.decode("utf-8") for topic in self._routes)
+
+    def handlers_for(self, topic: Optional[bytes]) -> list[_Handler]:
+        return self._routes.get(topic, self._everything)
+
+    def _context(self, handler: _Handler, partition_context) -> HandlerPartitionContext:
+        context = handler.contexts.get(partition_context.partition_id)
+        if context is None or context.shared_context is not partition_context:
+            context = handler.contexts[partition_context.partition_id] = HandlerPartitionContext(self, handler, partition_context)
+        return context
+
+    async def on_event(self, partition_context, event):
+        partition_id = partition_context.partition_id
+        self.stats["received"] += 1
+        routed = self.handlers_for(event.properties.get(b"topic"))
+        handlers = [handler for handler in routed if event.sequence_number > handler.processed_through.get(partition_id, -1)]
+        if not routed:
+            self.stats["unrouted"] += 1
+        self.stats["skipped"] += len(routed) - len(handlers)
+        released = self._progress.setdefault(partition_id, _PartitionProgress()).receive(event, handlers)
+        for handler in handlers:
+            await handler.consumer.on_event(self._context(handler, partition_context), event)
+        self.stats["dispatched"] += len(handlers)
+        if released is not None:
+            await self.checkpointer.advance(partition_context, released)
+
+    async def commit(self, handler: _Handler, context: HandlerPartitionContext, event):
+        """Called through a consumer's Checkpointer once it processed `event` and everything before it."""
+        if self.checkpoint_store is not None:
+            await self.checkpoint_store.update_checkpoint({
+                "fully_qualified_namespace": context.fully_qualified_namespace,
+                "eventhub_name": context.eventhub_name,
+                "consumer_group": handler.consumer_group,
+                "partition_id": context.partition_id,
+                "offset": event.offset,
+                "sequence_number": event.sequence_number,
+            })
+        progress = self._progress.get(context.partition_id)
+        released = progress.commit(handler, event.sequence_number) if progress else None
+        if released is not None:
+            await self.checkpointer.advance(context.shared_context, released)
+
+    async def on_partition_initialize(self, partition_context):
+        partition_id = partition_context.partition_id
+        self._progress[partition_id] = _PartitionProgress()
+        if self.checkpoint_store is None:
+            return
+        for handler in self.handlers:
+            checkpoints = await self.checkpoint_store.list_checkpoints(
+                partition_context.fully_qualified_namespace, partition_context.eventhub_name, handler.consumer_group
+            )
+            sequence_number = next(
+                (checkpoint.get("sequence_number") for checkpoint in checkpoints if checkpoint.get("partition_id") == partition_id),
+                None,
+            )
+            if sequence_number is None:
+                handler.processed_through.pop(partition_id, None)
+            else:
+                handler.processed_through[partition_id] = int(sequence_number)
+
+    async def on_partition_close(self, partition_context, reason):
+        logger.info(f"Partition {partition_context.partition_id} closed ({reason}). Consumer group: {self.consumer_group}")
+        for handler in self.handlers:
+            context = handler.contexts.get(partition_context.partition_id)
+            if context is not None:
+                await handler.consumer.checkpointer.flush_partition(context)
+        await self.checkpointer.flush_partition(partition_context)
+
+    def _retry_schedulers(self) -> list:
+        return [handler.consumer.retries for handler in self.handlers if getattr(handler.consumer, "retries", None)]
+
+    async def start(self):
+        logger.info(f"Starting shared receiver on group {self.consumer_group} for consumer groups: "
+                    f"{[handler.consumer_group for handler in self.handlers]}")
+        for retries in self._retry_schedulers():
+            retries.start()
+        async with self.receiver:
+            await self.receiver.receive(
+                on_event=self.on_event,
+                on_partition_initialize=self.on_partition_initialize,
+                on_partition_close=self.on_partition_close,
+                starting_position="-1",
+                prefetch=self.prefetch,
+            )
+
+    async def stop(self, timeout: Optional[float] = None):
+        """
+        Stops the consumers' retries, lets every consumer finish its events in flight, writes all checkpoints and
+        closes the receiver.
+        """
+        await asyncio.gather(*(retries.stop(timeout=timeout) for retries in self._retry_schedulers()))
+        await asyncio.gather(*(handler.consumer.dispatcher.drain(timeout=timeout) for handler in self.handlers))
+        for handler in self.handlers:
+            await handler.consumer.checkpointer.flush()
+        await self.checkpointer.flush()
+        await self.receiver.close()
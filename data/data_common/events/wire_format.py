@@ -0,0 +1,120 @@
+"""
+Event body formats, told apart by the `wire_version` application property:
+
+1 (no property): the legacy body, the payload as a JSON string JSON encoded again, as UTF-8 text.
+2: the payload encoded once with orjson. Bodies over EVENT_COMPRESSION_THRESHOLD_BYTES are gzip compressed when
+   that makes them smaller, flagged by `content_encoding: gzip`.
+
+Consumers read both. Producers write the legacy body until EVENT_WIRE_VERSION=2 is set, once no consumer of an
+older release reads the event hub anymore.
+"""
+import gzip
+import json
+from typing import Optional
+
+import orjson
+
+from common.utils import env_utils
+from common.utils.event_utils import decode_event_body
+
+WIRE_VERSION_PROPERTY = "wire_version"
+CONTENT_ENCODING_PROPERTY = "content_encoding"
+LEGACY_WIRE_VERSION = 1
+WIRE_VERSION = 2
+GZIP = "gzip"
+
+EVENT_WIRE_VERSION = int(env_utils.get("EVENT_WIRE_VERSION", str(LEGACY_WIRE_VERSION)))
+# "gzip" or "none"
+EVENT_COMPRESSION = env_utils.get("EVENT_COMPRESSION", GZIP).lower()
+EVENT_COMPRESSION_THRESHOLD_BYTES = int(env_utils.get("EVENT_COMPRESSION_THRESHOLD_BYTES", "4096"))
+EVENT_COMPRESSION_LEVEL = int(env_utils.get("EVENT_COMPRESSION_LEVEL", "1"))
+
+
+def property_str(properties: Optional[dict], key: str) -> Optional[str]:
+    """An application property as a string, whether it was sent (str keys) or received (bytes keys and values)."""
+    if not properties:
+        return None
+    value = properties.get(key.encode("utf-8"), properties.get(key))
+    if isinstance(value, bytes):
+        return value.decode("utf-8") or None
+    return str(value) if value not in (None, "") else None
+
+
+def _dumps(payload) -> bytes:
+    try:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        # e.g. integers beyond 64 bits, which the json module still writes
+        return json.dumps(payload).encode("utf-8")
+
+
+def encode_payload(
+    payload: dict | str,
+    version: int = None,
+    compression: str = None,
+    threshold: int = None,
+) -> tuple[bytes | str, dict]:
+    """
+    The body and the application properties describing it for a payload (a dict, or a JSON string already encoded
+    once). Returns a str body for the legacy format and bytes otherwise.
+    """
+    version = version or EVENT_WIRE_VERSION
+    if version == LEGACY_WIRE_VERSION:
+        return json.dumps(payload if isinstance(payload, str) else json.dumps(payload)), {}
+    if version != WIRE_VERSION:
+        raise ValueError(f"Unsupported event wire format version {version}")
+
+    body = payload.encode("utf-8") if isinstance(payload, str) else _dumps(payload)
+    properties = {WIRE_VERSION_PROPERTY: str(WIRE_VERSION)}
+    compression = compression or EVENT_COMPRESSION
+    if compression == GZIP and len(body) > (EVENT_COMPRESSION_THRESHOLD_BYTES if threshold is None else threshold):
+        compressed = gzip.compress(body, compresslevel=EVENT_COMPRESSION_LEVEL)
+        if len(compressed) < len(body):
+            body = compressed
+            properties[CONTENT_ENCODING_PROPERTY] = GZIP
+    return body, properties
+
+
+def event_body_bytes(event) -> bytes | str:
+    """The raw body of a received (or prepared) event: azure EventData yields its data sections, LocalEvent has it."""
+    body = event.body
+    if isinstance(body, (bytes, str)):
+        return body
+    return b"".join(body)
+
+
+def wire_version(event) -> int:
+    version = property_str(getattr(event, "properties", None), WIRE_VERSION_PROPERTY)
+    return int(version) if version else LEGACY_WIRE_VERSION
+
+
+def _json_bytes(event) -> bytes | str:
+    """The JSON document of a version 2 body, decompressed."""
+    body = event_body_bytes(event)
+    encoding = property_str(event.properties, CONTENT_ENCODING_PROPERTY)
+    if encoding == GZIP:
+        return gzip.decompress(body)
+    if encoding:
+        raise ValueError(f"Unsupported event content encoding {encoding}")
+    return body
+
+
+def decode_event(event):
+    """The payload of a received event in any wire format version."""
+    version = wire_version(event)
+    if version == LEGACY_WIRE_VERSION:
+        return decode_event_body(event.body_as_str())
+    if version != WIRE_VERSION:
+        raise ValueError(f"Unsupported event wire format version {version}")
+    try:
+        return orjson.loads(_json_bytes(event))
+    except orjson.JSONDecodeError:
+        return json.loads(_json_bytes(event))
+
+
+def event_text(event) -> str:
+    """The body as text, for logs and error reports: the legacy body as is, the JSON document otherwise."""
+    if wire_version(event) == LEGACY_WIRE_VERSION:
+        return event.body_as_str()
+    text = _json_bytes(event)
+    return text.decode("utf-8") if isinstance(text, bytes) else text
@@ -3,6 +3,7 @@ import psycopg2
 import json
 from common.genie_logger import GenieLogger
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import register_schema
 from typing import List, Optional, Any
 from data.data_common.data_transfer_objects.badges_dto import (
     BadgeDTO,
@@ -16,7 +17,7 @@ logger = GenieLogger()
 
 class BadgesRepository:
     def __init__(self):
-        self.create_tables_if_not_exists()
+        register_schema(self.create_tables_if_not_exists)
 
     def create_tables_if_not_exists(self):
         badge_table_query = """
@@ -9,12 +9,13 @@ from pydantic import AnyUrl, ValidationError
 from common.utils.str_utils import get_uuid4
 from data.data_common.data_transfer_objects.company_dto import CompanyDTO, NewsData
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import register_schema
 logger = GenieLogger()
 
 
 class CompaniesRepository:
     def __init__(self):
-        self.create_table_if_not_exists()
+        register_schema(self.create_table_if_not_exists)
 
     def create_table_if_not_exists(self):
         create_table_query = """
@@ -95,6 +96,14 @@ class CompaniesRepository:
                 traceback.print_exc()
                 return None
 
+    def get_companies_by_domains(self, domains: List[str]) -> dict[str, CompanyDTO]:
+        """
+        Set-based get_company_from_domain: maps each domain that has a company to it, in one round-trip.
+        """
+        if not domains:
+            return {}
+        return {company.domain: company for company in self.get_companies_from_domains(list(set(domains)))}
+
     def get_companies_from_domains(self, domains: List[str]) -> List[CompanyDTO]:
         select_query = """
         SELECT uuid, name, domain, address, country, logo, founded_year, size, industry, description, overview, challenges, technologies, employees, social_links, annual_revenue, total_funding, funding_rounds, news
@@ -155,7 +164,6 @@ class CompaniesRepository:
                 return None
 
     def save_company_without_news(self, company: CompanyDTO):
-        self.create_table_if_not_exists()
         if not company.uuid:
             company.uuid = get_uuid4()
         if self.exists_domain(company.domain):
@@ -258,7 +266,6 @@ class CompaniesRepository:
                 return []
 
     def save_news(self, uuid, news: Union[List[NewsData], List[dict]]):
-        self.create_table_if_not_exists()
         self.validate_news(news)
         if not news:
             logger.error(f"Invalid news data: {news}, skip saving news")
@@ -2,13 +2,14 @@ from typing import Optional
 import psycopg2
 from common.genie_logger import GenieLogger
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import register_schema
 from data.data_common.data_transfer_objects.contact_dto import ContactDTO
 logger = GenieLogger()
 
 
 class ContactsRepository:
     def __init__(self):
-        self.create_table_if_not_exists()
+        register_schema(self.create_table_if_not_exists)
 
     def create_table_if_not_exists(self):
         create_table_query = """
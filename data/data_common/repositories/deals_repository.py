@@ -2,6 +2,7 @@ import traceback
 import psycopg2
 from common.genie_logger import GenieLogger
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import register_schema
 from typing import List, Optional
 from data.data_common.data_transfer_objects.deal_dto import (
     DealDTO,
@@ -12,7 +13,7 @@ logger = GenieLogger()
 
 class DealsRepository:
     def __init__(self):
-        self.create_tables_if_not_exists()
+        register_schema(self.create_tables_if_not_exists)
 
     def create_tables_if_not_exists(self):
         deal_table_query = """
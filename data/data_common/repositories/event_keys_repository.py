@@ -0,0 +1,144 @@
+from datetime import datetime
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from common.genie_logger import GenieLogger
+from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import register_schema
+
+logger = GenieLogger()
+
+
+# What lease() found for a key
+KEY_CLAIMED = "claimed"
+KEY_DONE = "done"
+KEY_PROCESSING = "processing"
+
+
+class EventKeysRepository:
+    """
+    Idempotency keys of sent and processed events, each held until its expires_at (see EventCoalescer). Keys of
+    events being processed are leases, `done` once the event was processed.
+    """
+
+    def __init__(self):
+        register_schema(self.create_table_if_not_exists)
+
+    def create_table_if_not_exists(self):
+        create_table_query = """
+            CREATE TABLE IF NOT EXISTS event_keys (
+                key VARCHAR PRIMARY KEY,
+                expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                done BOOLEAN NOT NULL DEFAULT TRUE
+            );
+        """
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(create_table_query)
+                    conn.commit()
+            except psycopg2.Error as error:
+                logger.error(f"Error creating table: {error.pgerror}")
+
+    def claim(self, keys: list[tuple[str, datetime]]) -> set[str]:
+        """
+        Claims the keys that are free or expired until their expiry, in one round-trip.
+
+        :param keys: (key, expires_at), each key at most once
+        :return: the keys claimed; the others are held by an earlier claim
+        """
+        query = """
+            INSERT INTO event_keys (key, expires_at)
+            VALUES %s
+            ON CONFLICT (key) DO UPDATE SET expires_at = EXCLUDED.expires_at, done = TRUE
+            WHERE event_keys.expires_at <= NOW()
+            RETURNING key;
+        """
+        if not keys:
+            return set()
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    rows = execute_values(cursor, query, keys, template="(%s, %s::timestamptz)",
+                                          page_size=len(keys), fetch=True)
+                    conn.commit()
+                    return {row[0] for row in rows}
+            except psycopg2.Error as error:
+                conn.rollback()
+                logger.error(f"Error claiming {len(keys)} event keys: {error.pgerror}")
+                raise
+
+    def lease(self, key: str, expires_at: datetime) -> str:
+        """
+        Claims the key, if free or expired, as a lease until `expires_at`.
+
+        :return: KEY_CLAIMED, or KEY_DONE / KEY_PROCESSING when an earlier claim holds it
+        """
+        query = """
+            WITH claimed AS (
+                INSERT INTO event_keys (key, expires_at, done)
+                VALUES (%(key)s, %(expires_at)s, FALSE)
+                ON CONFLICT (key) DO UPDATE SET expires_at = EXCLUDED.expires_at, done = FALSE
+                WHERE event_keys.expires_at <= NOW()
+                RETURNING key
+            )
+            SELECT 'claimed' FROM claimed
+            UNION ALL
+            SELECT CASE WHEN done THEN 'done' ELSE 'processing' END FROM event_keys
+            WHERE key = %(key)s AND NOT EXISTS (SELECT 1 FROM claimed);
+        """
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, {"key": key, "expires_at": expires_at})
+                    row = cursor.fetchone()
+                    conn.commit()
+                    # No row: a concurrent claim inserted the key after this statement's snapshot
+                    return row[0] if row else KEY_PROCESSING
+            except psycopg2.Error as error:
+                conn.rollback()
+                logger.error(f"Error leasing event key {key}: {error.pgerror}")
+                raise
+
+    def renew(self, key: str, expires_at: datetime):
+        """Extends the lease of a key being processed."""
+        self._set_expiry("UPDATE event_keys SET expires_at = %s WHERE key = %s AND NOT done;", key, expires_at)
+
+    def complete(self, key: str, expires_at: datetime):
+        """Marks a leased key done, held until `expires_at`."""
+        self._set_expiry("UPDATE event_keys SET expires_at = %s, done = TRUE WHERE key = %s;", key, expires_at)
+
+    def _set_expiry(self, query: str, key: str, expires_at: datetime):
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (expires_at, key))
+                    conn.commit()
+            except psycopg2.Error as error:
+                conn.rollback()
+                logger.error(f"Error updating event key {key}: {error.pgerror}")
+                raise
+
+    def release(self, key: str):
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("DELETE FROM event_keys WHERE key = %s;", (key,))
+                    conn.commit()
+            except psycopg2.Error as error:
+                conn.rollback()
+                logger.error(f"Error releasing event key {key}: {error.pgerror}")
+                raise
+
+    def delete_expired(self) -> int:
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("DELETE FROM event_keys WHERE expires_at <= NOW();")
+                    conn.commit()
+                    return cursor.rowcount
+            except psycopg2.Error as error:
+                conn.rollback()
+                logger.error(f"Error deleting expired event keys: {error.pgerror}")
+                raise
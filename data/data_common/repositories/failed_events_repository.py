@@ -0,0 +1,242 @@
+from datetime import datetime
+from typing import Optional
+
+import psycopg2
+from psycopg2.extras import Json
+
+from common.genie_logger import GenieLogger
+from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import register_schema
+
+logger = GenieLogger()
+
+RETRY_COLUMNS = ["id", "consumer_group", "topic", "body", "properties", "attempts", "last_error", "first_failed_at"]
+DEAD_LETTER_COLUMNS = [
+    "id", "consumer_group", "topic", "body", "properties", "attempts", "last_error", "first_failed_at", "dead_lettered_at"
+]
+
+
+class FailedEventsRepository:
+    """
+    Failed events of a consumer group: event_retries holds the ones waiting for their next attempt, dead_letter_events
+    the ones that used up their attempts (see RetryScheduler).
+    """
+
+    def __init__(self):
+        register_schema(self.create_tables_if_not_exists)
+
+    def create_tables_if_not_exists(self):
+        create_tables_query = """
+            CREATE TABLE IF NOT EXISTS event_retries (
+                id SERIAL PRIMARY KEY,
+                consumer_group VARCHAR NOT NULL,
+                topic VARCHAR,
+                body BYTEA NOT NULL,
+                properties JSONB,
+                attempts INT NOT NULL DEFAULT 0,
+                last_error TEXT,
+                first_failed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS event_retries_due_idx ON event_retries (consumer_group, next_attempt_at);
+            CREATE TABLE IF NOT EXISTS dead_letter_events (
+                id SERIAL PRIMARY KEY,
+                consumer_group VARCHAR NOT NULL,
+                topic VARCHAR,
+                body BYTEA NOT NULL,
+                properties JSONB,
+                attempts INT NOT NULL DEFAULT 0,
+                last_error TEXT,
+                first_failed_at TIMESTAMP WITH TIME ZONE,
+                dead_lettered_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+            );
+            CREATE INDEX IF NOT EXISTS dead_letter_events_group_idx ON dead_letter_events (consumer_group, dead_lettered_at);
+        """
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(create_tables_query)
+                    conn.commit()
+            except psycopg2.Error as error:
+                logger.error(f"Error creating tables: {error.pgerror}")
+
+    def insert_retry(self, consumer_group: str, topic: Optional[str], body: bytes, properties: dict, attempts: int,
+                     last_error: str, next_attempt_at: datetime) -> int:
+        query = """
+            INSERT INTO event_retries (consumer_group, topic, body, properties, attempts, last_error, next_attempt_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            RETURNING id;
+        """
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (consumer_group, topic, psycopg2.Binary(body), Json(properties), attempts,
+                                           last_error, next_attempt_at))
+                    retry_id = cursor.fetchone()[0]
+                    conn.commit()
+                    return retry_id
+            except psycopg2.Error as error:
+                conn.rollback()
+                logger.error(f"Error inserting retry of {topic} for {consumer_group}: {error.pgerror}")
+                raise
+
+    def claim_due(self, consumer_group: str, limit: int, lease_seconds: float) -> list[dict]:
+        """
+        The consumer group's retries that are due, oldest first. Claimed rows are leased: they are not due again for
+        `lease_seconds`, so other replicas skip them and a crashed replica's claim expires.
+        """
+        query = f"""
+            UPDATE event_retries SET next_attempt_at = NOW() + %s * INTERVAL '1 second'
+            WHERE id IN (
+                SELECT id FROM event_retries
+                WHERE consumer_group = %s AND next_attempt_at <= NOW()
+                ORDER BY next_attempt_at
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING {", ".join(RETRY_COLUMNS)};
+        """
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (lease_seconds, consumer_group, limit))
+                    rows = cursor.fetchall()
+                    conn.commit()
+                    return [self._row_to_dict(RETRY_COLUMNS, row) for row in rows]
+            except psycopg2.Error as error:
+                conn.rollback()
+                logger.error(f"Error claiming due retries for {consumer_group}: {error.pgerror}")
+                raise
+
+    def reschedule(self, retry_id: int, attempts: int, last_error: str, next_attempt_at: datetime):
+        query = "UPDATE event_retries SET attempts = %s, last_error = %s, next_attempt_at = %s WHERE id = %s;"
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (attempts, last_error, next_attempt_at, retry_id))
+                    conn.commit()
+            except psycopg2.Error as error:
+                conn.rollback()
+                logger.error(f"Error rescheduling retry {retry_id}: {error.pgerror}")
+                raise
+
+    def delete_retry(self, retry_id: int):
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("DELETE FROM event_retries WHERE id = %s;", (retry_id,))
+                    conn.commit()
+            except psycopg2.Error as error:
+                conn.rollback()
+                logger.error(f"Error deleting retry {retry_id}: {error.pgerror}")
+                raise
+
+    def dead_letter(self, retry_id: Optional[int], consumer_group: str, topic: Optional[str], body: bytes,
+                    properties: dict, attempts: int, last_error: str, first_failed_at: Optional[datetime]) -> int:
+        """Stores a poison event in dead_letter_events and deletes its retry, if it had one, in one transaction."""
+        query = """
+            INSERT INTO dead_letter_events (consumer_group, topic, body, properties, attempts, last_error, first_failed_at)
+            VALUES (%s, %s, %s, %s, %s, %s, COALESCE(%s, NOW()))
+            RETURNING id;
+        """
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (consumer_group, topic, psycopg2.Binary(body), Json(properties), attempts,
+                                           last_error, first_failed_at))
+                    dead_letter_id = cursor.fetchone()[0]
+                    if retry_id is not None:
+                        cursor.execute("DELETE FROM event_retries WHERE id = %s;", (retry_id,))
+                    conn.commit()
+                    return dead_letter_id
+            except psycopg2.Error as error:
+                conn.rollback()
+                logger.error(f"Error dead-lettering {topic} for {consumer_group}: {error.pgerror}")
+                raise
+
+    @staticmethod
+    def _filters(ids: Optional[list[int]], consumer_group: Optional[str], topic: Optional[str]) -> tuple[str, list]:
+        conditions, params = [], []
+        if ids:
+            conditions.append("id = ANY(%s)")
+            params.append(list(ids))
+        if consumer_group:
+            conditions.append("consumer_group = %s")
+            params.append(consumer_group)
+        if topic:
+            conditions.append("topic = %s")
+            params.append(topic)
+        return (" WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+    def get_dead_letters(self, consumer_group: Optional[str] = None, topic: Optional[str] = None,
+                         ids: Optional[list[int]] = None, limit: int = 100) -> list[dict]:
+        where, params = self._filters(ids, consumer_group, topic)
+        query = f"SELECT {', '.join(DEAD_LETTER_COLUMNS)} FROM dead_letter_events{where} ORDER BY id DESC LIMIT %s;"
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (*params, limit))
+                    return [self._row_to_dict(DEAD_LETTER_COLUMNS, row) for row in cursor.fetchall()]
+            except psycopg2.Error as error:
+                logger.error(f"Error fetching dead letters: {error.pgerror}")
+                return []
+
+    def count_by_consumer_group(self) -> dict[str, dict[str, int]]:
+        """{consumer_group: {"retrying": n, "dead_letters": n}}"""
+        query = """
+            SELECT consumer_group, 'retrying', COUNT(*) FROM event_retries GROUP BY consumer_group
+            UNION ALL
+            SELECT consumer_group, 'dead_letters', COUNT(*) FROM dead_letter_events GROUP BY consumer_group;
+        """
+        counts = {}
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(query)
+                    for consumer_group, kind, count in cursor.fetchall():
+                        counts.setdefault(consumer_group, {"retrying": 0, "dead_letters": 0})[kind] = count
+            except psycopg2.Error as error:
+                logger.error(f"Error counting failed events: {error.pgerror}")
+        return counts
+
+    def replay_dead_letters(self, ids: Optional[list[int]] = None, consumer_group: Optional[str] = None,
+                            topic: Optional[str] = None) -> int:
+        """Moves the matching dead letters back to event_retries, due now with their attempts reset."""
+        where, params = self._filters(ids, consumer_group, topic)
+        query = f"""
+            WITH replayed AS (DELETE FROM dead_letter_events{where} RETURNING *)
+            INSERT INTO event_retries (consumer_group, topic, body, properties, attempts, last_error, first_failed_at,
+                                       next_attempt_at)
+            SELECT consumer_group, topic, body, properties, 0, last_error, first_failed_at, NOW() FROM replayed;
+        """
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, params)
+                    conn.commit()
+                    return cursor.rowcount
+            except psycopg2.Error as error:
+                conn.rollback()
+                logger.error(f"Error replaying dead letters: {error.pgerror}")
+                raise
+
+    def purge_dead_letters(self, ids: Optional[list[int]] = None, consumer_group: Optional[str] = None,
+                           topic: Optional[str] = None) -> int:
+        where, params = self._filters(ids, consumer_group, topic)
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"DELETE FROM dead_letter_events{where};", params)
+                    conn.commit()
+                    return cursor.rowcount
+            except psycopg2.Error as error:
+                conn.rollback()
+                logger.error(f"Error purging dead letters: {error.pgerror}")
+                raise
+
+    @staticmethod
+    def _row_to_dict(columns: list[str], row) -> dict:
+        record = dict(zip(columns, row))
+        if isinstance(record.get("body"), memoryview):
+            record["body"] = record["body"].tobytes()
+        return record
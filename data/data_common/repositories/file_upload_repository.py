@@ -3,6 +3,7 @@ import psycopg2
 from datetime import datetime
 from data.data_common.data_transfer_objects.file_upload_dto import FileUploadDTO, FileStatusEnum
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import register_schema
 from common.genie_logger import GenieLogger
 
 logger = GenieLogger()
@@ -10,7 +11,7 @@ logger = GenieLogger()
 
 class FileUploadRepository:
     def __init__(self):
-        self.create_table_if_not_exists()
+        register_schema(self.create_table_if_not_exists)
 
     def create_table_if_not_exists(self):
         create_table_query = """
@@ -7,13 +7,14 @@ from common.utils.str_utils import get_uuid4
 
 from common.genie_logger import GenieLogger
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import register_schema
 
 logger = GenieLogger()
 
 
 class GoogleCredsRepository:
     def __init__(self):
-        self.create_table_if_not_exists()
+        register_schema(self.create_table_if_not_exists)
 
     def create_table_if_not_exists(self):
         create_table_query = """
@@ -4,13 +4,14 @@ import uuid
 import psycopg2
 from common.genie_logger import GenieLogger
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import register_schema
 
 logger = GenieLogger()
 
 
 class HobbiesRepository:
     def __init__(self):
-        self.create_table_if_not_exists()
+        register_schema(self.create_table_if_not_exists)
 
     def create_table_if_not_exists(self):
         create_table_query = """
@@ -30,7 +31,6 @@ class HobbiesRepository:
                 logger.error("Error creating table:", error)
 
     def insert(self, hobby: {}) -> Optional[int]:
-        self.create_table_if_not_exists()
         insert_query = """
         INSERT INTO hobbies (uuid, hobby_name, icon_url)
         VALUES (%s, %s, %s)
@@ -0,0 +1,112 @@
+from datetime import datetime
+from typing import Optional
+
+import psycopg2
+
+from common.genie_logger import GenieLogger
+from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import register_schema
+
+logger = GenieLogger()
+
+
+class LlmResponsesRepository:
+    """Cached LLM responses by content key, each served until its expires_at (see ResponseCache)."""
+
+    def __init__(self):
+        register_schema(self.create_table_if_not_exists)
+
+    def create_table_if_not_exists(self):
+        create_table_query = """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key VARCHAR PRIMARY KEY,
+                prompt_name VARCHAR NOT NULL,
+                response TEXT NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+                expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_llm_responses_prompt_name ON llm_responses (prompt_name);
+            CREATE INDEX IF NOT EXISTS idx_llm_responses_expires_at ON llm_responses (expires_at);
+        """
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(create_table_query)
+                    conn.commit()
+            except psycopg2.Error as error:
+                logger.error(f"Error creating table: {error.pgerror}")
+
+    def get(self, key: str) -> Optional[tuple[str, datetime]]:
+        """
+        :return: (response, expires_at) of the key, or None when it is not cached or expired
+        """
+        query = "SELECT response, expires_at FROM llm_responses WHERE key = %s AND expires_at > NOW();"
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (key,))
+                    row = cursor.fetchone()
+                    return (row[0], row[1]) if row else None
+            except psycopg2.Error as error:
+                logger.error(f"Error getting LLM response {key}: {error.pgerror}")
+                raise
+
+    def put(self, key: str, prompt_name: str, response: str, expires_at: datetime):
+        query = """
+            INSERT INTO llm_responses (key, prompt_name, response, expires_at)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (key) DO UPDATE
+            SET response = EXCLUDED.response, created_at = NOW(), expires_at = EXCLUDED.expires_at;
+        """
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (key, prompt_name, response, expires_at))
+                    conn.commit()
+            except psycopg2.Error as error:
+                conn.rollback()
+                logger.error(f"Error saving LLM response {key}: {error.pgerror}")
+                raise
+
+    def count_by_prompt(self) -> dict[str, int]:
+        """Unexpired responses per prompt name."""
+        query = """
+            SELECT prompt_name, COUNT(*) FROM llm_responses WHERE expires_at > NOW()
+            GROUP BY prompt_name ORDER BY prompt_name;
+        """
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(query)
+                    return {prompt_name: count for prompt_name, count in cursor.fetchall()}
+            except psycopg2.Error as error:
+                logger.error(f"Error counting LLM responses: {error.pgerror}")
+                raise
+
+    def delete_by_prompt(self, prompt_name: Optional[str] = None) -> int:
+        """Deletes the responses of a prompt, or all of them without one."""
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    if prompt_name:
+                        cursor.execute("DELETE FROM llm_responses WHERE prompt_name = %s;", (prompt_name,))
+                    else:
+                        cursor.execute("DELETE FROM llm_responses;")
+                    conn.commit()
+                    return cursor.rowcount
+            except psycopg2.Error as error:
+                conn.rollback()
+                logger.error(f"Error deleting LLM responses of {prompt_name or 'all prompts'}: {error.pgerror}")
+                raise
+
+    def delete_expired(self) -> int:
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("DELETE FROM llm_responses WHERE expires_at <= NOW();")
+                    conn.commit()
+                    return cursor.rowcount
+            except psycopg2.Error as error:
+                conn.rollback()
+                logger.error(f"Error deleting expired LLM responses: {error.pgerror}")
+                raise
@@ -9,12 +9,36 @@ from common.genie_logger import GenieLogger
 
 logger = GenieLogger()
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.async_postgres_connector import async_db_connection
+from data.data_common.utils.schema_registry import register_schema
+from data.data_common.utils.upsert import Upsert, Merge, UpsertUnavailable
 from data.data_common.data_transfer_objects.meeting_dto import MeetingDTO, AgendaItem, MeetingClassification
 
 
+SELECT_MEETING_DATA_QUERY = """
+SELECT uuid, google_calendar_id, user_id, tenant_id, participants_emails, participants_hash, link, subject, location, start_time, end_time, agenda, classification
+FROM meetings
+WHERE uuid = %s AND classification != %s;
+"""
+
+
 class MeetingsRepository:
     def __init__(self):
-        self.create_table_if_not_exists()
+        register_schema(self.create_table_if_not_exists)
+        # A calendar event is identified per user; re-syncs only write when something changed.
+        # Generated agendas survive calendar updates, which never carry one.
+        self.meeting_upsert = Upsert(
+            "meetings",
+            conflict_columns=("google_calendar_id", "user_id"),
+            rules={
+                "uuid": Merge.INSERT_ONLY,
+                "tenant_id": Merge.INSERT_ONLY,
+                "fake": Merge.INSERT_ONLY,
+                "agenda": Merge.KEEP_IF_NULL,
+            },
+            returning=("uuid",),
+            only_if_changed=True,
+        )
 
     def create_table_if_not_exists(self):
         create_table_query = """
@@ -31,6 +55,8 @@ class MeetingsRepository:
             location VARCHAR,
             start_time VARCHAR,
             end_time VARCHAR,
+            start_time_tz TIMESTAMPTZ,
+            end_time_tz TIMESTAMPTZ,
             goals JSONB,
             agenda JSONB,
             classification VARCHAR,
@@ -54,8 +80,8 @@ class MeetingsRepository:
             return None
         insert_query = """
         INSERT INTO meetings (uuid, google_calendar_id, user_id, tenant_id, participants_emails, participants_hash, link,
-         subject, location, start_time, end_time, classification, reminder_schedule, fake)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+         subject, location, start_time, end_time, start_time_tz, end_time_tz, classification, reminder_schedule, fake)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         RETURNING id;
         """
 
@@ -71,6 +97,8 @@ class MeetingsRepository:
             meeting.location,
             meeting.start_time,
             meeting.end_time,
+            MeetingDTO.parse_time(meeting.start_time),
+            MeetingDTO.parse_time(meeting.end_time),
             meeting.classification.value,  # Convert enum to string for DB
             meeting.calculate_reminder_schedule(meeting.start_time) if meeting.classification == MeetingClassification.EXTERNAL else None,
             meeting.fake,
@@ -91,15 +119,10 @@ class MeetingsRepository:
                 raise Exception(f"Error inserting meeting, because: {error}")
 
     def get_meeting_data(self, uuid: str) -> Optional[MeetingDTO]:
-        select_query = """
-        SELECT uuid, google_calendar_id, user_id, tenant_id, participants_emails, participants_hash, link, subject, location, start_time, end_time, agenda, classification
-        FROM meetings
-        WHERE uuid = %s AND classification != %s;
-        """
         with db_connection() as conn:
             try:
                 with conn.cursor() as cursor:
-                    cursor.execute(select_query, (uuid, MeetingClassification.DELETED.value))
+                    cursor.execute(SELECT_MEETING_DATA_QUERY, (uuid, MeetingClassification.DELETED.value))
                     row = cursor.fetchone()
                     if row:
                         logger.info(f"Got meeting data {row[0]} from database")
@@ -140,7 +163,6 @@ class MeetingsRepository:
         """
         with db_connection() as conn:
             try:
-                self.create_table_if_not_exists()
                 with conn.cursor() as cursor:
                     cursor.execute(select_query, (tenant_id, MeetingClassification.DELETED.value))
                     meetings = cursor.fetchall()
@@ -163,7 +185,6 @@ class MeetingsRepository:
         """
         with db_connection() as conn:
             try:
-                self.create_table_if_not_exists()
                 with conn.cursor() as cursor:
                     cursor.execute(select_query, (user_id, MeetingClassification.DELETED.value))
                     meetings = cursor.fetchall()
@@ -225,7 +246,6 @@ class MeetingsRepository:
         """
         with db_connection() as conn:
             try:
-                self.create_table_if_not_exists()
                 with conn.cursor() as cursor:
                     cursor.execute(select_query, (user_id, MeetingClassification.EXTERNAL.value))
                     meetings = cursor.fetchall()
@@ -279,8 +299,10 @@ class MeetingsRepository:
     #             return []
 
     def get_all_meetings_by_user_id_in_datetime(self, user_id: str, selected_datetime: datetime) -> list[MeetingDTO]:
-        start_range = (selected_datetime - timedelta(weeks=2)).isoformat()
-        end_range = (selected_datetime + timedelta(weeks=2)).isoformat()
+        if selected_datetime.tzinfo is None:
+            selected_datetime = selected_datetime.replace(tzinfo=timezone.utc)
+        start_range = selected_datetime - timedelta(weeks=2)
+        end_range = selected_datetime + timedelta(weeks=2)
 
         # SQL query to filter within the date range
         select_query = """
@@ -288,11 +310,10 @@ class MeetingsRepository:
             FROM meetings
             WHERE user_id = %s 
               AND classification != %s
-              AND to_timestamp(start_time, 'YYYY-MM-DD"T"HH24:MI:SS') AT TIME ZONE 'UTC' BETWEEN %s AND %s;
+              AND start_time_tz BETWEEN %s AND %s;
             """
         with db_connection() as conn:
             try:
-                self.create_table_if_not_exists()
                 with conn.cursor() as cursor:
                     cursor.execute(select_query, (user_id, MeetingClassification.DELETED.value, start_range, end_range))
                     meetings = cursor.fetchall()
@@ -312,12 +333,7 @@ class MeetingsRepository:
         SELECT uuid, google_calendar_id, user_id, tenant_id, participants_emails, participants_hash, link, subject, location, start_time, end_time, agenda, classification
         FROM meetings
         WHERE tenant_id = %s
-        AND (
-            CASE
-                WHEN start_time ~ 'T' THEN TO_TIMESTAMP(SPLIT_PART(start_time, '+', 1), 'YYYY-MM-DD"T"HH24:MI:SS')
-                ELSE TO_TIMESTAMP(start_time, 'YYYY-MM-DD')
-            END > %s
-        )
+        AND start_time_tz > %s
         AND classification != %s;
         """
         with db_connection() as conn:
@@ -338,12 +354,7 @@ class MeetingsRepository:
         SELECT uuid, google_calendar_id, user_id, tenant_id, participants_emails, participants_hash, link, subject, location, start_time, end_time, agenda, classification
         FROM meetings
         WHERE user_id = %s
-        AND (
-            CASE
-                WHEN start_time ~ 'T' THEN TO_TIMESTAMP(SPLIT_PART(start_time, '+', 1), 'YYYY-MM-DD"T"HH24:MI:SS')
-                ELSE TO_TIMESTAMP(start_time, 'YYYY-MM-DD')
-            END > %s
-        )
+        AND start_time_tz > %s
         AND classification != %s;
         """
         with db_connection() as conn:
@@ -500,7 +511,8 @@ class MeetingsRepository:
         update_query = """
         UPDATE meetings
         SET participants_emails = %s, participants_hash = %s, link = %s, subject = %s, location = %s,
-        start_time = %s, end_time = %s, agenda = %s, classification = %s, reminder_schedule = %s
+        start_time = %s, end_time = %s, start_time_tz = %s, end_time_tz = %s, agenda = %s, classification = %s,
+        reminder_schedule = %s
         WHERE google_calendar_id = %s AND user_id = %s;
         """
 
@@ -519,6 +531,8 @@ class MeetingsRepository:
             meeting.location,
             meeting.start_time,
             meeting.end_time,
+            MeetingDTO.parse_time(meeting.start_time),
+            MeetingDTO.parse_time(meeting.end_time),
             json.dumps(agenda_dicts),
             meeting.classification.value,
             reminder_schedule,
@@ -537,6 +551,45 @@ class MeetingsRepository:
                 raise Exception(f"Error updating meeting, because: {error.pgerror}")
 
     def save_meeting(self, meeting: MeetingDTO):
+        if self.meeting_upsert.available and meeting.user_id:
+            agenda = meeting.agenda
+            values = {
+                "uuid": meeting.uuid,
+                "google_calendar_id": meeting.google_calendar_id,
+                "user_id": meeting.user_id,
+                "tenant_id": meeting.tenant_id,
+                "participants_emails": json.dumps(meeting.participants_emails),
+                "participants_hash": meeting.participants_hash,
+                "link": meeting.link,
+                "subject": meeting.subject,
+                "location": meeting.location,
+                "start_time": meeting.start_time,
+                "end_time": meeting.end_time,
+                "start_time_tz": MeetingDTO.parse_time(meeting.start_time),
+                "end_time_tz": MeetingDTO.parse_time(meeting.end_time),
+                "agenda": json.dumps([agenda_item.to_dict() if isinstance(agenda_item, AgendaItem) else agenda_item for agenda_item in agenda]) if agenda else None,
+                "classification": meeting.classification.value,
+                "reminder_schedule": meeting.calculate_reminder_schedule(meeting.start_time) if meeting.classification == MeetingClassification.EXTERNAL else None,
+                "fake": meeting.fake,
+            }
+            with db_connection() as conn:
+                try:
+                    row = self.meeting_upsert.execute(conn, values)
+                    if row is None:
+                        logger.info(
+                            f"Meeting with google_calendar_id {meeting.google_calendar_id} "
+                            f"already exists - and no changes were made. Skipping..."
+                        )
+                    else:
+                        logger.info(f"{'Inserted' if row[1] else 'Updated'} meeting with uuid {row[0]}")
+                    return
+                except UpsertUnavailable:
+                    pass
+                except psycopg2.Error as error:
+                    logger.error(f"Error saving meeting: {error.pgerror}")
+                    traceback.print_exc()
+                    raise Exception(f"Error saving meeting, because: {error.pgerror}")
+        # Check-then-write path, used until the unique (google_calendar_id, user_id) index exists
         if self.exists(meeting.google_calendar_id, meeting.user_id):
             if self.exists_without_changes(meeting):
                 logger.info(
@@ -661,17 +714,16 @@ class MeetingsRepository:
     def get_all_meetings_by_tenant_id_that_should_be_imported(
         self, number_of_imported_meetings: int, tenant_id: str
     ) -> list[MeetingDTO]:
-        ten_hours_ago = datetime.now(timezone.utc) - timedelta(hours=10)
-        cutoff_time = ten_hours_ago.isoformat()
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=10)
 
         select_query = f"""
         SELECT uuid, google_calendar_id, user_id, tenant_id, participants_emails, participants_hash, link, subject, location, start_time, end_time, agenda, classification
         FROM meetings
         WHERE classification NOT IN (%s)
         AND fake = FALSE
-        AND start_time > %s
+        AND start_time_tz > %s
         AND tenant_id = %s
-        ORDER BY start_time ASC
+        ORDER BY start_time_tz ASC
         {"LIMIT %s" if number_of_imported_meetings > 0 else ""};
         """
         with db_connection() as conn:
@@ -693,16 +745,15 @@ class MeetingsRepository:
                 return []
 
     def get_all_meetings_by_user_id_that_should_be_imported(self, number_of_imported_meetings: int, user_id: str) -> list[MeetingDTO]:
-        ten_hours_ago = datetime.now(timezone.utc) - timedelta(hours=10)
-        cutoff_time = ten_hours_ago.isoformat()
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=10)
         select_query = f"""
         SELECT uuid, google_calendar_id, user_id, tenant_id, participants_emails, participants_hash, link, subject, location, start_time, end_time, agenda, classification
         FROM meetings
         WHERE classification NOT IN (%s)
         AND fake = FALSE
-        AND start_time > %s
+        AND start_time_tz > %s
         AND user_id = %s
-        ORDER BY start_time ASC
+        ORDER BY start_time_tz ASC
         {"LIMIT %s" if number_of_imported_meetings > 0 else ""};
         """
         with db_connection() as conn:
@@ -772,11 +823,7 @@ class MeetingsRepository:
         SELECT uuid, google_calendar_id, user_id tenant_id, participants_emails, participants_hash, link, subject, location, start_time, end_time, agenda, classification
         FROM meetings
         WHERE tenant_id = %s
-        AND (
-        CASE
-            WHEN start_time ~ 'T' THEN TO_TIMESTAMP(SPLIT_PART(start_time, '+', 1), 'YYYY-MM-DD"T"HH24:MI:SS')
-            ELSE TO_TIMESTAMP(start_time, 'YYYY-MM-DD')
-        END > %s)
+        AND start_time_tz > %s
         AND classification = %s;
         """
         with db_connection() as conn:
@@ -784,7 +831,7 @@ class MeetingsRepository:
                 with conn.cursor() as cursor:
                     cursor.execute(
                         select_query,
-                        (tenant_id, datetime.now(timezone.utc).isoformat(), MeetingClassification.EXTERNAL.value),
+                        (tenant_id, datetime.now(timezone.utc), MeetingClassification.EXTERNAL.value),
                     )
                     meetings = cursor.fetchall()
                     logger.info(f"Got {len(meetings)} future meetings for tenant {tenant_id}")
@@ -799,11 +846,7 @@ class MeetingsRepository:
         SELECT uuid, google_calendar_id, user_id, tenant_id, participants_emails, participants_hash, link, subject, location, start_time, end_time, agenda, classification
         FROM meetings
         WHERE user_id = %s
-        AND (
-        CASE
-            WHEN start_time ~ 'T' THEN TO_TIMESTAMP(SPLIT_PART(start_time, '+', 1), 'YYYY-MM-DD"T"HH24:MI:SS')
-            ELSE TO_TIMESTAMP(start_time, 'YYYY-MM-DD')
-        END > %s)
+        AND start_time_tz > %s
         AND classification = %s;
         """
         with db_connection() as conn:
@@ -811,7 +854,7 @@ class MeetingsRepository:
                 with conn.cursor() as cursor:
                     cursor.execute(
                         select_query,
-                        (user_id, datetime.now(timezone.utc).isoformat(), MeetingClassification.EXTERNAL.value),
+                        (user_id, datetime.now(timezone.utc), MeetingClassification.EXTERNAL.value),
                     )
                     meetings = cursor.fetchall()
                     logger.info(f"Got {len(meetings)} future meetings for user {user_id}")
@@ -899,8 +942,8 @@ class MeetingsRepository:
                    m.subject, m.location, m.start_time, m.end_time, m.agenda, m.classification, m.reminder_schedule
             FROM meetings m
             INNER JOIN tenants t ON m.user_id = t.user_id
-            WHERE (m.reminder_schedule AT TIME ZONE 'UTC') BETWEEN (CURRENT_TIMESTAMP AT TIME ZONE 'UTC' - INTERVAL '25 minutes') 
-                  AND (CURRENT_TIMESTAMP AT TIME ZONE 'UTC' + INTERVAL '5 minutes')
+            WHERE m.reminder_schedule BETWEEN CURRENT_TIMESTAMP - INTERVAL '25 minutes'
+                  AND CURRENT_TIMESTAMP + INTERVAL '5 minutes'
               AND m.classification = %s 
               AND m.reminder_sent IS NULL
               AND t.reminder_subscription = TRUE;
@@ -1015,3 +1058,25 @@ class MeetingsRepository:
 def hash_participants(participants_emails: list[str] | list[dict]) -> str:
     emails_string = json.dumps(participants_emails, sort_keys=True)
     return hashlib.sha256(emails_string.encode("utf-8")).hexdigest()
+
+
+class AsyncMeetingsRepository:
+    """
+    Non-blocking counterparts of MeetingsRepository methods for async endpoints and consumers.
+    """
+
+    async def get_meeting_data(self, uuid: str) -> Optional[MeetingDTO]:
+        async with async_db_connection() as conn:
+            try:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(SELECT_MEETING_DATA_QUERY, (uuid, MeetingClassification.DELETED.value))
+                    row = await cursor.fetchone()
+                    if row:
+                        logger.info(f"Got meeting data {row[0]} from database")
+                        return MeetingDTO.from_tuple(row)
+                    else:
+                        logger.warning(f"Meeting not found for {uuid}")
+            except Exception as error:
+                logger.error("Error fetching meeting data by uuid:", error)
+                traceback.print_exc()
+            return None
@@ -3,14 +3,21 @@ from typing import Optional
 import psycopg2
 from common.genie_logger import GenieLogger
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.async_postgres_connector import async_db_connection
+from data.data_common.utils.schema_registry import register_schema
 
 logger = GenieLogger()
 import json
 
 
+CHECK_OWNERSHIP_QUERY = """
+SELECT id FROM ownerships WHERE person_uuid = %s AND user_id = %s;
+"""
+
+
 class OwnershipsRepository:
     def __init__(self):
-        self.create_table_if_not_exists()
+        register_schema(self.create_table_if_not_exists)
 
 
     def update_tenant_id(self, new_tenant_id, old_tenant_id):
@@ -30,7 +37,6 @@ class OwnershipsRepository:
                 return False
 
     def get_all_persons_for_tenant(self, tenant_id):
-        self.create_table_if_not_exists()
         select_query = """
         SELECT person_uuid FROM ownerships WHERE tenant_id = %s;
         """
@@ -48,7 +54,6 @@ class OwnershipsRepository:
                 return []
 
     def get_tenants_for_person(self, uuid):
-        self.create_table_if_not_exists()
         select_query = """
         SELECT tenant_id FROM ownerships WHERE person_uuid = %s;
         """
@@ -65,7 +70,6 @@ class OwnershipsRepository:
                 return []
 
     def get_users_for_person(self, person_uuid: str) -> list[dict]:
-        self.create_table_if_not_exists()
         select_query = """SELECT user_id, tenant_id FROM ownerships WHERE person_uuid = %s;"""
         with db_connection() as conn:
             try:
@@ -80,7 +84,6 @@ class OwnershipsRepository:
                 return []
 
     def save_ownership(self, uuid, user_id, tenant_id):
-        self.create_table_if_not_exists()
         logger.info(f"About to save ownership: {uuid}, for user: {user_id}")
         if self.exists(uuid, user_id, tenant_id):
             return "Ownership already exists in database"
@@ -147,13 +150,10 @@ class OwnershipsRepository:
         """
         Check if the ownership exists in the database
         """
-        select_query = """
-        SELECT id FROM ownerships WHERE person_uuid = %s AND user_id = %s;
-        """
         with db_connection() as conn:
             try:
                 with conn.cursor() as cursor:
-                    cursor.execute(select_query, (uuid, user_id))
+                    cursor.execute(CHECK_OWNERSHIP_QUERY, (uuid, user_id))
                     ownership = cursor.fetchone()
                     if ownership:
                         return True
@@ -181,3 +181,24 @@ class OwnershipsRepository:
                 logger.error(f"Error deleting ownership: {error.pgerror}")
                 traceback.print_exc()
                 return False
+
+
+class AsyncOwnershipsRepository:
+    """
+    Non-blocking counterparts of OwnershipsRepository methods for async endpoints and consumers.
+    """
+
+    async def check_ownership(self, user_id, uuid):
+        """
+        Check if the ownership exists in the database
+        """
+        async with async_db_connection() as conn:
+            try:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(CHECK_OWNERSHIP_QUERY, (uuid, user_id))
+                    ownership = await cursor.fetchone()
+                    return bool(ownership)
+            except Exception as error:
+                logger.error(f"Error checking ownership existence: {error}")
+                traceback.print_exc()
+                return False
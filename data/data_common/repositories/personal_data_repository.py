@@ -11,18 +11,83 @@ from data.data_common.data_transfer_objects.meeting_dto import MeetingClassifica
 from data.data_common.data_transfer_objects.news_data_dto import NewsData, SocialMediaPost
 from common.genie_logger import GenieLogger
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.async_postgres_connector import async_db_connection
+from data.data_common.utils.schema_registry import register_schema
+from data.data_common.utils.upsert import Upsert, Merge
 
 logger = GenieLogger()
 
 LAST_UPDATED_NEWS_INTERVAL = env_utils.get("LAST_UPDATED_NEWS_INTERVAL", "14")
 
 
+SELECT_SOCIAL_MEDIA_LINKS_QUERY = """
+SELECT pdl_personal_data -> 'profiles', apollo_personal_data
+FROM personalData
+WHERE uuid = %s
+"""
+
+
+def social_media_links_from_row(result) -> List[SocialMediaLinks]:
+    pdl_social_link = result[0]
+    apollo_data = result[1]
+
+    social_media_list = []
+
+    if pdl_social_link:
+        for profile in pdl_social_link:
+            url = profile.get("url")
+            network = profile.get("network")
+            if url and network:
+                social_media_list.append(
+                    SocialMediaLinks.from_dict({"url": url, "platform": network})
+                )
+
+    if apollo_data:
+        apollo_links = {
+            "linkedin_url": apollo_data.get("linkedin_url"),
+            "twitter_url": apollo_data.get("twitter_url"),
+            "facebook_url": apollo_data.get("facebook_url"),
+            "github_url": apollo_data.get("github_url"),
+        }
+
+        platform_mapping = {
+            "linkedin_url": "LinkedIn",
+            "twitter_url": "Twitter",
+            "facebook_url": "Facebook",
+            "github_url": "GitHub",
+        }
+        for key, url in apollo_links.items():
+            if url and not any(s.url == url for s in social_media_list):
+                social_media_list.append(
+                    SocialMediaLinks.from_dict(
+                        {"url": url, "platform": platform_mapping[key]}
+                    )
+                )
+
+    return social_media_list
+
+
 class PersonalDataRepository:
     FETCHED = "FETCHED"
     TRIED_BUT_FAILED = "TRIED_BUT_FAILED"
 
     def __init__(self):
-        self.create_table_if_not_exists()
+        register_schema(self.create_table_if_not_exists)
+        self.personal_data_insert = Upsert(
+            "personaldata",
+            conflict_columns=("uuid",),
+            rules={
+                "name": Merge.INSERT_ONLY,
+                "email": Merge.INSERT_ONLY,
+                "linkedin_url": Merge.INSERT_ONLY,
+                "pdl_personal_data": Merge.INSERT_ONLY,
+                "pdl_status": Merge.INSERT_ONLY,
+                "pdl_last_updated": Merge.CREATED,
+                "apollo_personal_data": Merge.INSERT_ONLY,
+                "apollo_status": Merge.INSERT_ONLY,
+                "apollo_last_updated": Merge.CREATED,
+            },
+        )
 
     def create_table_if_not_exists(self):
         create_table_query = """
@@ -64,66 +129,35 @@ class PersonalDataRepository:
         pdl_status: str = None,
         apollo_status: str = None,
     ):
-        # Start with the mandatory columns and values
-        columns = ["uuid", "name", "email", "linkedin_url"]
-        values = [uuid, name, email, linkedin_url]
+        # Insert-only: an existing uuid is left untouched, and the timestamps are set by the same statement
+        values = {"uuid": uuid, "name": name, "email": email, "linkedin_url": linkedin_url}
+        touch = []
 
-        # Append optional columns and values
         if pdl_personal_data:
-            columns.append("pdl_personal_data")
-            columns.append("pdl_status")
-            values.append(
+            values["pdl_personal_data"] = (
                 json.dumps(pdl_personal_data) if isinstance(pdl_personal_data, dict) else pdl_personal_data
             )
-            values.append(pdl_status)
-        elif pdl_status:
-            columns.append("pdl_status")
-            values.append(pdl_status)
+        if pdl_personal_data or pdl_status:
+            values["pdl_status"] = pdl_status
+            touch.append("pdl_last_updated")
 
         if apollo_personal_data:
-            columns.append("apollo_personal_data")
-            columns.append("apollo_status")
-            values.append(
+            values["apollo_personal_data"] = (
                 json.dumps(apollo_personal_data)
                 if isinstance(apollo_personal_data, dict)
                 else apollo_personal_data
             )
-            values.append(apollo_status)
-        elif apollo_status:
-            columns.append("apollo_status")
-            values.append(apollo_status)
+        if apollo_personal_data or apollo_status:
+            values["apollo_status"] = apollo_status
+            touch.append("apollo_last_updated")
 
-        # Build the insert query dynamically
-        insert_query = f"""
-        INSERT INTO personalData ({', '.join(columns)})
-        VALUES ({', '.join(['%s'] * len(values))})
-        """
-
-        if self.exists_uuid(uuid):
-            logger.error("Personal data with this UUID already exists")
-            return
         with db_connection() as conn:
-
             try:
-                with conn.cursor() as cursor:
-                    cursor.execute(insert_query, tuple(values))
-                    conn.commit()
-                    # Conditionally update the timestamps
-                    if pdl_personal_data or pdl_status:
-                        cursor.execute(
-                            "UPDATE personalData SET pdl_last_updated = CURRENT_TIMESTAMP WHERE uuid = %s",
-                            (uuid,),
-                        )
-                    if apollo_personal_data or apollo_status:
-                        cursor.execute(
-                            "UPDATE personalData SET apollo_last_updated = CURRENT_TIMESTAMP WHERE uuid = %s",
-                            (uuid,),
-                        )
-                    conn.commit()
+                row = self.personal_data_insert.execute(conn, values, touch=touch)
+                if row:
                     logger.info("Inserted personalData into database")
-            except psycopg2.IntegrityError as e:
-                logger.error("PersonalData with this UUID already exists")
-                traceback.print_exc()
+                else:
+                    logger.error("Personal data with this UUID already exists")
             except Exception as e:
                 logger.error(f"Error inserting personalData: {e}")
                 logger.error(traceback.format_exc())
@@ -135,7 +169,6 @@ class PersonalDataRepository:
         :param uuid: Unique identifier for the personalData.
         :return: True if personalData exists, False otherwise.
         """
-        self.create_table_if_not_exists()
         select_query = """
         SELECT EXISTS (
             SELECT 1
@@ -163,7 +196,6 @@ class PersonalDataRepository:
         :param linkedin_url: LinkedIn URL of the person.
         :return: True if personalData exists, False otherwise.
         """
-        self.create_table_if_not_exists()
         select_query = """
         SELECT EXISTS (
             SELECT 1
@@ -191,7 +223,6 @@ class PersonalDataRepository:
         :param uuid: Unique identifier for the personalData.
         :return: Personal data as a json if personalData exists, None otherwise.
         """
-        self.create_table_if_not_exists()
         select_query = """
         SELECT pdl_personal_data
         FROM personalData
@@ -252,7 +283,6 @@ class PersonalDataRepository:
                 return False
 
     def get_apollo_personal_data(self, uuid: str) -> Optional[dict]:
-        self.create_table_if_not_exists()
         select_query = """
         SELECT apollo_personal_data
         FROM personalData
@@ -319,7 +349,6 @@ class PersonalDataRepository:
         :return: Personal data as a json if personalData exists, None otherwise.
         """
         logger.info(f"Got get request for {linkedin_profile_url}")
-        self.create_table_if_not_exists()
         select_query = """
         SELECT pdl_personal_data
         FROM personalData
@@ -348,7 +377,6 @@ class PersonalDataRepository:
         :return: Personal data as a json if personalData exists, None otherwise.
         """
         logger.info(f"Got get request for {linkedin_profile_url}")
-        self.create_table_if_not_exists()
         select_query = """
         SELECT apollo_personal_data
         FROM personalData
@@ -376,7 +404,6 @@ class PersonalDataRepository:
         :param email_address: Email address of the person.
         :return: Personal data as a json if personalData exists, None otherwise.
         """
-        self.create_table_if_not_exists()
         select_query = """
         SELECT pdl_personal_data
         FROM personalData
@@ -404,7 +431,6 @@ class PersonalDataRepository:
         :param email_address: Email address of the person.
         :return: Personal data as a json if personalData exists, None otherwise.
         """
-        self.create_table_if_not_exists()
         select_query = """
         SELECT apollo_personal_data
         FROM personalData
@@ -542,7 +568,6 @@ class PersonalDataRepository:
         :param email_address: Email address of the person.
         :return: Personal data uuid if personalData exists, None otherwise.
         """
-        self.create_table_if_not_exists()
         select_query = """
         SELECT uuid
         FROM personalData
@@ -570,7 +595,6 @@ class PersonalDataRepository:
         :param email_address: Email address of the person.
         :return: Personal data as a json if personalData exists, None otherwise.
         """
-        self.create_table_if_not_exists()
         select_query = """
         SELECT pdl_personal_data, apollo_personal_data
         FROM personalData
@@ -812,7 +836,6 @@ class PersonalDataRepository:
         :param person: Person object.
         :param personal_data: Personal data to save.
         """
-        self.create_table_if_not_exists()
         if not self.exists_uuid(person.uuid):
             self.insert(
                 uuid=person.uuid,
@@ -1010,54 +1033,13 @@ class PersonalDataRepository:
         :param uuid: Unique identifier for the profile.
         :return: List of SocialMediaLinks if profile exists, empty list otherwise.
         """
-        select_query = """
-        SELECT pdl_personal_data -> 'profiles', apollo_personal_data
-        FROM personalData
-        WHERE uuid = %s
-        """
         with db_connection() as conn:
             try:
                 with conn.cursor() as cursor:
-                    cursor.execute(select_query, (str(uuid),))
+                    cursor.execute(SELECT_SOCIAL_MEDIA_LINKS_QUERY, (str(uuid),))
                     result = cursor.fetchone()
                     if result:
-                        pdl_social_link = result[0]
-                        apollo_data = result[1]
-
-                        social_media_list = []
-
-                        if pdl_social_link:
-                            for profile in pdl_social_link:
-                                url = profile.get("url")
-                                network = profile.get("network")
-                                if url and network:
-                                    social_media_list.append(
-                                        SocialMediaLinks.from_dict({"url": url, "platform": network})
-                                    )
-
-                        if apollo_data:
-                            apollo_links = {
-                                "linkedin_url": apollo_data.get("linkedin_url"),
-                                "twitter_url": apollo_data.get("twitter_url"),
-                                "facebook_url": apollo_data.get("facebook_url"),
-                                "github_url": apollo_data.get("github_url"),
-                            }
-
-                            platform_mapping = {
-                                "linkedin_url": "LinkedIn",
-                                "twitter_url": "Twitter",
-                                "facebook_url": "Facebook",
-                                "github_url": "GitHub",
-                            }
-                            for key, url in apollo_links.items():
-                                if url and not any(s.url == url for s in social_media_list):
-                                    social_media_list.append(
-                                        SocialMediaLinks.from_dict(
-                                            {"url": url, "platform": platform_mapping[key]}
-                                        )
-                                    )
-
-                        return social_media_list
+                        return social_media_links_from_row(result)
                     else:
                         logger.warning("Personal data was not found")
                         return []
@@ -1382,3 +1364,25 @@ class PersonalDataRepository:
                 conn.rollback()
                 logger.error(f"Error updating news last_updated in the database: {e}")
                 raise
+
+
+class AsyncPersonalDataRepository:
+    """
+    Non-blocking counterparts of PersonalDataRepository methods for async endpoints and consumers.
+    """
+
+    async def get_social_media_links(self, uuid: str) -> List[SocialMediaLinks]:
+        async with async_db_connection() as conn:
+            try:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(SELECT_SOCIAL_MEDIA_LINKS_QUERY, (str(uuid),))
+                    result = await cursor.fetchone()
+                    if result:
+                        return social_media_links_from_row(result)
+                    else:
+                        logger.warning("Personal data was not found")
+                        return []
+            except Exception as e:
+                logger.error(f"Error retrieving social media links: {e}")
+                traceback.print_exc()
+                return []
@@ -1,12 +1,15 @@
 import traceback
 
 import psycopg2
+from psycopg2 import errors
 
 from uuid import UUID
 
 from data.data_common.data_transfer_objects.person_dto import PersonDTO, PersonStatus
 from common.genie_logger import GenieLogger
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import register_schema
+from data.data_common.utils.upsert import Upsert, Merge, UpsertUnavailable
 
 logger = GenieLogger()
 
@@ -14,7 +17,22 @@ logger = GenieLogger()
 
 class PersonsRepository:
     def __init__(self):
-        self.create_table_if_not_exists()
+        register_schema(self.create_table_if_not_exists)
+        # A person is identified by email; an existing row keeps its uuid and status, and enrichment never blanks a field
+        self.person_upsert = Upsert(
+            "persons",
+            conflict_columns=("email",),
+            rules={
+                "uuid": Merge.INSERT_ONLY,
+                "status": Merge.INSERT_ONLY,
+                "name": Merge.KEEP_IF_NULL,
+                "company": Merge.KEEP_IF_NULL,
+                "linkedin": Merge.KEEP_IF_NULL,
+                "position": Merge.KEEP_IF_NULL,
+                "timezone": Merge.KEEP_IF_NULL,
+            },
+            returning=("uuid",),
+        )
 
     def create_table_if_not_exists(self):
         create_table_query = """
@@ -283,7 +301,44 @@ class PersonsRepository:
                 return False
 
     def save_person(self, person: PersonDTO):
-        self.create_table_if_not_exists()
+        """
+        Inserts the person or merges it into the existing person with the same email, in one statement.
+        :return: the uuid of the stored person, which is the existing one when the email was already known,
+        or None when the email is new but the uuid belongs to another person
+        """
+        if self.person_upsert.available and person.email:
+            values = {
+                "uuid": person.uuid,
+                "name": person.name,
+                "company": person.company,
+                "email": person.email,
+                "linkedin": person.linkedin,
+                "position": person.position,
+                "timezone": person.timezone,
+                "status": PersonStatus.IN_PROGRESS.value,
+            }
+            with db_connection() as conn:
+                try:
+                    row = self.person_upsert.execute(conn, values)
+                    logger.info(f"{'Inserted' if row[1] else 'Updated'} person {row[0]} with email {person.email}")
+                    return row[0]
+                except UpsertUnavailable:
+                    pass
+                except errors.UniqueViolation as error:
+                    # The email is new but another unique column is taken (the uuid): the checked path keeps
+                    # the existing behaviour, an insert skipped with None
+                    logger.warning(
+                        f"Person {person.uuid} with email {person.email} conflicts on "
+                        f"{error.diag.constraint_name}, saving it with check-then-write"
+                    )
+                except psycopg2.Error as error:
+                    logger.error(f"Error saving person: {error.pgerror}")
+                    traceback.print_exc()
+                    raise Exception(f"Error saving person, because: {error.pgerror}")
+        return self._save_person_checked(person)
+
+    def _save_person_checked(self, person: PersonDTO):
+        # Check-then-write path, used until the unique persons email index exists
         uuid = self.exists_properties(person)
         logger.info(f"Result of exists_properties: {uuid}")
         if uuid:
@@ -309,6 +364,28 @@ class PersonsRepository:
                 logger.error(f"Error finding person by email: {error}")
                 return None
 
+    def find_persons_by_emails(self, emails: list[str]) -> dict[str, PersonDTO]:
+        """
+        Set-based find_person_by_email: one round-trip for all emails. Emails without a person are absent from the result.
+        """
+        if not emails:
+            return {}
+        query = """
+        SELECT DISTINCT ON (email) uuid, name, company, email, linkedin, position, timezone
+        FROM persons WHERE email = ANY(%s)
+        ORDER BY email, id;
+        """
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (list(set(emails)),))
+                    persons = cursor.fetchall()
+                    logger.info(f"Found {len(persons)} persons for {len(emails)} emails")
+                    return {person[3]: PersonDTO.from_tuple(person) for person in persons}
+            except psycopg2.Error as error:
+                logger.error(f"Error finding persons by emails: {error}")
+                return {}
+
     def get_person_email(self, uuid):
         query = """
         SELECT email FROM persons WHERE uuid = %s;
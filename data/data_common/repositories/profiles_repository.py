@@ -19,15 +19,71 @@ from data.data_common.data_transfer_objects.profile_dto import (
 from data.data_common.data_transfer_objects.profile_category_dto import SalesCriteria
 from common.genie_logger import GenieLogger
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.async_postgres_connector import async_db_connection
+from data.data_common.utils.schema_registry import register_schema
+from data.data_common.utils.upsert import Upsert, Merge
 
 logger = GenieLogger()
 DEFAULT_PROFILE_PICTURE = env_utils.get("DEFAULT_PROFILE_PICTURE", "https://frontedresources.blob.core.windows.net/images/default-profile-picture.png")
 BLOB_CONTAINER_PICTURES_NAME = env_utils.get("BLOB_CONTAINER_PICTURES_NAME", "profile-pictures")
 
 
+SELECT_PROFILE_DATA_QUERY = """
+SELECT uuid, name, company, position, strengths, hobbies, connections, get_to_know, summary, picture_url,
+work_history_summary, sales_criteria, profile_category
+FROM profiles
+WHERE uuid = %s;
+"""
+
+
+def profile_from_row(row) -> ProfileDTO:
+    uuid = UUID(str(row[0]))
+    name = row[1]
+    company = row[2]
+    position = row[3]
+    summary = row[8] if row[8] else None
+    picture_url = AnyUrl(row[9]) if AnyUrl(row[9]) else DEFAULT_PROFILE_PICTURE
+    strengths = [Strength.from_dict(item) for item in row[4]]
+    hobbies = json.loads(row[5]) if isinstance(row[5], str) else row[5]
+    connections = [Connection.from_dict(item) for item in row[6]]
+    get_to_know = {k: [Phrase.from_dict(p) for p in v] for k, v in row[7].items()} if row[7] else {}
+    work_history_summary = row[10] if row[10] else None
+    sales_criteria = (SalesCriteria.from_dict(criteria) for criteria in row[11]) if row[11] else None
+    profile_category = row[12] if row[12] else None
+    profile_data = (
+        uuid,
+        name,
+        company,
+        position,
+        summary,
+        picture_url,
+        get_to_know,
+        connections,
+        strengths,
+        hobbies,
+        work_history_summary,
+        sales_criteria,
+        profile_category
+    )
+    return ProfileDTO.from_tuple(profile_data)
+
+
 class ProfilesRepository:
     def __init__(self):
-        self.create_table_if_not_exists()
+        register_schema(self.create_table_if_not_exists)
+        # Partial profiles (e.g. from save_new_profile_from_person) must not erase what enrichment already wrote
+        self.profile_upsert = Upsert(
+            "profiles",
+            conflict_columns=("uuid",),
+            rules={
+                "summary": Merge.KEEP_IF_NULL,
+                "picture_url": Merge.KEEP_IF_NULL,
+                "work_history_summary": Merge.KEEP_IF_NULL,
+                "sales_criteria": Merge.KEEP_IF_NULL,
+                "profile_category": Merge.KEEP_IF_NULL,
+            },
+            insert_defaults={"summary": "", "picture_url": DEFAULT_PROFILE_PICTURE},
+        )
 
     def create_table_if_not_exists(self):
         create_table_query = """
@@ -58,18 +114,41 @@ class ProfilesRepository:
                 traceback.print_exc()
 
     def save_new_profile_from_person(self, person: PersonDTO):
-        self.create_table_if_not_exists()
         profile = ProfileDTO(
             uuid=person.uuid, name=person.name, company=person.company, position=person.position
         )
         self.save_profile(profile)
 
     def save_profile(self, profile: ProfileDTO):
-        self.create_table_if_not_exists()
-        if self.exists(str(profile.uuid)):
-            self._update(profile)
-        else:
-            self._insert(profile)
+        profile_dict = profile.to_dict()
+        logger.info(f"About to save profile: {profile_dict}")
+        values = {
+            "uuid": str(profile_dict["uuid"]),
+            "name": profile_dict["name"],
+            "company": profile_dict["company"],
+            "position": profile_dict["position"],
+            "strengths": json.dumps([s if isinstance(s, dict) else s.to_dict() for s in profile_dict["strengths"]]),
+            "hobbies": json.dumps(profile_dict["hobbies"]),
+            "connections": json.dumps([c if isinstance(c, dict) else c.to_dict() for c in profile_dict["connections"]]),
+            "get_to_know": json.dumps(
+                {
+                    k: [p if isinstance(p, dict) else p.to_dict() for p in v]
+                    for k, v in profile_dict["get_to_know"].items()
+                }
+            ) if profile_dict.get("get_to_know") else json.dumps({}),
+            "summary": profile_dict["summary"] or None,
+            "picture_url": str(profile_dict["picture_url"]) if profile_dict["picture_url"] else None,
+            "work_history_summary": profile_dict["work_history_summary"] or None,
+            "sales_criteria": json.dumps([(criteria.to_dict() if isinstance(criteria, SalesCriteria) else criteria) for criteria in profile_dict["sales_criteria"]]) if profile_dict["sales_criteria"] else None,
+            "profile_category": profile_dict.get("profile_category"),
+        }
+        with db_connection() as conn:
+            try:
+                row = self.profile_upsert.execute(conn, values)
+                logger.info(f"{'Inserted' if row[1] else 'Updated'} profile {profile.uuid}. profile id: {row[0]}")
+                return row[0]
+            except psycopg2.Error as error:
+                raise Exception(f"Error saving profile, because: {error.pgerror}")
 
     def exists(self, uuid: str) -> bool:
         logger.info(f"About to check if uuid exists: {uuid}")
@@ -128,48 +207,14 @@ class ProfilesRepository:
             return None
 
     def get_profile_data(self, uuid: str) -> Union[ProfileDTO, None]:
-        select_query = """
-        SELECT uuid, name, company, position, strengths, hobbies, connections, get_to_know, summary, picture_url,
-        work_history_summary, sales_criteria, profile_category
-        FROM profiles
-        WHERE uuid = %s;
-        """
         with db_connection() as conn:
             try:
                 with conn.cursor() as cursor:
-                    cursor.execute(select_query, (uuid,))
+                    cursor.execute(SELECT_PROFILE_DATA_QUERY, (uuid,))
                     row = cursor.fetchone()
                     if row:
                         logger.info(f"Got {row[0]} from database")
-                        uuid = UUID(row[0])
-                        name = row[1]
-                        company = row[2]
-                        position = row[3]
-                        summary = row[8] if row[8] else None
-                        picture_url = AnyUrl(row[9]) if AnyUrl(row[9]) else DEFAULT_PROFILE_PICTURE
-                        strengths = [Strength.from_dict(item) for item in row[4]]
-                        hobbies = json.loads(row[5]) if isinstance(row[5], str) else row[5]
-                        connections = [Connection.from_dict(item) for item in row[6]]
-                        get_to_know = {k: [Phrase.from_dict(p) for p in v] for k, v in row[7].items()} if row[7] else {}
-                        work_history_summary = row[10] if row[10] else None
-                        sales_criteria = (SalesCriteria.from_dict(criteria) for criteria in row[11]) if row[11] else None
-                        profile_category = row[12] if row[12] else None
-                        profile_data = (
-                            uuid,
-                            name,
-                            company,
-                            position,
-                            summary,
-                            picture_url,
-                            get_to_know,
-                            connections,
-                            strengths,
-                            hobbies,
-                            work_history_summary,
-                            sales_criteria,
-                            profile_category
-                        )
-                        return ProfileDTO.from_tuple(profile_data)
+                        return profile_from_row(row)
                     else:
                         logger.warning(f"Error with getting profile data for {uuid}")
             except Exception as error:
@@ -469,6 +514,40 @@ class ProfilesRepository:
                 traceback.print_exc()
             return None
 
+    def get_profiles_by_emails(self, emails: list[str]) -> dict[str, ProfileDTO]:
+        """
+        Set-based get_profile_data_by_email: maps each email that has a profile to it, in one round-trip.
+        """
+        if not emails:
+            return {}
+        select_query = """
+        SELECT DISTINCT ON (persons.email) profiles.uuid, profiles.name, profiles.company, profiles.position,
+        profiles.strengths, profiles.hobbies, profiles.connections, profiles.get_to_know, profiles.summary,
+        profiles.picture_url, profiles.work_history_summary, profiles.sales_criteria, profiles.profile_category,
+        persons.email
+        FROM profiles
+        JOIN persons on persons.uuid = profiles.uuid
+        WHERE persons.email = ANY(%s)
+        ORDER BY persons.email, persons.id;
+        """
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(select_query, (list(set(emails)),))
+                    rows = cursor.fetchall()
+                    logger.info(f"Got {len(rows)} profiles for {len(emails)} emails")
+                    profiles = {}
+                    for row in rows:
+                        try:
+                            profiles[row[13]] = profile_from_row(row)
+                        except Exception as error:
+                            logger.error(f"Error parsing profile {row[0]} for {row[13]}: {error}")
+                    return profiles
+            except Exception as error:
+                logger.error(f"Error fetching profiles by emails: {error}")
+                traceback.print_exc()
+                return {}
+
     def get_hobbies_by_email(self, email: str) -> list:
         if not email:
             return None
@@ -546,6 +625,29 @@ class ProfilesRepository:
                 traceback.print_exc()
                 return None
 
+    def get_pictures_by_uuids(self, uuids: list[str]) -> dict[str, Optional[str]]:
+        """
+        Set-based get_profile_picture: maps each uuid that has a profile to its picture_url.
+        """
+        if not uuids:
+            return {}
+        select_query = """
+        SELECT uuid, picture_url
+        FROM profiles
+        WHERE uuid = ANY(%s);
+        """
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(select_query, ([str(uuid) for uuid in set(uuids)],))
+                    rows = cursor.fetchall()
+                    logger.info(f"Got {len(rows)} profile pictures for {len(uuids)} uuids")
+                    return {row[0]: row[1] for row in rows}
+            except Exception as error:
+                logger.error(f"Error fetching profile pictures by uuids: {error}")
+                traceback.print_exc()
+                return {}
+
     def update_profile_picture(self, uuid: str, picture_url: str):
         if "https://static.licdn.com" in picture_url:
             logger.info(f"Got static url for {uuid}. Skipping")
@@ -925,87 +1027,6 @@ class ProfilesRepository:
             except psycopg2.Error as error:
                 raise Exception(f"Error updating profile category, because: {error.pgerror}")
 
-    def _insert(self, profile: ProfileDTO) -> Union[str, None]:
-        insert_query = """
-                INSERT INTO profiles (uuid, name, company, position, strengths, hobbies, connections, get_to_know, summary, picture_url, work_history_summary, sales_criteria, profile_category)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id;
-                """
-        profile_details = "\n".join([f"{k}: {v}" for k, v in profile.__dict__.items()])
-        logger.info(f"About to insert profile: {profile_details}")
-
-        profile_dict = profile.to_dict()
-        profile_data = (
-            str(profile_dict["uuid"]),
-            profile_dict["name"],
-            profile_dict["company"],
-            profile_dict["position"],
-            json.dumps([s if isinstance(s, dict) else s.to_dict() for s in profile_dict["strengths"]]),
-            json.dumps(profile_dict["hobbies"]),
-            json.dumps([c if isinstance(c, dict) else c.to_dict() for c in profile_dict["connections"]]),
-            json.dumps(
-                {
-                    k: [p if isinstance(p, dict) else p.to_dict() for p in v]
-                    for k, v in profile_dict["get_to_know"].items()
-                }
-            ) if profile_dict.get("get_to_know") else json.dumps({}),
-            profile_dict["summary"] if profile_dict["summary"] else "",
-            str(profile_dict["picture_url"]) if profile_dict["picture_url"] else DEFAULT_PROFILE_PICTURE,
-            profile_dict["work_history_summary"] if profile_dict["work_history_summary"] else None,
-            json.dumps([(criteria.to_dict() if isinstance(criteria, SalesCriteria) else criteria) for criteria in profile_dict["sales_criteria"]]) if profile_dict["sales_criteria"] else None,
-            profile_dict.get("profile_category")
-        )
-        with db_connection() as conn:
-            try:
-                with conn.cursor() as cursor:
-                    cursor.execute(insert_query, profile_data)
-                    conn.commit()
-                    profile_id = cursor.fetchone()[0]
-                    logger.info(f"Inserted profile to database. profile id: {profile_id}")
-                    return profile_id
-            except psycopg2.Error as error:
-                raise Exception(f"Error inserting profile, because: {error.pgerror}")
-
-    def _update(self, profile: ProfileDTO):
-        update_query = """
-        UPDATE profiles
-        SET name = %s, company = %s, position = %s, strengths = %s, hobbies = %s, connections = %s, get_to_know = %s,
-        summary = %s, picture_url = %s, work_history_summary = %s, sales_criteria = %s, profile_category = %s
-        WHERE uuid = %s;
-        """
-        profile_dict = profile.to_dict()
-        logger.info(f"About to update profile: {profile_dict}")
-        profile_data = (
-            profile_dict["name"],
-            profile_dict["company"],
-            profile_dict["position"],
-            json.dumps([s if isinstance(s, dict) else s.to_dict() for s in profile_dict["strengths"]]),
-            json.dumps(profile_dict["hobbies"]),
-            json.dumps([c if isinstance(c, dict) else c.to_dict() for c in profile_dict["connections"]]),
-            json.dumps(
-                {
-                    k: [p if isinstance(p, dict) else p.to_dict() for p in v]
-                    for k, v in profile_dict.get("get_to_know").items()
-                }
-            ) if profile_dict.get("get_to_know") else json.dumps({}),
-            profile_dict["summary"],
-            str(profile_dict["picture_url"]) if profile_dict["picture_url"] else None,
-            profile_dict["work_history_summary"] if profile_dict["work_history_summary"] else None,
-            json.dumps([(criteria.to_dict() if isinstance(criteria, SalesCriteria) else criteria) for criteria in profile_dict["sales_criteria"]]) if profile_dict["sales_criteria"] else None,
-            profile_dict.get("profile_category"),
-            str(profile_dict["uuid"]),
-            )
-
-        logger.info(f"Persisting profile data {profile_data}")
-        with db_connection() as conn:
-            try:
-                with conn.cursor() as cursor:
-                    cursor.execute(update_query, profile_data)
-                    conn.commit()
-                    logger.info(f"Updated profile with uuid: {profile.uuid}")
-            except psycopg2.Error as error:
-                raise Exception(f"Error updating profile, because: {error.pgerror}")
-
     def get_all_profiles_pictures(self):
         select_query = f"""
         SELECT name, picture_url
@@ -1126,3 +1147,26 @@ class ProfilesRepository:
                 logger.error(f"Error fetching sales criteria by uuid: {error}")
                 traceback.print_exc()
                 return None
+
+
+class AsyncProfilesRepository:
+    """
+    Non-blocking counterparts of ProfilesRepository methods for async endpoints and consumers.
+    Same method names, queries and DTOs; the sync repository stays for scripts.
+    """
+
+    async def get_profile_data(self, uuid: str) -> Union[ProfileDTO, None]:
+        async with async_db_connection() as conn:
+            try:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(SELECT_PROFILE_DATA_QUERY, (uuid,))
+                    row = await cursor.fetchone()
+                    if row:
+                        logger.info(f"Got {row[0]} from database")
+                        return profile_from_row(row)
+                    else:
+                        logger.warning(f"Error with getting profile data for {uuid}")
+            except Exception as error:
+                logger.error(f"Error fetching profile data by uuid: {error}")
+                traceback.print_exception(error)
+            return None
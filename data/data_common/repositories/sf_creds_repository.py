@@ -3,6 +3,7 @@ import psycopg2
 from common.genie_logger import GenieLogger
 from common.utils.str_utils import get_uuid4
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import register_schema
 from data.data_common.data_transfer_objects.sf_creds_dto import SalesforceCredsDTO
 
 logger = GenieLogger()
@@ -11,7 +12,7 @@ logger = GenieLogger()
 
 class SalesforceUsersRepository:
     def __init__(self, ):
-        self.create_table_if_not_exists()
+        register_schema(self.create_table_if_not_exists)
 
     def create_table_if_not_exists(self):
         create_table_query = """
@@ -44,7 +45,6 @@ class SalesforceUsersRepository:
 
 
     def _insert(self, salesforce_creds_dto: SalesforceCredsDTO):
-        self.create_table_if_not_exists()
         insert_query = """
         INSERT INTO sf_users (user_id, tenant_id, salesforce_user_id, salesforce_tenant_id, salesforce_instance_url, salesforce_refresh_token, salesforce_access_token)
         VALUES (%s, %s, %s, %s, %s, %s, %s)
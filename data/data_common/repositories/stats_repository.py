@@ -8,13 +8,14 @@ from data.data_common.data_transfer_objects.badges_dto import BadgesEventTypes
 from data.data_common.data_transfer_objects.stats_dto import StatsDTO
 from common.genie_logger import GenieLogger
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import register_schema
 
 logger = GenieLogger()
 
 
 class StatsRepository:
     def __init__(self):
-        self.create_table_if_not_exists()
+        register_schema(self.create_table_if_not_exists)
 
     def create_table_if_not_exists(self):
         create_table_query = """
@@ -0,0 +1,164 @@
+import atexit
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from common.genie_logger import GenieLogger
+from common.utils import env_utils
+
+logger = GenieLogger()
+
+STATUS_FLUSH_INTERVAL_MS = float(env_utils.get("STATUS_FLUSH_INTERVAL_MS", "250"))
+STATUS_FLUSH_SIZE = int(env_utils.get("STATUS_FLUSH_SIZE", "500"))
+STATUS_MAX_BUFFER = int(env_utils.get("STATUS_MAX_BUFFER", "10000"))
+
+STARTED = "STARTED"
+
+
+class _PendingStatus:
+    __slots__ = ("update", "insert")
+
+    def __init__(self):
+        # Latest transition of rows that already exist, written before `insert`
+        self.update: Optional[tuple] = None
+        # Row started in this process and not written yet; later transitions are folded into it
+        self.insert: Optional[list] = None
+
+
+class StatusRecorder:
+    """
+    Write-behind front for StatusesRepository.start_status / update_status, with the same signatures.
+
+    Transitions are buffered per (ctx_id, object_id, user_id, event_topic) and only the latest one per key is
+    written: a started row whose event was also processed here is inserted with its final status, PROCESSING followed
+    by COMPLETED becomes a single update. A background thread writes the buffer with StatusesRepository.write_statuses
+    every `flush_interval_ms` or once `flush_size` keys are waiting; when `max_buffer` keys are waiting the recording
+    thread writes the buffer itself. close() (also run at exit) writes what is left.
+    """
+
+    def __init__(
+        self,
+        repository,
+        flush_interval_ms: float = STATUS_FLUSH_INTERVAL_MS,
+        flush_size: int = STATUS_FLUSH_SIZE,
+        max_buffer: int = STATUS_MAX_BUFFER,
+    ):
+        self.repository = repository
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_size = max(1, flush_size)
+        self.max_buffer = max(self.flush_size, max_buffer)
+        self._pending: dict[tuple, _PendingStatus] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.stats = {"recorded": 0, "coalesced": 0, "rows_written": 0, "flushes": 0, "inline_flushes": 0,
+                      "dropped": 0, "write_failures": 0}
+
+    def start_status(self, ctx_id: str, object_id: str, object_type: str, user_id: str, tenant_id: str,
+                     previous_event_topic: str, next_event_topic: str):
+        if not object_id or not user_id:
+            # statuses.object_id and user_id are NOT NULL, the row could never be written
+            self.stats["dropped"] += 1
+            return
+        key = (str(ctx_id), object_id, user_id, next_event_topic)
+        row = [key[0], object_id, object_type, user_id, tenant_id, next_event_topic, previous_event_topic,
+               datetime.now(timezone.utc), STARTED, None]
+        with self._lock:
+            pending = self._entry(key)
+            pending.insert = row
+        self._after_record()
+
+    def update_status(self, ctx_id: str, object_id: str, user_id: str, event_topic: str, status, error_message: str = None):
+        if not object_id or not user_id:
+            self.stats["dropped"] += 1
+            return
+        key = (str(ctx_id), object_id, user_id, event_topic)
+        status = getattr(status, "value", status)
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            pending = self._entry(key)
+            if pending.insert is not None:
+                pending.insert[7:10] = [now, status, error_message]
+            else:
+                pending.update = (*key, now, status, error_message)
+        self._after_record()
+
+    def _entry(self, key: tuple) -> _PendingStatus:
+        self.stats["recorded"] += 1
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _PendingStatus()
+        else:
+            self.stats["coalesced"] += 1
+        return pending
+
+    def _after_record(self):
+        size = len(self._pending)
+        if size >= self.max_buffer or self._closed:
+            self.stats["inline_flushes"] += 1
+            self.flush()
+            return
+        if self._thread is None:
+            self._start()
+        if size >= self.flush_size:
+            self._wakeup.set()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="genie-status-recorder", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Writes everything buffered so far."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            updates = [entry.update for entry in pending.values() if entry.update is not None]
+            inserts = [tuple(entry.insert) for entry in pending.values() if entry.insert is not None]
+            try:
+                self.repository.write_statuses(updates, inserts)
+            except Exception as e:
+                logger.error(f"Failed to write {len(pending)} buffered statuses, writing them one by one: {e}")
+                self._write_one_by_one(updates, inserts)
+            self.stats["flushes"] += 1
+            self.stats["rows_written"] += len(updates) + len(inserts)
+
+    def _write_one_by_one(self, updates: list[tuple], inserts: list[tuple]):
+        for update in updates:
+            self._write_safely([update], [])
+        for insert in inserts:
+            self._write_safely([], [insert])
+
+    def _write_safely(self, updates: list[tuple], inserts: list[tuple]):
+        try:
+            self.repository.write_statuses(updates, inserts)
+        except Exception as e:
+            self.stats["write_failures"] += 1
+            logger.error(f"Failed to write status {(updates or inserts)[0][:4]}: {e}")
+
+    def close(self, timeout: Optional[float] = 10):
+        """Stops the background flushes and writes what is left; later transitions are written immediately."""
+        if self._closed:
+            self.flush()
+            return
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        started = time.perf_counter()
+        self.flush()
+        logger.info(f"Status recorder closed in {time.perf_counter() - started:.3f}s. Stats: {self.stats}")
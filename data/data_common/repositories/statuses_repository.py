@@ -2,16 +2,22 @@ from datetime import datetime, timezone
 from dbm import error
 from uuid import UUID
 import psycopg2
+from psycopg2.extras import execute_values
 import traceback
 from common.genie_logger import GenieLogger, user_id
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import register_schema
 from data.data_common.data_transfer_objects.status_dto import StatusDTO, StatusEnum
 
 logger = GenieLogger()
 
+def _status_key(ctx_id, object_id, user_id, event_topic) -> tuple[str, ...]:
+    return str(ctx_id), str(object_id), str(user_id), str(event_topic)
+
+
 class StatusesRepository:
     def __init__(self):
-        self.create_table_if_not_exists()
+        register_schema(self.create_table_if_not_exists)
 
     def create_table_if_not_exists(self):
         create_table_query = """
@@ -76,6 +82,81 @@ class StatusesRepository:
                 traceback.format_exc()
 
 
+    def write_statuses(self, updates: list[tuple], inserts: list[tuple]):
+        """
+        Applies buffered status transitions in one transaction, updates first (see StatusRecorder). Processes flush
+        independently, so a consumer's transition may reach the table before the started row of its event: a
+        transition without its row inserts it, and a started row finding its row fills in what the transition
+        lacked, keeping the newer status. Flushes touching the same keys take turns on an advisory lock per key.
+
+        :param updates: (ctx_id, object_id, user_id, event_topic, current_event_start_time, status, error_message)
+        :param inserts: (ctx_id, object_id, object_type, user_id, tenant_id, event_topic, previous_event_topic,
+                        current_event_start_time, status, error_message)
+        """
+        lock_query = "SELECT pg_advisory_xact_lock(hashtext(k)) FROM unnest(%s::text[]) AS k ORDER BY k;"
+        update_query = """
+            UPDATE statuses AS s
+            SET current_event_start_time = v.current_event_start_time, status = v.status, error_message = v.error_message
+            FROM (VALUES %s) AS v (ctx_id, object_id, user_id, event_topic, current_event_start_time, status, error_message)
+            WHERE s.ctx_id = v.ctx_id AND s.object_id = v.object_id AND s.user_id = v.user_id AND s.event_topic = v.event_topic
+            RETURNING s.ctx_id, s.object_id, s.user_id, s.event_topic;
+        """
+        merge_started_query = """
+            UPDATE statuses AS s
+            SET object_type = COALESCE(s.object_type, v.object_type),
+                tenant_id = COALESCE(s.tenant_id, v.tenant_id),
+                previous_event_topic = COALESCE(s.previous_event_topic, v.previous_event_topic),
+                status = CASE WHEN newer THEN v.status ELSE s.status END,
+                error_message = CASE WHEN newer THEN v.error_message ELSE s.error_message END,
+                current_event_start_time = CASE WHEN newer THEN v.current_event_start_time ELSE s.current_event_start_time END
+            FROM (
+                SELECT v.*, s.id AS status_id,
+                       s.current_event_start_time IS NULL OR s.current_event_start_time < v.current_event_start_time AS newer
+                FROM (VALUES %s) AS v (ctx_id, object_id, object_type, user_id, tenant_id, event_topic, previous_event_topic,
+                                       current_event_start_time, status, error_message)
+                JOIN statuses AS s ON s.ctx_id = v.ctx_id AND s.object_id = v.object_id AND s.user_id = v.user_id
+                                  AND s.event_topic = v.event_topic
+            ) AS v
+            WHERE s.id = v.status_id
+            RETURNING s.ctx_id, s.object_id, s.user_id, s.event_topic;
+        """
+        insert_query = """
+            INSERT INTO statuses (ctx_id, object_id, object_type, user_id, tenant_id, event_topic, previous_event_topic,
+                                  current_event_start_time, status, error_message)
+            VALUES %s;
+        """
+        update_template = "(%s, %s, %s, %s, %s::timestamptz, %s, %s)"
+        insert_template = "(%s, %s, %s, %s, %s, %s, %s, %s::timestamptz, %s, %s)"
+        keys = {_status_key(*update[:4]) for update in updates}
+        keys |= {_status_key(insert[0], insert[1], insert[3], insert[5]) for insert in inserts}
+        with db_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(lock_query, (sorted("|".join(key) for key in keys),))
+                    if updates:
+                        rows = execute_values(cursor, update_query, updates, template=update_template,
+                                              page_size=len(updates), fetch=True)
+                        updated = {_status_key(*row) for row in rows}
+                        # Transitions whose started row was not written yet
+                        orphans = [(ctx_id, object_id, None, user_id, None, event_topic, None, start_time, status, error_message)
+                                   for ctx_id, object_id, user_id, event_topic, start_time, status, error_message in updates
+                                   if _status_key(ctx_id, object_id, user_id, event_topic) not in updated]
+                        if orphans:
+                            execute_values(cursor, insert_query, orphans, template=insert_template, page_size=len(orphans))
+                    if inserts:
+                        rows = execute_values(cursor, merge_started_query, inserts, template=insert_template,
+                                              page_size=len(inserts), fetch=True)
+                        merged = {_status_key(*row) for row in rows}
+                        missing = [insert for insert in inserts
+                                   if _status_key(insert[0], insert[1], insert[3], insert[5]) not in merged]
+                        if missing:
+                            execute_values(cursor, insert_query, missing, template=insert_template, page_size=len(missing))
+                    conn.commit()
+            except psycopg2.Error as error:
+                conn.rollback()
+                logger.error(f"Error writing {len(updates)} status updates and {len(inserts)} inserts: {error.pgerror}")
+                raise
+
     def _exists(self, ctx_id: str, object_id: str, user_id: str, topic: str) -> bool:
         query = """
             SELECT EXISTS(SELECT 1 FROM statuses 
@@ -14,13 +14,14 @@ from data.data_common.data_transfer_objects.profile_dto import (
 )
 from common.genie_logger import GenieLogger
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import register_schema
 
 logger = GenieLogger()
 
 
 class TenantProfilesRepository:
     def __init__(self):
-        self.create_table_if_not_exists()
+        register_schema(self.create_table_if_not_exists)
 
 
     def create_table_if_not_exists(self):
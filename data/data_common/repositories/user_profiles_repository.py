@@ -9,6 +9,7 @@ from common.utils.str_utils import get_uuid4
 
 from common.genie_logger import GenieLogger
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import register_schema
 from data.data_common.data_transfer_objects.sales_action_item_dto import SalesActionItem
 from data.data_common.data_transfer_objects.profile_dto import (
     ProfileDTO,
@@ -22,7 +23,7 @@ logger = GenieLogger()
 
 class UserProfilesRepository:
     def __init__(self):
-        self.create_table_if_not_exists()
+        register_schema(self.create_table_if_not_exists)
 
 
     def create_table_if_not_exists(self):
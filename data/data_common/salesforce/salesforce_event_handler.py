@@ -17,7 +17,6 @@ class SalesforceEventHandler:
             logger.info(f"Received event data: {event}")
             salesforce_contact_id = event.get("ContactId__c")
             change_type = event.get("ChangeType__c")
-            self.contacts_repository.create_table_if_not_exists()
 
             if not salesforce_contact_id or not change_type:
                 logger.error("Invalid event data: missing ContactId or ChangeType")
@@ -10,6 +10,7 @@ from data.data_common.utils.str_utils import remove_non_alphanumeric_strings
 from common.utils import env_utils
 from common.genie_logger import GenieLogger
 from ai.langsmith.langsmith_loader import Langsmith
+from ai.langsmith.param_scoring import score_in_batches
 from data.api_services.linkedin_scrape import HandleLinkedinScrape
 from common.utils.str_utils import fix_linkedin_url
 from data.data_common.repositories.persons_repository import PersonsRepository
@@ -118,57 +119,78 @@ class ProfileParamsService:
         if not self.clues_column_index:
             await self._initialize_sheet()  # Ensure sheet is initialized
 
-        tasks = []
-        for row in self.data_rows:
-            if row[self.id_column_index] and row[self.id_column_index] != '0':
-                task = asyncio.create_task(self.evaluate_param(post, name, position, company, {
-                    'param_id': row[self.id_column_index],
-                    'param_name': row[self.param_name_column_index],
-                    'min_range': row[self.min_range_column_index],
-                    'max_range': row[self.max_range_column_index],
-                    'param_explanation': row[self.param_explanation_column_index],
-                    'clues_list': row[self.clues_column_index].split(";")
-                }))
-                tasks.append(task)
-
-        # 🚀 Process tasks as they complete
-        results = []
-        for completed_task in asyncio.as_completed(tasks):
-            try:
-                result = await completed_task
-                if isinstance(result, dict) and result:
-                    results.append(result)
-            except Exception as e:
-                logger.error(f"Error evaluating param: {e}")
-
-        return results  # Return only successful evaluations
+        param_dicts = [
+            self._param_dict(row) for row in self.data_rows
+            if row[self.id_column_index] and row[self.id_column_index] != '0'
+        ]
+        return await self.evaluate_params(post, name, position, company, param_dicts)  # Only successful evaluations
 
     async def evaluate_work_history_params(self, work_element, name, position, company):
         if not self.clues_column_index:
             await self._initialize_sheet()  # Ensure sheet is initialized
 
-        filtered_data_rows = [
-            row for row in self.data_rows if row[self.id_column_index] in self.work_history_params_ids
-        ]
-        tasks = [
-            self.evaluate_param(work_element, name, position, company, {
-                'param_id': row[self.id_column_index],
-                'param_name': row[self.param_name_column_index],
-                'min_range': row[self.min_range_column_index],
-                'max_range': row[self.max_range_column_index],
-                'param_explanation': row[self.param_explanation_column_index],
-                'clues_list': row[self.clues_column_index].split(";")
-            })
-            for row in filtered_data_rows if row[self.id_column_index] and row[self.id_column_index] != '0'
+        param_dicts = [
+            self._param_dict(row) for row in self.data_rows
+            if row[self.id_column_index] in self.work_history_params_ids
+            and row[self.id_column_index] and row[self.id_column_index] != '0'
         ]
+        return await self.evaluate_params(work_element, name, position, company, param_dicts)
 
-        results = []
-        for task in asyncio.as_completed(tasks):
-            result = await task
-            if result:
-                results.append(result)
+    def _param_dict(self, row):
+        return {
+            'param_id': row[self.id_column_index],
+            'param_name': row[self.param_name_column_index],
+            'min_range': row[self.min_range_column_index],
+            'max_range': row[self.max_range_column_index],
+            'param_explanation': row[self.param_explanation_column_index],
+            'clues_list': row[self.clues_column_index].split(";")
+        }
 
-        return results
+    async def evaluate_params(self, artifact, name, position, company, param_dicts):
+        """
+        Scores the artifact on every parameter of param_dicts, several parameters per LLM call (see param_scoring);
+        the parameters a batched call fails to score are evaluated one by one with evaluate_param.
+        """
+        person = {
+            'name': name,
+            'position': position,
+            'company': company,
+        }
+
+        async def score_batch(group):
+            params_data = [{'param_id': param_dict['param_id'], **self._param_data(param_dict)} for param_dict in group]
+            scores = await self.langsmith.get_params_evaluation(person, params_data, artifact)
+            return {
+                str(param_dict['param_id']): self._param_result(param_dict, scores[str(param_dict['param_id'])])
+                for param_dict in group if str(param_dict['param_id']) in scores
+            }
+
+        async def score_one(param_dict):
+            return await self.evaluate_param(artifact, name, position, company, param_dict)
+
+        return await score_in_batches(param_dicts, artifact, score_batch, score_one)
+
+    @staticmethod
+    def _param_data(param_dict):
+        return {
+            'param_name': param_dict.get('param_name'),
+            'min_range': param_dict.get('min_range'),
+            'max_range': param_dict.get('max_range'),
+            'explanation': param_dict.get('param_explanation'),
+            'clues': remove_non_alphanumeric_strings(param_dict.get('clues_list')),
+        }
+
+    @staticmethod
+    def _param_result(param_dict, response):
+        param_name = param_dict.get('param_name')
+        clues_list = remove_non_alphanumeric_strings(param_dict.get('clues_list'))
+        response_dict = {'param': param_name, 'param_id': param_dict.get('param_id')}
+        response['param'] = param_name
+        response_clues = response.get('clues') or []
+        for i in range(min(len(response_clues), len(clues_list))):
+            response['clues'][i]['clue'] = clues_list[i]
+        response_dict.update(response)
+        return response_dict
 
     async def evaluate_param(self, post, name, position, company, param_dict):
         person = {
@@ -176,35 +198,18 @@ class ProfileParamsService:
             'position': position,
             'company': company,
         }
+        param_id = param_dict.get('param_id')
+        param_name = param_dict.get('param_name')
         try:
-            param_id = param_dict.get('param_id')
-            param_name = param_dict.get('param_name')
-            min_range = param_dict.get('min_range')
-            max_range = param_dict.get('max_range')
-            param_explanation = param_dict.get('param_explanation')
-            clues_list = param_dict.get('clues_list')
-            clues_list = remove_non_alphanumeric_strings(clues_list)
+            param_data = self._param_data(param_dict)
         except Exception as e:
             logger.error(f"Failed to find parameter {param_id}: {param_name} in sheet. Error: {e}")
             return {}
-        param_data = {
-            'param_name': param_name,
-            'min_range': min_range,
-            'max_range': max_range,
-            'explanation': param_explanation,
-            'clues': clues_list,
-        }
         try:
             response = await self.langsmith.get_param_evaluation(person, param_data, post)
             logger.info(f"Got response for parameter {param_name}: {response}")
             if response:
-                response_dict = { 'param': param_name, 'param_id': param_id }
-                response['param'] = param_name
-                response_clues = response.get('clues')
-                for i in range(min(len(response_clues), len(clues_list))):
-                    response['clues'][i]['clue'] = clues_list[i]
-                response_dict.update(response)
-                return response_dict
+                return self._param_result(param_dict, response)
             else:
                 logger.error(f"Failed to evaluate parameter {param_name} for person {name}")
         except Exception as e:
@@ -0,0 +1,68 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool
+
+from common.utils import env_utils
+from common.genie_logger import GenieLogger
+from data.data_common.utils import postgres_connector
+
+logger = GenieLogger()
+
+DB_ASYNC_POOL_MIN_CONN = int(env_utils.get("DB_ASYNC_POOL_MIN_CONN", "1"))
+DB_ASYNC_POOL_MAX_CONN = int(env_utils.get("DB_ASYNC_POOL_MAX_CONN", "20"))
+
+# psycopg3 accepts the same %s placeholders as psycopg2, so the async repositories reuse the sync SQL as-is
+conninfo = make_conninfo(
+    user=postgres_connector.db_user,
+    password=postgres_connector.password,
+    host=postgres_connector.host,
+    port=postgres_connector.port,
+    dbname=postgres_connector.database,
+)
+
+_async_pool: Optional[AsyncConnectionPool] = None
+_async_pool_open: Optional[asyncio.Future] = None
+
+
+async def get_async_pool() -> AsyncConnectionPool:
+    """
+    The async pool is bound to the running event loop, so it is created and opened lazily on first use
+    (one pool per process: the API loop or the consumers loop).
+    """
+    global _async_pool, _async_pool_open
+    if _async_pool is None:
+        _async_pool = AsyncConnectionPool(
+            conninfo,
+            min_size=DB_ASYNC_POOL_MIN_CONN,
+            max_size=DB_ASYNC_POOL_MAX_CONN,
+            timeout=postgres_connector.DB_POOL_TIMEOUT_SECONDS,
+            open=False,
+        )
+        _async_pool_open = asyncio.ensure_future(_async_pool.open())
+        logger.info(f"Opening async connection pool (max_size={DB_ASYNC_POOL_MAX_CONN})")
+    await _async_pool_open
+    return _async_pool
+
+
+@asynccontextmanager
+async def async_db_connection():
+    """Check out an async connection; the transaction is committed on success and rolled back on error."""
+    pool = await get_async_pool()
+    async with pool.connection() as conn:
+        yield conn
+
+
+async def close_async_pool():
+    global _async_pool, _async_pool_open
+    if _async_pool is not None:
+        await _async_pool.close()
+        logger.info("Async connection pool closed")
+    _async_pool = None
+    _async_pool_open = None
+
+
+def get_async_pool_stats() -> dict:
+    return _async_pool.get_stats() if _async_pool is not None else {}
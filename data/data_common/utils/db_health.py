@@ -0,0 +1,80 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+from common.utils import env_utils
+from common.genie_logger import GenieLogger
+from data.data_common.utils import postgres_connector
+
+logger = GenieLogger()
+
+DB_HEALTH_CACHE_TTL_SECONDS = float(env_utils.get("DB_HEALTH_CACHE_TTL_SECONDS", "5"))
+DB_HEALTH_CHECKOUT_TIMEOUT_SECONDS = float(env_utils.get("DB_HEALTH_CHECKOUT_TIMEOUT_SECONDS", "1"))
+DB_HEALTH_STATEMENT_TIMEOUT_MS = int(env_utils.get("DB_HEALTH_STATEMENT_TIMEOUT_MS", "500"))
+
+
+class DbHealthChecker:
+    """
+    Readiness check for the database that never competes with real traffic:
+    one connection, one SELECT 1 under a short statement timeout, and the result is cached for `ttl` seconds.
+    Concurrent probes while a check is running get the cached result instead of queueing behind it.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DB_HEALTH_CACHE_TTL_SECONDS,
+        checkout_timeout: float = DB_HEALTH_CHECKOUT_TIMEOUT_SECONDS,
+        statement_timeout_ms: int = DB_HEALTH_STATEMENT_TIMEOUT_MS,
+    ):
+        self.ttl = ttl
+        self.checkout_timeout = checkout_timeout
+        self.statement_timeout_ms = statement_timeout_ms
+        self._lock = threading.Lock()
+        self._result = None
+        self._checked_at = 0.0
+
+    def _pool_state(self) -> dict:
+        stats = postgres_connector.get_pool_stats()
+        return {key: stats[key] for key in ("size", "max_size", "in_use", "idle", "waiters", "timeouts", "leaked")}
+
+    def _probe(self) -> dict:
+        start = time.monotonic()
+        error = None
+        try:
+            postgres_connector.ping_db(self.checkout_timeout, self.statement_timeout_ms)
+        except Exception as e:
+            error = str(e)
+            logger.warning(f"Database readiness probe failed: {e}")
+        return {
+            "healthy": error is None,
+            "latency_ms": round((time.monotonic() - start) * 1000, 3),
+            "error": error,
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def check(self, force: bool = False) -> dict:
+        now = time.monotonic()
+        if not force and self._result is not None and now - self._checked_at < self.ttl:
+            return {**self._result, "cached": True, "pool": self._pool_state()}
+        if not self._lock.acquire(blocking=self._result is None):
+            # Another thread is probing right now; serve the previous result
+            return {**self._result, "cached": True, "pool": self._pool_state()}
+        try:
+            self._result = self._probe()
+            self._checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+        return {**self._result, "cached": False, "pool": self._pool_state()}
+
+
+db_health_checker = DbHealthChecker()
+
+
+def liveness() -> dict:
+    """The process is up and serving requests; deliberately does not touch the database."""
+    return {"status": "alive"}
+
+
+def readiness(force: bool = False) -> dict:
+    result = db_health_checker.check(force)
+    return {"status": "ready" if result["healthy"] else "not ready", "database": result}
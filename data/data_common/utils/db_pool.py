@@ -0,0 +1,252 @@
+import bisect
+import threading
+import time
+import traceback
+from typing import Callable, Optional
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+from common.genie_logger import GenieLogger
+
+logger = GenieLogger()
+
+# Upper bounds (in milliseconds) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolTimeoutError(PoolError):
+    """Raised when no connection became available within the checkout timeout."""
+
+
+class LatencyHistogram:
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float):
+        self.counts[bisect.bisect_left(self.buckets_ms, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Upper bound of the bucket holding the p-th percentile (None for the open-ended bucket)."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets_ms[index] if index < len(self.buckets_ms) else None
+        return None
+
+    def to_dict(self) -> dict:
+        labels = [f"<={bound}ms" for bound in self.buckets_ms] + [f">{self.buckets_ms[-1]}ms"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class InstrumentedConnectionPool:
+    """
+    Thread-safe replacement for psycopg2's SimpleConnectionPool.
+
+    - getconn() blocks up to `timeout` seconds when all `maxconn` connections are checked out,
+      instead of failing immediately with PoolError.
+    - Records checkout wait and hold latencies, in-use / idle / waiter gauges and leaked checkouts
+      (connections held for longer than `leak_threshold` seconds).
+    - Connections are opened lazily; closed or broken connections are discarded and replaced.
+    - With `capture_stacks` the checkout call site is kept so leak reports show who holds the connection.
+    """
+
+    def __init__(
+        self,
+        minconn: int,
+        maxconn: int,
+        timeout: float = 30.0,
+        leak_threshold: float = 60.0,
+        capture_stacks: bool = False,
+        connection_factory: Callable = psycopg2.connect,
+        **connect_kwargs,
+    ):
+        if maxconn < 1 or minconn < 0 or minconn > maxconn:
+            raise ValueError(f"Invalid pool bounds: minconn={minconn}, maxconn={maxconn}")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.leak_threshold = leak_threshold
+        self.capture_stacks = capture_stacks
+        self._connection_factory = connection_factory
+        self._connect_kwargs = connect_kwargs
+
+        self._condition = threading.Condition(threading.Lock())
+        self._idle: list = []
+        self._in_use: dict[int, tuple] = {}  # id(conn) -> (conn, checkout monotonic time, thread name, stack)
+        self._opening = 0
+        self._waiters = 0
+        self._closed = False
+
+        self._wait_histogram = LatencyHistogram()
+        self._hold_histogram = LatencyHistogram()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._connections_opened = 0
+        self._connections_discarded = 0
+        self._leaks_reported: set[int] = set()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _open_connection(self):
+        return self._connection_factory(**self._connect_kwargs)
+
+    def getconn(self, timeout: Optional[float] = None):
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+                while self._idle:
+                    conn = self._idle.pop()
+                    if conn.closed:
+                        self._connections_discarded += 1
+                        continue
+                    return self._checkout(conn, start)
+                if len(self._in_use) + self._opening < self.maxconn:
+                    self._opening += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    self._report_leaks_locked()
+                    raise PoolTimeoutError(f"Timed out after {timeout}s waiting for a connection ({self.maxconn} in use)")
+                self._waiters += 1
+                try:
+                    self._condition.wait(remaining)
+                finally:
+                    self._waiters -= 1
+
+        # Open the new connection outside the lock so other threads can keep checking out / returning
+        try:
+            conn = self._open_connection()
+        except Exception:
+            with self._condition:
+                self._opening -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._opening -= 1
+            self._connections_opened += 1
+            return self._checkout(conn, start)
+
+    def _checkout(self, conn, start: float):
+        now = time.monotonic()
+        stack = "".join(traceback.format_stack(limit=8)[:-2]) if self.capture_stacks else ""
+        self._in_use[id(conn)] = (conn, now, threading.current_thread().name, stack)
+        self._wait_histogram.observe((now - start) * 1000)
+        self._checkouts += 1
+        return conn
+
+    def putconn(self, conn, close: bool = False):
+        with self._condition:
+            entry = self._in_use.get(id(conn))
+            if entry is None:
+                if self._closed:
+                    self._discard(conn)
+                    return
+                raise PoolError("trying to put unkeyed connection")
+        # The rollback of an open transaction is a round-trip, so it runs before the slot is released
+        # but without holding the pool lock
+        reusable = not (self._closed or close or conn.closed) and self._reset(conn)
+        with self._condition:
+            self._in_use.pop(id(conn), None)
+            self._hold_histogram.observe((time.monotonic() - entry[1]) * 1000)
+            self._leaks_reported.discard(id(conn))
+            if reusable and not self._closed:
+                self._idle.append(conn)
+            else:
+                self._discard(conn)
+            self._condition.notify()
+
+    def _reset(self, conn) -> bool:
+        """Return the connection to an idle transaction state; False if it should be discarded."""
+        try:
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                return False
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            return True
+        except Exception as e:
+            logger.warning(f"Discarding connection that failed to reset: {e}")
+            return False
+
+    def _discard(self, conn):
+        self._connections_discarded += 1
+        try:
+            if not conn.closed:
+                conn.close()
+        except Exception:
+            pass
+
+    def closeall(self):
+        with self._condition:
+            self._closed = True
+            for conn in self._idle + [entry[0] for entry in self._in_use.values()]:
+                self._discard(conn)
+            self._idle.clear()
+            self._in_use.clear()
+            self._condition.notify_all()
+
+    def _report_leaks_locked(self) -> list[dict]:
+        now = time.monotonic()
+        leaks = []
+        for key, (conn, checked_out_at, thread_name, stack) in self._in_use.items():
+            held_for = now - checked_out_at
+            if held_for < self.leak_threshold:
+                continue
+            leaks.append({"held_seconds": round(held_for, 3), "thread": thread_name, "stack": stack})
+            if key not in self._leaks_reported:
+                self._leaks_reported.add(key)
+                logger.warning(f"Possible connection leak: held for {held_for:.1f}s by thread {thread_name}\n{stack}")
+        return leaks
+
+    def find_leaks(self) -> list[dict]:
+        """Connections currently held for longer than the leak threshold."""
+        with self._condition:
+            return self._report_leaks_locked()
+
+    def stats(self) -> dict:
+        with self._condition:
+            leaks = self._report_leaks_locked()
+            return {
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "size": len(self._in_use) + len(self._idle),
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "waiters": self._waiters,
+                "closed": self._closed,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "connections_opened": self._connections_opened,
+                "connections_discarded": self._connections_discarded,
+                "leaked": len(leaks),
+                "leaks": [{k: v for k, v in leak.items() if k != "stack"} for leak in leaks],
+                "checkout_wait": self._wait_histogram.to_dict(),
+                "checkout_hold": self._hold_histogram.to_dict(),
+            }
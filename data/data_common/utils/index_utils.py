@@ -0,0 +1,56 @@
+from contextlib import contextmanager
+
+from psycopg2 import sql
+
+from common.genie_logger import GenieLogger
+from data.data_common.utils.postgres_connector import db_connection
+
+logger = GenieLogger()
+
+
+@contextmanager
+def autocommit_connection():
+    """
+    Pooled connection in autocommit mode, for statements that cannot run inside a transaction block
+    (CREATE / DROP INDEX CONCURRENTLY). Autocommit is switched back off before the connection returns to the pool.
+    """
+    with db_connection() as conn:
+        conn.autocommit = True
+        try:
+            yield conn
+        finally:
+            conn.autocommit = False
+
+
+def create_index_concurrently(index_name: str, table: str, definition: str, unique: bool = False):
+    """
+    CREATE [UNIQUE] INDEX CONCURRENTLY IF NOT EXISTS <index_name> ON <table> <definition>.
+    A previous interrupted concurrent build leaves an INVALID index behind that IF NOT EXISTS would keep,
+    so such an index is dropped and rebuilt.
+    """
+    with autocommit_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid
+                WHERE c.relname = %s;
+                """,
+                (index_name,),
+            )
+            row = cursor.fetchone()
+            if row and not row[0]:
+                logger.warning(f"Index {index_name} is invalid, rebuilding it")
+                cursor.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(index_name)))
+            cursor.execute(
+                sql.SQL("CREATE {}INDEX CONCURRENTLY IF NOT EXISTS {} ON {} ").format(
+                    sql.SQL("UNIQUE " if unique else ""), sql.Identifier(index_name), sql.Identifier(table)
+                )
+                + sql.SQL(definition)
+            )
+            logger.info(f"Index {index_name} on {table} is ready")
+
+
+def drop_index_concurrently(index_name: str):
+    with autocommit_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(index_name)))
@@ -7,6 +7,7 @@ from contextlib import contextmanager
 
 from common.utils import env_utils
 from common.genie_logger import GenieLogger
+from data.data_common.utils.db_pool import InstrumentedConnectionPool, PoolTimeoutError
 
 logger = GenieLogger()
 load_dotenv()
@@ -20,10 +21,18 @@ database = env_utils.get(DEV_MODE + "DB_NAME")
 password = env_utils.get(DEV_MODE + "DB_PASSWORD")
 port = int(env_utils.get(DEV_MODE + "DB_PORT"))
 
-# Create a connection pool
-connection_pool = psycopg2.pool.SimpleConnectionPool(
+DB_POOL_MAX_CONN = int(env_utils.get("DB_POOL_MAX_CONN", "25"))
+DB_POOL_TIMEOUT_SECONDS = float(env_utils.get("DB_POOL_TIMEOUT_SECONDS", "30"))
+DB_POOL_LEAK_THRESHOLD_SECONDS = float(env_utils.get("DB_POOL_LEAK_THRESHOLD_SECONDS", "60"))
+DB_POOL_CAPTURE_STACKS = env_utils.get("DB_POOL_CAPTURE_STACKS", "false").lower() == "true"
+
+# Create a connection pool (shared by the FastAPI threadpool, scheduler threads and the consumers)
+connection_pool = InstrumentedConnectionPool(
     minconn=1,
-    maxconn=25,  # Adjust this based on your expected concurrency
+    maxconn=DB_POOL_MAX_CONN,
+    timeout=DB_POOL_TIMEOUT_SECONDS,
+    leak_threshold=DB_POOL_LEAK_THRESHOLD_SECONDS,
+    capture_stacks=DB_POOL_CAPTURE_STACKS,
     user=db_user,
     password=password,
     host=host,
@@ -51,12 +60,11 @@ def create_database_if_not_exists():
 
 def get_db_connection():
     try:
-        # Get a connection from the pool
-        conn = connection_pool.getconn()
-        if conn.closed:
-            logger.error("Connection is closed")
-            return get_db_connection()
-        return conn
+        # Get a connection from the pool; blocks up to DB_POOL_TIMEOUT_SECONDS when the pool is exhausted
+        return connection_pool.getconn()
+    except PoolTimeoutError as e:
+        logger.error(f"Timed out waiting for a connection from pool: {e}. Pool stats: {get_pool_stats()}")
+        return None
     except psycopg2.DatabaseError as e:
         logger.error(f"Error getting connection from pool: {e}")
         traceback.print_exc()
@@ -68,13 +76,22 @@ def release_db_connection(conn):
     if conn and not conn.closed:
         connection_pool.putconn(conn)
         logger.debug("Connection released back to pool")
-    else:
+    elif conn:
+        # Still hand it back so the pool frees the slot and discards the connection
         logger.warning("Attempted to release an already closed connection")
+        connection_pool.putconn(conn, close=True)
+
+
+def get_pool_stats() -> dict:
+    """
+    Snapshot of the connection pool: size / in_use / idle / waiters gauges, checkout wait and hold
+    latency histograms, timeouts and connections held longer than DB_POOL_LEAK_THRESHOLD_SECONDS.
+    """
+    return connection_pool.stats()
 
 
 @contextmanager
 def db_connection():
-    create_database_if_not_exists()
     conn = get_db_connection()
     try:
         # Check if the connection is still open before using it
@@ -96,22 +113,26 @@ def db_connection():
             connection_pool.putconn(conn, close=True)  # Remove and close the invalid connection
 
 
-def check_db_connection():
-    max_connections = connection_pool.maxconn
-    closed_connections = 0
-
-    # Acquire and check each connection in the pool
-    for _ in range(max_connections):
-        conn = connection_pool.getconn()
-        try:
-            if conn.closed:
-                closed_connections += 1
-        finally:
-            # Always release the connection back to the pool
-            connection_pool.putconn(conn)
-    # Check if more than half of the connections are closed
-    if closed_connections >= max_connections // 2:
-        logger.warning(f"More than half of the connections are closed ({closed_connections}/{max_connections}). Consider corrective action.")
-        return False
-    else:
+def ping_db(checkout_timeout: float = 1.0, statement_timeout_ms: int = 500):
+    """
+    Validate a single pooled connection with SELECT 1 under a short statement timeout.
+    Raises on failure; never holds more than one connection, so it cannot drain the pool.
+    """
+    conn = connection_pool.getconn(timeout=checkout_timeout)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SET LOCAL statement_timeout = %s", (f"{int(statement_timeout_ms)}ms",))
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        conn.rollback()
+    finally:
+        connection_pool.putconn(conn, close=bool(conn.closed))
+
+
+def check_db_connection(checkout_timeout: float = 1.0, statement_timeout_ms: int = 500) -> bool:
+    try:
+        ping_db(checkout_timeout, statement_timeout_ms)
         return True
+    except Exception as e:
+        logger.warning(f"Database health check failed: {e}")
+        return False
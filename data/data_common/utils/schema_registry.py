@@ -0,0 +1,72 @@
+import threading
+import traceback
+from typing import Callable
+
+from common.genie_logger import GenieLogger
+from data.data_common.utils import postgres_connector
+
+logger = GenieLogger()
+
+# Repositories register their DDL callables here instead of running them on every __init__ / method call.
+# bootstrap_schema() runs them once per process (at startup or from run_migrations.py) and flips the
+# "schema ready" flag, after which the hot paths never issue DDL or open the side connection to "postgres".
+_registered_ddl: dict[str, Callable[[], None]] = {}
+_applied_ddl: set[str] = set()
+_lock = threading.RLock()
+_schema_ready = False
+
+
+def _ddl_key(ddl: Callable[[], None]) -> str:
+    owner = getattr(ddl, "__self__", None)
+    if owner is not None:
+        return f"{type(owner).__name__}.{ddl.__name__}"
+    return getattr(ddl, "__qualname__", repr(ddl))
+
+
+def _apply(key: str, ddl: Callable[[], None]):
+    try:
+        ddl()
+        _applied_ddl.add(key)
+    except Exception as e:
+        logger.error(f"Failed to apply schema DDL {key}: {e}")
+        traceback.print_exc()
+
+
+def register_schema(ddl: Callable[[], None]):
+    """
+    Register a repository's create-table callable. If the schema was already bootstrapped in this process,
+    a repository type seen for the first time gets its DDL applied immediately (once).
+    """
+    key = _ddl_key(ddl)
+    with _lock:
+        if key in _registered_ddl:
+            return
+        _registered_ddl[key] = ddl
+        if _schema_ready:
+            _apply(key, ddl)
+
+
+def bootstrap_schema(force: bool = False):
+    """
+    Create the database (if needed) and run every registered DDL exactly once for this process.
+    """
+    global _schema_ready
+    with _lock:
+        if _schema_ready and not force:
+            return
+        logger.info(f"Bootstrapping database schema ({len(_registered_ddl)} registered DDL callables)")
+        postgres_connector.create_database_if_not_exists()
+        for key, ddl in _registered_ddl.items():
+            if force or key not in _applied_ddl:
+                _apply(key, ddl)
+        _schema_ready = True
+        logger.info("Database schema is ready")
+
+
+def is_schema_ready() -> bool:
+    return _schema_ready
+
+
+def registered_schemas() -> list[str]:
+    with _lock:
+        return list(_registered_ddl.keys())
@@ -0,0 +1,144 @@
+import time
+from enum import Enum
+from typing import Iterable, Optional
+
+import psycopg2
+from psycopg2 import errors, sql
+
+from common.genie_logger import GenieLogger
+from common.utils import env_utils
+
+logger = GenieLogger()
+
+# How long an upsert without its unique index falls back to check-then-write before trying the upsert again
+UPSERT_REPROBE_SECONDS = float(env_utils.get("UPSERT_REPROBE_SECONDS", "300"))
+
+
+class Merge(Enum):
+    """What happens to a column when the row already exists."""
+
+    OVERWRITE = "overwrite"  # take the new value, NULL included
+    KEEP_IF_NULL = "keep_if_null"  # take the new value unless it is NULL
+    INSERT_ONLY = "insert_only"  # set on insert, never updated
+    TOUCH = "touch"  # CURRENT_TIMESTAMP on insert and on every update that reaches the row
+    CREATED = "created"  # CURRENT_TIMESTAMP on insert, never updated
+
+
+class UpsertUnavailable(Exception):
+    """The table has no unique index matching the conflict columns (yet); callers fall back to check-then-write."""
+
+
+class Upsert:
+    """
+    Single round-trip INSERT ... ON CONFLICT (<conflict_columns>) DO UPDATE ... RETURNING statement for a table.
+
+    Values are passed by column name. Columns without a rule are OVERWRITE, `insert_defaults` only apply to the
+    inserted row, and TOUCH / CREATED columns are set by the database. With `only_if_changed`, an existing row whose
+    merged values would not change is left alone, and execute() returns None for it.
+    Every returned row ends with an `inserted` flag.
+
+    While the unique index is missing, `available` is False for `reprobe_seconds`, then the upsert is tried again,
+    so processes pick it up once the index is built.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        conflict_columns: Iterable[str],
+        rules: Optional[dict[str, Merge]] = None,
+        insert_defaults: Optional[dict] = None,
+        returning: Iterable[str] = ("id",),
+        only_if_changed: bool = False,
+        reprobe_seconds: float = UPSERT_REPROBE_SECONDS,
+    ):
+        self.table = table
+        self.conflict_columns = tuple(conflict_columns)
+        self.rules = rules or {}
+        self.insert_defaults = insert_defaults or {}
+        self.returning = tuple(returning)
+        self.only_if_changed = only_if_changed
+        self.reprobe_seconds = reprobe_seconds
+        self._unavailable_until = 0.0
+        self._queries: dict[tuple, sql.Composed] = {}
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._unavailable_until
+
+    def rule(self, column: str) -> Merge:
+        if column in self.conflict_columns:
+            return Merge.INSERT_ONLY
+        return self.rules.get(column, Merge.OVERWRITE)
+
+    def _insert_value(self, column: str) -> sql.Composable:
+        if self.rule(column) in (Merge.TOUCH, Merge.CREATED):
+            return sql.SQL("CURRENT_TIMESTAMP")
+        if column in self.insert_defaults:
+            return sql.SQL("COALESCE({}, {})").format(sql.Placeholder(column), sql.Literal(self.insert_defaults[column]))
+        return sql.Placeholder(column)
+
+    def _update_value(self, column: str) -> Optional[sql.Composable]:
+        rule = self.rule(column)
+        if rule in (Merge.INSERT_ONLY, Merge.CREATED):
+            return None
+        if rule == Merge.TOUCH:
+            return sql.SQL("CURRENT_TIMESTAMP")
+        if rule == Merge.KEEP_IF_NULL:
+            return sql.SQL("COALESCE({}, t.{})").format(sql.Placeholder(column), sql.Identifier(column))
+        return sql.Placeholder(column)
+
+    def query(self, columns: Iterable[str]) -> sql.Composed:
+        columns = tuple(columns)
+        if columns in self._queries:
+            return self._queries[columns]
+        updates = {column: self._update_value(column) for column in columns}
+        updates = {column: value for column, value in updates.items() if value is not None}
+        query = sql.SQL("INSERT INTO {table} AS t ({columns}) VALUES ({values}) ON CONFLICT ({conflict}) ").format(
+            table=sql.Identifier(self.table),
+            columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
+            values=sql.SQL(", ").join(self._insert_value(column) for column in columns),
+            conflict=sql.SQL(", ").join(map(sql.Identifier, self.conflict_columns)),
+        )
+        if not updates:
+            query += sql.SQL("DO NOTHING")
+        else:
+            query += sql.SQL("DO UPDATE SET ") + sql.SQL(", ").join(
+                sql.SQL("{} = {}").format(sql.Identifier(column), value) for column, value in updates.items()
+            )
+            compared = [column for column in updates if self.rule(column) != Merge.TOUCH]
+            if self.only_if_changed and compared:
+                query += sql.SQL(" WHERE ({}) IS DISTINCT FROM ({})").format(
+                    sql.SQL(", ").join(sql.SQL("t.{}").format(sql.Identifier(column)) for column in compared),
+                    sql.SQL(", ").join(updates[column] for column in compared),
+                )
+        query += sql.SQL(" RETURNING {}, (xmax = 0) AS inserted").format(
+            sql.SQL(", ").join(sql.SQL("t.{}").format(sql.Identifier(column)) for column in self.returning)
+        )
+        self._queries[columns] = query
+        return query
+
+    def execute(self, conn, values: dict, touch: Iterable[str] = ()) -> Optional[tuple]:
+        """
+        Runs the upsert for one row and commits. `touch` lists TOUCH / CREATED columns to stamp on this call,
+        for timestamps that only apply when a given value is written.
+        Returns the RETURNING row, or None when the row was left unchanged (or skipped by DO NOTHING).
+        """
+        columns = tuple(values) + tuple(column for column in touch if column not in values)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(self.query(columns), values)
+                row = cursor.fetchone()
+            conn.commit()
+            return row
+        except errors.InvalidColumnReference as error:
+            # No unique index matches the conflict columns, see the migration creating it
+            conn.rollback()
+            self._unavailable_until = time.monotonic() + self.reprobe_seconds
+            logger.warning(
+                f"Upsert on {self.table}{self.conflict_columns} is unavailable, "
+                f"retrying it in {self.reprobe_seconds:.0f}s: {error.pgerror}"
+            )
+            raise UpsertUnavailable(str(error)) from error
+        except psycopg2.Error:
+            conn.rollback()
+            raise
@@ -54,7 +54,7 @@ class EmailManager(GenieConsumer):
 
     async def process_event(self, event):
         logger.info(f"EmailManager processing event: {event}")
-        topic = event.properties.get(b"topic").decode("utf-8")
+        topic = event.topic
         logger.info(f"Processing event on topic {topic}")
 
         match topic:
@@ -66,10 +66,7 @@ class EmailManager(GenieConsumer):
                 return {"status": "error", "message": f"Unknown topic: {topic}"}
 
     async def handle_meeting_reminder(self, event):
-        event_body = event.body_as_str()
-        event_body = json.loads(event_body)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         meeting_uuid = event_body.get("meeting_uuid")
         logger.info(f"Handling meeting reminder for meeting UUID: {meeting_uuid}")
         already_sent = self.meetings_repository.has_sent_meeting_reminder(meeting_uuid)
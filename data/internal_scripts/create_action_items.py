@@ -4,6 +4,7 @@ import os
 from typing import List
 
 from data.data_common.events.genie_event import GenieEvent
+from data.data_common.events.priority import Priority
 from data.data_common.events.genie_event_batch_manager import EventHubBatchManager
 from data.data_common.events.topics import Topic
 
@@ -67,7 +68,8 @@ def create_new_base_profile_events(uuid: str, tenant_id: str):
 
     event = GenieEvent(
         topic=Topic.NEW_BASE_PROFILE,
-        data=data_to_send
+        data=data_to_send,
+        priority=Priority.BULK,
     )
     return event
 
@@ -2,6 +2,7 @@ import sys
 import os
 
 from data.data_common.events.genie_event import GenieEvent
+from data.data_common.events.priority import Priority
 from data.data_common.events.topics import Topic
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
@@ -46,7 +47,8 @@ def fetch_apollo_data(uuids: list):
             if not person.email:
                 logger.error(f"Person with uuid {uuid} has no email")
                 continue
-            event = GenieEvent(topic=Topic.APOLLO_NEW_PERSON_TO_ENRICH, data={"person": person.to_dict()})
+            event = GenieEvent(topic=Topic.APOLLO_NEW_PERSON_TO_ENRICH, data={"person": person.to_dict()},
+                               priority=Priority.BULK)
             event.send()
             logger.info(f"Sent event for {person.email}")
         except Exception as e:
@@ -4,6 +4,7 @@ import requests
 
 from data.data_common.data_transfer_objects.news_data_dto import NewsData
 from data.data_common.events.genie_event import GenieEvent
+from data.data_common.events.priority import Priority
 from data.data_common.events.topics import Topic
 from data.data_common.repositories.personal_data_repository import PersonalDataRepository
 
@@ -95,6 +96,7 @@ def create_summary_to_existing_posts(uuids: list):
         event = GenieEvent(
             Topic.NEW_PERSONAL_DATA,
             data={"uuid": uuid, "news_data": news_data_objects},
+            priority=Priority.BULK,
         )
         event.send()
         logger.info(f"Successfully sent event for {uuid}")
@@ -2,6 +2,7 @@ import sys
 import os
 
 from data.data_common.events.genie_event import GenieEvent
+from data.data_common.events.priority import Priority
 from data.data_common.events.topics import Topic
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
@@ -25,6 +26,7 @@ def send_failed_to_get_profile_picture_event(person):
     event = GenieEvent(
         topic=Topic.FAILED_TO_GET_PROFILE_PICTURE,
         data={"person": person.to_dict()},
+        priority=Priority.BULK,
     )
     event.send()
     logger.error(f"Profile picture upload failed for {person.uuid}")
@@ -6,6 +6,7 @@ from typing import List
 from data.data_common.data_transfer_objects.company_dto import CompanyDTO
 from ai.langsmith.langsmith_loader import Langsmith
 from data.data_common.events.genie_event import GenieEvent
+from data.data_common.events.priority import Priority
 from data.data_common.events.topics import Topic
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
@@ -35,7 +36,7 @@ async def fix_company_challenges(limit: int = 1):
             company.challenges = updated_challenges
             companies_repository.save_company_without_news(company)
         else:
-            response = langsmith.run_prompt_company_overview_challenges({"company_data": company.to_dict()})
+            response = await langsmith.run_prompt_company_overview_challenges({"company_data": company.to_dict()})
             logger.info(f"Response: {response}")
             overview = response.get("company_overview")
             challenges = response.get("challenges")
@@ -43,7 +44,7 @@ async def fix_company_challenges(limit: int = 1):
             company.overview = overview
             company.challenges = challenges
             companies_repository.save_company_without_news(company)
-            event = GenieEvent(topic=Topic.NEW_COMPANY_DATA, data={"company_uuid": company.uuid})
+            event = GenieEvent(topic=Topic.NEW_COMPANY_DATA, data={"company_uuid": company.uuid}, priority=Priority.BULK)
             event.send()
 
 
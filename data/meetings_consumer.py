@@ -21,11 +21,13 @@ from data.data_common.dependencies.dependencies import (
     tenants_repository,
     profiles_repository,
     ownerships_repository,
+    async_meetings_repository,
 )
 from ai.langsmith.langsmith_loader import Langsmith
 from data.data_common.data_transfer_objects.meeting_dto import MeetingDTO, AgendaItem, MeetingClassification
 from data.data_common.events.genie_consumer import GenieConsumer
 from data.data_common.events.genie_event import GenieEvent
+from data.data_common.events.priority import priority_for_meeting
 from data.data_common.events.topics import Topic
 from data.data_common.events.genie_event_batch_manager import EventHubBatchManager
 from data.api_services.embeddings import GenieEmbeddingsClient
@@ -78,6 +80,7 @@ class MeetingManager(GenieConsumer):
             consumer_group=CONSUMER_GROUP,
         )
         self.meetings_repository = meetings_repository()
+        self.async_meetings_repository = async_meetings_repository()
         self.personal_data_repository = personal_data_repository()
         self.companies_repository = companies_repository()
         # self.tenant_repository = tenants_repository()
@@ -89,7 +92,7 @@ class MeetingManager(GenieConsumer):
 
     async def process_event(self, event):
         logger.info(f"Person processing event: {str(event)[:300]}")
-        topic = event.properties.get(b"topic").decode("utf-8")
+        topic = event.topic
         logger.info(f"Processing event on topic {topic}")
         # Should use Topic class
 
@@ -132,9 +135,7 @@ class MeetingManager(GenieConsumer):
 
     async def handle_new_meetings_to_process(self, event):
         logger.info(f"Person processing event: {str(event)[:300]}")
-        event_body = json.loads(event.body_as_str())
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         meetings = event_body.get("meetings")
 
         # tenant_id = event_body.get("tenant_id")
@@ -143,6 +144,7 @@ class MeetingManager(GenieConsumer):
         self_email = self.users_repository.get_email_by_user_id(user_id)
         emails_to_send_events = []
         meetings_dto_to_check_deletion = []  # List of meetings to check if they need to be deleted
+        email_priorities = {}  # Priority of each email's nearest meeting
 
         # Convert the meeting start times to timezone-aware datetime and sort meetings by start time
         def get_start_time(meeting):
@@ -154,7 +156,8 @@ class MeetingManager(GenieConsumer):
 
         # Sort meetings by the start time
         meetings = sorted(meetings, key=lambda m: get_start_time(m) or datetime.max.replace(tzinfo=pytz.UTC))
-        tasks = [self.handle_meeting_to_process(meeting, emails_to_send_events, meetings_dto_to_check_deletion, user_id, tenant_id) for meeting in meetings]
+        tasks = [self.handle_meeting_to_process(meeting, emails_to_send_events, meetings_dto_to_check_deletion, user_id, tenant_id,
+                                                email_priorities) for meeting in meetings]
         await asyncio.gather(*tasks)
         event_batch = EventHubBatchManager()
 
@@ -162,6 +165,7 @@ class MeetingManager(GenieConsumer):
         event = GenieEvent(
             topic=Topic.NEW_EMAIL_TO_PROCESS_DOMAIN,
             data={"user_id": user_id, "email": self_email},
+            priority=min(email_priorities.values(), default=None),
         )
         event_batch.queue_event(event)
 
@@ -169,11 +173,13 @@ class MeetingManager(GenieConsumer):
             event = GenieEvent(
                 topic=Topic.NEW_EMAIL_TO_PROCESS_DOMAIN,
                 data={"user_id": user_id, "email": email},
+                priority=email_priorities.get(email),
             )
             event_batch.queue_event(event)
             event = GenieEvent(
                 topic=Topic.NEW_EMAIL_ADDRESS_TO_PROCESS,
                 data={"user_id": user_id, "email": email},
+                priority=email_priorities.get(email),
             )
             event_batch.queue_event(event)
         await event_batch.send_batch()
@@ -181,7 +187,7 @@ class MeetingManager(GenieConsumer):
         return {"status": "success"}
 
     async def handle_meeting_to_process(self, meeting: MeetingDTO, emails_to_send_events, meetings_dto_to_check_deletion,
-                                        user_id, tenant_id):
+                                        user_id, tenant_id, email_priorities: dict = None):
         if isinstance(meeting, str):
             meeting = json.loads(meeting)
         meeting = MeetingDTO.from_google_calendar_event(event=meeting, user_id=user_id, tenant_id=tenant_id)
@@ -213,6 +219,10 @@ class MeetingManager(GenieConsumer):
             emails_to_process = email_utils.filter_emails(self_email, participant_emails)
         logger.info(f"Emails to process: {emails_to_process}")
         emails_to_send_events.extend(emails_to_process)
+        if email_priorities is not None:
+            priority = priority_for_meeting(meeting.start_time)
+            for email in emails_to_process:
+                email_priorities[email] = min(priority, email_priorities.get(email, priority))
 
     # async def handle_new_meeting(self, event):
     #     logger.info(f"Person processing event: {str(event)[:300]}")
@@ -263,9 +273,7 @@ class MeetingManager(GenieConsumer):
     async def create_goals_from_new_personal_data(self, event):
         logger.clean_cty_id()
         logger.info(f"Person processing event: {str(event)[:300]}")
-        event_body = json.loads(event.body_as_str())
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         user_id = event_body.get("user_id")
         if not user_id:
             user_id = logger.get_user_id()
@@ -332,9 +340,7 @@ class MeetingManager(GenieConsumer):
     async def create_goals_from_new_company_data(self, event):
         logger.clean_cty_id()
         logger.info(f"Person processing event: {str(event)[:300]}")
-        event_body = json.loads(event.body_as_str())
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         company_uuid = event_body.get("company_uuid")
         force_refresh_goals = event_body.get("force_refresh_goals")
         # tenant_id = event_body.get("tenant_id")
@@ -414,9 +420,7 @@ class MeetingManager(GenieConsumer):
     async def create_agenda_from_profile(self, event):
         logger.clean_cty_id()
         logger.info(f"Person processing event: {str(event)[:300]}")
-        event_body = json.loads(event.body_as_str())
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         person = event_body.get("person")
         profile = event_body.get("profile")
         if not person:
@@ -476,9 +480,7 @@ class MeetingManager(GenieConsumer):
     async def create_agenda_from_goals(self, event):
         logger.clean_cty_id()
         logger.info(f"Person processing event: {str(event)[:300]}")
-        event_body = json.loads(event.body_as_str())
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         meeting_uuid = event_body.get("meeting_uuid")
         seller_context = event_body.get("seller_context")
         seller_context = " || ".join(seller_context) if seller_context else None
@@ -486,7 +488,7 @@ class MeetingManager(GenieConsumer):
         if not meeting_uuid:
             logger.error("No meeting uuid in event")
             return
-        meeting = self.meetings_repository.get_meeting_data(meeting_uuid)
+        meeting = await self.async_meetings_repository.get_meeting_data(meeting_uuid)
         if not meeting:
             logger.error(f"No meeting found for {meeting_uuid}")
             raise Exception(f"No meeting found for {meeting_uuid}")
@@ -612,9 +614,7 @@ class MeetingManager(GenieConsumer):
         It will gather all future external meetings for the tenant.
         """
         logger.info(f"Person processing event: {str(event)[:300]}")
-        event_body = json.loads(event.body_as_str())
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         tenant_id = event_body.get("tenant_id")
         if not tenant_id:
             tenant_id = logger.get_tenant_id()
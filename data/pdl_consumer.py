@@ -53,7 +53,7 @@ class PDLConsumer(GenieConsumer):
 
     async def process_event(self, event):
         logger.info(f"Person processing event: {str(event)[:300]}")
-        topic = event.properties.get(b"topic").decode("utf-8")
+        topic = event.topic
         logger.info(f"Processing event on topic {topic}")
         # Should use Topic class
 
@@ -68,16 +68,11 @@ class PDLConsumer(GenieConsumer):
                 logger.info(f"Unknown topic: {topic}")
 
     async def enrich_person(self, event):
-        event_body = event.body_as_str()
-        if isinstance(event_body, str):
-            try:
-                logger.info(f"Event body is string")
-                event_body = json.loads(event_body)
-                if isinstance(event_body, str):
-                    event_body = json.loads(event_body)
-            except json.JSONDecodeError:
-                logger.error(f"Invalid JSON: {event_body}")
-                return {"error": "Invalid JSON"}
+        try:
+            event_body = event.payload
+        except json.JSONDecodeError:
+            logger.error(f"Invalid JSON: {event.body_as_str()}")
+            return {"error": "Invalid JSON"}
         if event_body.get("person"):
             person = PersonDTO.from_dict(event_body.get("person"))
         else:
@@ -183,15 +178,11 @@ class PDLConsumer(GenieConsumer):
         5. Create a PersonDTO object.
         6. Sends an event to the event queue with the PersonDTO and personal data.
         """
-        event_body = event.body_as_str()
-        event_body = json.loads(event_body)
-        if isinstance(event_body, str):
-            try:
-                logger.info(f"Event body is string")
-                event_body = json.loads(event_body)
-            except json.JSONDecodeError:
-                logger.error(f"Invalid JSON: {event_body}")
-                return {"error": "Invalid JSON"}
+        try:
+            event_body = event.payload
+        except json.JSONDecodeError:
+            logger.error(f"Invalid JSON: {event.body_as_str()}")
+            return {"error": "Invalid JSON"}
 
         email = event_body.get("email")
         uuid = event_body.get("uuid")
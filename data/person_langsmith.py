@@ -19,6 +19,7 @@ from data.data_common.events.genie_event import GenieEvent
 from data.data_common.events.genie_event_batch_manager import EventHubBatchManager
 from data.data_common.events.topics import Topic
 from data.data_common.events.genie_consumer import GenieConsumer
+from data.data_common.events.event_dispatcher import object_id_key
 from data.data_common.data_transfer_objects.sales_action_item_dto import SalesActionItem, SalesActionItemCategory
 from data.internal_services.sales_action_items_service import SalesActionItemsService
 from data.data_common.dependencies.dependencies import (
@@ -29,6 +30,7 @@ from data.data_common.dependencies.dependencies import (
     tenant_profiles_repository, 
     persons_repository,
     deals_repository,
+    async_profiles_repository,
 )
 from common.genie_logger import GenieLogger
 
@@ -38,6 +40,8 @@ load_dotenv()
 PERSON_PORT = env_utils.get("PERSON_PORT", 8005)
 
 CONSUMER_GROUP_LANGSMITH = "langsmithconsumergroup"
+# LLM calls take seconds; run several per partition, keeping events of the same person in order
+LANGSMITH_MAX_IN_FLIGHT_PER_PARTITION = int(env_utils.get("LANGSMITH_MAX_IN_FLIGHT_PER_PARTITION", "4"))
 
 
 class LangsmithConsumer(GenieConsumer):
@@ -49,11 +53,14 @@ class LangsmithConsumer(GenieConsumer):
                     Topic.NEW_PERSON_CONTEXT,
                     Topic.PERSONAL_NEWS_ARE_UP_TO_DATE],
             consumer_group=CONSUMER_GROUP_LANGSMITH,
+            max_in_flight_per_partition=LANGSMITH_MAX_IN_FLIGHT_PER_PARTITION,
+            ordering_key=object_id_key,
         )
 
         self.langsmith = Langsmith()
         self.company_repository = companies_repository()
         self.profiles_repository = profiles_repository()
+        self.async_profiles_repository = async_profiles_repository()
         # self.tenants_repository = tenants_repository()
         self.users_repository = UsersRepository()
         self.personal_data_repository = personal_data_repository()
@@ -66,8 +73,8 @@ class LangsmithConsumer(GenieConsumer):
 
     async def process_event(self, event):
         logger.info(f"Person processing event: {str(event)[:300]}")
-        logger.info(f"Processing event on topic {event.properties.get(b'topic').decode('utf-8')}")
-        topic = event.properties.get(b"topic").decode("utf-8")
+        logger.info(f"Processing event on topic {event.topic}")
+        topic = event.topic
 
         match topic:
             case Topic.NEW_PERSONAL_NEWS:
@@ -90,16 +97,13 @@ class LangsmithConsumer(GenieConsumer):
 
 
     async def new_person_context(self, event):
-        event_body = event.body_as_str()
-        logger.info(f"Event body: {str(event_body)[:300]}")
-        event_body = json.loads(event_body)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        logger.info(f"Event body: {event.body_as_str()[:300]}")
+        event_body = event.payload
         person_uuid = event_body.get("person_uuid") if event_body.get("person_uuid") else event_body.get("person_id")
         if not person_uuid:
             logger.error(f"No person data found for person {person_uuid}")
             raise Exception("Got event with uuid but no person data")
-        profile = self.profiles_repository.get_profile_data(person_uuid)
+        profile = await self.async_profiles_repository.get_profile_data(person_uuid)
 
         # Check if needs to proceed with the event
         if profile:
@@ -134,16 +138,13 @@ class LangsmithConsumer(GenieConsumer):
             6.1 NEW_BASE_PROFILE
             6.2 NEW_PROCESSED_PROFILE
         """
-        event_body = event.body_as_str()
-        logger.info(f"Event body: {str(event_body)[:300]}")
-        event_body = json.loads(event_body)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        logger.info(f"Event body: {event.body_as_str()[:300]}")
+        event_body = event.payload
         person_uuid = event_body.get("person_uuid") if event_body.get("person_uuid") else event_body.get("person_id")
         if not person_uuid:
             logger.error(f"No person data found for person {person_uuid}")
             raise Exception("Got event with uuid but no person data")
-        profile = self.profiles_repository.get_profile_data(person_uuid)
+        profile = await self.async_profiles_repository.get_profile_data(person_uuid)
 
         # Check if needs to proceed with the event
         if profile and profile.strengths and not event_body.get("force"):
@@ -217,11 +218,8 @@ class LangsmithConsumer(GenieConsumer):
         1. Get person data and profile_strengths_get_to_know_work_history_summary from event.
         2. Get company data from database
         """
-        event_body = event.body_as_str()
-        logger.info(f"Event body: {str(event_body)[:300]}")
-        event_body = json.loads(event_body)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        logger.info(f"Event body: {event.body_as_str()[:300]}")
+        event_body = event.payload
 
         personal_data = event_body.get("profile")
         strengths = personal_data.get("strengths")
@@ -240,7 +238,7 @@ class LangsmithConsumer(GenieConsumer):
             raise Exception("Got base profile event with no email address and no person")
         forced_refresh = event_body.get("force_refresh")
         seller_user_id = logger.get_user_id()
-        event_topic = event.properties.get(b"topic").decode("utf-8")
+        event_topic = event.topic
         if not seller_user_id or not event_topic:
             logger.error(f"No tenant id or event topic found")
             raise Exception("Got event with no tenant id or event topic")
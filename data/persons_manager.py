@@ -86,7 +86,7 @@ class PersonManager(GenieConsumer):
 
     async def process_event(self, event):
         logger.info(f"Person processing event: {str(event)[:300]}")
-        topic = event.properties.get(b"topic").decode("utf-8")
+        topic = event.topic
         logger.info(f"Processing event on topic {topic}")
         # Should use Topic class
 
@@ -140,10 +140,7 @@ class PersonManager(GenieConsumer):
                 logger.info(f"Unknown topic: {topic}")
 
     async def handle_new_person(self, event):
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         person_dict = event_body.get("person")
         if isinstance(person_dict, str):
             person_dict = json.loads(person_dict)
@@ -155,14 +152,11 @@ class PersonManager(GenieConsumer):
         return {"status": "success"}
 
     async def handle_email_address(self, event):
-        event_body = event.body_as_str()
-        event_body = json.loads(event_body)
-        if isinstance(event_body, str):
-            try:
-                event_body = json.loads(event_body)
-            except json.JSONDecodeError:
-                logger.error(f"Invalid JSON: {event_body}")
-                return {"error": "Invalid JSON"}
+        try:
+            event_body = event.payload
+        except json.JSONDecodeError:
+            logger.error(f"Invalid JSON: {event.body_as_str()}")
+            return {"error": "Invalid JSON"}
         email = event_body.get("email")
         tenant_id = event_body.get("tenant_id") or logger.get_tenant_id()
         #
@@ -232,10 +226,7 @@ class PersonManager(GenieConsumer):
 
     async def handle_pdl_updated_enriched_data(self, event):
         # Assuming the event body contains an uuid and a JSON string with the personal data
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         person_dict = event_body.get("person")
         tenant_id = event_body.get("tenant_id") or logger.get_tenant_id()
         user_id = event_body.get("user_id") or logger.get_user_id()
@@ -279,10 +270,7 @@ class PersonManager(GenieConsumer):
         This function checks if already tried to get apollo personal data.
         If not, it will send apollo an event to get the apollo data.
         """
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         person_dict = event_body.get("person")
         if isinstance(person_dict, str):
             person_dict = json.loads(person_dict)
@@ -315,10 +303,7 @@ class PersonManager(GenieConsumer):
         return {"status": "failed"}
 
     async def handle_apollo_failed_to_enrich_person(self, event):
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         person_dict = event_body.get("person")
         if isinstance(person_dict, str):
             person_dict = json.loads(person_dict)
@@ -355,10 +340,7 @@ class PersonManager(GenieConsumer):
         This function checks if already tried to get apollo personal data.
         If not, it will send apollo an event to get the apollo data.
         """
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         email = event_body.get("email")
         if not email:
             logger.error(f"Email not found in event body: {event_body}")
@@ -393,10 +375,7 @@ class PersonManager(GenieConsumer):
         return {"status": "failed"}
 
     async def handle_apollo_failed_to_enrich_email(self, event):
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         email = event_body.get("email")
         if not email:
             logger.error(f"Email not found in event body: {event_body}")
@@ -465,10 +444,7 @@ class PersonManager(GenieConsumer):
                 logger.info(f"Saved profile with picture url: {profile.picture_url}")
             return {"status": "success"}
 
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         person_dict = event_body.get("person")
         if not person_dict:
             logger.error("No person data received in event")
@@ -541,10 +517,7 @@ class PersonManager(GenieConsumer):
 
     async def handle_new_processed_profile(self, event):
         # Assuming the event body contains a JSON string with the processed data
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         person_dict = event_body.get("person")
         if isinstance(person_dict, str):
             person_dict = json.loads(person_dict)
@@ -611,10 +584,7 @@ class PersonManager(GenieConsumer):
         return {"status": "success"}
 
     async def handle_pdl_already_failed_to_enrich_person(self, event):
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         person_dict = event_body.get("person")
         if isinstance(person_dict, str):
             person_dict = json.loads(person_dict)
@@ -652,10 +622,7 @@ class PersonManager(GenieConsumer):
             return {"status": "success"}
 
     async def check_profile_data(self, event):
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         person_dict = event_body.get("person")
         if isinstance(person_dict, str):
             person_dict = json.loads(person_dict)
@@ -676,10 +643,7 @@ class PersonManager(GenieConsumer):
 
     async def handle_linkedin_scrape(self, event):
         # logger.info(f"Handling LinkedIn scrape event: {event}")
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         person_dict = event_body.get("person")
         logger.info(f"Person: {person_dict}")
         if not person_dict:
@@ -837,10 +801,7 @@ class PersonManager(GenieConsumer):
         return person
 
     async def handle_finished_new_profile(self, event):
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         profile_uuid = event_body.get("profile_uuid")
         if not profile_uuid:
             logger.error("No profile UUID found in event body")
@@ -885,10 +846,7 @@ class PersonManager(GenieConsumer):
         """
         Should check for profile data, and if is broken that update person to be error
         """
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         email = event_body.get("email")
         uuid = event_body.get("uuid")
         if uuid:
@@ -1,6 +1,5 @@
 import asyncio
 import datetime
-import json
 import os
 import sys
 from pydantic import ValidationError
@@ -50,7 +49,7 @@ class ProfileParamsConsumer(GenieConsumer):
 
     async def process_event(self, event):
         logger.info(f"Person processing event: {str(event)[:300]}")
-        topic = event.properties.get(b"topic").decode("utf-8")
+        topic = event.topic
         logger.info(f"Processing event on topic {topic}")
         match topic:
             case Topic.NEW_PERSONAL_NEWS:
@@ -69,11 +68,8 @@ class ProfileParamsConsumer(GenieConsumer):
                 logger.error(f"Should not have reached here: {topic}, consumer_group: {CONSUMER_GROUP}")
 
     async def begin_profiling(self, event):
-        event_body = event.body_as_str()
-        logger.info(f"Event body: {str(event_body)[:300]}")
-        event_body = json.loads(event_body)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        logger.info(f"Event body: {event.body_as_str()[:300]}")
+        event_body = event.payload
         person_uuid = event_body.get("person_uuid") if event_body.get("person_uuid") else event_body.get("person_id")
         if not person_uuid:
             logger.error(f"No person data found for person {person_uuid}")
@@ -102,11 +98,8 @@ class ProfileParamsConsumer(GenieConsumer):
 
         
     async def handle_new_artifact(self, event):
-        event_body = event.body_as_str()
-        logger.info(f"Event body: {str(event_body)[:300]}")
-        event_body = json.loads(event_body)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        logger.info(f"Event body: {event.body_as_str()[:300]}")
+        event_body = event.payload
         artifact_dict = event_body.get("artifact")
         if not artifact_dict:
             logger.error(f"No artifact data found for event {event_body}")
@@ -125,11 +118,8 @@ class ProfileParamsConsumer(GenieConsumer):
     
     
     async def artifact_calculated(self, event):
-        event_body = event.body_as_str()
-        logger.info(f"Event body: {str(event_body)[:300]}")
-        event_body = json.loads(event_body)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        logger.info(f"Event body: {event.body_as_str()[:300]}")
+        event_body = event.payload
         artifact_uuid = event_body.get("artifact_uuid")
         profile_uuid = event_body.get("profile_uuid")
         artifact = self.artifacts_service.get_artifact(artifact_uuid)
@@ -145,11 +135,8 @@ class ProfileParamsConsumer(GenieConsumer):
     
 
     async def calculate_overall_params(self, event):
-        event_body = event.body_as_str()
-        logger.info(f"Event body: {str(event_body)[:300]}")
-        event_body = json.loads(event_body)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        logger.info(f"Event body: {event.body_as_str()[:300]}")
+        event_body = event.payload
         profile_uuid = event_body.get("profile_uuid")
         person = self.persons_repository.get_person(profile_uuid)
         if not person:
@@ -160,11 +147,8 @@ class ProfileParamsConsumer(GenieConsumer):
         return {"status": "success"}
 
     async def handle_work_history(self, event):
-        event_body = event.body_as_str()
-        logger.info(f"Event body: {str(event_body)[:300]}")
-        event_body = json.loads(event_body)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        logger.info(f"Event body: {event.body_as_str()[:300]}")
+        event_body = event.payload
         person = event_body.get("person")
         if not person:
             logger.error(f"No person data found for person {person}")
@@ -218,11 +202,8 @@ class ProfileParamsConsumer(GenieConsumer):
 
 
     async def process_work_history_artifact(self, event):
-        event_body = event.body_as_str()
-        logger.info(f"Event body: {str(event_body)[:300]}")
-        event_body = json.loads(event_body)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        logger.info(f"Event body: {event.body_as_str()[:300]}")
+        event_body = event.payload
         work_history_artifact_dict = event_body.get("work_history_artifact")
         person_dict = event_body.get("person")
         if not work_history_artifact_dict or not person_dict:
@@ -1,7 +1,6 @@
 import asyncio
 import os
 import sys
-import json
 from datetime import datetime, timedelta, timezone
 
 from common.utils import env_utils
@@ -49,7 +48,7 @@ class SalesMaterialConsumer(GenieConsumer):
 
     async def process_event(self, event):
         logger.info(f"Person processing event: {str(event)[:300]}")
-        topic = event.properties.get(b"topic").decode("utf-8")
+        topic = event.topic
         logger.info(f"Processing event on topic {topic}")
         match topic:
             case Topic.FILE_UPLOADED:
@@ -59,9 +58,7 @@ class SalesMaterialConsumer(GenieConsumer):
                 logger.error(f"Unexpected topic: {topic}, consumer_group: {CONSUMER_GROUP}")
 
     async def embed_and_store_content(self, event):
-        event_body = json.loads(event.body_as_str())
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         event_data = event_body["event_data"]
         blob_name = event_data["blobUrl"]
         text = await self.fetch_doc_content(blob_name)
@@ -52,7 +52,7 @@ class SalesforceConsumer(GenieConsumer):
 
     async def process_event(self, event):
         logger.info(f"Person processing event: {str(event)[:300]}")
-        topic = event.properties.get(b"topic").decode("utf-8")
+        topic = event.topic
         logger.info(f"Processing event on topic {topic}")
         # Should use Topic class
 
@@ -67,14 +67,11 @@ class SalesforceConsumer(GenieConsumer):
                 logger.info(f"Unknown topic: {topic}")
 
     async def handle_new_contacts(self, event):
-        event_body = event.body_as_str()
-        event_body = json.loads(event_body)
-        if isinstance(event_body, str):
-            try:
-                event_body = json.loads(event_body)
-            except json.JSONDecodeError:
-                logger.error(f"Invalid JSON: {event_body}")
-                return {"error": "Invalid JSON"}
+        try:
+            event_body = event.payload
+        except json.JSONDecodeError:
+            logger.error(f"Invalid JSON: {event.body_as_str()}")
+            return {"error": "Invalid JSON"}
         contacts = event_body.get("contacts")
         salesforce_user_id = event_body.get("salesforce_user_id")
         if not contacts:
@@ -105,14 +102,11 @@ class SalesforceConsumer(GenieConsumer):
 
 
     async def handle_finished_profile(self, event):
-        event_body = event.body_as_str()
-        event_body = json.loads(event_body)
-        if isinstance(event_body, str):
-            try:
-                event_body = json.loads(event_body)
-            except json.JSONDecodeError:
-                logger.error(f"Invalid JSON: {event_body}")
-                return {"error": "Invalid JSON"}
+        try:
+            event_body = event.payload
+        except json.JSONDecodeError:
+            logger.error(f"Invalid JSON: {event.body_as_str()}")
+            return {"error": "Invalid JSON"}
         profile_uuid = event_body.get("profile_uuid")
         if not profile_uuid:
             logger.error("No profile_uuid")
@@ -1,5 +1,4 @@
 import asyncio
-import json
 import os
 import sys
 import time
@@ -59,7 +58,7 @@ class SlackConsumer(GenieConsumer):
 
     async def process_event(self, event):
         logger.info(f"Person processing event: {str(event)[:300]}")
-        topic = event.properties.get(b"topic").decode("utf-8")
+        topic = event.topic
         logger.info(f"Processing event on topic {topic}")
         match topic:
             case Topic.FAILED_TO_ENRICH_PERSON:
@@ -90,10 +89,7 @@ class SlackConsumer(GenieConsumer):
                 logger.info(f"Unknown topic: {topic}")
 
     async def handle_failed_to_get_personal_data(self, event):
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         email = event_body.get("email")
         person = event_body.get("person")
         if not email and person:
@@ -138,10 +134,7 @@ class SlackConsumer(GenieConsumer):
         return {"status": "ok"}
 
     async def handle_failed_to_get_profile_picture(self, event):
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         person = event_body.get("person")
         person = PersonDTO.from_dict(person)
         if not person:
@@ -178,10 +171,7 @@ class SlackConsumer(GenieConsumer):
         return {"status": "ok"}
 
     async def handle_email_sender_failed(self, event):
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         error = event_body.get("error")
         recipient = event_body.get("recipient")
         subject = event_body.get("subject")
@@ -202,10 +192,7 @@ class SlackConsumer(GenieConsumer):
         return {"status": "ok"}
 
     async def handle_bug_in_tenant_id(self, event):
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
         tenant_id = event_body.get("tenant_id")
         logger_tenant_id = logger.get_tenant_id()
         message = f"[CTX={logger.get_ctx_id()}] found a bug in tenant_id: {tenant_id} and logger_tenant_id: {logger_tenant_id}."
@@ -216,10 +203,7 @@ class SlackConsumer(GenieConsumer):
         """
         Should send a message to slack about the error
         """
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
 
         logger_info = logger.get_extra()
         logger_info_str = ", ".join(f"{k}: {v}" for k, v in logger_info.items())
@@ -241,10 +225,7 @@ class SlackConsumer(GenieConsumer):
         """
         Should send a message to slack about the error
         """
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
 
         logger_info = logger.get_extra()
         logger_info_str = ", ".join(f"{k}: {v}" for k, v in logger_info.items())
@@ -265,10 +246,7 @@ class SlackConsumer(GenieConsumer):
         """
         Should send a message to slack about the error
         """
-        event_body_str = event.body_as_str()
-        event_body = json.loads(event_body_str)
-        if isinstance(event_body, str):
-            event_body = json.loads(event_body)
+        event_body = event.payload
 
         logger_info = logger.get_extra()
         logger_info_str = ", ".join(f"{k}: {v}" for k, v in logger_info.items())
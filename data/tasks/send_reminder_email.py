@@ -2,6 +2,7 @@ from datetime import datetime, timezone
 from dateutil import parser
 from data.data_common.dependencies.dependencies import meetings_repository
 from data.data_common.events.genie_event import GenieEvent
+from data.data_common.events.priority import priority_for_meeting
 from data.data_common.events.topics import Topic
 from common.genie_logger import GenieLogger
 
@@ -28,6 +29,7 @@ def run():
         event = GenieEvent(
             topic=Topic.NEW_UPCOMING_MEETING,
             data={"meeting_uuid": meeting.uuid},
+            priority=priority_for_meeting(meeting.start_time),
         )
         try:
             event.send()
@@ -1,6 +1,7 @@
 from common.utils import env_utils
 from data.data_common.dependencies.dependencies import profiles_repository, persons_repository
 from data.data_common.events.genie_event import GenieEvent
+from data.data_common.events.priority import Priority
 from data.data_common.events.topics import Topic
 from data.internal_services.azure_storage_picture_uploader import AzureProfilePictureUploader, NotAnImageError
 from common.genie_logger import GenieLogger
@@ -38,6 +39,7 @@ def run():
             event = GenieEvent(
                 topic=Topic.FAILED_TO_GET_PROFILE_PICTURE,
                 data={"person": person.to_dict()},
+                priority=Priority.BULK,
             )
             event.send()
             logger.error(f"Profile picture upload failed for {profile_uuid}")
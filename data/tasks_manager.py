@@ -5,6 +5,7 @@ from apscheduler.triggers.date import DateTrigger
 import logging
 import time
 from data.tasks import send_reminder_email, upload_profile_picture_to_blob
+from data.data_common.utils.schema_registry import bootstrap_schema
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -12,6 +13,7 @@ logger = logging.getLogger(__name__)
 
 class SchedulerService:
     def __init__(self):
+        bootstrap_schema()
         self.scheduler = BackgroundScheduler()
         self.scheduler.start()
 
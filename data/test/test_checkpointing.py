@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from data.data_common.events.checkpointing import CHECKPOINT_EVERY_EVENTS, CheckpointPolicy, Checkpointer
+
+
+class FakeEvent:
+    def __init__(self, sequence_number: int):
+        self.sequence_number = sequence_number
+
+
+class FakePartitionContext:
+    def __init__(self, partition_id="0"):
+        self.partition_id = partition_id
+        self.checkpoints = []
+
+    async def update_checkpoint(self, event):
+        self.checkpoints.append(event.sequence_number)
+
+
+@pytest.mark.asyncio
+async def test_writes_every_n_events():
+    checkpointer = Checkpointer(CheckpointPolicy(every_events=10, every_seconds=60))
+    context = FakePartitionContext()
+    for sequence_number in range(25):
+        await checkpointer.advance(context, FakeEvent(sequence_number))
+    assert context.checkpoints == [9, 19]
+    await checkpointer.flush()
+    assert context.checkpoints == [9, 19, 24]
+
+
+@pytest.mark.asyncio
+async def test_events_skipped_by_sequence_number_count_towards_the_policy():
+    checkpointer = Checkpointer(CheckpointPolicy(every_events=10, every_seconds=60))
+    context = FakePartitionContext()
+    await checkpointer.advance(context, FakeEvent(0))
+    await checkpointer.advance(context, FakeEvent(12))
+    assert context.checkpoints == [12]
+
+
+@pytest.mark.asyncio
+async def test_quiet_partition_is_written_after_the_interval():
+    checkpointer = Checkpointer(CheckpointPolicy(every_events=100, every_seconds=0.05))
+    context = FakePartitionContext()
+    await checkpointer.advance(context, FakeEvent(0))
+    await checkpointer.advance(context, FakeEvent(1))
+    assert context.checkpoints == []
+    await asyncio.sleep(0.1)
+    assert context.checkpoints == [1]
+
+
+@pytest.mark.asyncio
+async def test_partition_close_writes_only_that_partition():
+    checkpointer = Checkpointer(CheckpointPolicy(every_events=100, every_seconds=60))
+    first, second = FakePartitionContext("0"), FakePartitionContext("1")
+    await checkpointer.advance(first, FakeEvent(3))
+    await checkpointer.advance(second, FakeEvent(7))
+    await checkpointer.flush_partition(first)
+    assert first.checkpoints == [3]
+    assert second.checkpoints == []
+    await checkpointer.flush()
+    await checkpointer.flush()
+    assert second.checkpoints == [7]
+
+
+def test_policy_is_configurable_per_consumer_group(monkeypatch):
+    monkeypatch.setenv("CHECKPOINT_EVERY_EVENTS_APOLLO_CONSUMER_GROUP", "5")
+    policy = CheckpointPolicy.for_consumer_group("apollo_consumer_group")
+    assert policy.every_events == 5
+    assert CheckpointPolicy.for_consumer_group("other_consumer_group").every_events == CHECKPOINT_EVERY_EVENTS
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+
+from data.data_common.events.coalescing import (
+    RECEIPT_CLAIMED,
+    RECEIPT_DONE,
+    RECEIPT_PROCESSING,
+    CoalescingPolicy,
+    EventCoalescer,
+    IdempotencyStore,
+)
+from data.data_common.events.genie_envelope import GenieEnvelope
+from data.data_common.events.local_event_bus import LocalEvent
+from data.data_common.events.topics import Topic
+
+
+class FakeEventKeysRepository:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.keys = {}
+        self.round_trips = 0
+
+    def claim(self, keys, done=True):
+        self.round_trips += 1
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        now = datetime.now(timezone.utc)
+        claimed = set()
+        for key, expires_at in keys:
+            if key not in self.keys or self.keys[key][0] <= now:
+                self.keys[key] = (expires_at, done)
+                claimed.add(key)
+        return claimed
+
+    def lease(self, key, expires_at):
+        if self.claim([(key, expires_at)], done=False):
+            return RECEIPT_CLAIMED
+        return RECEIPT_DONE if self.keys[key][1] else RECEIPT_PROCESSING
+
+    def renew(self, key, expires_at):
+        if key in self.keys and not self.keys[key][1]:
+            self.keys[key] = (expires_at, False)
+
+    def complete(self, key, expires_at):
+        self.keys[key] = (expires_at, True)
+
+    def release(self, key):
+        self.keys.pop(key, None)
+
+    def delete_expired(self):
+        return 0
+
+
+class FakeEvent:
+    def __init__(self, topic, payload, user_id=None):
+        self.topic = topic
+        self.payload = payload
+        self.user_id = user_id
+
+
+def received(topic, payload) -> GenieEnvelope:
+    properties = {b"topic": topic.encode(), b"user_id": b"user"}
+    return GenieEnvelope(LocalEvent(json.dumps(payload).encode(), {**properties, b"wire_version": b"2"}, None, 0))
+
+
+def coalescer(repository=None, **kwargs) -> EventCoalescer:
+    return EventCoalescer(IdempotencyStore(repository or FakeEventKeysRepository()), enabled=True, **kwargs)
+
+
+def test_duplicate_sends_are_suppressed_within_and_across_batches():
+    repository = FakeEventKeysRepository()
+    events = coalescer(repository)
+    first = [FakeEvent(Topic.NEW_EMAIL_ADDRESS_TO_PROCESS, {"user_id": "user", "email": email})
+             for email in ("jane@example.com", "john@example.com", "Jane@Example.com ")]
+    assert [event.payload["email"] for event in events.filter_sends(first)] == ["jane@example.com", "john@example.com"]
+
+    second = [
+        FakeEvent(Topic.NEW_EMAIL_ADDRESS_TO_PROCESS, {"user_id": "user", "email": "john@example.com"}),
+        FakeEvent(Topic.NEW_EMAIL_ADDRESS_TO_PROCESS, {"email": "john@example.com"}, user_id="other-user"),
+        FakeEvent(Topic.NEW_EMAIL_ADDRESS_TO_PROCESS, {"user_id": "user", "email": "john@example.com", "force_refresh": True}),
+        FakeEvent(Topic.NEW_PERSON, {"user_id": "user", "email": "john@example.com"}),
+    ]
+    assert events.filter_sends(second) == second[1:]
+    assert events.stats["suppressed_sends"] == 2
+    assert events.suppressed_by_topic[Topic.NEW_EMAIL_ADDRESS_TO_PROCESS] == 2
+    # The repeated key of the second batch was answered by the front cache
+    assert repository.round_trips == 2
+    assert events.store.stats["cache_hits"] == 2
+
+
+def test_processed_keys_are_skipped_per_consumer_group_and_released_on_failure():
+    events = coalescer()
+    topic = Topic.NEW_EMAIL_ADDRESS_TO_PROCESS
+    envelope = received(topic, {"email": "jane@example.com"})
+    key = events.receipt_key("persons", envelope)
+    assert key == f"persons|{topic}|user|jane@example.com"
+    assert events.claim_receipt(key, topic) == RECEIPT_CLAIMED
+    # Held while processing, skipped once done
+    assert events.claim_receipt(key, topic) == RECEIPT_PROCESSING
+    events.complete(key, topic)
+    assert events.claim_receipt(key, topic) == RECEIPT_DONE
+    other_group = events.receipt_key("slack", envelope)
+    assert events.claim_receipt(other_group, topic) == RECEIPT_CLAIMED
+
+    events.release(key)
+    assert events.claim_receipt(key, topic) == RECEIPT_CLAIMED
+    assert events.stats["skipped_receipts"] == 1 and events.stats["held_receipts"] == 1
+    assert events.receipt_key("persons", received(Topic.NEW_PERSON, {"email": "jane@example.com"})) is None
+
+
+def test_a_lease_left_by_a_dead_worker_expires_and_a_running_one_is_renewed():
+    repository = FakeEventKeysRepository()
+    topic = Topic.NEW_EMAIL_ADDRESS_TO_PROCESS
+    key = f"persons|{topic}|user|jane@example.com"
+    crashed = coalescer(repository, lease_seconds=1)
+    assert crashed.claim_receipt(key, topic) == RECEIPT_CLAIMED
+
+    # The event is delivered again after the restart: processed once the lease of the dead worker expired
+    restarted = coalescer(repository, lease_seconds=1)
+    assert restarted.claim_receipt(key, topic) == RECEIPT_PROCESSING
+    time.sleep(1.05)
+    assert restarted.claim_receipt(key, topic) == RECEIPT_CLAIMED
+
+    async def run_longer_than_the_lease():
+        lease = restarted.keep_leased(key)
+        await asyncio.sleep(1.2)
+        assert crashed.claim_receipt(key, topic) == RECEIPT_PROCESSING
+        lease.cancel()
+
+    asyncio.run(run_longer_than_the_lease())
+
+
+def test_keys_are_free_again_after_the_window(monkeypatch):
+    monkeypatch.setenv("EVENT_COALESCING_WINDOW_SECONDS_NEW_EMAIL_ADDRESS_TO_PROCESS", "0.05")
+    assert CoalescingPolicy.for_topic(Topic.NEW_EMAIL_ADDRESS_TO_PROCESS).window_seconds == 0.05
+    events = coalescer()
+    event = FakeEvent(Topic.NEW_EMAIL_ADDRESS_TO_PROCESS, {"user_id": "user", "email": "jane@example.com"})
+    assert events.filter_sends([event]) == [event]
+    assert events.filter_sends([event]) == []
+    time.sleep(0.1)
+    assert events.filter_sends([event]) == [event]
+
+
+def test_topics_can_be_configured_and_claims_fail_open(monkeypatch):
+    monkeypatch.setenv("EVENT_COALESCING_KEY_NEW_PERSON", "uuid")
+    monkeypatch.setenv("EVENT_COALESCING_KEY_NEW_EMAIL_ADDRESS_TO_PROCESS", "none")
+    assert CoalescingPolicy.for_topic(Topic.NEW_PERSON).key_fields == ("uuid",)
+    assert CoalescingPolicy.for_topic(Topic.NEW_EMAIL_ADDRESS_TO_PROCESS) is None
+
+    events = coalescer(FakeEventKeysRepository(fail=True))
+    batch = [FakeEvent(Topic.NEW_PERSON, {"uuid": "person-1"}), FakeEvent(Topic.NEW_PERSON, {"uuid": "person-1"})]
+    assert events.filter_sends(batch) == batch[:1]
+    assert events.store.stats["store_failures"] == 1
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+from psycopg2 import extensions
+
+from data.data_common.utils.db_pool import InstrumentedConnectionPool, PoolTimeoutError
+
+
+class FakeInfo:
+    transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeConnection:
+    def __init__(self, **kwargs):
+        self.closed = 0
+        self.info = FakeInfo()
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+def make_pool(maxconn=2, timeout=0.2, leak_threshold=60.0):
+    return InstrumentedConnectionPool(
+        minconn=1, maxconn=maxconn, timeout=timeout, leak_threshold=leak_threshold, connection_factory=FakeConnection
+    )
+
+
+def test_connections_are_reused():
+    pool = make_pool()
+    conn = pool.getconn()
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+    stats = pool.stats()
+    assert stats["connections_opened"] == 1
+    assert stats["in_use"] == 1
+    assert stats["checkouts"] == 2
+
+
+def test_exhausted_pool_times_out():
+    pool = make_pool(maxconn=1, timeout=0.1)
+    pool.getconn()
+    with pytest.raises(PoolTimeoutError):
+        pool.getconn()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_waiter_gets_released_connection():
+    pool = make_pool(maxconn=1, timeout=2)
+    conn = pool.getconn()
+    result = {}
+
+    def waiter():
+        result["conn"] = pool.getconn()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    time.sleep(0.1)
+    assert pool.stats()["waiters"] == 1
+    pool.putconn(conn)
+    thread.join(timeout=2)
+    assert result["conn"] is conn
+    assert pool.stats()["checkout_wait"]["max_ms"] >= 50
+
+
+def test_closed_and_dirty_connections():
+    pool = make_pool()
+    conn = pool.getconn()
+    conn.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+    pool.putconn(conn)
+    assert conn.rollbacks == 1
+
+    conn = pool.getconn()
+    conn.close()
+    pool.putconn(conn)
+    stats = pool.stats()
+    assert stats["idle"] == 0
+    assert stats["connections_discarded"] == 1
+    assert pool.getconn() is not conn
+
+
+def test_leak_detection():
+    pool = make_pool(leak_threshold=0.05)
+    conn = pool.getconn()
+    time.sleep(0.1)
+    stats = pool.stats()
+    assert stats["leaked"] == 1
+    pool.putconn(conn)
+    assert pool.find_leaks() == []
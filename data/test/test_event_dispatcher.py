@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import pytest
+
+from data.data_common.events.event_dispatcher import CompletionTracker, PartitionDispatcher, email_key, object_id_key
+
+
+class FakeEvent:
+    def __init__(self, number: int, body: dict = None):
+        self.number = number
+        self.body = json.dumps(json.dumps(body or {}))
+
+    def body_as_str(self):
+        return self.body
+
+
+class FakePartitionContext:
+    def __init__(self, partition_id="0"):
+        self.partition_id = partition_id
+
+
+def test_tracker_only_advances_past_contiguous_finished_events():
+    tracker = CompletionTracker()
+    entries = [tracker.start(number) for number in range(4)]
+    assert tracker.finish(entries[1]) is None
+    assert tracker.finish(entries[2]) is None
+    assert tracker.finish(entries[0]) == (2, 2)
+    assert tracker.finish(entries[3]) == (3, 3)
+    assert len(tracker) == 0
+
+
+def test_ordering_keys_read_the_double_encoded_body():
+    assert object_id_key(FakeEvent(0, {"meeting_uuid": "m1"})) == "m1"
+    assert email_key(FakeEvent(0, {"person": {"email": "Jane@Example.com"}})) == "jane@example.com"
+    assert email_key(FakeEvent(0, {"meeting_uuid": "m1"})) is None
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_wait_for_slower_earlier_events():
+    checkpoints = []
+    delays = {0: 0.05, 1: 0.0, 2: 0.0}
+
+    async def handler(event):
+        await asyncio.sleep(delays[event.number])
+
+    async def checkpoint(partition_context, event):
+        checkpoints.append(event.number)
+
+    dispatcher = PartitionDispatcher(handler, checkpoint, max_in_flight_per_partition=3, max_in_flight=3)
+    context = FakePartitionContext()
+    for number in range(3):
+        await dispatcher.dispatch(context, FakeEvent(number))
+    assert await dispatcher.drain(timeout=1)
+    assert checkpoints == [2]
+
+
+@pytest.mark.asyncio
+async def test_in_flight_events_are_bounded_per_partition_and_globally():
+    running = {"now": 0, "max": 0}
+
+    async def handler(event):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+
+    async def checkpoint(partition_context, event):
+        pass
+
+    dispatcher = PartitionDispatcher(handler, checkpoint, max_in_flight_per_partition=4, max_in_flight=6)
+
+    async def receive(partition_id):
+        for number in range(20):
+            await dispatcher.dispatch(FakePartitionContext(partition_id), FakeEvent(number))
+
+    await asyncio.gather(*(receive(str(partition)) for partition in range(3)))
+    assert await dispatcher.drain(timeout=1)
+    assert running["max"] == 6
+    assert dispatcher.stats["finished"] == 60
+
+
+@pytest.mark.asyncio
+async def test_events_sharing_a_key_run_in_order():
+    handled = []
+
+    async def handler(event):
+        # Earlier events of a key are slower, so without ordering they would finish last
+        await asyncio.sleep(0.03 - event.number * 0.005)
+        handled.append(event.number)
+
+    async def checkpoint(partition_context, event):
+        pass
+
+    dispatcher = PartitionDispatcher(handler, checkpoint, max_in_flight_per_partition=6, max_in_flight=6,
+                                     ordering_key=object_id_key)
+    context = FakePartitionContext()
+    for number in range(6):
+        await dispatcher.dispatch(context, FakeEvent(number, {"object_id": f"key{number % 2}"}))
+    assert await dispatcher.drain(timeout=1)
+    assert [number for number in handled if number % 2 == 0] == [0, 2, 4]
+    assert [number for number in handled if number % 2 == 1] == [1, 3, 5]
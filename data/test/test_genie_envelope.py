@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from data.data_common.events.event_dispatcher import email_key, object_id_key
+from data.data_common.events.genie_envelope import GenieEnvelope
+from data.data_common.events.local_event_bus import LocalEvent
+from data.data_common.events.topics import Topic
+
+
+class CountingEvent(LocalEvent):
+    __slots__ = ("reads",)
+
+    def __init__(self, payload, properties: dict):
+        super().__init__(json.dumps(json.dumps(payload)), properties, None, 7)
+        self.reads = 0
+
+    def body_as_str(self, encoding: str = "UTF-8") -> str:
+        self.reads += 1
+        return super().body_as_str(encoding)
+
+
+def test_envelope_exposes_properties_and_decodes_the_body_once():
+    properties = {b"topic": Topic.NEW_PERSONAL_DATA.encode(), b"ctx_id": b"ctx", b"user_id": b"user", b"tenant_id": b""}
+    event = CountingEvent({"person": {"uuid": "person-1", "email": "Jane@Example.com"}, "scores": [1, 2]}, properties)
+    envelope = GenieEnvelope(event)
+
+    assert envelope.topic == Topic.NEW_PERSONAL_DATA
+    assert (envelope.ctx_id, envelope.user_id, envelope.tenant_id, envelope.cty_id) == ("ctx", "user", None, None)
+    assert event.reads == 0
+    assert envelope.payload["scores"] == [1, 2]
+    assert (envelope.object_id, envelope.object_type) == ("person-1", "PERSON")
+    assert object_id_key(envelope) == "person-1"
+    assert email_key(envelope) == "jane@example.com"
+    assert event.reads == 1
+    # The received event's own attributes are still there for handlers reading it directly
+    assert envelope.sequence_number == 7
+    assert json.loads(json.loads(envelope.body_as_str())) == envelope.payload
+
+
+def test_envelope_accepts_single_encoded_bodies_and_nan():
+    event = LocalEvent('{"meeting_uuid": "m-1", "score": NaN}', {b"topic": b"x"}, None, 0)
+    envelope = GenieEnvelope(event)
+    assert envelope.object_id == "m-1"
+    assert envelope.payload["score"] != envelope.payload["score"]
+
+
+def test_invalid_body_raises_json_decode_error():
+    envelope = GenieEnvelope(LocalEvent("not json", {}, None, 0))
+    assert envelope.topic is None
+    with pytest.raises(json.JSONDecodeError):
+        envelope.payload
+    assert object_id_key(envelope) is None
@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("langchain_openai")
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from ai.langsmith.langsmith_loader import Langsmith
+from ai.langsmith.llm_gateway import LLMGateway
+from ai.langsmith.prompt_registry import PromptRegistry
+from ai.langsmith.response_cache import ResponseCache
+
+LLM_LATENCY_SECONDS = 2
+
+
+def slow_llm() -> RunnableLambda:
+    """A model answering after LLM_LATENCY_SECONDS; its sync path blocks the calling thread as a real client does."""
+
+    def invoke(prompt):
+        time.sleep(LLM_LATENCY_SECONDS)
+        return AIMessage(content="Ten years in B2B sales")
+
+    async def ainvoke(prompt):
+        await asyncio.sleep(LLM_LATENCY_SECONDS)
+        return AIMessage(content="Ten years in B2B sales")
+
+    return RunnableLambda(invoke, afunc=ainvoke)
+
+
+def langsmith() -> Langsmith:
+    client = Langsmith.__new__(Langsmith)
+    client.model = client.azure_model = slow_llm()
+    client.prompts = PromptRegistry(lambda reference: RunnableLambda(lambda arguments: arguments), snapshot_dir=None)
+    client.llm = LLMGateway()
+    client.responses = ResponseCache(enabled=False)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_other_events_make_progress_during_llm_calls():
+    client = langsmith()
+    ticks = []
+
+    async def other_event():
+        # Another consumer's handler, waking up every 50ms
+        while True:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.05)
+
+    ticker = asyncio.create_task(other_event())
+    started = time.perf_counter()
+    summaries = await asyncio.gather(*(client.get_work_history_summary({"name": "Jane"}, []) for _ in range(5)))
+    elapsed = time.perf_counter() - started
+    ticker.cancel()
+
+    assert summaries == ["Ten years in B2B sales"] * 5
+    # The five calls overlapped instead of running one after the other
+    assert elapsed < LLM_LATENCY_SECONDS * 1.5
+    # and the loop kept serving the other event throughout
+    during = [tick for tick in ticks if started < tick < started + LLM_LATENCY_SECONDS]
+    assert len(during) >= LLM_LATENCY_SECONDS / 0.05 * 0.8
+    assert max(later - earlier for earlier, later in zip(during, during[1:])) < 0.2
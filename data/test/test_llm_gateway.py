@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+from ai.langsmith.llm_gateway import LLMGateway, TokenBucket
+from data.data_common.events.retry import set_retries_deferred
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__("Too Many Requests")
+        self.response = type("Response", (), {"headers": {"retry-after-ms": str(int(retry_after * 1000))}})()
+
+
+class StubModel:
+    """A model call of `latency` seconds; the first `rate_limited` calls are answered with a 429."""
+
+    def __init__(self, latency: float = 0.05, rate_limited: int = 0, retry_after: float = 0.1):
+        self.latency = latency
+        self.rate_limited = rate_limited
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started = []
+
+    async def ainvoke(self, arguments):
+        self.started.append(time.monotonic())
+        if self.rate_limited:
+            self.rate_limited -= 1
+            raise RateLimitError(self.retry_after)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        return arguments
+
+
+@pytest.mark.asyncio
+async def test_calls_are_bounded_per_prompt_and_per_process():
+    gateway = LLMGateway(max_concurrent=4, max_concurrent_per_prompt=3, requests_per_minute=0, tokens_per_minute=0)
+    scoring, meetings = StubModel(), StubModel()
+    results = await asyncio.gather(
+        *(gateway.invoke("param-scoring-v2", scoring, {"param": i}) for i in range(12)),
+        *(gateway.invoke("get_meeting_goals", meetings, {"meeting": i}) for i in range(3)),
+    )
+
+    assert results[:12] == [{"param": i} for i in range(12)]
+    assert scoring.max_in_flight == 3
+    # The fan-out left a slot to the other prompt, which did not wait for all of it
+    assert meetings.max_in_flight >= 1 and min(meetings.started) < max(scoring.started)
+    assert gateway.stats["calls"] == 15 and gateway.stats["in_flight"] == 0 and gateway.stats["queued"] == 0
+    assert gateway.stats["max_queued"] >= 8 and gateway.prompt_stats["param-scoring-v2"]["wait_seconds"] > 0
+
+
+@pytest.mark.asyncio
+async def test_requests_and_tokens_per_minute_are_spread_over_the_minute():
+    requests = TokenBucket(10, period_seconds=1)
+    started = time.monotonic()
+    for _ in range(15):
+        await requests.acquire(1)
+    # 10 at once, then one every 0.1s
+    assert 0.45 < time.monotonic() - started < 0.8
+
+    gateway = LLMGateway(requests_per_minute=0, tokens_per_minute=1000, completion_tokens=0, minute_seconds=1)
+    started = time.monotonic()
+    await asyncio.gather(*(gateway.invoke("post_summary", StubModel(latency=0), "x" * 1600) for _ in range(4)))
+    # 401 tokens each: two fit the bucket, the other two wait for ~0.4s of refill each
+    assert 0.6 < time.monotonic() - started < 1.2
+
+
+@pytest.mark.asyncio
+async def test_a_429_pauses_every_call_for_its_retry_after():
+    set_retries_deferred(False)
+    gateway = LLMGateway(requests_per_minute=0, tokens_per_minute=0, rate_limit_retries=2)
+    model = StubModel(latency=0, rate_limited=1, retry_after=0.2)
+    started = time.monotonic()
+    assert await gateway.invoke("get_strengths", model, {"name": "Jane"}) == {"name": "Jane"}
+    assert await gateway.invoke("profile_person", StubModel(latency=0), {}) == {}
+
+    assert 0.2 <= time.monotonic() - started < 0.5
+    assert model.started[1] - model.started[0] >= 0.2
+    assert gateway.stats["rate_limited"] == 1 and gateway.prompt_stats["get_strengths"]["rate_limited"] == 1
+
+    # Once the retries are used up the 429 is raised
+    with pytest.raises(RateLimitError):
+        await gateway.invoke("get_strengths", StubModel(rate_limited=5, retry_after=0.01), {})
+    assert gateway.stats["failures"] == 1
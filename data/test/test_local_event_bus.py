@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+import pytest
+
+from data.data_common.events.local_event_bus import LocalEventBus
+from data.data_common.events.topics import Topic
+
+
+async def collect(receiver, count: int, checkpoint: bool = True, timeout: float = 1) -> list:
+    received = []
+    done = asyncio.Event()
+
+    async def on_event(partition_context, event):
+        received.append((partition_context.partition_id, event))
+        if checkpoint:
+            await partition_context.update_checkpoint(event)
+        if len(received) >= count:
+            done.set()
+
+    task = asyncio.create_task(receiver.receive(on_event=on_event))
+    await asyncio.wait_for(done.wait(), timeout)
+    await receiver.close()
+    await task
+    return received
+
+
+@pytest.mark.asyncio
+async def test_events_are_routed_by_topic():
+    bus = LocalEventBus(partitions=2)
+    persons = bus.receiver("persons", [Topic.NEW_CONTACT])
+    meetings = bus.receiver("meetings", [Topic.NEW_MEETING])
+    everything = bus.receiver("garbage", ["*"])
+    assert bus.publish('"{}"', {"topic": Topic.NEW_CONTACT}) == 2
+    assert bus.publish('"{}"', {"topic": Topic.NEW_MEETING}) == 2
+    assert bus.publish('"{}"', {"topic": Topic.PROFILE_ERROR}) == 1
+
+    [(_, event)] = await collect(persons, 1)
+    assert event.properties[b"topic"] == Topic.NEW_CONTACT.encode()
+    assert len(await collect(everything, 3)) == 3
+    assert bus.backlog("meetings") == 1
+
+
+@pytest.mark.asyncio
+async def test_partition_key_keeps_events_in_one_partition_in_order():
+    bus = LocalEventBus(partitions=4)
+    receiver = bus.receiver("group", [Topic.NEW_PERSON])
+    for number in range(20):
+        bus.publish(str(number), {"topic": Topic.NEW_PERSON}, partition_key="person-1")
+    received = await collect(receiver, 20)
+    assert len({partition_id for partition_id, _ in received}) == 1
+    assert [event.body_as_str() for _, event in received] == [str(number) for number in range(20)]
+
+
+@pytest.mark.asyncio
+async def test_unacknowledged_events_are_redelivered():
+    bus = LocalEventBus(partitions=1)
+    receiver = bus.receiver("group", [Topic.NEW_PERSON])
+    for number in range(3):
+        bus.publish(str(number), {"topic": Topic.NEW_PERSON})
+    first = await collect(receiver, 3, checkpoint=False)
+    assert bus.backlog("group") == 3
+
+    receiver = bus.receiver("group", [Topic.NEW_PERSON])
+    again = await collect(receiver, 3)
+    assert [event.sequence_number for _, event in again] == [event.sequence_number for _, event in first]
+    assert bus.backlog("group") == 0
+
+
+@pytest.mark.asyncio
+async def test_events_published_from_another_thread_wake_the_receiver():
+    bus = LocalEventBus(partitions=2)
+    receiver = bus.receiver("group", [Topic.NEW_PERSON])
+    collecting = asyncio.create_task(collect(receiver, 10))
+    await asyncio.sleep(0.01)
+    publisher = threading.Thread(target=lambda: [bus.publish(str(n), {"topic": Topic.NEW_PERSON}) for n in range(10)])
+    publisher.start()
+    publisher.join()
+    assert len(await collecting) == 10
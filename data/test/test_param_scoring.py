@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from ai.langsmith.param_scoring import chunk_params, parse_score, parse_scores, score_in_batches
+
+
+def params(count: int, clues: int = 3) -> list[dict]:
+    return [{"param_id": str(i), "param_name": f"Param {i}", "clues_list": [f"clue {j}" for j in range(clues)]}
+            for i in range(1, count + 1)]
+
+
+def test_params_are_chunked_by_batch_size_and_prompt_size():
+    assert [len(group) for group in chunk_params(params(20), "A post", batch_size=8)] == [8, 8, 4]
+    # A long artifact leaves room for fewer parameters per call
+    groups = chunk_params(params(20, clues=200), "We are hiring " * 2000, batch_size=8, max_prompt_tokens=9000)
+    assert 1 < max(len(group) for group in groups) < 8
+    assert [param for group in groups for param in group] == params(20, clues=200)
+
+
+def test_batched_answers_are_parsed_by_param_id():
+    answer = "```json\n" + json.dumps([
+        {"param_id": "1", "score": "7", "clues": [{"clue": "a", "score": 80}, "not a clue"]},
+        {"param_id": 2, "score": 3},
+        {"param_id": "3", "score": "high"},
+        {"param_id": "9", "score": 5},
+    ]) + "\n```"
+    scores = parse_scores(answer, ["1", "2", "3"])
+    assert set(scores) == {"1", "2"}
+    assert scores["1"]["score"] == 7.0 and scores["1"]["clues"] == [{"clue": "a", "score": 80}]
+    assert scores["2"]["clues"] == []
+    assert parse_scores("Here are the scores: [{\"param_id\": \"1\", \"score\": 4}] Hope it helps", ["1"])["1"]["score"] == 4
+    assert parse_scores("I cannot score this text", ["1"]) == {}
+
+
+@pytest.mark.asyncio
+async def test_params_a_batch_did_not_score_are_scored_one_by_one():
+    batches, singles = [], []
+
+    async def score_batch(group):
+        batches.append([param["param_id"] for param in group])
+        if group[0]["param_id"] == "9":
+            raise ValueError("malformed answer")
+        # The model skipped the last parameter of every group
+        return {param["param_id"]: {"param_id": param["param_id"], "score": 50} for param in group[:-1]}
+
+    async def score_one(param):
+        singles.append(param["param_id"])
+        return {"param_id": param["param_id"], "score": 10} if param["param_id"] != "10" else {}
+
+    results = await score_in_batches(params(10), "A post", score_batch, score_one, batch_size=4)
+
+    assert batches == [["1", "2", "3", "4"], ["5", "6", "7", "8"], ["9", "10"]]
+    assert sorted(singles) == ["10", "4", "8", "9"]
+    assert [result["param_id"] for result in results] == [str(i) for i in range(1, 10)]
+    assert [result["score"] for result in results] == [50, 50, 50, 10, 50, 50, 50, 10, 10]
+
+    singles.clear()
+    assert len(await score_in_batches(params(3), "A post", score_batch, score_one, batch_size=1)) == 3
+    assert singles == ["1", "2", "3"]
+
+
+def test_parse_score_reads_fenced_and_embedded_objects():
+    assert parse_score('```json\n{"score": 70,\n "clues": []}\n```') == {"score": 70, "clues": []}
+    assert parse_score('Here is the score: {"score": 40} as requested') == {"score": 40}
+    assert parse_score("I cannot score this post") is None
+    assert parse_score("[1, 2]") is None
+    assert parse_score(None) is None
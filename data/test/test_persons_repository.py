@@ -0,0 +1,60 @@
+import pytest
+from uuid import uuid4
+
+from data.data_common.utils.index_utils import create_index_concurrently
+from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.data_transfer_objects.person_dto import PersonDTO
+from data.data_common.repositories.persons_repository import PersonsRepository
+
+
+@pytest.fixture(scope="module")
+def persons_repo():
+    """Initialize the PersonsRepository with the unique email index its upsert conflicts on"""
+    repository = PersonsRepository()
+    repository.create_table_if_not_exists()
+    create_index_concurrently("idx_persons_email_unique", "persons", "(email)", unique=True)
+    return repository
+
+
+@pytest.fixture
+def saved_uuids():
+    """Deletes the persons saved by a test"""
+    uuids = []
+    yield uuids
+    with db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM persons WHERE uuid = ANY(%s);", (uuids,))
+        conn.commit()
+
+
+def make_person(uuid=None, email=None, **kwargs):
+    return PersonDTO(
+        uuid=uuid or str(uuid4()),
+        name=kwargs.get("name", "Jane Doe"),
+        company=kwargs.get("company", "Acme"),
+        email=email or f"{uuid4().hex}@acme.com",
+        linkedin=kwargs.get("linkedin", ""),
+        position=kwargs.get("position", "VP Sales"),
+        timezone=kwargs.get("timezone", ""),
+    )
+
+
+def test_save_person_merges_into_the_person_with_the_same_email(persons_repo, saved_uuids):
+    person = make_person()
+    saved_uuids.append(person.uuid)
+    assert persons_repo.save_person(person) == person.uuid
+
+    again = make_person(email=person.email, name=None, position="CRO")
+    assert persons_repo.save_person(again) == person.uuid
+    stored = persons_repo.get_person(person.uuid)
+    assert stored.name == "Jane Doe" and stored.position == "CRO"
+
+
+def test_save_person_with_a_taken_uuid_is_skipped(persons_repo, saved_uuids):
+    person = make_person()
+    saved_uuids.append(person.uuid)
+    persons_repo.save_person(person)
+
+    # New email, uuid of another person: skipped as before the upsert, not raised
+    assert persons_repo.save_person(make_person(uuid=person.uuid)) is None
+    assert persons_repo.get_person(person.uuid).email == person.email
@@ -0,0 +1,108 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from data.data_common.events.event_dispatcher import PartitionDispatcher
+from data.data_common.events.local_event_bus import LocalEvent
+from data.data_common.events.priority import (
+    Priority,
+    PriorityLanes,
+    as_priority,
+    event_priority,
+    priority_for_meeting,
+)
+
+
+class FakeEvent:
+    def __init__(self, number: int, priority: Priority, key: str = None):
+        self.number = number
+        self.priority = priority
+        self.key = key
+
+
+class FakePartitionContext:
+    def __init__(self, partition_id="0"):
+        self.partition_id = partition_id
+
+
+def test_priorities_follow_the_nearest_meeting_start():
+    now = datetime(2024, 9, 2, 9, 0, tzinfo=timezone.utc)
+    assert priority_for_meeting(now + timedelta(minutes=20), now) == Priority.URGENT
+    assert priority_for_meeting((now - timedelta(minutes=10)).isoformat(), now) == Priority.URGENT
+    assert priority_for_meeting("2024-09-02T18:00:00+03:00", now) == Priority.HIGH
+    assert priority_for_meeting(now + timedelta(days=3), now) == Priority.NORMAL
+    assert priority_for_meeting(now - timedelta(days=1), now) == Priority.NORMAL
+    assert priority_for_meeting("", now) == Priority.NORMAL
+
+    assert as_priority("bulk") == as_priority("3") == as_priority(7) == Priority.BULK
+    assert as_priority("soon") is None
+    assert event_priority(LocalEvent(b"{}", {b"priority": b"0"}, None, 0)) == Priority.URGENT
+    assert event_priority(LocalEvent(b"{}", {}, None, 0)) == Priority.NORMAL
+
+
+def test_lanes_are_dequeued_by_weight_without_starving_bulk():
+    lanes = PriorityLanes(weights=(8, 4, 2, 1))
+    for number in range(100):
+        for priority in Priority:
+            lanes.push(priority, (priority, number))
+    first = [lanes.pop() for _ in range(15)]
+    assert Counter(priority for priority, _ in first) == {Priority.URGENT: 8, Priority.HIGH: 4, Priority.NORMAL: 2, Priority.BULK: 1}
+    # Each lane stays in receive order
+    assert [number for priority, number in first if priority == Priority.URGENT] == list(range(8))
+    # Ineligible items are skipped and their lane earns no credit
+    assert lanes.pop(lambda item: item[0] == Priority.BULK) == (Priority.BULK, 1)
+    assert lanes.stats["urgent"]["dequeued"] == 8
+
+
+@pytest.mark.asyncio
+async def test_urgent_events_overtake_a_backlog_of_the_same_partition():
+    gate = asyncio.Event()
+    handled, checkpoints = [], []
+
+    async def handler(event):
+        if event.number == 0:
+            await gate.wait()
+        handled.append(event.number)
+
+    async def checkpoint(partition_context, event):
+        checkpoints.append(event.number)
+
+    dispatcher = PartitionDispatcher(handler, checkpoint, max_in_flight_per_partition=1, max_in_flight=4,
+                                     priority=lambda event: event.priority, buffer_per_partition=64)
+    context = FakePartitionContext()
+    for number in range(20):
+        await dispatcher.dispatch(context, FakeEvent(number, Priority.BULK))
+    await dispatcher.dispatch(context, FakeEvent(20, Priority.URGENT))
+    assert dispatcher.in_flight == 1 and dispatcher.queued == 20
+
+    gate.set()
+    while dispatcher.stats["finished"] < 21:
+        await asyncio.sleep(0.01)
+    assert handled[:2] == [0, 20]
+    assert handled[2:] == list(range(1, 20))
+    assert checkpoints[-1] == 20
+
+
+@pytest.mark.asyncio
+async def test_events_sharing_a_key_keep_their_order_across_priorities():
+    handled = []
+
+    async def handler(event):
+        await asyncio.sleep(0.01)
+        handled.append(event.number)
+
+    async def checkpoint(partition_context, event):
+        pass
+
+    dispatcher = PartitionDispatcher(handler, checkpoint, max_in_flight_per_partition=1, max_in_flight=4,
+                                     ordering_key=lambda event: event.key, priority=lambda event: event.priority)
+    await dispatcher.dispatch(FakePartitionContext("0"), FakeEvent(0, Priority.NORMAL, key="a"))
+    await dispatcher.dispatch(FakePartitionContext("1"), FakeEvent(1, Priority.BULK, key="b"))
+    await dispatcher.dispatch(FakePartitionContext("1"), FakeEvent(2, Priority.URGENT, key="b"))
+    await dispatcher.dispatch(FakePartitionContext("1"), FakeEvent(3, Priority.URGENT, key="c"))
+    while dispatcher.stats["finished"] < 4:
+        await asyncio.sleep(0.01)
+    assert handled.index(1) < handled.index(2)
+    assert await dispatcher.drain(timeout=1)
@@ -0,0 +1,73 @@
+import json
+import time
+
+import pytest
+
+from ai.langsmith.prompt_registry import PromptRegistry
+
+
+class StubHub:
+    def __init__(self):
+        self.versions = {}
+        self.pulls = []
+        self.down = False
+
+    def pull(self, reference):
+        self.pulls.append(reference)
+        if self.down:
+            raise ConnectionError("hub unreachable")
+        name, _, commit = reference.partition(":")
+        return {"name": name, "template": f"{name} v{commit or self.versions.get(name, 1)}"}
+
+
+def registry(hub: StubHub, tmp_path, **kwargs) -> PromptRegistry:
+    return PromptRegistry(hub.pull, json.dumps, json.loads, snapshot_dir=str(tmp_path), **kwargs)
+
+
+def wait_for(condition, timeout=1.0):
+    started = time.monotonic()
+    while not condition() and time.monotonic() - started < timeout:
+        time.sleep(0.01)
+
+
+def test_prompts_are_pulled_once_and_refreshed_in_the_background_after_the_ttl(tmp_path):
+    hub = StubHub()
+    prompts = registry(hub, tmp_path, ttl_seconds=0.1)
+    assert prompts.get("get_strengths")["template"] == "get_strengths v1"
+    assert prompts.get("get_strengths") is prompts.get("get_strengths")
+    assert hub.pulls == ["get_strengths"] and prompts.stats["hits"] == 2
+
+    hub.versions["get_strengths"] = 2
+    time.sleep(0.15)
+    # The expired prompt is still served while the new version is pulled
+    assert prompts.get("get_strengths")["template"] == "get_strengths v1"
+    wait_for(lambda: prompts.stats["refreshes"] == 1)
+    assert prompts.get("get_strengths")["template"] == "get_strengths v2"
+
+
+def test_snapshots_let_a_process_start_while_the_hub_is_down(tmp_path):
+    hub = StubHub()
+    assert registry(hub, tmp_path).warm_up(["get_strengths", "whiteforest/chain-of-density-prompt"]) == 2
+    assert (tmp_path / "whiteforest_chain-of-density-prompt.json").exists()
+
+    hub.down = True
+    restarted = registry(hub, tmp_path)
+    assert restarted.get("whiteforest/chain-of-density-prompt")["template"] == "whiteforest/chain-of-density-prompt v1"
+    assert restarted.stats["snapshot_loads"] == 1 and restarted.stats["pull_failures"] == 1
+    with pytest.raises(ConnectionError):
+        restarted.get("param-scoring-v2")
+
+    offline = registry(StubHub(), tmp_path, offline=True)
+    assert offline.get("get_strengths")["template"] == "get_strengths v1"
+    assert offline.stats["pulls"] == 0
+
+
+def test_prompts_can_be_pinned_to_a_version(tmp_path, monkeypatch):
+    monkeypatch.setenv("LANGSMITH_PROMPT_VERSION_PARAM_SCORING_V2", "abc123")
+    hub = StubHub()
+    prompts = registry(hub, tmp_path, ttl_seconds=0, pins={"get_strengths": "def456"})
+    assert prompts.get("param-scoring-v2")["template"] == "param-scoring-v2 vabc123"
+    assert prompts.get("get_strengths")["template"] == "get_strengths vdef456"
+    prompts.get("get_strengths")
+    # Pinned prompts are not refreshed
+    assert hub.pulls == ["param-scoring-v2:abc123", "get_strengths:def456"]
@@ -0,0 +1,161 @@
+import json
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from ai.langsmith.response_cache import ResponseCache, bypass_response_cache
+
+
+class FakeLlmResponsesRepository:
+    def __init__(self):
+        self.rows = {}
+        self.down = False
+
+    def get(self, key):
+        if self.down:
+            raise ConnectionError("database unreachable")
+        row = self.rows.get(key)
+        return (row[1], row[2]) if row and row[2] > datetime.now(timezone.utc) else None
+
+    def put(self, key, prompt_name, response, expires_at):
+        if self.down:
+            raise ConnectionError("database unreachable")
+        self.rows[key] = (prompt_name, response, expires_at)
+
+    def delete_expired(self):
+        return 0
+
+
+class Prompt:
+    def __init__(self, template):
+        self.template = template
+
+    def __repr__(self):
+        return f"Prompt({self.template!r})"
+
+
+class Model:
+    def __init__(self, deployment_name="gpt-4o"):
+        self.deployment_name = deployment_name
+        self.calls = 0
+
+    async def answer(self, arguments):
+        self.calls += 1
+        return {"content": f"answer {self.calls}", "inputs": arguments}
+
+
+class Runnable:
+    """prompt | model, as the cache sees it."""
+
+    def __init__(self, prompt, model):
+        self.first = prompt
+        self.last = model
+
+
+def cache(repository, **kwargs) -> ResponseCache:
+    return ResponseCache(repository, json.dumps, json.loads, enabled=True, **kwargs)
+
+
+async def run(responses: ResponseCache, prompt_name, runnable, arguments):
+    return await responses.get_or_call(prompt_name, runnable, arguments, lambda: runnable.last.answer(arguments))
+
+
+@pytest.mark.asyncio
+async def test_responses_are_reused_for_the_same_prompt_version_inputs_and_model():
+    repository, model = FakeLlmResponsesRepository(), Model()
+    strengths = Runnable(Prompt("strengths of {personal_data}"), model)
+    jane = {"personal_data": {"name": "Jane", "title": "VP Sales"}}
+    first = cache(repository)
+    answer = await run(first, "get_strengths", strengths, jane)
+    reordered = {"personal_data": {"title": "VP Sales", "name": "Jane"}}
+    assert await run(first, "get_strengths", strengths, reordered) == answer
+
+    # Another process finds it in the table
+    second = cache(repository)
+    assert await run(second, "get_strengths", strengths, jane) == answer
+    assert model.calls == 1
+    assert first.stats["memory_hits"] == 1 and second.stats["store_hits"] == 1
+
+    # Other inputs, another version of the prompt or another model call the model
+    await run(second, "get_strengths", strengths, {"personal_data": {"name": "John"}})
+    await run(second, "get_strengths", Runnable(Prompt("strengths v2 of {personal_data}"), model), jane)
+    await run(second, "get_strengths", Runnable(strengths.first, Model("gpt-4o-mini")), jane)
+    assert model.calls == 3
+    assert second.hit_rates() == {"get_strengths": 0.25}
+
+    pinned = cache(repository, version=lambda name: "abc123")
+    await run(pinned, "get_strengths", Runnable(Prompt("one"), model), {})
+    await run(pinned, "get_strengths", Runnable(Prompt("two"), model), {})
+    assert model.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_prompts_are_cached_for_their_ttl(monkeypatch):
+    model = Model()
+    responses = cache(FakeLlmResponsesRepository(), ttls={"get_strengths": 0.1, "post_summary": 60})
+    strengths, goals = Runnable(Prompt("strengths"), model), Runnable(Prompt("goals"), model)
+
+    await run(responses, "get_meeting_goals", goals, {})
+    await run(responses, "get_meeting_goals", goals, {})
+    assert model.calls == 2 and "get_meeting_goals" not in responses.prompt_stats
+
+    await run(responses, "get_strengths", strengths, {})
+    await run(responses, "get_strengths", strengths, {})
+    time.sleep(0.15)
+    await run(responses, "get_strengths", strengths, {})
+    assert model.calls == 4
+
+    monkeypatch.setenv("LLM_RESPONSE_CACHE_TTL_SECONDS_POST_SUMMARY", "0")
+    await run(responses, "post_summary", strengths, {})
+    await run(responses, "post_summary", strengths, {})
+    assert model.calls == 6
+
+
+@pytest.mark.asyncio
+async def test_bypassed_calls_replace_the_cached_response_and_the_table_fails_open():
+    repository, model = FakeLlmResponsesRepository(), Model()
+    responses = cache(repository)
+    summary = Runnable(Prompt("summary"), model)
+    assert (await run(responses, "work-history-summary", summary, {}))["content"] == "answer 1"
+    with bypass_response_cache():
+        assert (await run(responses, "work-history-summary", summary, {}))["content"] == "answer 2"
+    assert (await run(responses, "work-history-summary", summary, {}))["content"] == "answer 2"
+    assert (await run(cache(repository), "work-history-summary", summary, {}))["content"] == "answer 2"
+    assert responses.prompt_stats["work-history-summary"] == {"lookups": 3, "hits": 1, "misses": 1, "bypassed": 1}
+
+    repository.down = True
+    unavailable = cache(repository)
+    assert (await run(unavailable, "work-history-summary", summary, {}))["content"] == "answer 3"
+    assert unavailable.stats["store_failures"] == 2
+
+
+@pytest.mark.asyncio
+async def test_only_responses_passing_the_check_are_cached():
+    repository, model = FakeLlmResponsesRepository(), Model()
+    responses = cache(repository)
+    scoring = Runnable(Prompt("score {param_data}"), model)
+
+    def parses(response):
+        return json.loads(response["content"])
+
+    async def score():
+        return await responses.get_or_call("param-scoring-v2", scoring, {}, lambda: model.answer({}), valid=parses)
+
+    # "answer 1" is not JSON: returned to the caller but not cached, so the next call asks the model again
+    assert (await score())["content"] == "answer 1"
+    await score()
+    assert model.calls == 2 and repository.rows == {} and responses.stats["rejected"] == 2
+
+    # A response cached before the check is a miss and gets replaced
+    key = responses.key("param-scoring-v2", scoring, {})
+    expires_at = datetime.max.replace(tzinfo=timezone.utc)
+    repository.rows[key] = ("param-scoring-v2", json.dumps({"content": "not json"}), expires_at)
+    model.answer = lambda arguments: _answer('{"score": 70}')
+    assert (await score())["content"] == '{"score": 70}'
+    assert (await score())["content"] == '{"score": 70}'
+    assert responses.prompt_stats["param-scoring-v2"]["hits"] == 1
+
+
+async def _answer(content):
+    return {"content": content}
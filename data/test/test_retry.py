@@ -0,0 +1,173 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from data.data_common.events import retry
+from data.data_common.events.event_dispatcher import PartitionDispatcher
+from data.data_common.events.genie_envelope import GenieEnvelope
+from data.data_common.events.local_event_bus import LocalEventBus
+from data.data_common.events.retry import RetryLater, RetryPolicy, RetryScheduler, defer_inline_retry, set_retries_deferred
+
+
+class FakeFailedEventsRepository:
+    def __init__(self):
+        self.retries = {}
+        self.dead_letters = {}
+        self.next_id = 1
+
+    def _id(self) -> int:
+        self.next_id += 1
+        return self.next_id - 1
+
+    def insert_retry(self, consumer_group, topic, body, properties, attempts, last_error, next_attempt_at):
+        retry_id = self._id()
+        self.retries[retry_id] = {"id": retry_id, "consumer_group": consumer_group, "topic": topic, "body": body,
+                                  "properties": properties, "attempts": attempts, "last_error": last_error,
+                                  "first_failed_at": datetime.now(timezone.utc), "next_attempt_at": next_attempt_at}
+        return retry_id
+
+    def claim_due(self, consumer_group, limit, lease_seconds):
+        now = datetime.now(timezone.utc)
+        due = sorted((row for row in self.retries.values()
+                      if row["consumer_group"] == consumer_group and row["next_attempt_at"] <= now),
+                     key=lambda row: row["next_attempt_at"])[:limit]
+        for row in due:
+            row["next_attempt_at"] = datetime.max.replace(tzinfo=timezone.utc)
+        return [dict(row) for row in due]
+
+    def reschedule(self, retry_id, attempts, last_error, next_attempt_at):
+        self.retries[retry_id].update(attempts=attempts, last_error=last_error, next_attempt_at=next_attempt_at)
+
+    def delete_retry(self, retry_id):
+        del self.retries[retry_id]
+
+    def dead_letter(self, retry_id, consumer_group, topic, body, properties, attempts, last_error, first_failed_at):
+        self.retries.pop(retry_id, None)
+        dead_letter_id = self._id()
+        self.dead_letters[dead_letter_id] = {"id": dead_letter_id, "consumer_group": consumer_group, "topic": topic,
+                                             "body": body, "properties": properties, "attempts": attempts,
+                                             "last_error": last_error, "first_failed_at": first_failed_at}
+        return dead_letter_id
+
+    def replay_dead_letters(self, ids=None, consumer_group=None, topic=None):
+        replayed = [row for row in self.dead_letters.values() if not ids or row["id"] in ids]
+        for row in replayed:
+            del self.dead_letters[row["id"]]
+            self.insert_retry(row["consumer_group"], row["topic"], row["body"], row["properties"], 0,
+                              row["last_error"], datetime.now(timezone.utc))
+        return len(replayed)
+
+
+class FlakyConsumer:
+    """Handles events as GenieConsumer.handle_event does: failures go to the retry scheduler."""
+
+    def __init__(self, bus: LocalEventBus, repository, failures: dict, policy: RetryPolicy):
+        self.receiver = bus.receiver("group", ["NEW_PERSON"])
+        self.failures = failures
+        self.handled = {}
+        self.failed = []
+        self.dispatcher = PartitionDispatcher(self.handle_event, self.checkpoint, max_in_flight_per_partition=1)
+        self.retries = RetryScheduler("group", self.handle_event, repository, policy, poll_seconds=0.01)
+
+    async def checkpoint(self, partition_context, envelope):
+        await partition_context.update_checkpoint(envelope.event)
+
+    async def on_event(self, partition_context, event):
+        await self.dispatcher.dispatch(partition_context, GenieEnvelope(event))
+
+    async def handle_event(self, envelope: GenieEnvelope):
+        email = envelope.payload["email"]
+        try:
+            set_retries_deferred(True)
+            await asyncio.sleep(0.001)
+            if self.failures.get(email):
+                self.failures[email] -= 1
+                # A client backing off for longer than it may hold the partition
+                defer_inline_retry(30, f"{email} is rate limited")
+                raise RuntimeError(f"{email} failed")
+            self.handled[email] = time.perf_counter()
+        except (Exception, RetryLater) as e:
+            if not self.retries.schedule(envelope, e):
+                self.failed.append(email)
+
+    async def run(self, timeout: float, done, receive: bool = True):
+        task = asyncio.create_task(self.receiver.receive(on_event=self.on_event)) if receive else None
+        self.retries.start()
+        started = time.perf_counter()
+        while not done() and time.perf_counter() - started < timeout:
+            await asyncio.sleep(0.01)
+        await self.retries.stop(timeout=1)
+        if task:
+            await self.receiver.close()
+            await task
+            await self.dispatcher.drain(timeout=1)
+
+
+def publish(bus: LocalEventBus, email: str):
+    bus.publish(json.dumps({"email": email}), {"topic": "NEW_PERSON"}, partition_key="same-partition")
+
+
+@pytest.mark.asyncio
+async def test_healthy_events_keep_flowing_while_a_failing_one_is_retried():
+    bus = LocalEventBus(partitions=1)
+    repository = FakeFailedEventsRepository()
+    consumer = FlakyConsumer(bus, repository, {"flaky@example.com": 2},
+                             RetryPolicy(max_attempts=5, base_delay_seconds=0.2, max_delay_seconds=1))
+    started = time.perf_counter()
+    publish(bus, "flaky@example.com")
+    for number in range(50):
+        publish(bus, f"healthy{number}@example.com")
+
+    await consumer.run(5, lambda: len(consumer.handled) == 51)
+    healthy = [at for email, at in consumer.handled.items() if email.startswith("healthy")]
+    assert len(healthy) == 50
+    # The partition was not held by the failing event's backoff
+    assert max(healthy) - started < 0.2
+    assert consumer.handled["flaky@example.com"] > max(healthy)
+    assert consumer.retries.stats == {"scheduled": 2, "retried": 2, "succeeded": 1, "dead_lettered": 0, "store_failures": 0}
+    assert repository.retries == {} and consumer.failed == []
+    assert bus.backlog("group") == 0
+
+
+@pytest.mark.asyncio
+async def test_poison_events_are_dead_lettered_and_can_be_replayed():
+    bus = LocalEventBus(partitions=1)
+    repository = FakeFailedEventsRepository()
+    failures = {"poison@example.com": 3}
+    consumer = FlakyConsumer(bus, repository, failures, RetryPolicy(max_attempts=3, base_delay_seconds=0.01))
+    publish(bus, "poison@example.com")
+    publish(bus, "healthy@example.com")
+
+    await consumer.run(2, lambda: consumer.failed)
+    assert consumer.failed == ["poison@example.com"] and list(consumer.handled) == ["healthy@example.com"]
+    [dead_letter] = repository.dead_letters.values()
+    assert dead_letter["attempts"] == 3 and dead_letter["last_error"] == "RetryLater: poison@example.com is rate limited"
+    assert dead_letter["properties"] == {"topic": "NEW_PERSON"}
+
+    # Once the cause is fixed an admin replays it
+    assert repository.replay_dead_letters([dead_letter["id"]]) == 1
+    await consumer.run(2, lambda: "poison@example.com" in consumer.handled, receive=False)
+    assert "poison@example.com" in consumer.handled and repository.retries == {}
+
+
+def test_backoff_grows_until_capped_and_is_configured_per_consumer_group(monkeypatch):
+    policy = RetryPolicy(max_attempts=4, base_delay_seconds=10, max_delay_seconds=60)
+    assert 5 <= policy.delay(1) <= 10
+    assert 20 <= policy.delay(3) <= 40
+    assert 30 <= policy.delay(8) <= 60
+    assert not policy.exhausted(3) and policy.exhausted(4)
+
+    monkeypatch.setenv("RETRY_MAX_ATTEMPTS_LANGSMITHCONSUMERGROUP", "2")
+    assert RetryPolicy.for_consumer_group("langsmithconsumergroup").max_attempts == 2
+    assert RetryPolicy.for_consumer_group("other").max_attempts == retry.RETRY_MAX_ATTEMPTS
+
+    # Outside a consumer with retries, clients keep retrying inline
+    defer_inline_retry(30, "rate limited")
+    set_retries_deferred(True)
+    defer_inline_retry(1, "rate limited")
+    with pytest.raises(RetryLater):
+        defer_inline_retry(1, "rate limited", blocking=True)
+    set_retries_deferred(False)
@@ -0,0 +1,203 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from data.data_common.events.checkpointing import CheckpointPolicy, Checkpointer
+from data.data_common.events.event_dispatcher import PartitionDispatcher
+from data.data_common.events.genie_envelope import GenieEnvelope
+from data.data_common.events.local_event_bus import LocalEventBus
+from data.data_common.events.retry import RetryLater, RetryPolicy, RetryScheduler
+from data.data_common.events.shared_receiver import SharedReceiver
+from data.data_common.events.topics import Topic
+
+
+class FakeEvent:
+    def __init__(self, sequence_number: int, topic: str, body: str = "not json"):
+        self.sequence_number = sequence_number
+        self.offset = str(sequence_number * 100)
+        self.properties = {b"topic": topic.encode("utf-8")}
+        self.body = body
+
+    def body_as_str(self):
+        return self.body
+
+
+class FakePartitionContext:
+    fully_qualified_namespace = "namespace"
+    eventhub_name = "hub"
+
+    def __init__(self, partition_id: str = "0"):
+        self.partition_id = partition_id
+        self.checkpoints = []
+
+    async def update_checkpoint(self, event=None, **kwargs):
+        self.checkpoints.append(event.sequence_number)
+
+
+class FakeCheckpointStore:
+    def __init__(self, checkpoints: list[dict] = ()):
+        self.checkpoints = list(checkpoints)
+
+    async def list_checkpoints(self, fully_qualified_namespace, eventhub_name, consumer_group, **kwargs):
+        return [checkpoint for checkpoint in self.checkpoints if checkpoint["consumer_group"] == consumer_group]
+
+    async def update_checkpoint(self, checkpoint, **kwargs):
+        self.checkpoints.append(checkpoint)
+
+
+class FakeConsumer:
+    def __init__(self, consumer_group: str, topics: list[str], gate: asyncio.Event = None):
+        self.consumer_group = consumer_group
+        self.topics = topics
+        self.gate = gate
+        self.handled = []
+        self.checkpointer = Checkpointer(CheckpointPolicy(every_events=1, every_seconds=60))
+        self.dispatcher = PartitionDispatcher(self.handle, self.checkpointer.advance, max_in_flight_per_partition=4)
+        self.prefetch = self.dispatcher.max_in_flight_per_partition
+
+    async def on_event(self, partition_context, event):
+        await self.dispatcher.dispatch(partition_context, event)
+
+    async def handle(self, event):
+        if self.gate:
+            await self.gate.wait()
+        self.handled.append(event.sequence_number)
+
+
+class FakeRetriesRepository:
+    def __init__(self):
+        self.retries = {}
+
+    def insert_retry(self, consumer_group, topic, body, properties, attempts, last_error, next_attempt_at):
+        retry_id = len(self.retries) + 1
+        self.retries[retry_id] = {"id": retry_id, "consumer_group": consumer_group, "body": body,
+                                  "properties": properties, "attempts": attempts, "next_attempt_at": next_attempt_at}
+        return retry_id
+
+    def claim_due(self, consumer_group, limit, lease_seconds):
+        now = datetime.now(timezone.utc)
+        due = [row for row in self.retries.values() if row["next_attempt_at"] <= now][:limit]
+        for row in due:
+            row["next_attempt_at"] = now + timedelta(seconds=lease_seconds)
+        return [dict(row) for row in due]
+
+    def reschedule(self, retry_id, attempts, last_error, next_attempt_at):
+        self.retries[retry_id].update(attempts=attempts, next_attempt_at=next_attempt_at)
+
+    def delete_retry(self, retry_id):
+        del self.retries[retry_id]
+
+
+class FailingOnceConsumer(FakeConsumer):
+    """Fails each event the first time, as GenieConsumer.handle_event does: the failure goes to its RetryScheduler."""
+
+    def __init__(self, consumer_group: str, topics: list[str], repository):
+        super().__init__(consumer_group, topics)
+        self.dispatcher = PartitionDispatcher(self.handle_event, self.checkpointer.advance, max_in_flight_per_partition=4)
+        self.retries = RetryScheduler(consumer_group, self.handle_event, repository,
+                                      RetryPolicy(max_attempts=3, base_delay_seconds=0.01), poll_seconds=0.01)
+        self.attempts = 0
+
+    async def on_event(self, partition_context, event):
+        await self.dispatcher.dispatch(partition_context, GenieEnvelope(event))
+
+    async def handle_event(self, envelope):
+        self.attempts += 1
+        try:
+            if self.attempts == 1:
+                raise RetryLater("rate limited", delay_seconds=0.01)
+            self.handled.append(envelope.topic)
+        except (Exception, RetryLater) as e:
+            self.retries.schedule(envelope, e)
+
+
+def shared_receiver(consumers, checkpoint_store=None, receiver=None) -> SharedReceiver:
+    return SharedReceiver(consumers, receiver, checkpoint_store=checkpoint_store,
+                          checkpoint_policy=CheckpointPolicy(every_events=1, every_seconds=60))
+
+
+@pytest.mark.asyncio
+async def test_events_reach_only_the_consumers_of_their_topic():
+    bus = LocalEventBus(partitions=1)
+    persons = FakeConsumer("persons", [Topic.NEW_PERSON, Topic.NEW_CONTACT])
+    meetings = FakeConsumer("meetings", [Topic.NEW_MEETING])
+    everything = FakeConsumer("garbage", ["*"])
+    receiver = shared_receiver([persons, meetings, everything], receiver=bus.receiver("shared", ["*"]))
+    for topic in (Topic.NEW_PERSON, Topic.NEW_MEETING, Topic.NEW_CONTACT, Topic.PROFILE_ERROR):
+        bus.publish("not json", {"topic": topic})
+
+    task = asyncio.create_task(receiver.start())
+    await asyncio.sleep(0.05)
+    await receiver.stop(timeout=1)
+    await task
+    assert persons.handled == [0, 2]
+    assert meetings.handled == [1]
+    assert everything.handled == [0, 1, 2, 3]
+    assert receiver.stats["dispatched"] == 7
+    assert bus.backlog("shared") == 0
+
+
+@pytest.mark.asyncio
+async def test_shared_checkpoint_waits_for_the_slowest_consumer():
+    gate = asyncio.Event()
+    fast = FakeConsumer("fast", [Topic.NEW_PERSON])
+    slow = FakeConsumer("slow", [Topic.NEW_PERSON], gate=gate)
+    receiver = shared_receiver([fast, slow])
+    context = FakePartitionContext()
+    for number in range(3):
+        await receiver.on_event(context, FakeEvent(number, Topic.NEW_PERSON))
+    await receiver.on_event(context, FakeEvent(3, Topic.NEW_MEETING))
+    await fast.dispatcher.drain(timeout=1)
+    assert fast.handled == [0, 1, 2]
+    assert context.checkpoints == []
+
+    gate.set()
+    await slow.dispatcher.drain(timeout=1)
+    # Nobody waits for the unrouted event 3, it is checkpointed with the events before it
+    assert context.checkpoints[-1] == 3
+    await receiver.on_event(context, FakeEvent(4, Topic.PROFILE_ERROR))
+    assert context.checkpoints[-1] == 4
+    assert receiver.stats["unrouted"] == 2
+
+
+@pytest.mark.asyncio
+async def test_consumer_checkpoints_are_kept_per_consumer_group():
+    store = FakeCheckpointStore([{"consumer_group": "persons", "partition_id": "0", "sequence_number": 1}])
+    persons = FakeConsumer("persons", [Topic.NEW_PERSON])
+    meetings = FakeConsumer("meetings", [Topic.NEW_PERSON])
+    receiver = shared_receiver([persons, meetings], checkpoint_store=store)
+    context = FakePartitionContext()
+    await receiver.on_partition_initialize(context)
+    for number in range(3):
+        await receiver.on_event(context, FakeEvent(number, Topic.NEW_PERSON))
+    for consumer in (persons, meetings):
+        await consumer.dispatcher.drain(timeout=1)
+
+    assert persons.handled == [2]
+    assert meetings.handled == [0, 1, 2]
+    assert receiver.stats["skipped"] == 2
+    written = [(checkpoint["consumer_group"], checkpoint["sequence_number"]) for checkpoint in store.checkpoints[1:]]
+    assert ("persons", 2) in written and ("meetings", 2) in written
+    assert all(checkpoint["offset"] == str(checkpoint["sequence_number"] * 100) for checkpoint in store.checkpoints[1:])
+    assert context.checkpoints[-1] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_events_are_retried_behind_the_shared_receiver():
+    bus = LocalEventBus(partitions=1)
+    repository = FakeRetriesRepository()
+    persons = FailingOnceConsumer("persons", [Topic.NEW_PERSON], repository)
+    receiver = shared_receiver([persons], receiver=bus.receiver("shared", ["*"]))
+    bus.publish("not json", {"topic": Topic.NEW_PERSON})
+
+    task = asyncio.create_task(receiver.start())
+    for _ in range(100):
+        if persons.handled:
+            break
+        await asyncio.sleep(0.01)
+    await receiver.stop(timeout=1)
+    await task
+    assert persons.handled == [Topic.NEW_PERSON]
+    assert persons.retries.stats["scheduled"] == 1 and persons.retries.stats["succeeded"] == 1
+    assert repository.retries == {}
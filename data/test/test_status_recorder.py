@@ -0,0 +1,75 @@
+import threading
+import time
+
+from data.data_common.repositories.status_recorder import StatusRecorder
+
+
+class FakeStatusesRepository:
+    def __init__(self, fail_batches: bool = False):
+        self.fail_batches = fail_batches
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def write_statuses(self, updates, inserts):
+        with self.lock:
+            if self.fail_batches and len(updates) + len(inserts) > 1:
+                raise RuntimeError("batch failed")
+            self.calls.append((list(updates), list(inserts)))
+
+    @property
+    def updates(self):
+        return [update for updates, _ in self.calls for update in updates]
+
+    @property
+    def inserts(self):
+        return [insert for _, inserts in self.calls for insert in inserts]
+
+
+def test_transitions_of_one_key_are_coalesced_into_one_update():
+    repository = FakeStatusesRepository()
+    recorder = StatusRecorder(repository, flush_interval_ms=60_000)
+    recorder.update_status("ctx", "person-1", "user", "topic", "PROCESSING")
+    recorder.update_status("ctx", "person-1", "user", "topic", "COMPLETED")
+    recorder.flush()
+    assert len(repository.calls) == 1
+    assert [(update[:4], update[5]) for update in repository.updates] == [(("ctx", "person-1", "user", "topic"), "COMPLETED")]
+    assert recorder.stats["coalesced"] == 1
+
+
+def test_status_started_in_this_process_is_inserted_with_its_final_status():
+    repository = FakeStatusesRepository()
+    recorder = StatusRecorder(repository, flush_interval_ms=60_000)
+    recorder.start_status("ctx", "meeting-1", "MEETING", "user", "tenant", "previous", "topic")
+    recorder.update_status("ctx", "meeting-1", "user", "topic", "FAILED", "boom")
+    recorder.flush()
+    assert repository.updates == []
+    [insert] = repository.inserts
+    assert insert[:7] == ("ctx", "meeting-1", "MEETING", "user", "tenant", "topic", "previous")
+    assert insert[8:] == ("FAILED", "boom")
+
+
+def test_background_flush_and_bounded_buffer():
+    repository = FakeStatusesRepository()
+    recorder = StatusRecorder(repository, flush_interval_ms=20, flush_size=1000, max_buffer=1000)
+    recorder.update_status("ctx", "person-1", "user", "topic", "PROCESSING")
+    time.sleep(0.1)
+    assert len(repository.updates) == 1
+
+    recorder = StatusRecorder(repository, flush_interval_ms=60_000, flush_size=5, max_buffer=10)
+    for number in range(25):
+        recorder.update_status("ctx", f"person-{number}", "user", "topic", "PROCESSING")
+        assert len(recorder._pending) < 10
+    recorder.close()
+    assert len(repository.updates) == 26
+
+
+def test_failed_batch_is_retried_row_by_row():
+    repository = FakeStatusesRepository(fail_batches=True)
+    recorder = StatusRecorder(repository, flush_interval_ms=60_000)
+    recorder.update_status("ctx", "person-1", "user", "topic", "COMPLETED")
+    recorder.start_status("ctx", "person-2", "PERSON", "user", "tenant", None, "topic")
+    recorder.start_status("ctx", "person-3", "PERSON", None, "tenant", None, "topic")
+    recorder.flush()
+    assert len(repository.updates) == 1
+    assert len(repository.inserts) == 1
+    assert recorder.stats["dropped"] == 1
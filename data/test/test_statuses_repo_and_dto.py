@@ -79,3 +79,42 @@ def test_failed_status_with_error():
         statuses_repo.delete_status("ctx_id", "123e4567-e89b-12d3-a456-426614174002", "user_id", "event_topic")
         status = statuses_repo.get_status("ctx_id", "123e4567-e89b-12d3-a456-426614174002", "user_id", "event_topic")
         assert status is None
+
+
+def test_transition_written_before_its_started_row():
+    object_id = "123e4567-e89b-12d3-a456-426614174003"
+    sent_at = datetime.now(timezone.utc)
+    processed_at = sent_at + timedelta(seconds=1)
+    try:
+        # The consumer's process flushes before the producer's
+        statuses_repo.write_statuses([("ctx_id", object_id, "user_id", "event_topic", processed_at, "COMPLETED", None)], [])
+        statuses_repo.write_statuses([], [("ctx_id", object_id, "PERSON", "user_id", "tenant_id", "event_topic",
+                                           "previous_event", sent_at, "STARTED", None)])
+        status = statuses_repo.get_status("ctx_id", object_id, "user_id", "event_topic")
+        assert status.status == StatusEnum.COMPLETED
+        assert status.object_type == "PERSON"
+        assert status.tenant_id == "tenant_id"
+        assert status.previous_event_topic == "previous_event"
+
+        # The event is sent again: its started row is newer
+        statuses_repo.write_statuses([], [("ctx_id", object_id, "PERSON", "user_id", "tenant_id", "event_topic",
+                                           "previous_event", processed_at + timedelta(seconds=1), "STARTED", None)])
+        assert statuses_repo.get_status("ctx_id", object_id, "user_id", "event_topic").status == StatusEnum.STARTED
+    finally:
+        statuses_repo.delete_status("ctx_id", object_id, "user_id", "event_topic")
+
+
+def test_transition_and_started_row_of_a_new_key_in_one_flush():
+    object_id = "123e4567-e89b-12d3-a456-426614174004"
+    sent_at = datetime.now(timezone.utc)
+    try:
+        statuses_repo.write_statuses(
+            [("ctx_id", object_id, "user_id", "event_topic", sent_at + timedelta(seconds=1), "PROCESSING", None)],
+            [("ctx_id", object_id, "PERSON", "user_id", "tenant_id", "event_topic", "previous_event", sent_at, "STARTED", None)],
+        )
+        status = statuses_repo.get_status("ctx_id", object_id, "user_id", "event_topic")
+        assert status.status == StatusEnum.PROCESSING and status.object_type == "PERSON"
+        statuses_repo.delete_status("ctx_id", object_id, "user_id", "event_topic")
+        assert statuses_repo.get_status("ctx_id", object_id, "user_id", "event_topic") is None
+    finally:
+        statuses_repo.delete_status("ctx_id", object_id, "user_id", "event_topic")
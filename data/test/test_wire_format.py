@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import pytest
+
+from data.data_common.events.genie_envelope import GenieEnvelope
+from data.data_common.events.local_event_bus import LocalEvent, LocalEventBus
+from data.data_common.events.topics import Topic
+from data.data_common.events.wire_format import (
+    CONTENT_ENCODING_PROPERTY,
+    WIRE_VERSION_PROPERTY,
+    decode_event,
+    encode_payload,
+    event_text,
+)
+
+PROFILE = {"person": {"uuid": "person-1", "email": "jane@example.com"}, "strengths": ["Led teams " * 20] * 50}
+
+
+def received(payload, **kwargs) -> LocalEvent:
+    """The event as a consumer receives it, with bytes property keys and values."""
+    bus = LocalEventBus(partitions=1)
+    bus.subscribe("group", ["*"])
+    body, properties = encode_payload(payload, **kwargs)
+    bus.publish(body, {"topic": Topic.NEW_PROCESSED_PROFILE, **properties})
+    return bus._subscriptions["group"].logs[0].pending[0]
+
+
+def test_small_payloads_are_encoded_once_without_compression():
+    event = received({"uuid": "person-1"}, version=2, compression="gzip", threshold=4096)
+    assert event.properties[WIRE_VERSION_PROPERTY.encode()] == b"2"
+    assert CONTENT_ENCODING_PROPERTY.encode() not in event.properties
+    assert event.body == b'{"uuid":"person-1"}'
+    assert decode_event(event) == {"uuid": "person-1"}
+
+
+def test_large_payloads_are_compressed_and_flagged():
+    event = received(PROFILE, version=2, compression="gzip", threshold=4096)
+    assert event.properties[CONTENT_ENCODING_PROPERTY.encode()] == b"gzip"
+    assert len(event.body) < len(json.dumps(PROFILE)) / 10
+    envelope = GenieEnvelope(event)
+    assert envelope.payload == PROFILE
+    assert envelope.object_id == "person-1"
+    assert json.loads(envelope.body_as_str()) == PROFILE
+
+
+def test_compression_can_be_turned_off():
+    event = received(PROFILE, version=2, compression="none", threshold=4096)
+    assert CONTENT_ENCODING_PROPERTY.encode() not in event.properties
+    assert decode_event(event) == PROFILE
+
+
+def test_legacy_bodies_are_still_decoded():
+    body, properties = encode_payload(PROFILE, version=1)
+    assert properties == {}
+    assert body == json.dumps(json.dumps(PROFILE))
+    event = received(PROFILE, version=1)
+    assert decode_event(event) == PROFILE
+    assert event_text(event) == body
+
+
+def test_unknown_versions_are_rejected():
+    event = LocalEvent(b"{}", {WIRE_VERSION_PROPERTY.encode(): b"3"}, None, 0)
+    with pytest.raises(ValueError):
+        decode_event(event)
+    with pytest.raises(ValueError):
+        encode_payload({}, version=3)
+
+
+@pytest.mark.asyncio
+async def test_compressed_events_travel_through_the_local_bus():
+    bus = LocalEventBus(partitions=1)
+    receiver = bus.receiver("group", [Topic.NEW_PROCESSED_PROFILE])
+    batch = await bus.create_batch()
+
+    class Prepared:
+        body, properties = encode_payload(PROFILE, version=2, compression="gzip", threshold=0)
+        properties = {"topic": Topic.NEW_PROCESSED_PROFILE, **properties}
+
+    batch.add(Prepared())
+    await bus.send_batch(batch)
+    payloads = []
+
+    async def on_event(partition_context, event):
+        payloads.append(GenieEnvelope(event).payload)
+        await receiver.close()
+
+    await asyncio.wait_for(receiver.receive(on_event=on_event), 1)
+    assert payloads == [PROFILE]
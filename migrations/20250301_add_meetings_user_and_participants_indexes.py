@@ -0,0 +1,11 @@
+from data.data_common.utils.index_utils import create_index_concurrently, drop_index_concurrently
+
+def upgrade():
+    # get_all_meetings_by_user_id* filter on user_id and classification
+    create_index_concurrently("idx_meetings_user_id_classification", "meetings", "(user_id, classification)")
+    # participants_emails @> lookups (meetings of a participant); jsonb_path_ops does not serve ?| queries
+    create_index_concurrently("idx_meetings_participants_emails", "meetings", "USING GIN (participants_emails jsonb_path_ops)")
+
+def downgrade():
+    drop_index_concurrently("idx_meetings_participants_emails")
+    drop_index_concurrently("idx_meetings_user_id_classification")
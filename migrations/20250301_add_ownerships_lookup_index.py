@@ -0,0 +1,8 @@
+from data.data_common.utils.index_utils import create_index_concurrently, drop_index_concurrently
+
+def upgrade():
+    # check_ownership filters on (person_uuid, user_id); person_uuid leads so person-only lookups use it too
+    create_index_concurrently("idx_ownerships_person_uuid_user_id", "ownerships", "(person_uuid, user_id)")
+
+def downgrade():
+    drop_index_concurrently("idx_ownerships_person_uuid_user_id")
@@ -0,0 +1,8 @@
+from data.data_common.utils.index_utils import create_index_concurrently, drop_index_concurrently
+
+def upgrade():
+    # uuid is already covered by the UNIQUE constraint; email lookups were sequential scans
+    create_index_concurrently("idx_personal_data_email", "personaldata", "(email)")
+
+def downgrade():
+    drop_index_concurrently("idx_personal_data_email")
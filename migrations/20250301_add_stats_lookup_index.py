@@ -0,0 +1,8 @@
+from data.data_common.utils.index_utils import create_index_concurrently, drop_index_concurrently
+
+def upgrade():
+    # StatsRepository filters on email, action, entity and orders / filters by timestamp
+    create_index_concurrently("idx_stats_email_action_entity_timestamp", "stats", "(email, action, entity, timestamp)")
+
+def downgrade():
+    drop_index_concurrently("idx_stats_email_action_entity_timestamp")
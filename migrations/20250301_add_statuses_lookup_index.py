@@ -0,0 +1,8 @@
+from data.data_common.utils.index_utils import create_index_concurrently, drop_index_concurrently
+
+def upgrade():
+    # StatusesRepository filters every read/update on (ctx_id, object_id, user_id, event_topic)
+    create_index_concurrently("idx_statuses_ctx_object_user_topic", "statuses", "(ctx_id, object_id, user_id, event_topic)")
+
+def downgrade():
+    drop_index_concurrently("idx_statuses_ctx_object_user_topic")
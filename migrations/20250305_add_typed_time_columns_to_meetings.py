@@ -0,0 +1,79 @@
+from common.genie_logger import GenieLogger
+from data.data_common.utils.index_utils import create_index_concurrently, drop_index_concurrently
+from data.data_common.utils.postgres_connector import db_connection
+
+logger = GenieLogger()
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Strings that are not ISO dates/date-times are left NULL instead of failing the whole batch
+ISO_TIME_PATTERN = r"^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}(:?\d{2})?)?)?$"
+
+
+def upgrade():
+    with db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                DO $$
+                    BEGIN
+                        IF NOT EXISTS (
+                            SELECT 1
+                            FROM information_schema.columns
+                            WHERE table_name = 'meetings' AND column_name = 'start_time_tz'
+                        ) THEN
+                            ALTER TABLE meetings ADD COLUMN start_time_tz TIMESTAMPTZ;
+                        END IF;
+                        IF NOT EXISTS (
+                            SELECT 1
+                            FROM information_schema.columns
+                            WHERE table_name = 'meetings' AND column_name = 'end_time_tz'
+                        ) THEN
+                            ALTER TABLE meetings ADD COLUMN end_time_tz TIMESTAMPTZ;
+                        END IF;
+                    END $$;
+            """)
+            conn.commit()
+            cursor.execute("SELECT COALESCE(MIN(id), 0), COALESCE(MAX(id), 0) FROM meetings;")
+            min_id, max_id = cursor.fetchone()
+
+    # Backfill in id ranges, one short transaction per batch, so writers are never blocked for long
+    for batch_start in range(min_id, max_id + 1, BACKFILL_BATCH_SIZE):
+        with db_connection() as conn:
+            with conn.cursor() as cursor:
+                # All-day events are stored as a bare date; read them as midnight UTC like MeetingDTO.parse_time
+                cursor.execute("SET LOCAL timezone = 'UTC';")
+                cursor.execute(
+                    """
+                    UPDATE meetings
+                    SET start_time_tz = CASE WHEN start_time ~ %(pattern)s THEN start_time::timestamptz END,
+                        end_time_tz = CASE WHEN end_time ~ %(pattern)s THEN end_time::timestamptz END
+                    WHERE id >= %(start)s AND id < %(end)s
+                      AND (start_time_tz IS NULL OR end_time_tz IS NULL);
+                    """,
+                    {"pattern": ISO_TIME_PATTERN, "start": batch_start, "end": batch_start + BACKFILL_BATCH_SIZE},
+                )
+                logger.info(f"Backfilled {cursor.rowcount} meetings with ids {batch_start}-{batch_start + BACKFILL_BATCH_SIZE - 1}")
+                conn.commit()
+
+    # get_all_meetings_by_user_id_in_datetime, get_all_future_*_for_user and *_that_should_be_imported
+    create_index_concurrently("idx_meetings_user_id_start_time_tz", "meetings", "(user_id, start_time_tz)")
+    # get_all_future_*_for_tenant and get_all_meetings_by_tenant_id_that_should_be_imported
+    create_index_concurrently("idx_meetings_tenant_id_start_time_tz", "meetings", "(tenant_id, start_time_tz)")
+    # get_meetings_to_send_reminders only looks at pending reminders of external meetings
+    create_index_concurrently(
+        "idx_meetings_pending_reminder_schedule",
+        "meetings",
+        "(reminder_schedule) WHERE reminder_sent IS NULL AND classification = 'external'",
+    )
+
+
+def downgrade():
+    drop_index_concurrently("idx_meetings_pending_reminder_schedule")
+    drop_index_concurrently("idx_meetings_tenant_id_start_time_tz")
+    drop_index_concurrently("idx_meetings_user_id_start_time_tz")
+    with db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                ALTER TABLE meetings DROP COLUMN IF EXISTS start_time_tz, DROP COLUMN IF EXISTS end_time_tz;
+            """)
+            conn.commit()
@@ -0,0 +1,11 @@
+from data.data_common.utils.index_utils import create_index_concurrently, drop_index_concurrently
+
+def upgrade():
+    # find_person_by_email / find_persons_by_emails and the persons join of get_profiles_by_emails
+    create_index_concurrently("idx_persons_email", "persons", "(email)")
+    # get_company_from_domain / get_companies_by_domains
+    create_index_concurrently("idx_companies_domain", "companies", "(domain)")
+
+def downgrade():
+    drop_index_concurrently("idx_companies_domain")
+    drop_index_concurrently("idx_persons_email")
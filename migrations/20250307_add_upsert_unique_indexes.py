@@ -0,0 +1,43 @@
+from common.genie_logger import GenieLogger
+from data.data_common.utils.index_utils import create_index_concurrently, drop_index_concurrently
+from data.data_common.utils.postgres_connector import db_connection
+
+logger = GenieLogger()
+
+# Conflict targets of the upserts in PersonsRepository.save_person and MeetingsRepository.save_meeting.
+# Existing duplicates are reported, not merged: persons are referenced by uuid from profiles, ownerships and
+# personal data. upgrade() builds the indexes of tables without duplicates and logs the ones it skips, so
+# deploys are not held up by existing data. The upserts re-probe for their conflict target and keep their
+# check-then-write path until it exists; a skipped index is built by running upgrade() again once the
+# duplicates are merged.
+UNIQUE_INDEXES = [
+    ("idx_persons_email_unique", "persons", ("email",)),
+    ("idx_meetings_google_calendar_id_user_id_unique", "meetings", ("google_calendar_id", "user_id")),
+]
+
+
+def upgrade():
+    for index_name, table, columns in UNIQUE_INDEXES:
+        with db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT COUNT(*) FROM (
+                        SELECT 1 FROM {table}
+                        WHERE {' AND '.join(f'{column} IS NOT NULL' for column in columns)}
+                        GROUP BY {', '.join(columns)}
+                        HAVING COUNT(*) > 1
+                    ) duplicates;
+                    """
+                )
+                duplicates = cursor.fetchone()[0]
+        if duplicates:
+            logger.warning(f"Skipping {index_name}: {duplicates} duplicate {columns} groups in {table}, "
+                           f"merge them and run this migration's upgrade() again to build it")
+            continue
+        create_index_concurrently(index_name, table, f"({', '.join(columns)})", unique=True)
+
+
+def downgrade():
+    for index_name, _, _ in UNIQUE_INDEXES:
+        drop_index_concurrently(index_name)
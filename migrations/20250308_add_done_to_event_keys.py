@@ -0,0 +1,20 @@
+from data.data_common.utils.postgres_connector import db_connection
+
+
+def upgrade():
+    # Keys claimed before leases existed count as done, as every claim did
+    with db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                ALTER TABLE IF EXISTS event_keys ADD COLUMN IF NOT EXISTS done BOOLEAN NOT NULL DEFAULT TRUE;
+            """)
+            conn.commit()
+
+
+def downgrade():
+    with db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                ALTER TABLE IF EXISTS event_keys DROP COLUMN IF EXISTS done;
+            """)
+            conn.commit()
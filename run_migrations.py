@@ -1,5 +1,6 @@
 import os
 from data.data_common.utils.postgres_connector import db_connection
+from data.data_common.utils.schema_registry import bootstrap_schema
 from common.genie_logger import GenieLogger
 
 
@@ -42,6 +43,9 @@ def apply_migration(migration_file):
 
 def run_migrations():
     logger.info("Running migrations")
+    # Importing the dependencies registers every repository's DDL with the schema registry
+    import data.data_common.dependencies.dependencies  # noqa: F401
+    bootstrap_schema()
     applied_migrations = get_applied_migrations()
     all_migrations = sorted(os.listdir(MIGRATIONS_DIR))
 
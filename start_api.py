@@ -1,3 +1,4 @@
+import asyncio
 import traceback
 import signal
 import sys
@@ -10,7 +11,11 @@ from dotenv import load_dotenv
 # from azure.monitor.opentelemetry import configure_azure_monitor
 # from common.utils import jwt_utils
 from common.genie_logger import GenieLogger
-from data.data_common.utils.postgres_connector import check_db_connection
+from data.data_common.utils import db_health
+from data.data_common.utils.schema_registry import bootstrap_schema
+from data.data_common.utils.async_postgres_connector import close_async_pool
+from data.data_common.events.genie_event import close_status_sink
+from data.data_common.events.genie_event_producer import close_producer_service
 
 # Load environment variables and initialize logger
 load_dotenv()
@@ -21,7 +26,7 @@ logger.info("Logger initialized")
 
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
-from starlette.responses import PlainTextResponse, RedirectResponse
+from starlette.responses import PlainTextResponse, RedirectResponse, JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from common.utils import env_utils
 
@@ -29,6 +34,7 @@ logger.info("Importing API")
 from data.api.api_manager import v1_router
 
 logger.info("Finished Importing API")
+bootstrap_schema()
 
 GENIE_CONTEXT_HEADER = "genie-context"
 GENIE_EMAIL_STATE = "user_email"
@@ -133,12 +139,33 @@ def read_root(request: Request):
     return RedirectResponse(url=base_url + "/docs")
 
 
+@app.get("/health/live")
+async def liveness_check():
+    return db_health.liveness()
+
+
+@app.get("/health/ready")
+def readiness_check():
+    readiness = db_health.readiness()
+    if readiness["status"] != "ready":
+        return JSONResponse(status_code=503, content=readiness)
+    return readiness
+
+
 @app.get("/health")
-async def health_check():
-    db_connected = check_db_connection()
-    if not db_connected:
+def health_check():
+    # Kept for existing probes: same cached, single-connection check as /health/ready
+    readiness = db_health.readiness()
+    if readiness["status"] != "ready":
         raise HTTPException(status_code=500, detail="Database connection failed")
-    return {"status": "healthy"}
+    return {"status": "healthy", "database": readiness["database"]}
+
+
+@app.on_event("shutdown")
+async def close_db_pools():
+    await asyncio.to_thread(close_producer_service, 30)
+    await asyncio.to_thread(close_status_sink)
+    await close_async_pool()
 
 
 app.include_router(v1_router, dependencies=[Depends(genie_metrics)])
@@ -10,6 +10,12 @@ from data.persons_manager import PersonManager
 from data.meetings_consumer import MeetingManager
 from data.slack_consumer import SlackConsumer
 from data.data_common.events.genie_consumer import GenieConsumer
+from data.data_common.events.genie_event import close_status_sink
+from data.data_common.events.genie_event_producer import close_producer_service
+from data.data_common.events.event_transport import EVENT_TRANSPORT, create_checkpoint_store, create_receiver
+from data.data_common.events.shared_receiver import SHARED_RECEIVER, SHARED_RECEIVER_CONSUMER_GROUP, SharedReceiver
+from data.data_common.utils.schema_registry import bootstrap_schema
+from data.data_common.utils.async_postgres_connector import close_async_pool
 from data.apollo_consumer import ApolloConsumer
 from data.company_consumer import CompanyConsumer
 from data.sales_material_consumer import SalesMaterialConsumer
@@ -34,8 +40,27 @@ consumers = [
 ]
 
 
+shared_receiver = None
+
+
+def create_shared_receiver() -> SharedReceiver:
+    checkpoint_store = create_checkpoint_store()
+    topics = {topic for consumer in consumers for topic in consumer.topics}
+    receiver = create_receiver(SHARED_RECEIVER_CONSUMER_GROUP, topics, checkpoint_store=checkpoint_store)
+    return SharedReceiver(consumers, receiver, checkpoint_store=checkpoint_store)
+
+
 async def run_consumers():
-    tasks = [asyncio.create_task(consumer.start()) for consumer in consumers]
+    global shared_receiver
+    if SHARED_RECEIVER and EVENT_TRANSPORT != "local":
+        bootstrap_schema()
+        shared_receiver = create_shared_receiver()
+        tasks = [asyncio.create_task(shared_receiver.start())]
+    else:
+        if SHARED_RECEIVER:
+            # The local bus already delivers each consumer group only its own topics
+            logger.info("SHARED_RECEIVER is ignored with the local event bus")
+        tasks = [asyncio.create_task(consumer.start()) for consumer in consumers]
 
     try:
         await asyncio.gather(*tasks)
@@ -47,6 +72,12 @@ async def run_consumers():
 
 async def cleanup(consumers):
     logger.info("Cleaning up consumers.")
+    if shared_receiver is not None:
+        try:
+            await shared_receiver.stop(timeout=30)
+        except Exception as e:
+            logger.error(f"Error stopping shared receiver: {e}")
+
     for consumer in consumers:
         try:
             await consumer.stop()
@@ -58,6 +89,22 @@ async def cleanup(consumers):
     except Exception as e:
         logger.error(f"Error in GenieConsumer cleanup: {e}")
 
+    try:
+        # Deliver events still lingering in the producer before the process goes away
+        await asyncio.to_thread(close_producer_service, 30)
+    except Exception as e:
+        logger.error(f"Error closing event producer: {e}")
+
+    try:
+        await asyncio.to_thread(close_status_sink)
+    except Exception as e:
+        logger.error(f"Error flushing buffered statuses: {e}")
+
+    try:
+        await close_async_pool()
+    except Exception as e:
+        logger.error(f"Error closing async connection pool: {e}")
+
     # Close any remaining aiohttp sessions and cancel tasks
     tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
     for task in tasks: